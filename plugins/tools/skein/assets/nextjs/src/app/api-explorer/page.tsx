@@ -43,6 +43,7 @@ const ENDPOINTS: EndpointDef[] = [
       { name: "worktree.root", label: "Worktree 目录", desc: "worktree 存放目录 (相对仓库根)", type: "text", defaultValue: ".worktrees" },
       { name: "web.serve", label: "启动看板服务", desc: "启动 http 看板服务", type: "boolean", defaultValue: "true" },
       { name: "web.board_open", label: "自动打开浏览器", desc: "启动时自动打开浏览器 (仅 tty 生效)", type: "boolean", defaultValue: "true" },
+      { name: "web.exec", label: "看板写操作执行方式", desc: "inprocess=serve 进程内直调 / subprocess=每次起 skein 子进程 (隔离)", type: "text", defaultValue: "inprocess" },
       { name: "spec.core_budget", label: "Spec 核心预算", desc: "SessionStart 常驻注入预算 (字符数)", type: "number", defaultValue: "400" },
       { name: "spec.always_budget", label: "Spec 常驻预算", desc: "每轮 prompt 常驻注入预算 (字符数, ≈300 token)", type: "number", defaultValue: "517" },
       { name: "confirm.unattended", label: "无人值守放行", desc: "允许无人值守放行 confirm (cron/CI 场景)", type: "boolean", defaultValue: "false" },
@@ -55,7 +56,7 @@ const ENDPOINTS: EndpointDef[] = [
     params: [
       { name: "id", label: "Task ID", desc: "task 的唯一标识符", required: true, type: "text", placeholder: "perf-final-verification" },
     ] },
-  { id: "task-search", method: "POST", path: "/__skein__/task/search", label: "搜索 Task", desc: "按关键词搜索 task 名称和描述", category: "Task",
+  { id: "task-search", method: "POST", path: "/__skein__/task/search", label: "搜索 Task", desc: "FTS 搜索 task / subtask / spec 章节 (前缀匹配, bm25 排序, 片段带命中区间)", category: "Task",
     params: [
       { name: "q", label: "关键词", desc: "搜索关键词", required: true, type: "text", placeholder: "内存" },
     ] },
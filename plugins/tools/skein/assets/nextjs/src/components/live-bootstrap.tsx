@@ -9,7 +9,11 @@ import { AlertTriangle } from "lucide-react";
 // 项目名跨导航缓存 —— 每次路由切换都要重设标题, 但项目名一个会话内不变, 只请求一次。
 let cachedProj: string | null = null;
 
+// 自己消费 task-changed 局部更新的页: view-changed 不整页刷 (否则增量推送白做)
+const LOCAL_PAGES = /\/(board|task\/detail)\/?$/;
+
 // Boots WS live-updates on client side; subscribes globally to trigger page reloads on "data" messages.
+// 增量订阅下卡片之外的视图变了 (view-changed) 也整页刷 —— 除了自己按 task-changed 局部更新的页。
 // 断线时渲染顶部横幅提示 (非静默失效); 重连成功走 live.ts 的整页刷路径, 横幅随页面重载一并消失。
 export function LiveBootstrap() {
   const [offline, setOffline] = useState(false);
@@ -31,6 +35,7 @@ export function LiveBootstrap() {
     startLive();
     const unsub = subscribe((msg) => {
       if (msg.type === "data") location.reload();
+      if (msg.type === "view-changed" && !LOCAL_PAGES.test(location.pathname)) location.reload();
       if (msg.type === "offline") setOffline(true);
     });
     return unsub;
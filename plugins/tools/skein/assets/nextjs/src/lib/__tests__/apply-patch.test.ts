@@ -0,0 +1,70 @@
+// WS 增量协议客户端 (applyPatch / patchedCards) 纯函数测试 — 对拍服务端 delta.py 的产出形状:
+//   1) 对象上的 add / remove / replace 就地生效, path "" 整体替换返回新根
+//   2) JSON Pointer 转义 (~0 = "~", ~1 = "/") 解码正确
+//   3) patchedCards 只收 /board/cards/<id> 下的 id, 去重, 不把 /queue 之类算进去
+//   4) viewsTouched 反过来只收卡片之外的视图 (queue / board overview), 整体替换算全部
+//
+// 运行 (从 nextjs 项目根目录):
+//   npx tsc src/lib/__tests__/apply-patch.test.ts --outDir /tmp/apout \
+//     --module commonjs --moduleResolution node --target es2020 --esModuleInterop --skipLibCheck
+//   node /tmp/apout/__tests__/apply-patch.test.js
+
+import { applyPatch, patchedCards, viewsTouched } from "../live";
+
+let pass = 0, fail = 0;
+function assert(cond: boolean, msg: string) {
+  if (cond) { pass++; return; }
+  fail++;
+  console.error(`FAIL: ${msg}`);
+}
+
+// ── 断言 1: add / remove / replace ──
+{
+  const doc = { board: { cards: { a: { id: "a", status: "pending" }, b: { id: "b" } } }, queue: { q: [1] } };
+  const out = applyPatch(doc, [
+    { op: "replace", path: "/board/cards/a/status", value: "active" },
+    { op: "remove", path: "/board/cards/b" },
+    { op: "add", path: "/board/cards/c", value: { id: "c" } },
+    { op: "replace", path: "/queue/q", value: [1, 2] },
+  ]) as typeof doc & { board: { cards: Record<string, unknown> } };
+  assert(out === doc, "非根 path 就地改, 返回同一对象");
+  assert((out.board.cards.a as { status: string }).status === "active", "replace 叶子字段");
+  assert(!("b" in out.board.cards), "remove 删键");
+  assert(JSON.stringify(out.board.cards.c) === '{"id":"c"}', "add 新键");
+  assert(JSON.stringify(out.queue.q) === "[1,2]", "数组整值 replace");
+  assert(JSON.stringify(applyPatch(doc, [{ op: "replace", path: "", value: { x: 1 } }])) === '{"x":1}',
+    "path \"\" 整体替换");
+}
+
+// ── 断言 2: 转义解码 ──
+{
+  const doc: Record<string, unknown> = {};
+  applyPatch(doc, [{ op: "add", path: "/a~1b~0c", value: 1 }]);
+  assert(doc["a/b~c"] === 1, "~1 → / , ~0 → ~");
+}
+
+// ── 断言 3: patchedCards ──
+{
+  const ids = patchedCards([
+    { op: "replace", path: "/board/cards/t1/status", value: "done" },
+    { op: "replace", path: "/board/cards/t1/pct", value: 100 },
+    { op: "remove", path: "/board/cards/t2" },
+    { op: "replace", path: "/queue/runningSubs", value: [] },
+    { op: "replace", path: "/board/overview/total", value: 3 },
+  ]);
+  assert(JSON.stringify(ids.sort()) === '["t1","t2"]', `只收卡片 id 且去重, 得 ${JSON.stringify(ids)}`);
+}
+
+// ── 断言 4: viewsTouched ──
+{
+  const card = { op: "replace" as const, path: "/board/cards/t1/status", value: "done" };
+  assert(viewsTouched([card]).length === 0, "只动卡片 → 不算视图变更");
+  const views = viewsTouched([card, { op: "replace", path: "/queue/runningSubs", value: [] },
+    { op: "replace", path: "/board/overview/total", value: 3 }]);
+  assert(JSON.stringify(views) === '["board","queue"]', `queue + overview, 得 ${JSON.stringify(views)}`);
+  assert(JSON.stringify(viewsTouched([{ op: "replace", path: "", value: {} }])) === '["board","queue"]',
+    "根替换 = 全部视图");
+}
+
+console.log(`apply-patch: ${pass} passed, ${fail} failed`);
+if (fail) process.exit(1);
@@ -108,6 +108,14 @@ export interface SpecSearchResult {
   snippet: string;
 }
 
+export interface SearchHit {
+  kind: "task" | "subtask" | "spec";
+  id: string;
+  name: string;
+  snippet: string;
+  marks?: [number, number][]; // snippet 内命中区间 [起, 止), 前端自行包 <mark>
+}
+
 export interface SpecMetaItem {
   path: string;
   title: string;
@@ -131,7 +139,7 @@ export const api = {
   dashboard: () => postJSON<DashboardData>(`${BASE}/task/dashboard`),
   queue: () => postJSON<{ items: QueueItem[] }>(`${BASE}/task/queue`),
   task: (tid: string) => postJSON<Task>(`${BASE}/task/get`, { id: tid }),
-  search: (q: string) => postJSON<{ results: Task[] }>(`${BASE}/task/search`, { q }),
+  search: (q: string) => postJSON<{ query: string; hits: SearchHit[] }>(`${BASE}/task/search`, { q }),
   spec: () => postJSON<{ items: SpecItem[] }>(`${BASE}/spec/list`),
   specMeta: () => postJSON<SpecMetaItem[]>(`${BASE}/spec/meta`),
   specFile: (path: string) => postJSON<{ content: string }>(`${BASE}/spec/get`, { path }),
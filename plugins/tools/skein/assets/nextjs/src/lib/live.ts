@@ -6,6 +6,14 @@
 //   {type:"task-changed", id, card}  → 软刷订阅 id 的页 (card 有值=新建/更新, null=归档/删除)
 //   {type:"spec-changed", path}   → spec 页软刷
 //
+// 增量订阅 (连上即发 {type:"resync"} 订阅; 订阅后服务端不再推 task-changed/data, 改推):
+//   {type:"snapshot", seq, doc}   → 全量基线 doc = {board: {...看板数据, cards: {id: card}}, queue}
+//   {type:"patch", seq, ops, touched} → RFC 6902 增量 (delta.py); seq 不是上一条 +1 → 断档, 再发 resync
+// 本地应用后按改动的卡片 (ops 落在 /board/cards/<id> 下) + touched (卡片没变但 task 文档有编辑)
+// 合成 task-changed 派发 —— 订阅方 (board/detail 页) 不感知协议换了。卡片之外的 op (queue 视图、
+// board overview) 另合成 {type:"view-changed", views} —— 只会整页重拉的页 (queue/dashboard/archive)
+// 靠它刷新, 见 LiveBootstrap。文件变了但视图无差异时服务端对订阅者照旧推 "data" 兜底。
+//
 // 协议 (客户端本地状态, 不来自服务端 — 由 startLive 自己派发):
 //   {type:"offline"}              → 连接断开, 正在重连 (非静默失效的提示信号; 只提示, 永不放弃重连)
 //
@@ -17,8 +25,12 @@ type LiveMessage =
   | { type: "data" }
   | { type: "task-changed"; id: string; card: Record<string, unknown> | null }
   | { type: "spec-changed"; path?: string }
+  | { type: "view-changed"; views: string[] }
   | { type: "offline" };
 
+export type PatchOp = { op: "add" | "remove" | "replace"; path: string; value?: unknown };
+type Doc = { board: { cards: Record<string, Record<string, unknown>> } & Record<string, unknown> } & Record<string, unknown>;
+
 type Subscriber = (msg: LiveMessage) => void;
 type Unsubscribe = () => void;
 
@@ -36,6 +48,41 @@ export function backoffDelayMs(attempt: number, random: () => number = Math.rand
   return random() * upper;
 }
 
+// RFC 6902 子集: 服务端只在对象上出 add/remove/replace (数组整值 replace), 就地改 doc;
+// path "" 是整体替换, 所以返回新根。
+export function applyPatch(doc: unknown, ops: PatchOp[]): unknown {
+  for (const o of ops) {
+    if (o.path === "") { doc = o.value; continue; }
+    const keys = o.path.slice(1).split("/").map(k => k.replace(/~1/g, "/").replace(/~0/g, "~"));
+    const last = keys.pop()!;
+    let node = doc as Record<string, unknown>;
+    for (const k of keys) node = node[k] as Record<string, unknown>;
+    if (o.op === "remove") delete node[last]; else node[last] = o.value;
+  }
+  return doc;
+}
+
+// 一批 ops 动到的卡片 id (/board/cards/<id>[/...]); /board/cards 整体替换 → 新旧 id 由调用方比对
+export function patchedCards(ops: PatchOp[]): string[] {
+  const ids = new Set<string>();
+  for (const o of ops) {
+    const m = /^\/board\/cards\/([^/]+)/.exec(o.path);
+    if (m) ids.add(m[1].replace(/~1/g, "/").replace(/~0/g, "~"));
+  }
+  return [...ids];
+}
+
+// 一批 ops 动到的卡片之外的视图 (文档顶层键: "board" / "queue"); 整体替换 board / 根也算
+export function viewsTouched(ops: PatchOp[]): string[] {
+  const views = new Set<string>();
+  for (const o of ops) {
+    if (/^\/board\/cards\/[^/]+/.test(o.path)) continue;
+    if (o.path === "") { views.add("board"); views.add("queue"); continue; }
+    views.add(o.path.slice(1).split("/")[0].replace(/~1/g, "/").replace(/~0/g, "~"));
+  }
+  return [...views].sort();
+}
+
 export function subscribe(cb: Subscriber, opts?: { taskId?: string }): Unsubscribe {
   if (opts?.taskId) {
     let set = taskSubs.get(opts.taskId);
@@ -59,17 +106,54 @@ export function startLive() {
   // 连接存活过这么久才算「稳定」, 才清零失败计数 —— 防止连上立刻又断的崩溃循环把退避冲掉
   const STABLE_MS = 5000;
 
-  function dispatch(payload: string) {
+  // 增量订阅状态: 本地文档 + 已应用到的 seq (每次重连都重新 resync, 不跨连接沿用)
+  let doc: Doc | null = null;
+  let seq = -1;
+
+  function emit(m: LiveMessage) {
+    subs.forEach(cb => cb(m));
+    if (m.type === "task-changed" && m.id) {
+      const set = taskSubs.get(m.id);
+      set?.forEach(cb => cb(m));
+    }
+  }
+
+  function emitCards(ids: Iterable<string>) {
+    for (const id of ids) emit({ type: "task-changed", id, card: doc?.board.cards[id] ?? null });
+  }
+
+  function dispatch(ws: WebSocket, payload: string) {
     if (payload === "reload") return location.reload();
-    if (payload === "data") { const m: LiveMessage = { type: "data" }; return subs.forEach(cb => cb(m)); }
-    let m: LiveMessage | null = null;
+    if (payload === "data") return emit({ type: "data" });
+    let m: (LiveMessage | { type: "snapshot"; seq: number; doc: Doc }
+      | { type: "patch"; seq: number; ops: PatchOp[]; touched: string[] }) | null = null;
     try { m = JSON.parse(payload); } catch { return; }
     if (!m) return;
-    subs.forEach(cb => cb(m!));
-    if (m.type === "task-changed" && m.id) {
-      const set = taskSubs.get(m.id);
-      set?.forEach(cb => cb(m!));
+    if (m.type === "snapshot") {
+      // 断档重建: 新旧基线逐卡比, 变了的照常派发 (首个快照无旧基线, 页面自己拉过全量)
+      const old = doc;
+      doc = m.doc; seq = m.seq;
+      if (old) {
+        const ids = new Set([...Object.keys(old.board.cards), ...Object.keys(doc.board.cards)]);
+        emitCards([...ids].filter(id => JSON.stringify(old.board.cards[id]) !== JSON.stringify(doc!.board.cards[id])));
+      }
+      return;
+    }
+    if (m.type === "patch") {
+      if (!doc || m.seq !== seq + 1) { ws.send(JSON.stringify({ type: "resync" })); return; }
+      const before = Object.keys(doc.board.cards);
+      doc = applyPatch(doc, m.ops) as Doc;
+      seq = m.seq;
+      const ids = new Set([...patchedCards(m.ops), ...m.touched]);
+      if (m.ops.some(o => o.path === "" || o.path === "/board" || o.path === "/board/cards")) {
+        for (const id of [...before, ...Object.keys(doc.board.cards)]) ids.add(id);
+      }
+      emitCards(ids);
+      const views = viewsTouched(m.ops);
+      if (views.length) emit({ type: "view-changed", views });
+      return;
     }
+    emit(m);
   }
 
   (function conn() {
@@ -77,9 +161,11 @@ export function startLive() {
     ws.onopen = () => {
       offline = false;
       if (seen) location.reload(); else seen = true;
+      doc = null; seq = -1;
+      ws.send(JSON.stringify({ type: "resync" }));
       stableTimer = setTimeout(() => { attempt = 0; }, STABLE_MS);
     };
-    ws.onmessage = (e) => dispatch(e.data as string);
+    ws.onmessage = (e) => dispatch(ws, e.data as string);
     ws.onclose = () => {
       if (stableTimer) { clearTimeout(stableTimer); stableTimer = null; }
       // 首次转为断线时立刻提示 (静默重试期间用户不该以为一切正常)
@@ -50,6 +50,10 @@ _bootstrap.ensure_core_deps()
 
 
 def _run_main() -> None:
+    # 先于 import skeinlib.cli 接管: 画像要量的正是那次 import, 本进程不能先把它们载进来
+    if "--profile-startup" in sys.argv[1:]:
+        from skeinlib.cli.profile import profile_startup
+        raise SystemExit(profile_startup(sys.argv[1:]))
     from skeinlib.cli import main
     from skeinlib.utils.errors import SkeinError
 
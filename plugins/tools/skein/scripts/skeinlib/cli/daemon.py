@@ -0,0 +1,216 @@
+"""`skein daemon` — 常驻进程, 经 Unix socket 接 `bin/skein` 转发的 argv, 进程内跑完回传输出。
+
+## 为什么要它
+agent 每分钟几十次 `skein subtask show/done` / `skein claim`, 每次都是新 Python: import typer/
+pydantic/yaml、两次 `git rev-parse`、冷扫 task 目录。命令本身只要几毫秒, 启动占了九成。daemon
+把这些都留在内存里: 同一 cwd 复用同一个 `Skein` (见 `cli.main._RESIDENT`), task 读侧经
+`TaskScan` 的 stat 签名自己判失效 —— 别的进程/手改/in-process 回落路径改了文件, 下一条命令就看得见,
+不需要另起 watcher 线程去推失效。
+
+## 协议
+`.skein/.daemon.sock`, 一连接一请求: 客户端写一个 JSON 后半关写端, 服务端跑完回一个 JSON 再关。
+- 请求 `{"argv", "cwd", "env", "plugin"}` → 开跑前先回一行 `ACCEPTED`, 跑完再回 `{"out", "err", "code"}`
+- `plugin` 与本进程插件根不符 (插件升级了, daemon 还是旧代码) → 回 `{"fallback": true}`, 客户端就地执行
+- `ACCEPTED` 是"命令已开跑"的分界: 没收到它就断开 → 命令没跑过, 客户端可就地重跑; 收到了却没
+  等到完整结果 (daemon 中途崩了) → 命令可能已部分生效 (`subtask done` / `create` / `claim` 会改盘),
+  客户端只报错退非零, 绝不重跑
+- `{"op": "status" | "stop"}` 管理请求
+请求串行处理: 命令体改 cwd / os.environ / sys.argv, 并发就会串味; 跨进程的互斥仍由 flock 负责。
+
+## 不转发的
+`serve` / `daemon` 自身 (常驻), `init` / `setup` (子进程直写 fd, 捕获不到), 以及钩子里嵌套的
+`skein` 调用 (`SKEIN_IN_HOOK` —— 父命令正占着 daemon, 转发回来就是自己等自己)。判定在客户端。
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from skeinlib.hooks.runner import DBG
+from skeinlib.utils.errors import SkeinError
+from skeinlib.utils.paths import PLUGIN_ROOT, SKEIN_ENTRY
+
+if TYPE_CHECKING:
+    from skeinlib.core.commands import Skein
+
+SOCK_NAME = ".daemon.sock"
+ACCEPTED = b'{"accepted": true}\n'  # 与 bin/skein 里的同名常量逐字节一致 (那边不 import 本包)
+_SUN_PATH_MAX = 104  # sockaddr_un.sun_path: Linux 108, macOS 104, 取小
+_IDLE_DEFAULT = 1800.0  # 空闲这么久没人连就自退, 免会话结束后遗留进程
+
+
+def _request(sock_path: Path, msg: dict[str, Any], timeout: Optional[float] = 2.0) -> dict[str, Any]:
+    """发一条请求收一条回复 (管理命令与测试用; 转发 argv 的热路径在 bin/skein, 不 import 本包)。"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as c:
+        c.settimeout(timeout)
+        c.connect(str(sock_path))
+        c.sendall(json.dumps(msg).encode())
+        c.shutdown(socket.SHUT_WR)
+        buf = b"".join(iter(lambda: c.recv(65536), b""))
+    reply: dict[str, Any] = json.loads(buf)
+    return reply
+
+
+def _alive(sock_path: Path) -> Optional[dict[str, Any]]:
+    try:
+        return _request(sock_path, {"op": "status"})
+    except (OSError, ValueError):
+        return None
+
+
+def _run_argv(argv: list[str]) -> int:
+    """进程内跑一条 skein 命令, 返回退出码 —— 与 skein.py `_run_main` 同一套异常→退出码映射。"""
+    from skeinlib.cli.main import main
+
+    sys.argv = ["skein", *argv]
+    try:
+        main()
+    except (SkeinError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:  # 命令自身的 bug 不能带走 daemon
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+class Daemon:
+    """单工作区的常驻命令服务器。"""
+
+    def __init__(self, sock_path: Path, idle: float = _IDLE_DEFAULT) -> None:
+        self.sock_path = sock_path
+        self.idle = idle
+        self.served = 0
+        self.started = time.time()
+        self._stop = False
+
+    def serve_forever(self) -> None:
+        from skeinlib.cli.main import resident
+
+        if len(str(self.sock_path)) >= _SUN_PATH_MAX:
+            raise SkeinError(f"socket 路径过长 ({len(str(self.sock_path))} 字节), 起不了 daemon: {self.sock_path}")
+        with contextlib.suppress(FileNotFoundError):
+            self.sock_path.unlink()  # 上一个 daemon 被 kill -9 留下的死 socket
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            srv.bind(str(self.sock_path))
+            srv.listen(64)
+            srv.settimeout(self.idle)
+            DBG.log(f"daemon 就绪 {self.sock_path} (pid {os.getpid()})", style="green")
+            with resident():  # 本进程内的命令复用 Skein 实例, 见 cli.main._RESIDENT
+                while not self._stop:
+                    try:
+                        conn, _ = srv.accept()
+                    except socket.timeout:
+                        DBG.log(f"daemon 空闲 {self.idle:.0f}s, 退出", style="dim")
+                        break
+                    with conn:
+                        self._serve_one(conn)
+        finally:
+            srv.close()
+            with contextlib.suppress(FileNotFoundError):
+                self.sock_path.unlink()
+
+    def _serve_one(self, conn: socket.socket) -> None:
+        conn.settimeout(5.0)  # 只限读请求; 命令本身跑多久都行
+        try:
+            req = json.loads(b"".join(iter(lambda: conn.recv(65536), b"")))
+        except (OSError, ValueError):
+            return
+
+        def accept() -> bool:
+            try:
+                conn.sendall(ACCEPTED)
+            except OSError:
+                return False
+            return True
+        reply = self.handle(req, accept)
+        with contextlib.suppress(OSError):  # 客户端先走了 (Ctrl-C): 结果丢掉即可
+            conn.sendall(json.dumps(reply, ensure_ascii=False).encode())
+
+    def handle(self, req: dict[str, Any], accept: Optional[Callable[[], bool]] = None) -> dict[str, Any]:
+        """处理一条请求。accept 在命令真正开跑前调一次 (回 `ACCEPTED`); 返回 False = 客户端已走,
+        它会就地执行, 这边就不能再跑。"""
+        op = req.get("op")
+        if op == "status":
+            return {"pid": os.getpid(), "socket": str(self.sock_path), "served": self.served,
+                    "uptime": round(time.time() - self.started, 1), "plugin": str(PLUGIN_ROOT)}
+        if op == "stop":
+            self._stop = True
+            return {"stopped": True, "pid": os.getpid(), "served": self.served}
+        if req.get("plugin") != str(PLUGIN_ROOT):
+            return {"fallback": True}
+        return self._run(req, accept)
+
+    def _run(self, req: dict[str, Any], accept: Optional[Callable[[], bool]]) -> dict[str, Any]:
+        saved_env, saved_argv = dict(os.environ), sys.argv
+        try:
+            saved_cwd = os.getcwd()
+        except FileNotFoundError:
+            saved_cwd = str(self.sock_path.parent.parent)
+        out, err = io.StringIO(), io.StringIO()
+        try:
+            os.chdir(req["cwd"])
+        except (OSError, KeyError, TypeError):
+            return {"fallback": True}
+        if accept is not None and not accept():
+            os.chdir(saved_cwd)
+            return {"fallback": True}
+        try:
+            os.environ.clear()
+            os.environ.update(req.get("env") or {})
+            # 命令派生的子进程 (钩子等) 若再调 skein, 一律就地执行, 不绕回本进程排队
+            os.environ["SKEIN_NO_DAEMON"] = "1"
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                code = _run_argv(list(req.get("argv") or []))
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_env)
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+        self.served += 1
+        return {"out": out.getvalue(), "err": err.getvalue(), "code": code}
+
+
+def daemon(sk: "Skein", a: argparse.Namespace) -> Optional[dict[str, Any]]:
+    """`skein daemon [--status|--stop|--detach] [--idle SEC]`。缺省前台常驻 (同 serve)。"""
+    if not sk.dir.is_dir():
+        raise SkeinError("未初始化 — 先跑 `skein init`")
+    path = sk.dir / SOCK_NAME
+    running = _alive(path)
+    if getattr(a, "status", False):
+        return running or {"running": False, "socket": str(path)}
+    if getattr(a, "stop", False):
+        if running is None:
+            return {"stopped": False, "reason": "not_running"}
+        return _request(path, {"op": "stop"})
+    if running is not None:
+        return {"already_running": True, **running}
+    idle = float(getattr(a, "idle", None) or _IDLE_DEFAULT)
+    if getattr(a, "detach", False):
+        p = subprocess.Popen([sys.executable, str(SKEIN_ENTRY), "daemon", "--idle", str(idle)],
+                             cwd=sk.root, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and p.poll() is None:
+            if (st := _alive(path)) is not None:
+                return {"started": True, **st}
+            time.sleep(0.05)
+        raise SkeinError(f"daemon 未能就绪 (exit {p.poll()}) — 前台跑 `skein daemon --debug` 看原因")
+    Daemon(path, idle).serve_forever()
+    return None
@@ -2,9 +2,12 @@
 
 写盘命令统一在这里加 `_workspace_lock` (fcntl.flock 排他), 纯读命令免锁 —— 锁的边界只在这一
 处声明, 命令实现里不出现锁代码。新增写盘命令记得进 `MUTATING`, 漏了就是并发 read-modify-write。
+只改单个 task 内 subtask 的命令 (`TASK_SCOPED`) 改拿 task 级锁, 见 `_lock_scope`。
 """
 from __future__ import annotations
 
+import argparse
+import contextlib
 import inspect
 import json
 import os
@@ -13,7 +16,7 @@ import sys
 
 from enum import Enum
 from types import SimpleNamespace
-from typing import Annotated, Any, Optional
+from typing import Annotated, Any, Callable, Iterator, Optional
 
 try:
     import typer
@@ -189,6 +192,9 @@ MUTATING = {"init", "setup", "create", "confirm", "research", "plan", "check", "
             "repos", "deps", "estimate", "spec", "priority", "subtask", "research-task", "claim",
             "design", "flow", "del",
             "rename", "config"}
+# 只读写 `task/<tid>/` 一个目录的命令 (subtask/research 条目增改与迁移, save 走 sync_index=False):
+# 并行 executor 各自 `subtask done` 不该排在同一把全局锁后面。`tid=all` 等非单 task 形态照旧全局锁。
+TASK_SCOPED = {"subtask", "research-task"}
 
 
 def _namespace(cmd: str, **kwargs: object) -> SimpleNamespace:
@@ -197,8 +203,64 @@ def _namespace(cmd: str, **kwargs: object) -> SimpleNamespace:
     return SimpleNamespace(**data)
 
 
-def _dispatch(a: SimpleNamespace) -> None:
-    sk = Skein()
+@contextlib.contextmanager
+def _lock_scope(sk: Skein, a: SimpleNamespace) -> Iterator[None]:
+    """该命令要拿的锁。单 task 命令: 全局锁共享 + `task/<tid>/.lock` 排他 (加锁序恒为先全局后
+    task, 不会互等); 其余写命令: 全局锁排他, 与所有单 task 命令互斥。
+
+    task 锁放在 task 目录里而不是另起 `.locks/`: 随 rename/归档一起搬走, 不留孤儿; 目录不存在
+    (tid 拼错/`all`) 就退回全局锁, 不凭空造目录, 错误照旧由命令自己报。"""
+    tid = getattr(a, "tid", None)
+    if (a.cmd in TASK_SCOPED and isinstance(tid, str) and tid not in ("", ".", "..")
+            and "/" not in tid and (sk.tasks / tid / "task.json").is_file()):
+        with _workspace_lock(sk.dir / ".lock", shared=True), _workspace_lock(sk.tasks / tid / ".lock"):
+            yield
+    else:
+        with _workspace_lock(sk.dir / ".lock"):
+            yield
+
+
+# 常驻 daemon (cli/daemon.py) 经 `resident()` 置为 {} : 同一 cwd 复用同一个 Skein, TaskScan 内存层
+# 跨命令存活, `git rev-parse` 只跑一次。单次 CLI 进程保持 None, 每条命令照旧新建。
+_RESIDENT: Optional[dict[str, Skein]] = None
+
+
+@contextlib.contextmanager
+def resident() -> Iterator[None]:
+    global _RESIDENT
+    _RESIDENT = {}
+    try:
+        yield
+    finally:
+        _RESIDENT = None
+
+
+_CLICK: Any = None
+
+
+def _click_command() -> Any:
+    """typer 每次 `app()` 都从函数签名重建整棵 click 命令树 (几十毫秒, 大头是 get_type_hints);
+    常驻进程里建一次留着。"""
+    global _CLICK
+    if _CLICK is None:
+        _CLICK = typer.main.get_command(app)
+    return _CLICK
+
+
+def _skein() -> Skein:
+    if _RESIDENT is None:
+        return Skein()
+    key = os.getcwd()
+    sk = _RESIDENT.get(key)
+    if sk is None or not sk.dir.is_dir():  # 未初始化的不缓存: init 之后根可能换了
+        sk = _RESIDENT[key] = Skein()
+    return sk
+
+
+def invoke(sk: Skein, a: SimpleNamespace) -> Any:
+    """按 dispatch 表执行一条命令 (写命令在 `_lock_scope` 下), 返回业务方法的原始结果, 不打印。
+
+    `_dispatch` 与 serve 的进程内执行器 (web/executor.py) 共用这一出口: 锁边界仍只在这里声明。"""
     dispatch = {
         "init": sk.admin.init, "setup": sk.admin.setup, "config": sk.admin.config_cmd,
         "clean": sk.admin.clean, "board": sk.admin.board,
@@ -217,14 +279,18 @@ def _dispatch(a: SimpleNamespace) -> None:
         "status": sk.query.status, "list": sk.query.list_,
         "design": sk.artifacts.design,
         "serve": sk.serve, "doctor": sk.doctor,
+        "daemon": _daemon(sk), "sim": _sim,
     }
+    if a.cmd in MUTATING:
+        with _lock_scope(sk, a):
+            return dispatch[a.cmd](a)  # type: ignore[arg-type]
+    return dispatch[a.cmd](a)  # type: ignore[arg-type]
+
+
+def _dispatch(a: SimpleNamespace) -> None:
     DBG.rule(f"skein {a.cmd}")
     DBG.kv({k: v for k, v in vars(a).items() if k not in ("cmd", "debug") and v not in (None, False)}, title="参数")
-    if a.cmd in MUTATING:
-        with _workspace_lock(sk.dir / ".lock"):
-            result = dispatch[a.cmd](a)  # type: ignore[arg-type]
-    else:
-        result = dispatch[a.cmd](a)  # type: ignore[arg-type]
+    result = invoke(_skein(), a)
     DBG.log(f"✓ {a.cmd} 完成", style="bold green")
     # 业务方法返回 dict → 统一 JSON 输出; 返回 None → 静默 (已自行输出或无输出)。
     # --show: dict 改走 rich 面板渲染 (人读); 非 dict 返回值不受影响。
@@ -242,6 +308,19 @@ def _run(cmd: str, **kwargs: object) -> None:
     _dispatch(_namespace(cmd, **kwargs))
 
 
+# scheduling.subtask 读的全套字段; typer 的 subtask 子命令只传自己那几个, 其余在这里补 None。
+_SUBTASK_FIELDS: dict[str, object] = {"name": None, "desc": None, "estimate": None, "deps": None,
+                                      "check": None, "repo": None, "note": None, "passed": None,
+                                      "skills": None, "status_filter": None}
+
+
+def command(cmd: str, **kwargs: object) -> SimpleNamespace:
+    """程序化调用 (不经 typer) 的命令 namespace, 与 typer 命令交给 `_run` 的同形。"""
+    fields = dict(_SUBTASK_FIELDS) if cmd == "subtask" else {}
+    fields.update(kwargs)
+    return _namespace(cmd, **fields)
+
+
 @app.callback()
 def root() -> None:
     """SKEIN 任务管理引擎。"""
@@ -460,6 +539,44 @@ def serve(auto: Annotated[bool, typer.Option("--auto")] = False,
     _run("serve", auto=auto, open_browser=open_)
 
 
+def _daemon(sk: Skein) -> Callable[[argparse.Namespace], Optional[dict[str, Any]]]:
+    def run(a: argparse.Namespace) -> Optional[dict[str, Any]]:
+        from skeinlib.cli.daemon import daemon  # 冷路径: 只有 daemon 命令付 socket 这些 import
+        return daemon(sk, a)
+    return run
+
+
+@app.command()
+def daemon(status: Annotated[bool, typer.Option("--status", help="只查是否在跑")] = False,
+           stop: Annotated[bool, typer.Option("--stop", help="停掉本工作区的 daemon")] = False,
+           detach: Annotated[bool, typer.Option("--detach", help="后台起, 就绪即返回")] = False,
+           idle: Annotated[Optional[float], typer.Option("--idle", help="空闲自退秒数 (默认 1800)")] = None) -> None:
+    """常驻命令服务 (bin/skein 经 .skein/.daemon.sock 转发, 不在则就地执行)。"""
+    _run("daemon", status=status, stop=stop, detach=detach, idle=idle)
+
+
+def _sim(a: argparse.Namespace) -> dict[str, Any]:
+    from skeinlib.cli.sim import sim  # 冷路径: 模拟器只在 sim 命令里加载
+    return sim(a)
+
+
+@app.command()
+def sim(tasks: Annotated[int, typer.Option("--tasks", help="合成 task 数")] = 6,
+        subtasks: Annotated[str, typer.Option("--subtasks", help="每 task 的 subtask 数, N 或 MIN-MAX")] = "3-8",
+        shape: Annotated[str, typer.Option("--shape", help="DAG 形状 random/chain/fan/layered")] = "random",
+        work: Annotated[str, typer.Option("--work", help="pools.work, 逗号列表即扫描 (如 1,2,4)")] = "2",
+        gate: Annotated[str, typer.Option("--gate", help="pools.gate, 逗号列表即扫描")] = "3",
+        weight: Annotated[str, typer.Option("--weight", help="scheduling.weight, 逗号列表即扫描")] = "depth",
+        seed: Annotated[int, typer.Option("--seed", help="随机种子 (同种子同 DAG 同工期)")] = 0,
+        sigma: Annotated[float, typer.Option("--sigma", help="实际/预估工期的对数正态离散度")] = 0.3,
+        fail_rate: Annotated[float, typer.Option("--fail-rate", help="每次尝试失败 (重试) 的概率")] = 0.0,
+        finish: Annotated[float, typer.Option("--finish", help="验收+收尾耗时 (小时)")] = 0.5,
+        task_deps: Annotated[float, typer.Option("--task-deps", help="task 依赖前一个 task 的概率")] = 0.0) -> None:
+    """离线 makespan 模拟: 合成 DAG 在临时工作区里过真实 claim/迁移, 报 makespan/池占用/等待/claim 耗时。"""
+    _run("sim", tasks=tasks, subtasks=subtasks, shape=shape, work=work, gate=gate, weight=weight,
+         seed=seed, sigma=sigma, fail_rate=fail_rate, finish=finish, task_deps=task_deps)
+
+
 @task_app.command("status")
 def task_status(tid: str) -> None:
     """查 task 态 + subtask 汇总。"""
@@ -474,11 +591,7 @@ def task_show(tid: str) -> None:
 
 def _subtask(action: str, tid: str, sid: Optional[str] = None, **kwargs: object) -> None:
     """subtask 各子命令的共同出口 —— 补齐 scheduling.subtask 读的全套字段。"""
-    fields: dict[str, object] = {"name": None, "desc": None, "estimate": None, "deps": None,
-                                 "check": None, "repo": None, "note": None, "passed": None,
-                                 "skills": None, "status_filter": None}
-    fields.update(kwargs)
-    _run("subtask", action=action, tid=tid, sid=sid, **fields)
+    _dispatch(command("subtask", action=action, tid=tid, sid=sid, **kwargs))
 
 
 @subtask_app.command("add")
@@ -756,6 +869,9 @@ def main() -> None:
     globals()["_namespace"] = namespace_with_flags
     try:
         argv = _rewrite_legacy_task_args(argv)
-        app(args=argv, prog_name="skein")
+        if _RESIDENT is None:
+            app(args=argv, prog_name="skein")
+        else:
+            _click_command()(args=argv, prog_name="skein")
     finally:
         globals()["_namespace"] = original_namespace
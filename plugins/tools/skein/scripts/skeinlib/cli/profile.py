@@ -0,0 +1,71 @@
+"""`skein --profile-startup <命令...>` — 用 `-X importtime` 重跑一遍命令, 报启动期 import 开销。
+
+agent 每条 `skein` 都是冷启动, 导入耗时直接叠在每次调用上。本模块只用 stdlib, 由入口 skein.py
+在 import typer / skeinlib.cli 之前接管, 自身不污染被测的那次 import。命令本身照常跑
+(输出丢弃, 只留退出码), 所以 profile 的就是真实路径 —— 包括按需加载的 pydantic/yaml 是否被拖进来。
+
+输出 JSON:
+- `import_ms` 顶层 import 的 cumulative 之和 (≈ 解释器花在 import 上的总时间)
+- `wall_ms`   子进程总耗时 (含解释器启动与命令本体)
+- `packages`  按顶层包汇总的 self 时间, 降序 —— 一眼看出是 typer 还是 skeinlib 自己
+- `top`       cumulative 最大的若干模块 (嵌套的也列, 带深度), 用来顺藤摸瓜
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from typing import Any
+
+from skeinlib.utils.paths import SKEIN_ENTRY
+
+FLAG = "--profile-startup"
+_TOP_N = 20
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """`-X importtime` 的 stderr → [(模块, 深度, self_us, cumulative_us)]; 非该格式的行 (命令自身的 stderr) 跳过。"""
+    rows: list[tuple[str, int, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头 `self [us] | cumulative | imported package`
+        name = parts[2][1:]  # 格式固定为 " " + 每层两个空格缩进 + 模块名
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), depth, int(parts[0]), int(parts[1])))
+    return rows
+
+
+def summarize(rows: list[tuple[str, int, int, int]], top_n: int = _TOP_N) -> dict[str, Any]:
+    packages: dict[str, int] = {}
+    for name, _, self_us, _ in rows:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    top = sorted(rows, key=lambda r: -r[3])[:top_n]
+    return {
+        "import_ms": round(sum(r[3] for r in rows if r[1] == 0) / 1000, 1),
+        "modules": len(rows),
+        "packages": {k: round(v / 1000, 1) for k, v in sorted(packages.items(), key=lambda kv: -kv[1])[:top_n]},
+        "top": [{"module": n, "depth": d, "self_ms": round(s / 1000, 1), "cumulative_ms": round(c / 1000, 1)}
+                for n, d, s, c in top],
+    }
+
+
+def profile_startup(argv: list[str]) -> int:
+    """重跑 `skein <argv 去掉 FLAG>` 并打印 import 画像 JSON; 返回被测命令的退出码。"""
+    import json
+
+    args = [x for x in argv if x != FLAG]
+    # 常驻 daemon 会让被测进程只做转发, 量到的就不是冷启动了
+    env = dict(os.environ, SKEIN_NO_DAEMON="1")
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-X", "importtime", str(SKEIN_ENTRY), *args],
+                       capture_output=True, text=True, env=env, stdin=subprocess.DEVNULL)
+    wall = (time.perf_counter() - t0) * 1000
+    rows = parse_importtime(p.stderr)
+    out = {"argv": args, "exit": p.returncode, "wall_ms": round(wall, 1), **summarize(rows)}
+    print(json.dumps(out, ensure_ascii=False))
+    return p.returncode
@@ -0,0 +1,312 @@
+"""`skein sim` — 离线 makespan 模拟: 合成 task/subtask DAG, 在临时工作区里用真实调度逻辑回放。
+
+## 为什么要它
+`_W_CRIT/_W_WAIT/_W_EXEC` 打分、`pools.work`/`pools.gate` 上限和 `scheduling.weight` 档位改了之后
+吞吐变多少, 以前只能上线后看。池子开多大要在推给全组之前就能量出来。
+
+## 回放的是真东西
+每个场景新建一个临时目录 `skein init`, 按 `--work/--gate/--weight` 写 config.yaml, 把合成 task 直接
+落成「进行中」(跳过 create/plan/confirm 人审门 —— 不是被测对象)。之后主循环与真实 main 一致:
+反复 `Scheduler.claim` (exec + check 两池) 直到取不出新活, 再把虚拟时钟推进到下一个完成事件,
+用 `_transition` 落 subtask done/fail、`Lifecycle.finish` 收 task。落盘、timeline、看板渲染、
+阶段钩子全走生产路径, 所以 `claim_ms` 就是真实的单次取活耗时。
+
+虚拟时钟: 落盘时间戳统一出自 `task.model.now()`, 回放期间把它读的 `time` 换成模拟时钟 ——
+等待打分 (`_W_WAIT`) 按模拟时间涨, 几十小时的场景几秒跑完。checker 不单独建模: 引擎里
+`claim check` 本就一步进检查中、下一次 claim 即占 gate 进收尾中, `--finish` 是「验收 + 收尾」的合计耗时。
+
+## 输出
+同一 `--seed` 下 DAG 与每次尝试的实际工期固定, `--work/--gate/--weight` 给逗号列表即做网格扫描,
+各组合之间只差调度参数, 可直接对比:
+- `makespan_h` 首个 task 开工到最后一个 finish
+- `work_util` / `gate_util` 池占用率 (占用槽·小时 ÷ 容量·makespan)
+- `wait_h` subtask 从可开工 (依赖全 done / 失败待重试) 到被认领的等待分位
+- `claim_ms` 每次 `claim` 的墙钟耗时分位 (含落盘)
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Iterator
+
+from skeinlib.hooks.runner import DBG
+from skeinlib.task import model as _model
+from skeinlib.task.dag import WEIGHT_MODES
+from skeinlib.task.model import SubtaskStatus, TaskStatus
+from skeinlib.utils.errors import SkeinError
+
+if TYPE_CHECKING:
+    from skeinlib.core.commands import Skein
+
+SHAPES = ("random", "chain", "fan", "layered")
+_SKILLS = ("backend", "frontend", "db", "docs")
+_T0 = 1_700_000_000  # 模拟起点 (整点, 与真实时间无关: 结果可复现)
+
+
+class _Clock:
+    """替身 `time` 模块: `task.model.now()` 只调 `time.time()`。"""
+
+    def __init__(self, t: float) -> None:
+        self.t = t
+
+    def time(self) -> float:
+        return self.t
+
+
+@contextlib.contextmanager
+def _virtual_clock(clock: _Clock) -> Iterator[None]:
+    # ponytail: 换的是 model 模块里的 `time` 名字, 不是全局 time —— perf_counter / 锁超时 / racy 判定
+    # 照旧走真时钟。经 getattr/setattr: model 不导出 `time` 名, 且这里换上的是鸭子替身而非模块。
+    saved = getattr(_model, "time")
+    setattr(_model, "time", clock)
+    try:
+        yield
+    finally:
+        setattr(_model, "time", saved)
+
+
+def _estimate(rng: random.Random) -> float:
+    """长尾工期: 多数是半小时到两小时的小活, 约两成是 3~8 小时的大块。"""
+    if rng.random() < 0.8:
+        return rng.choice([0.5, 0.5, 1.0, 1.0, 2.0])
+    return round(rng.uniform(3, 8) * 4) / 4
+
+
+def synthetic_subtasks(rng: random.Random, n: int, shape: str) -> list[dict[str, Any]]:
+    """n 个 subtask 的 DAG: chain 串行 / fan 一根分叉再汇合 / layered 分层 (每层依赖上一层 1~2 个) /
+    random 每个依赖之前任意 0~2 个。"""
+    width = max(1, math.isqrt(n))
+    subs: list[dict[str, Any]] = []
+    for i in range(n):
+        prev = [f"s{j + 1}" for j in range(i)]
+        if shape == "chain":
+            deps = prev[-1:]
+        elif shape == "fan":
+            deps = [] if i == 0 else prev if i == n - 1 and n > 2 else prev[:1]
+        elif shape == "layered":
+            layer = prev[(i // width - 1) * width:(i // width) * width] if i >= width else []
+            deps = rng.sample(layer, k=min(len(layer), rng.randint(1, 2)))
+        else:
+            deps = rng.sample(prev, k=min(i, rng.randint(0, 2)))
+        subs.append({"sid": f"s{i + 1}", "name": f"s{i + 1}", "estimate": _estimate(rng),
+                     "depends_on": deps, "skills": [rng.choice(_SKILLS)]})
+    return subs
+
+
+def synthetic_tasks(seed: int, tasks: int, sub_range: tuple[int, int], shape: str,
+                    task_deps: float) -> list[dict[str, Any]]:
+    """同一 seed 出同一批 task (网格扫描的各组合共用)。`task_deps` = 每个 task 依赖前一个 task 的概率。"""
+    rng = random.Random(seed)
+    out: list[dict[str, Any]] = []
+    for k in range(tasks):
+        tid = f"sim-{k + 1}"
+        deps = [out[-1]["id"]] if out and rng.random() < task_deps else []
+        out.append({"id": tid, "deps": deps,
+                    "subtasks": synthetic_subtasks(rng, rng.randint(*sub_range), shape)})
+    return out
+
+
+def _attempt(seed: int, tid: str, sid: str, n: int, est: float, sigma: float,
+             fail_rate: float) -> tuple[float, bool]:
+    """第 n 次尝试的 (实际小时, 是否失败)。按 (seed, tid, sid, n) 定种: 与调度顺序无关, 各组合可比。"""
+    rng = random.Random(f"{seed}/{tid}/{sid}/{n}")
+    return est * rng.lognormvariate(0.0, sigma), rng.random() < fail_rate
+
+
+def _pct(vals: list[float], q: float) -> float:
+    """最近秩分位 (q ∈ [0, 1]); 空表记 0。"""
+    if not vals:
+        return 0.0
+    s = sorted(vals)
+    return s[min(len(s) - 1, max(0, math.ceil(q * len(s)) - 1))]
+
+
+def _seed(sk: "Skein", specs: list[dict[str, Any]]) -> None:
+    """合成 task 直接落成「进行中」。字段同 `create` + `subtask add` 落的形状。"""
+    t0 = _model.now()
+    for spec in specs:
+        (sk.tasks / spec["id"]).mkdir(parents=True)
+        subs = [{"tid": spec["id"], **s, "desc": "", "acceptance": [], "acceptance_done": [],
+                 "status": SubtaskStatus.PENDING, "repo": None,
+                 "created": t0, "started": None, "finished": None} for s in spec["subtasks"]]
+        sk.store.save({"id": spec["id"], "name": spec["id"], "status": TaskStatus.ACTIVE,
+                       "deps": spec["deps"], "subtasks": subs, "priority": None, "repos": [],
+                       "worktree": None, "worktrees": [], "branch": f"skein/{spec['id']}",
+                       "created": t0, "started": t0, "confirmed": t0, "checked": None,
+                       "checked_end": None, "finished": None, "updated": t0}, sync_index=False)
+    sk.store.sync()
+
+
+def _configure(sk: "Skein", work: int, gate: int, weight: str) -> None:
+    from skeinlib.config import Config
+
+    path = sk.dir / "config.yaml"
+    cfg = Config(path)
+    for key, val in (("pools.work", work), ("pools.gate", gate), ("scheduling.weight", weight),
+                     ("retain_days", -1), ("auto_commit", False)):
+        cfg.set(key, val)
+    # 刚写的配置按 racy 规则不进内存备忘, 每次 claim 都会重解析 yaml —— 量到的 claim_ms 就不是生产形态了
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+
+
+def run_once(specs: list[dict[str, Any]], *, work: int, gate: int, weight: str, seed: int,
+             sigma: float, fail_rate: float, finish: float) -> dict[str, Any]:
+    """一个 (work, gate, weight) 组合的完整回放。"""
+    from skeinlib.core.commands import Skein
+
+    clock = _Clock(float(_T0))
+    tmp = tempfile.mkdtemp(prefix="skein-sim-")
+    cwd = os.getcwd()
+    env_work = os.environ.pop("CLAUDE_PLUGIN_OPTION_MAX_ACTIVE", None)  # 会覆盖 pools.work
+    try:
+        os.chdir(tmp)
+        with _virtual_clock(clock):
+            sk = Skein()
+            sk.admin.init(argparse.Namespace())
+            _configure(sk, work, gate, weight)
+            _seed(sk, specs)
+            return {"work": work, "gate": gate, "weight": weight,
+                    **_replay(sk, specs, clock, seed=seed, sigma=sigma, fail_rate=fail_rate, finish=finish)}
+    finally:
+        os.chdir(cwd)
+        if env_work is not None:
+            os.environ["CLAUDE_PLUGIN_OPTION_MAX_ACTIVE"] = env_work
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _replay(sk: "Skein", specs: list[dict[str, Any]], clock: _Clock, *, seed: int,
+            sigma: float, fail_rate: float, finish: float) -> dict[str, Any]:
+    from skeinlib.core.scheduling import _transition
+
+    by_tid = {s["id"]: s for s in specs}
+    est = {(s["id"], x["sid"]): x["estimate"] for s in specs for x in s["subtasks"]}
+    deps = {(s["id"], x["sid"]): x["depends_on"] for s in specs for x in s["subtasks"]}
+    events: list[tuple[float, int, str, str, str, bool]] = []  # (到点, 序号, 类别, tid, sid, 失败?)
+    seq = itertools.count()
+    done_at: dict[tuple[str, str], float] = {}
+    retry_at: dict[tuple[str, str], float] = {}
+    task_done: dict[str, float] = {}
+    gate_in: dict[str, float] = {}
+    tries: dict[tuple[str, str], int] = {}
+    waits: list[float] = []
+    claim_ms: list[float] = []
+    busy = gate_busy = 0.0
+    errors = 0
+    claim = argparse.Namespace(phase=None, task=None, dry_run=False)
+    while True:
+        while True:  # 同一时刻反复 claim 到取不出新活 (check→finishing 要两次 claim 才走完)
+            t0 = time.perf_counter()
+            r = sk.scheduler.claim(claim)
+            claim_ms.append((time.perf_counter() - t0) * 1000)
+            claimed = r["exec"].get("claimed") or []
+            chk = r["check"]
+            errors += len(chk.get("errors") or [])
+            for c in claimed:
+                key = (c["tid"], c["sid"])
+                n = tries[key] = tries.get(key, 0) + 1
+                ready = retry_at.get(key) or max(
+                    [float(_T0)] + [task_done[d] for d in by_tid[key[0]]["deps"]]
+                    + [done_at[(key[0], d)] for d in deps[key]])
+                waits.append((clock.t - ready) / 3600)
+                hours, failed = _attempt(seed, *key, n, est[key], sigma, fail_rate)
+                busy += hours
+                heapq.heappush(events, (clock.t + hours * 3600, next(seq), "sub", *key, failed))
+            for tid in chk.get("checked") or []:
+                gate_in[tid] = clock.t
+            for tid in chk.get("finishing") or []:
+                heapq.heappush(events, (clock.t + finish * 3600, next(seq), "finish", tid, "", False))
+            if not (claimed or chk.get("checked") or chk.get("finishing")):
+                break
+        if not events:
+            break
+        now_t = events[0][0]
+        clock.t = now_t
+        while events and events[0][0] == now_t:  # 同一时刻完成的一起落, 再统一 claim
+            _, _, kind, tid, sid, failed = heapq.heappop(events)
+            if kind == "finish":
+                sk.lifecycle.finish(argparse.Namespace(id=tid, force=False))
+                task_done[tid] = now_t
+                gate_busy += now_t - gate_in.pop(tid, now_t)
+                continue
+            t = sk.store.load(tid)
+            s = next(x for x in t["subtasks"] if x["sid"] == sid)
+            _transition(sk, t, s, "fail" if failed else "done", exec_done=True,
+                       note="sim: 模拟失败" if failed else None)
+            if failed:
+                retry_at[(tid, sid)] = now_t
+            else:
+                done_at[(tid, sid)] = now_t
+    span = (max(task_done.values(), default=float(_T0)) - _T0) / 3600
+    unfinished = sorted(set(by_tid) - set(task_done))
+    if unfinished:
+        DBG.warn(f"sim: {len(unfinished)} 个 task 没跑完 (依赖/池配置卡死?): {unfinished}")
+    return {
+        "makespan_h": round(span, 3),
+        "work_util": round(busy / (sk.config()["pools"]["work"] * span), 3) if span else 0.0,
+        "gate_util": round(gate_busy / 3600 / (sk.config()["pools"]["gate"] * span), 3) if span else 0.0,
+        "wait_h": {k: round(_pct(waits, q), 3) for k, q in (("p50", .5), ("p90", .9), ("p99", .99), ("max", 1))},
+        "claim_ms": {"count": len(claim_ms),
+                     **{k: round(_pct(claim_ms, q), 2) for k, q in (("p50", .5), ("p90", .9), ("max", 1))}},
+        "attempts": sum(tries.values()), "failed": sum(tries.values()) - len(done_at),
+        "gate_rejects": errors, "unfinished": unfinished,
+    }
+
+
+def _ints(raw: str, flag: str) -> list[int]:
+    try:
+        vals = [int(x) for x in raw.split(",") if x.strip()]
+    except ValueError:
+        raise SkeinError(f"{flag} 须为正整数或逗号列表 (如 2,4,8): {raw!r}") from None
+    if not vals or min(vals) < 1:
+        raise SkeinError(f"{flag} 须为正整数或逗号列表 (如 2,4,8): {raw!r}")
+    return vals
+
+
+def _range(raw: str) -> tuple[int, int]:
+    lo, _, hi = raw.partition("-")
+    try:
+        r = (int(lo), int(hi or lo))
+    except ValueError:
+        r = (0, 0)
+    if r[0] < 1 or r[1] < r[0]:
+        raise SkeinError(f"--subtasks 须为 N 或 MIN-MAX (如 3-8): {raw!r}")
+    return r
+
+
+def sim(a: argparse.Namespace) -> dict[str, Any]:
+    """`skein sim [--tasks N] [--subtasks MIN-MAX] [--shape ...] [--work 2,4] [--gate 3] [--weight ...] ...`"""
+    shape = a.shape or "random"
+    if shape not in SHAPES:
+        raise SkeinError(f"--shape 只能是 {'/'.join(SHAPES)}: {shape!r}")
+    weights = [w.strip() for w in (a.weight or "depth").split(",") if w.strip()]
+    bad = [w for w in weights if w not in WEIGHT_MODES]
+    if bad or not weights:
+        raise SkeinError(f"--weight 只能是 {'/'.join(WEIGHT_MODES)} (可逗号多选): {a.weight!r}")
+    if a.tasks < 1:
+        raise SkeinError(f"--tasks 须 ≥ 1: {a.tasks}")
+    if not 0 <= a.fail_rate < 1:
+        raise SkeinError(f"--fail-rate 须在 [0, 1) 内: {a.fail_rate}")
+    sub_range = _range(a.subtasks or "3-8")
+    specs = synthetic_tasks(a.seed, a.tasks, sub_range, shape, a.task_deps)
+    runs: list[dict[str, Any]] = []
+    for work, gate, weight in itertools.product(_ints(a.work or "2", "--work"),
+                                                _ints(a.gate or "3", "--gate"), weights):
+        DBG.log(f"sim: work={work} gate={gate} weight={weight}", style="cyan")
+        runs.append(run_once(specs, work=work, gate=gate, weight=weight, seed=a.seed,
+                             sigma=a.sigma, fail_rate=a.fail_rate, finish=a.finish))
+    return {
+        "scenario": {"tasks": a.tasks, "subtasks": sum(len(s["subtasks"]) for s in specs),
+                     "shape": shape, "seed": a.seed, "sigma": a.sigma, "fail_rate": a.fail_rate,
+                     "finish_h": a.finish, "task_deps": a.task_deps,
+                     "estimate_h": round(sum(x["estimate"] for s in specs for x in s["subtasks"]), 2)},
+        "runs": runs,
+    }
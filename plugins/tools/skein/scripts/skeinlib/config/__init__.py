@@ -7,7 +7,7 @@ from __future__ import annotations
 
 from skeinlib.config.manager import (
     Config, ConfigData, PoolsConfig, WorktreeConfig, WebConfig, SpecConfig, ConfirmConfig,
-    HooksConfig, StageHooks, AgentHooks, HookEntry,
+    SchedulingConfig, HooksConfig, StageHooks, AgentHooks, HookEntry,
     LEGAL_HOOK_STAGES, HOOK_STAGE_DISPLAY,
 )
 
@@ -17,6 +17,7 @@ CONFIG_DEFAULTS = ConfigData().model_dump(by_alias=True)
 __all__ = [
     "Config",
     "ConfigData", "PoolsConfig", "WorktreeConfig", "WebConfig", "SpecConfig", "ConfirmConfig",
+    "SchedulingConfig",
     "HooksConfig", "StageHooks", "AgentHooks", "HookEntry",
     "LEGAL_HOOK_STAGES", "HOOK_STAGE_DISPLAY",
     "CONFIG_DEFAULTS",
@@ -7,7 +7,7 @@ hooks 校验由 pydantic 模型完成。
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 from pydantic import BaseModel, Field
@@ -30,6 +30,9 @@ class WebConfig(BaseModel):
     """可视化看板 Web 服务配置。"""
     serve: bool = Field(default=True, description="是否启动 http 看板服务")
     board_open: bool = Field(default=True, description="启动时是否自动打开浏览器 (仅 tty 生效)")
+    exec: Literal["inprocess", "subprocess"] = Field(default="inprocess", description=(
+        "看板写操作的执行方式: inprocess=serve 进程内直调命令实现 (同一把工作区锁); "
+        "subprocess=每次起一个 skein 子进程 (隔离模式, 慢几百毫秒)"))
 
 
 class ConfirmConfig(BaseModel):
@@ -43,6 +46,15 @@ class SpecConfig(BaseModel):
     """Spec 注入预算配置 (字符数, 非 token)。"""
     core_budget: int = Field(default=400, ge=0, description="SessionStart 常驻注入预算")
     always_budget: int = Field(default=517, ge=0, description="每轮 prompt 常驻注入预算 (≈300 token)")
+    recall: Literal["bm25", "hybrid"] = Field(default="bm25", description=(
+        "recall 排序: bm25=FTS5 全文; hybrid=BM25 融合章节向量余弦 (需 numpy, 缺则回落 bm25)"))
+
+
+class SchedulingConfig(BaseModel):
+    """subtask 派发排序配置。"""
+    weight: Literal["depth", "estimate", "learned"] = Field(default="depth", description=(
+        "关键路径长度怎么算: depth=下游链步数; estimate=按 subtask estimate (小时) 加权; "
+        "learned=按同 skill 已完成 subtask (含已归档 task) 的实测工期中位数加权 (无样本回落 estimate)"))
 
 
 class HookEntry(BaseModel):
@@ -113,6 +125,7 @@ class ConfigData(BaseModel):
     web: WebConfig = Field(default_factory=WebConfig)
     spec: SpecConfig = Field(default_factory=SpecConfig)
     confirm: ConfirmConfig = Field(default_factory=ConfirmConfig)
+    scheduling: SchedulingConfig = Field(default_factory=SchedulingConfig)
     hooks: HooksConfig = Field(default_factory=HooksConfig, description="hooks 配置 (阶段+agent 钩子)")
 
 
@@ -128,15 +141,17 @@ class Config:
     _cfg: ConfigData              # 生效配置 (pydantic 校验后的完整结构)
     _validation_error: str | None = None  # 校验错误 (hooks 非法键等, 供 doctor 检测)
 
-    def __init__(self, path: Path | str) -> None:
+    def __init__(self, path: Path | str, backfill: bool = True) -> None:
+        # backfill=False: 只读不回写 (补的默认值只留在内存), 给要区分"用户显式设了"的只读方用
         self._path = Path(path)
+        self._backfill = backfill
         self._validation_error = None
         self.reload()
 
     # ---- 读 ----
 
     def reload(self) -> ConfigData:
-        """读盘 → pydantic 校验+补默认值 → 缓存。文件不存在或缺失键时回写。"""
+        """读盘 → pydantic 校验+补默认值 → 缓存。文件不存在或缺失键时回写 (backfill=False 不写)。"""
         if self._path.exists():
             result = yaml.safe_load(self._path.read_text(encoding="utf-8"))
             raw = result if isinstance(result, dict) else {}
@@ -153,11 +168,13 @@ class Config:
                     self._cfg = ConfigData()  # hooks 之外也有错 → 才整份降级
             # 缺失顶层键 → pydantic 补了默认值 → 回写盘保持文件完整。
             # 校验失败时禁回写: 生效配置是降级值, 写回去等于拿默认值覆盖用户原文件。
-            if raw and not self._validation_error and not raw.keys() >= {f for f in ConfigData.model_fields}:
+            if (self._backfill and raw and not self._validation_error
+                    and not raw.keys() >= {f for f in ConfigData.model_fields}):
                 self._write()
         else:
             self._cfg = ConfigData()
-            self._write()
+            if self._backfill:
+                self._write()
         return self._cfg
 
     @property
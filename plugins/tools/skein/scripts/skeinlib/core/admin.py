@@ -10,14 +10,13 @@ import argparse
 from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from pydantic import BaseModel
     from skeinlib.core.workspace import Workspace
 
-import yaml
-from skeinlib.config import Config, ConfigData
 from skeinlib.gitignore.derivatives import ensure_gitignore
 from skeinlib.utils.errors import SkeinError
 from skeinlib.task.model import TaskStatus, normalize_task_status
-from skeinlib.task.migrate import (disable_trellisx_plugin, migrate_trellis_tasks,
+from skeinlib.task.migrate import (disable_trellisx_plugin, migrate_timeline, migrate_trellis_tasks,
                               purge_trellis_hooks, purge_wiring, settings_trellis_notes)
 from skeinlib.utils.paths import SPEC_ENTRY
 from skeinlib.gitignore.worktree_ignore import ignore_worktree_dir
@@ -30,11 +29,10 @@ import subprocess
 import sys
 
 
-from pydantic import BaseModel
-
-
 def _flatten_cfg(model: BaseModel, prefix: str = "") -> list[tuple[str, Any]]:
     """递归遍历 pydantic model → [(点号路径, 值), ...] (跳过 hooks)。"""
+    from pydantic import BaseModel
+
     out: list[tuple[str, Any]] = []
     for name, info in type(model).model_fields.items():
         if name == "hooks":
@@ -61,6 +59,8 @@ class Admin:
         self.ws.archive_dir.mkdir(parents=True, exist_ok=True)
         cfg = self.ws.dir / "config.yaml"
         if not cfg.exists():
+            from skeinlib.config import Config
+
             Config(cfg).reload()  # reload 文件不存在时自动写默认配置
         # .skein/.gitignore — 条目从 derivatives.DERIVATIVES 单一登记处导出 (单一来源, 见该模块)
         ensure_gitignore(self.ws.dir)
@@ -93,6 +93,7 @@ class Admin:
         # 物理迁移 trellis task 文件夹 (redirect 内, 保 stdout 纯 JSON)
         with contextlib.redirect_stdout(sys.stderr):
             tasks = migrate_trellis_tasks(trellis, self.ws.tasks, self.ws.store)
+        timeline_migrated = migrate_timeline(self.ws.tasks, self.ws.store.archive_dir)  # 内嵌 timeline → timeline.jsonl
         # 无条件删接线 (两模式), --full 再整删 .trellis 目录
         removed = purge_wiring(trellis, self.ws.root)
         removed += purge_trellis_hooks(self.ws.root)  # 剔 settings*.json 内 canonical trellis hook 条目 + 删脚本
@@ -103,6 +104,8 @@ class Admin:
         # web 看板服务: 缺省启用 (init 已写 web.serve=true); --no-web 关闭。启用则打开看板一次 (监听服务由 monitor 起)。
         web_enabled = not getattr(a, "no_web", False)
         if not web_enabled:
+            from skeinlib.config import Config
+
             Config(self.ws.dir / "config.yaml").set("web.serve", False)
         else:
             print("可视化看板: 运行 `skein serve --open` 起 http 服务打开 (常驻服务由 monitor 起)。", file=sys.stderr)
@@ -113,6 +116,7 @@ class Admin:
             "spec_copied": spec_copied,
             "spec_needs_reorg": spec_copied,  # 拷自 trellis → agent 重组为 namespace×类目 (在 .skein/spec 原地改, 安全)
             "trellis_tasks": tasks,  # 已物理迁入 .skein/task/; agent 只补语义 (subtask)
+            "timeline_migrated": timeline_migrated,  # task.json 内嵌 timeline 已搬进 timeline.jsonl 的 task
             "wiring_removed": removed,  # 已删的 trellis 接线 + (full 时) .trellis/
             "trellisx_disabled": trellisx_disabled,  # 已在 .claude/settings.local.json 禁用的 trellisx 插件 key
             "trellis_removed": trellis_removed,
@@ -121,6 +125,8 @@ class Admin:
         return manifest
 
     def config_cmd(self, a: argparse.Namespace) -> dict[str, Any]:
+        from skeinlib.config import Config  # 命令面只有 init/setup/config 要 pydantic, 别的命令不付这份开销
+
         cfg_path = self.ws.dir / "config.yaml"
         config = Config(cfg_path)
         action = getattr(a, "action", None)
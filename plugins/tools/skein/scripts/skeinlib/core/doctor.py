@@ -22,7 +22,6 @@ import sys
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Optional
 
-import yaml
 
 from skeinlib.utils.errors import SkeinError
 from skeinlib.task.dag import detect_cycle
@@ -166,6 +165,8 @@ class DoctorMixin:
         # 留在 config.yaml 会被静默忽略 (并发上限已改读 pools.work), 用户会误以为它还生效。
         cfg_file = self.dir / "config.yaml"
         if cfg_file.exists():
+            import yaml
+
             try:
                 raw_cfg = yaml.safe_load(cfg_file.read_text(encoding="utf-8"))
             except (OSError, yaml.YAMLError):
@@ -15,15 +15,17 @@ subtask 认领时**就地启动**, 故这里不再需要 `Lifecycle._start_task`
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 if TYPE_CHECKING:
     from skeinlib.core.workspace import Workspace
 
 from skeinlib.infra.worktree import workdir_for, worktrees_of
-from skeinlib.task.dag import _crit_weight, _split, _split_semi, _sub_estimate_sum, _sub_pct
+from skeinlib.task.dag import (WEIGHT_MODES, _crit_weight, _learned_hours, _node_costs, _split, _split_semi,
+                               _sub_estimate_sum, _sub_pct)
 from skeinlib.utils.errors import SkeinError
 from skeinlib.task.model import (SubtaskStatus, TaskStatus, PRIORITY_RANK, PRIORITY_DEFAULT,
                                  STATUS_ACTIVE,
@@ -224,12 +226,19 @@ def _report_mismatches(ws: "Workspace") -> list[dict[str, str]]:
     return mismatches
 
 
-def _score(s: dict[str, Any], crit_val: int, is_research: bool = False) -> float:
+def _score(s: dict[str, Any], crit_val: float, is_research: bool = False) -> float:
     """打分 = 关键路径权重×W_CRIT + 等待小时数×W_WAIT + (exec ? W_EXEC : 0)。"""
     wait_h = (now() - (s.get("created") or now())) / 3600.0
     return crit_val * _W_CRIT + wait_h * _W_WAIT + (0.0 if is_research else _W_EXEC)
 
 
+def _score_key(s: dict[str, Any], crit_val: float, is_research: bool = False) -> float:
+    """`_score` 去掉与 now() 相关的公共项: 同一时刻各候选的等待项都是 (now - created), now 在比较里
+    整体抵消, 剩下的只依赖 subtask 自身 —— 排序与 `_score` 逐位一致, 但不随时间漂移, 可直接当堆键。"""
+    created = s.get("created") or now()
+    return crit_val * _W_CRIT - created / 3600.0 * _W_WAIT + (0.0 if is_research else _W_EXEC)
+
+
 class Scheduler:
     """subtask DAG 就绪判定 + 认领。"""
 
@@ -237,10 +246,23 @@ class Scheduler:
         self.ws = ws
         self.lifecycle = lifecycle
 
-    def _ready(self, t: dict[str, Any]) -> list[dict[str, Any]]:
+    def _crit_fn(self) -> Callable[[list[dict[str, Any]]], dict[str, float]]:
+        """按 `scheduling.weight` 配好的关键路径权重函数 (一次取活内各 task 共用同一份实测工期)。
+        depth = 拓扑深度 (默认, 与改动前逐位一致); estimate / learned 见 `_node_costs`。
+        learned 的样本 = 未归档 task + 已归档 task (后者按归档目录签名缓存, 见 `TaskStore.archived_samples`),
+        所以实测不会在 task 归档 (retain_days 后) 时丢掉; 建一次要扫全部 task, 调用方每次取活只建一次。"""
+        mode = (self.ws.config().get("scheduling") or {}).get("weight", "depth")
+        if mode not in WEIGHT_MODES or mode == "depth":
+            return _crit_weight
+        learned = (_learned_hours(self.ws.store.all_tasks(), self.ws.store.archived_samples())
+                   if mode == "learned" else None)
+        return lambda subs: _crit_weight(subs, _node_costs(subs, mode, learned))
+
+    def _ready(self, t: dict[str, Any],
+               crit_of: Optional[Callable[[list[dict[str, Any]]], dict[str, float]]] = None) -> list[dict[str, Any]]:
         """就绪批: pending + 依赖全 done, 按打分降序排序后截到空闲槽位 (见 _score:
         关键路径优先 = 最长下游链先派, 最小化 makespan; 并行只看 depends_on DAG, 无写文件冲突自算;
-        同分按登记序稳定)。"""
+        同分按登记序稳定)。crit_of: 调用方已建好的 `_crit_fn()` (一次取活只建一次); 缺省现建。"""
         if self._deps_blocked(t):
             return []  # 前置 task 未完成 → 整个 task 不出活 (依赖门在取活时判, 不在 confirm 判)
         subs = t.get("subtasks", [])
@@ -249,17 +271,17 @@ class Scheduler:
         slots = self.ws.config()["pools"]["work"] - len(running)
         if slots <= 0:
             return []  # 并发满 → 阻塞
-        crit = _crit_weight(subs)
+        crit = (crit_of or self._crit_fn())(subs)
         cand = [(i, s) for i, s in enumerate(subs)
                 if s["status"] in (SubtaskStatus.PENDING, SubtaskStatus.FAILED)
                 and all(d in done for d in s.get("depends_on", []))]
         # PENDING 一律先于 FAILED (重试不抢新活的槽), 组内再按打分降序, 同分按登记序稳定 (i 升序)。
         # 状态必须是第一键: 打分含「等待小时数」, 早登记的 FAILED 等得久、分自然高, 放在打分之后
         # 就永远被打分压过 —— 慢机器上跑全量套件时表现为「fail 掉的 a 抢走了 c 的槽」的偶发红。
-        cand.sort(key=lambda p: (0 if p[1]["status"] == SubtaskStatus.PENDING else 1,
-                                 -_score(p[1], crit.get(p[1]["sid"], 0)),
-                                 p[0]))
-        return [s for _, s in cand[:slots]]
+        top = heapq.nsmallest(slots, cand, key=lambda p: (0 if p[1]["status"] == SubtaskStatus.PENDING else 1,
+                                                          -_score_key(p[1], crit.get(p[1]["sid"], 0)),
+                                                          p[0]))
+        return [s for _, s in top]
 
     def _deps_blocked(self, t: dict[str, Any]) -> list[str]:
         """该 task 尚未完成的前置 task id 列表 (空 = 可派活)。"""
@@ -292,12 +314,19 @@ class Scheduler:
         slots = self.ws.config()["pools"]["work"] - global_running
         if slots <= 0:
             return []
-        cand: list[tuple[dict[str, Any], dict[str, Any], int, int, float, int]] = []
+        # 堆元素 = (排序键, task, subtask)。排序键: 优先级降序 → 打分降序 → PENDING 优先于 FAILED
+        # → task 登记序 → subtask 登记序 (PENDING 先于 FAILED: 重试不抢新活的槽; 全同分时退化为
+        # 改动前的顺序 → 零回归)。键末两位 (ti, i) 全局唯一, 比较永远到不了后面的 dict。
+        # 打分用 `_score_key` (与 `_score` 同序、不含 now()), 取前 slots 个是 O(n log slots),
+        # 主循环每几秒一次 claim、单 task 上百 subtask 时不再整表排序。
+        heap: list[tuple[tuple[int, float, int, int, int], dict[str, Any], dict[str, Any]]] = []
+        crit_of = self._crit_fn()
         for ti, t in enumerate(tasks):
             subs = t.get("subtasks", [])
             rsubs = t.get("research_tasks", [])
             done = {s["sid"] for s in subs + rsubs if s["status"] == SubtaskStatus.DONE}
-            crit = _crit_weight(subs + rsubs)
+            crit = crit_of(subs + rsubs)
+            rsids = {r["sid"] for r in rsubs}
             prio = PRIORITY_RANK.get(t.get("priority") or PRIORITY_DEFAULT, PRIORITY_RANK[PRIORITY_DEFAULT])
             # exec subtask 与 research 任务合池 (research 无 exec 加分); deps 跨两列均可解析
             for i, s in enumerate(subs + rsubs):
@@ -305,14 +334,11 @@ class Scheduler:
                     continue
                 if not all(d in done for d in s.get("depends_on", [])):
                     continue  # 依赖未全 done 不入池 (依赖硬优先, 优先级不越过)
-                is_r = any(r["sid"] == s["sid"] for r in rsubs)
-                cand.append((t, s, ti, i, _score(s, crit.get(s["sid"], 0), is_r), prio))
-        # 优先级降序 → 打分降序 → PENDING 优先于 FAILED → task 登记序 → subtask 登记序
-        # (PENDING 先于 FAILED: 重试不抢新活的槽; 全同分时退化为改动前的顺序 → 零回归)
-        cand.sort(key=lambda x: (-x[5], -x[4],
-                                 0 if x[1]["status"] == SubtaskStatus.PENDING else 1,
-                                 x[2], x[3]))
-        return [(c[0], c[1]) for c in cand[:slots]]
+                score = _score_key(s, crit.get(s["sid"], 0), s["sid"] in rsids)
+                failed = 0 if s["status"] == SubtaskStatus.PENDING else 1
+                heap.append(((-prio, -score, failed, ti, i), t, s))
+        heapq.heapify(heap)
+        return [(t, s) for _, t, s in (heapq.heappop(heap) for _ in range(min(slots, len(heap))))]
 
     def claim(self, a: argparse.Namespace) -> dict[str, Any]:
         """全局跨 task 认领批, 按 phase 分流:
@@ -523,10 +549,20 @@ class Scheduler:
         # 执行认领: 先 check 后 finishing (finishing 的 gate 槽校验依赖 check 已就位)
         checked: list[str] = []
         errors: list[dict[str, str]] = []
+        # 进检查也占 gate 槽 (gate = 检查中+收尾中, 同 doctor 口径): 超额收进检查中的话, 每个检查中
+        # task 进收尾时都看见「别人占满了」, 谁也进不去 —— `skein sim --gate 1` 多 task 同时完工即死锁。
+        gate = self.ws.config()["pools"]["gate"]
+        occupied = sum(1 for x in self.ws.store.all_tasks()
+                       if x["status"] in (TaskStatus.CHECK, TaskStatus.FINISHING))
         for t in to_check:
+            if occupied >= gate:
+                errors.append({"tid": t["id"], "action": "check",
+                               "error": f"gate 池已满 ({occupied}/{gate}) — 留在进行中, 下次 claim 重试"})
+                continue
             try:
                 self.lifecycle.check(argparse.Namespace(id=t["id"]))  # 走同一道门, 带 stage hooks
                 checked.append(t["id"])
+                occupied += 1
             except SkeinError as e:
                 errors.append({"tid": t["id"], "action": "check", "error": str(e)})
         # 收尾路调 lifecycle.finishing (占 gate 槽; gate 满则该 task 留检查中, 下次 claim 重试)
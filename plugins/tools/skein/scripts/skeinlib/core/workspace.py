@@ -10,11 +10,14 @@
 就是那个门面。DoctorMixin / BoardSourceMixin 读的 `self.root` / `self.store` 也来自这里。
 
 ## 工作区写锁
-`_workspace_lock` 是 fcntl.flock 排他锁, 由 `cli.main` 对会写盘的命令统一加, 命令自身不管锁。
+`_workspace_lock` 是 fcntl.flock 锁, 由 `cli.main` 对会写盘的命令统一加, 命令自身不管锁。
+两级: 动索引/看板/多个 task 的命令拿 `.skein/.lock` 排他; 只改单个 task 内 subtask 的命令
+拿 `.skein/.lock` 共享 + `task/<id>/.lock` 排他 —— 不同 task 的 subtask 迁移互不排队。
 """
 from __future__ import annotations
 
 import contextlib
+import copy
 import datetime
 import fcntl
 import json
@@ -25,12 +28,13 @@ import time
 from pathlib import Path
 from typing import Any, Iterator, Optional, cast
 
-from skeinlib.config import Config
 from skeinlib.utils.errors import SkeinError
 from skeinlib.hooks.runner import DBG, HookBlocked, _run_hooks
 from skeinlib.task.model import TaskStatus
 from skeinlib.task.store import TaskStore
 from skeinlib.infra.worktree import git, worktrees_of
+from skeinlib.utils.paths import SCRIPTS_DIR
+from skeinlib.utils.fs import racy
 
 # 插件无法直接发货 settings.json 的 env 块 (plugin.json 无 env 字段)。
 # 官方持久化 env 的机制: SessionStart hook 往 $CLAUDE_ENV_FILE 追加 export。
@@ -59,10 +63,12 @@ def _persist_bash_cwd_env() -> None:
 
 
 @contextlib.contextmanager
-def _workspace_lock(lock_path: Path, timeout: float = 10.0, poll: float = 0.05) -> Iterator[None]:
-    # 工作区级排他写锁 (fcntl.flock): 防多 skein 进程并发 read-modify-write 破坏 task.json。
-    # 阻塞等待锁释放, 超 timeout 秒仍拿不到 → SkeinError (非死等)。CLI 短命, 全局锁足够。
-    # ponytail: global lock, per-task locks if throughput matters.
+def _workspace_lock(lock_path: Path, timeout: float = 10.0, poll: float = 0.05,
+                    shared: bool = False) -> Iterator[None]:
+    # 工作区级写锁 (fcntl.flock): 防多 skein 进程并发 read-modify-write 破坏 task.json。
+    # 阻塞等待锁释放, 超 timeout 秒仍拿不到 → SkeinError (非死等)。
+    # shared=True 取共享锁: 单 task 级命令在全局锁上只拿共享, 彼此不挡, 只挡全局排他的命令
+    # (sync/归档/rename 这类要看全部 task 的), 真正的互斥落在各自的 task 锁上 (同一函数, 不同文件)。
     # config-hooks: SKEIN_IN_HOOK 已置位 = 本进程是钩子(before/after)里派生的嵌套 skein 调用,
     # 其父进程正是本锁的持有者且仍在临界区内(阶段命令body含钩子执行)——同进程链单写者,
     # 再抢同一把锁必死锁到 timeout。跳过加锁(整个 with 块变 no-op), 写序仍由外层锁串行化。
@@ -75,18 +81,72 @@ def _workspace_lock(lock_path: Path, timeout: float = 10.0, poll: float = 0.05)
     try:
         while True:
             try:
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(f.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
                 break
             except OSError:
                 if time.monotonic() >= deadline:
                     raise SkeinError(
                         f"获取 .skein 写锁超时 ({timeout}s) — 另一 skein 进程持锁未释放: {lock_path}")
                 time.sleep(poll)
-        DBG.log(f"🔒 已获工作区写锁 {lock_path}", style="dim")
+        DBG.log(f"🔒 已获{'共享' if shared else '排他'}写锁 {lock_path}", style="dim")
         yield
     finally:
         f.close()  # 关闭即释放 flock
-        DBG.log("🔓 释放工作区写锁", style="dim")
+        DBG.log(f"🔓 释放写锁 {lock_path}", style="dim")
+
+
+def _config_schema_sig() -> int:
+    """ConfigData 定义文件的 mtime —— 不 import 它就能判断缓存的 dump 是否出自同一版模型。"""
+    try:
+        return os.stat(SCRIPTS_DIR / "skeinlib" / "config" / "manager.py").st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _load_config(skein_dir: Path, sig: tuple[int, int],
+                 backfill: bool = True) -> tuple[tuple[int, int], dict[str, Any]]:
+    """config.yaml → (签名, 生效配置 dump)。跨进程经 `.cache/config.json` 复用上次的 dump。
+
+    pydantic + yaml 的导入加建模约 150ms, 比 `skein ready` 其余部分加起来还多; 配置又极少改。
+    缓存键 = config.yaml 签名 + ConfigData 定义文件的 mtime (插件升级改了默认值/字段即失效)。
+    只在未命中时才 import pydantic —— `skein --profile-startup ready` 可验证热路径不加载它。
+    backfill 透传给 `Config`: False 时缺的键只在 dump 里补, 不回写 config.yaml。
+    """
+    f = skein_dir / "config.yaml"
+    cache = skein_dir / ".cache" / "config.json"
+    key = [*sig, _config_schema_sig()]
+    try:
+        hit = json.loads(cache.read_text(encoding="utf-8"))
+        if hit["key"] == key:
+            return sig, cast(dict[str, Any], hit["cfg"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    from skeinlib.config import Config
+
+    cfg = Config(f, backfill).cfg.model_dump(by_alias=True)
+    st = os.stat(f)  # reload 补缺失键时会回写, 签名以回写后为准
+    sig = (st.st_mtime_ns, st.st_size)
+    # 不回写时不记跨进程缓存: 否则 Workspace.config 按原签名命中, 缺的键永远补不回 config.yaml
+    if backfill and not racy(sig[0], time.time_ns()):
+        with contextlib.suppress(OSError):
+            cache.parent.mkdir(exist_ok=True)
+            tmp = cache.with_name(f".{cache.name}.{os.getpid()}")
+            tmp.write_text(json.dumps({"key": [*sig, key[2]], "cfg": cfg}, ensure_ascii=False),
+                           encoding="utf-8")
+            os.replace(tmp, cache)
+    return sig, cfg
+
+
+def load_config(skein_dir: Path) -> dict[str, Any]:
+    """`skein_dir` (.skein) 的生效配置, 结构同 ConfigData (补默认值 + 校验, 非法整段降级)。
+
+    给拿不到 `Workspace` 的层用 (如 spec); 不带 `Workspace.config` 的进程内记忆和 env 覆盖, 也不回写
+    缺的键 (spec 的 always_budget 要看原文区分"用户显式设了", 见 `spec.model.always_budget_tokens`)。"""
+    try:
+        st = os.stat(skein_dir / "config.yaml")
+    except FileNotFoundError:
+        raise SkeinError("未初始化 — 先跑 `skein init`") from None
+    return _load_config(skein_dir, (st.st_mtime_ns, st.st_size), backfill=False)[1]
 
 
 class Workspace:
@@ -111,6 +171,7 @@ class Workspace:
         self.proj: str = self.root.name
         # 落盘层: task.json 唯一写入口。config / worktree 列展示两个依赖注入进去,
         # 这样 store 不认识 commands 层, 依赖单向 (见 skeinlib/store.py)。
+        self._cfg_memo: Optional[tuple[tuple[int, int], dict[str, Any]]] = None
         self.store = TaskStore(self.dir, self.tasks, self.archive_dir,
                                self.config, self._wt_shown)
 
@@ -149,9 +210,18 @@ class Workspace:
     def config(self) -> dict[str, Any]:
         """返回生效配置, 结构固定同 ConfigData。"""
         f = self.dir / "config.yaml"
-        if not f.exists():
-            raise SkeinError("未初始化 — 先跑 `skein init`")
-        cfg = Config(f).cfg.model_dump(by_alias=True)
+        try:
+            st = os.stat(f)
+        except FileNotFoundError:
+            raise SkeinError("未初始化 — 先跑 `skein init`") from None
+        # yaml + pydantic 一遍十几毫秒, 一条命令里要调好几次 (常驻 daemon 里更是每条命令都调):
+        # 按文件签名记住 dump 结果。刚写过的 (racy, 判据同 TaskScan) 不记, 免同 tick 同 size 撞签名
+        sig = (st.st_mtime_ns, st.st_size)
+        memo = self._cfg_memo
+        if memo is None or memo[0] != sig:
+            memo = _load_config(self.dir, sig)
+            self._cfg_memo = None if racy(memo[0][0], time.time_ns()) else memo
+        cfg = copy.deepcopy(memo[1])  # 调用方会改返回值 (下面的 env 覆盖就是一例)
         # 用户在插件启用时确认的 userConfig 优先于 config.yaml (经 CLAUDE_PLUGIN_OPTION_* 传入)
         v = os.environ.get("CLAUDE_PLUGIN_OPTION_MAX_ACTIVE")
         if v and v.strip().isdigit():
@@ -168,6 +238,8 @@ class Workspace:
         if not f.exists():
             return {}
         try:
+            from skeinlib.config import Config
+
             cfg = Config(f)
             # 检测 hooks 非法阶段名/未知字段 → stderr 告警 (不阻断)
             if cfg._validation_error:
@@ -24,6 +24,7 @@ DERIVATIVES: list[Derivative] = [
     Derivative("spec/.pending-fix", "hooks/stopcheck.py 标记"),
     Derivative("spec/.audit-log", "spec/maintain.py 审计日志"),
     Derivative("spec/.recall.db", "spec/index.py FTS 索引"),
+    Derivative("spec/.recall.vec.npy", "spec/index.py _rebuild_vectors (hybrid recall 章节向量矩阵)"),
     Derivative("trash/", "lifecycle.py 软删转储"),
     Derivative("spec/index.md", "spec/index.py _reindex_top (总索引)"),
     Derivative("spec/*/index.md", "spec/index.py _reindex_layer (各 namespace 索引)"),
@@ -38,7 +39,10 @@ DERIVATIVES: list[Derivative] = [
     Derivative(".ready-migration-backup/", "readystate.py migrate_ready_status 迁移前快照, 供回滚"),
     Derivative("serve.log", "boardsource.py _run_server serve 崩溃日志"),
     Derivative(".cache/", "hooks 会话级缓存目录 (判定块已注标记 / fileMatch 注入去重表)"),
-    Derivative(".cache/*.json", "hooks/pre_tool_use.py filematch-injected + user_prompt_submit.py judge-emitted"),
+    Derivative(".cache/*.json", "hooks/pre_tool_use.py filematch-injected + spec/filematch.py filematch-index (reindex / spec-meta hook 重建) + spec/inject.py core-inject (reindex / 注入 hook 按 stat 增量重建) + spec/core.py spec-mtimes (按 HEAD 缓存的 git 提交时间) + user_prompt_submit.py judge-emitted + core/workspace.py config.json (生效配置 dump)"),
+    Derivative(".cache/tasks.db", "task/scan.py TaskScan 跨进程解析缓存 (删掉即冷扫重建)"),
+    Derivative(".cache/symbols.db", "spec/symbols.py map 骨架 / anchors 判定共用的逐文件符号缓存 (按 git blob sha; 删掉即冷扫重建)"),
+    Derivative(".daemon.sock", "cli/daemon.py 常驻命令服务的 Unix socket"),
 ]
 
 
@@ -5,15 +5,25 @@
 """
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
+# 已补过的 cwd: 常驻 daemon 里每条命令都走 main(), 同一目录补一次就够 (单次 CLI 进程里它恒为空)
+_DONE: set[str] = set()
+
 
 def run_preflight() -> None:
     """幂等增量补 .skein/.gitignore 条目 (仅已初始化的工作区)。
 
     所有 skein* CLI 入口必经此处。失败只 warn 不阻断。
     """
+    try:
+        cwd = os.getcwd()
+    except FileNotFoundError:
+        return
+    if cwd in _DONE:
+        return
     # 定位 .skein/ — 与 Workspace._find_skein_root 同策略但更轻量
     from skeinlib.infra.worktree import git
     r = git("rev-parse", "--show-toplevel", check=False)
@@ -29,6 +39,7 @@ def run_preflight() -> None:
     try:
         from skeinlib.gitignore.derivatives import ensure_gitignore
         ensure_gitignore(skein_dir)
+        _DONE.add(cwd)
     except Exception as e:
         print(f"⚠ .skein/.gitignore 增量补缺失败 (不阻断): {e}", file=sys.stderr)
 
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import json
 import re
+from pathlib import Path
 from typing import Any
 
+from skeinlib.spec import filematch as _filematch
+
 SPEC_RE = re.compile(r"(?:^|/)\.skein/spec/[^/]+/[^/]+/.+\.md$")
 SPEC_REQUIRED = ("title", "namespace", "inclusion", "keywords")
 SPEC_INCLUSIONS = ("always", "auto", "fileMatch", "manual")
@@ -41,6 +44,8 @@ def cmd_spec_meta(payload: dict[str, Any]) -> int:
     normalized_path = file_path.replace("\\", "/")
     if not SPEC_RE.search(normalized_path):
         return 0
+    # spec 页被 Edit/Write 过 → 顺手刷新 PreToolUse 的 fileMatch 索引 (按 stat 增量, 只重读变了的页)
+    _filematch.rebuild(Path(file_path[:normalized_path.rindex(".skein/spec/") + len(".skein/spec")]))
     try:
         with open(file_path, encoding="utf-8") as file:
             text = file.read()
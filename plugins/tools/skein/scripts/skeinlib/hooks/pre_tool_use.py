@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-import fnmatch
 import json
 import os
 import re
 import sys
-from pathlib import Path, PurePath
-from typing import Any
+from pathlib import Path
+from typing import Any, Optional
 
 from skeinlib.hooks.util import git_root
+from skeinlib.spec import filematch as _filematch
+from skeinlib.spec.filematch import parse_frontmatter, strip_frontmatter
 from skeinlib.spec.model import INJECTION_BUDGETS
 from skeinlib.utils.debug import budget_guard
 
@@ -18,78 +19,39 @@ GATED = {"Read", "Edit", "Write", "MultiEdit"}
 _WORKTREE_ADD_RE = re.compile(r"^\s*git\s+worktree\s+add\b")
 
 
-def parse_frontmatter(text: str) -> dict[str, str]:
-    if not text.startswith("---"):
-        return {}
-    end = text.find("\n---", 3)
-    if end == -1:
-        return {}
-    frontmatter: dict[str, str] = {}
-    for line in text[3:end].splitlines():
-        if ":" in line:
-            key, _, value = line.partition(":")
-            frontmatter[key.strip()] = value.strip().strip("[]")
-    return frontmatter
-
-
-def strip_frontmatter(text: str) -> str:
-    if text.startswith("---"):
-        end = text.find("\n---", 3)
-        if end != -1:
-            return text[end + 4:]
-    return text
-
-
 def find_filematch_specs(spec_root: str) -> list[tuple[Any, list[str], str, str]]:
+    """全量清单 (现扫, 不走索引)。守卫热路径用 `filematch_context` → 预编译索引, 见 spec/filematch.py。"""
     if not os.path.exists(spec_root):
         return []
-    matches: list[tuple[Any, list[str], str, str]] = []
-    try:
-        for root, _, files in os.walk(spec_root):
-            for filename in files:
-                if not filename.endswith(".md"):
-                    continue
-                path = Path(root) / filename
-                try:
-                    # 曾把这里改成「先读 2KB 头判 inclusion, 命中才补读全文」省全文加载。已回退:
-                    # A/B 实测 9 页省 0.02ms、500 页 x 8KB 省 0.3ms (均 <8%, 噪声量级), 瓶颈在
-                    # os.walk 的 syscall 不在读内容; 换来的是「frontmatter 超头长即静默漏注入」这个
-                    # 新故障面。别再改回去。
-                    text = path.read_text()
-                    metadata = parse_frontmatter(text)
-                    if metadata.get("inclusion", "") != "fileMatch":
-                        continue
-                    globs = [item.strip() for item in metadata.get("globs", "").split(",") if item.strip()]
-                    body = strip_frontmatter(text).strip()
-                    if globs and body:
-                        title = metadata.get("title", filename)
-                        matches.append((path, globs, body, title))
-                except (OSError, UnicodeDecodeError):
-                    continue
-    except OSError:
-        return []
-    return matches
+    return list(_filematch.scan(Path(spec_root)))
 
 
-def file_matches_globs(file_path: str, globs: list[str], workspace_root: str) -> bool:
+def _relative(file_path: str, workspace_root: str) -> Optional[str]:
     try:
         absolute_path = os.path.abspath(file_path)
         absolute_root = os.path.abspath(workspace_root)
         if not absolute_path.startswith(absolute_root):
-            return False
-        relative_path = os.path.relpath(absolute_path, absolute_root)
+            return None
+        return os.path.relpath(absolute_path, absolute_root)
     except ValueError:
-        return False
-    return any(fnmatch.fnmatch(relative_path, glob) or PurePath(relative_path).match(glob) for glob in globs)
+        return None
+
+
+def file_matches_globs(file_path: str, globs: list[str], workspace_root: str) -> bool:
+    """任一 glob 命中 (`fnmatch` 或 `PurePath.match` 口径, 合并成一条正则)。"""
+    relative_path = _relative(file_path, workspace_root)
+    return relative_path is not None and re.fullmatch(_filematch.glob_regex(globs), relative_path) is not None
 
 
 def filematch_context(file_path: str, workspace_root: str, session_id: str = "") -> str:
     """globs 命中规则正文注入; 同一 session 第二次命中同一页降级为一行提示 (见上文)。
 
     session_id 缺省时不做去重 (hook payload 正常都带 session_id)。"""
-    absolute_path = os.path.abspath(file_path)
-    absolute_root = os.path.abspath(workspace_root)
-    if not absolute_path.startswith(absolute_root):
+    relative_path = _relative(file_path, workspace_root)
+    if relative_path is None:
+        return ""
+    hits = _filematch.matches(Path(workspace_root) / ".skein" / "spec", relative_path)
+    if not hits:
         return ""
     cache_file = Path(workspace_root) / ".skein" / ".cache" / "filematch-injected.json"
     injected: set[str] = set()
@@ -100,14 +62,13 @@ def filematch_context(file_path: str, workspace_root: str, session_id: str = "")
             injected = set()
     sections: list[str] = []
     fresh: list[str] = []
-    for path, globs, body, title in find_filematch_specs(os.path.join(workspace_root, ".skein", "spec")):
-        if file_matches_globs(file_path, globs, workspace_root):
-            key = str(path)
-            if key in injected:
-                sections.append(f"### {title}\n规则 {title} 已注入过, 见上文")
-            else:
-                sections.append(f"### {title}\n{body}")
-                fresh.append(key)
+    for path, _globs, body, title in hits:
+        key = str(path)
+        if key in injected:
+            sections.append(f"### {title}\n规则 {title} 已注入过, 见上文")
+        else:
+            sections.append(f"### {title}\n{body}")
+            fresh.append(key)
     if session_id and fresh:
         try:
             cache_file.parent.mkdir(parents=True, exist_ok=True)
@@ -4,6 +4,10 @@ import json
 from datetime import datetime
 from typing import Any
 
+# 每轮对话结束都跑: 体检逐文件事实有缓存 (见 spec/maintain._health_records), 冷库/大改动时
+# 分析超出这个预算就先交部分结果, 剩下的下一次 Stop 接着做 (已分析的已落缓存, 不白做)。
+_SCAN_BUDGET_S = 1.0
+
 
 def cmd_stop_check(_: dict[str, Any]) -> int:
     from skeinlib.spec.facade import Spec
@@ -13,9 +17,11 @@ def cmd_stop_check(_: dict[str, Any]) -> int:
     if not spec.root.exists():
         return 0
     root = spec.root
-    findings = [finding for finding in spec._scan_findings(spec._scan_namespaces())
-                if not finding.get("rel", "").startswith("product/")]
+    found, pending = spec._health_scan(spec._scan_namespaces(), budget_s=_SCAN_BUDGET_S)
+    findings = [finding for finding in found if not finding.get("rel", "").startswith("product/")]
     marker = root / ".pending-fix"
+    if not findings and pending:
+        return 0  # 只扫了一部分且暂无问题: 旧标记 (若有) 留到扫完再定
     if not findings:
         try:
             marker.unlink()
@@ -41,6 +47,7 @@ def cmd_stop_check(_: dict[str, Any]) -> int:
         "core_tokens": estimate_tokens_from_chars(core_chars),
         "budget_tokens": always_budget_tokens(),
         "problems": problems,
+        **({"unscanned": pending} if pending else {}),  # 本轮未分析完的文件数, 下次 Stop 补齐
     }, ensure_ascii=False, indent=2))
     return 0
 
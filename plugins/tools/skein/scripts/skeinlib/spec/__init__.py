@@ -12,5 +12,6 @@
 `text` 文本纯函数 (frontmatter 解析 / 摘要 / slug) · `model` 常量 + 预算 + 库根定位 ·
 `core` `Spec` 基类 (路径 / 扫描 / inclusion 判定) · `index` 重建索引 + sqlite FTS + 召回 ·
 `inject` core 正文与 SessionStart/SubagentStart 注入 · `write` sediment 写盘 ·
-`maintain` 体检 / 降级 / 归档 / 重构 · `cli` argparse 入口。
+`maintain` 体检 / 降级 / 归档 / 重构 · `filematch` PreToolUse 的预编译 fileMatch 索引 ·
+`symbols` map 骨架与 anchors 判定共用的逐文件符号缓存 · `vectors` hybrid recall 的章节向量 · `cli` argparse 入口。
 """
@@ -23,7 +23,6 @@ from typing import Any, cast
 from pydantic import BaseModel, Field
 
 from skeinlib.utils.errors import SkeinError
-from skeinlib.spec.text import _frontmatter
 
 # 硬规否定式关键词 + 其后紧跟的短语 (最多 20 字, 到常见分隔符为止) — 用于硬规冲突候选提取
 _NEG_RE = re.compile(r"(禁止?|不可|不得|严禁|禁用|MUST NOT)\s*([^\n,，。;；:：]{2,20})")
@@ -162,7 +161,7 @@ class AnalyzeMixin:
             for f, title, _body in self._rules(ns):  # type: ignore[attr-defined]
                 if not title or title not in design_text:
                     continue
-                meta = _frontmatter(f.read_text())
+                meta = self._doc(f).meta  # type: ignore[attr-defined]
                 if meta.get("status") == "proposed":
                     out.append(SpecFinding(kind="confidence",
                                        text=f"[未验证] design.md 引用规则「{title}」"
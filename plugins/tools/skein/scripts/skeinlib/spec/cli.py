@@ -81,18 +81,22 @@ def init() -> None:
 
 
 @app.command()
-def reindex() -> None:
-    """重建各 namespace index.md + 顶层总索引 (改盘后同步)。"""
-    _run("reindex")
+def reindex(full: Annotated[bool, typer.Option(
+        "--full", help="忽略增量 manifest, 整库重建 (.recall.db 表 + 全部 index.md/backlinks.md)")] = False,
+            ) -> None:
+    """重建各 namespace index.md + 顶层总索引 (改盘后同步; 缺省增量, 只重做变过的文件)。"""
+    _run("reindex", full=full)
 
 
 @app.command()
 def recall(query: Annotated[str, typer.Argument(help="任务关键词")],
            src: Annotated[RecallSrc, typer.Option(
                "--src", help="仅召回指定 namespace (code=map namespace 语义页+anchors 汇总)")] = RecallSrc.all,
+           hybrid: Annotated[bool, typer.Option(
+               "--hybrid", help="本次用 BM25+章节向量混合排序 (缺省看 config spec.recall; 需 numpy)")] = False,
            ) -> None:
     """按关键词 FTS5 BM25 排序召回 (无 .recall.db/MATCH 失败 → grep fallback)。"""
-    _run("recall", query=query, src=src.value)
+    _run("recall", query=query, src=src.value, hybrid=hybrid)
 
 
 @app.command()
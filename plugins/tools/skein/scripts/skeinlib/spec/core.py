@@ -6,16 +6,57 @@
 
 `_inclusion()` 读 frontmatter 显式字段; 缺失时按旧 `layer` 字段兼容一轮 (core→always,
 其余→auto) —— 这是给未迁移的存量文件的**读侧**上坡道, 不是两套词汇并存。写侧只写 inclusion。
+
+`_mtimes()` 要每个规则文件最近一次提交的时间。以前每次都 `git log --name-only` 走完 spec 目录的
+全部历史, 老仓库一跑就是几万行。现在结果按 HEAD 存在 `.skein/.cache/spec-mtimes.json`:
+HEAD 没动就只花一次 `git rev-parse`; 往前走了 (旧 HEAD 是新 HEAD 的祖先) 就只 log `旧..新`
+这一段并入; 历史被改写 (reset / rebase / amend) 才全量重跑。
+
+`_doc()` 是规则文件的唯一读入口: 一次 reindex / maintain 里同一文件会被 `_rules` / `_inclusion` /
+FTS / spec_meta / 反链 / 体检各读一遍, 现在按 (mtime_ns, size) 在进程内缓存解析结果 `Doc`,
+各 mixin 共用 (模块级, 跨 `Spec()` 实例)。mtime 距解析时刻不足 `RACY_NS` (utils/fs.py) 的条目不信 —— 同一
+时钟粒度内同尺寸改写 stat 看不出来 (task/scan.py 同一判据), 刚写的文件照旧每次重读。
 """
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import subprocess
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from skeinlib.spec.model import INCLUSIONS, NAMESPACES, spec_root
-from skeinlib.spec.text import _frontmatter, _sections
+from skeinlib.spec.text import Doc, _parse_doc
+from skeinlib.utils.fs import racy
+
+_DOCS: dict[Path, tuple[int, int, int, Doc]] = {}  # 路径 → (mtime_ns, size, 解析时刻 ns, Doc)
+GIT_TIMES = "spec-mtimes.json"
+_GIT_TIMES_VERSION = 1
+
+
+def _git(cwd: Path, *args: str) -> Optional[str]:
+    try:
+        r = subprocess.run(["git", *args], capture_output=True, text=True, cwd=cwd)
+    except OSError:
+        return None
+    return r.stdout if r.returncode == 0 else None
+
+
+def _log_times(cwd: Path, rev: str) -> Optional[dict[str, int]]:
+    """`git log rev -- .` (cwd 下的路径) → {仓库相对路径: 最近提交时间}; 失败 → None。"""
+    out = _git(cwd, "log", "--format=@%ct", "--name-only", rev, "--", ".")
+    if out is None:
+        return None
+    times: dict[str, int] = {}
+    ts = 0
+    for ln in out.splitlines():
+        if ln.startswith("@"):
+            ts = int(ln[1:])
+        elif ln.strip():
+            times.setdefault(ln.strip(), ts)  # log 倒序 → 首次见即最新
+    return times
 
 
 class SpecBase:
@@ -45,26 +86,68 @@ class SpecBase:
                       if p.name not in ("index.md", "backlinks.md"))
     def _rules(self, layer: str) -> list[tuple[Path, str, str]]:
         """层内全部规则 (章节粒度): [(主题文件, 规则标题, 规则正文)]。"""
-        return [(f, t, b) for f in self._rule_files(layer) for t, b in _sections(f.read_text())]
+        return [(f, t, b) for f in self._rule_files(layer) for t, b in self._doc(f).sections]
+    def _doc(self, f: Path) -> Doc:
+        """规则文件解析结果 (进程内缓存, 见模块 docstring)。文件读不出照抛 OSError。"""
+        try:
+            st = f.stat()
+        except OSError:
+            _DOCS.pop(f, None)  # 删了/挪走的文件不留在缓存里
+            raise
+        hit = _DOCS.get(f)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size and not racy(st.st_mtime_ns, hit[2]):
+            return hit[3]
+        began = time.time_ns()
+        doc = _parse_doc(f.read_bytes().decode("utf-8", errors="replace"))
+        _DOCS[f] = (st.st_mtime_ns, st.st_size, began, doc)
+        return doc
     def _mtimes(self, use_git: bool = True) -> dict[Path, int]:
         """各规则文件最近修改时间 (epoch)。git 提交时间优先 (一次 git log 全量解析),
         未跟踪/无 git/use_git=False → 文件系统 mtime。取代已废弃的 frontmatter created/updated。"""
         out: dict[Path, int] = {}
         if use_git:
-            r = subprocess.run(["git", "log", "--format=@%ct", "--name-only", "--", "."],
-                               capture_output=True, text=True, cwd=self.root)
-            if r.returncode == 0:
-                repo = self.root.parent.parent  # .skein/spec → 仓库根 (git log 路径相对仓库根)
-                ts = 0
-                for ln in r.stdout.splitlines():
-                    if ln.startswith("@"):
-                        ts = int(ln[1:])
-                    elif ln.strip():
-                        out.setdefault(repo / ln.strip(), ts)  # log 倒序 → 首次见即最新
+            repo = self.root.parent.parent  # .skein/spec → 仓库根 (git log 路径相对仓库根)
+            out.update((repo / rel, ts) for rel, ts in self._git_times().items())
         for layer in self._scan_namespaces():
             for f in self._rule_files(layer):
                 out.setdefault(f, int(f.stat().st_mtime))
         return out
+    def _git_times(self) -> dict[str, int]:
+        """{仓库相对路径: 最近提交时间}, 按 HEAD 缓存并增量更新 (见模块 docstring); 无 git / 无提交 → {}。"""
+        if not self.root.is_dir():
+            return {}
+        head = (_git(self.root, "rev-parse", "--verify", "-q", "HEAD") or "").strip()
+        if not head:
+            return {}
+        cache = self.root.parent / ".cache" / GIT_TIMES
+        try:
+            prev = json.loads(cache.read_text())
+            if not isinstance(prev, dict) or prev.get("v") != _GIT_TIMES_VERSION:
+                prev = None
+        except (OSError, ValueError):
+            prev = None
+        if prev is not None and prev["head"] == head:
+            times: dict[str, int] = prev["times"]
+            return times
+        merged: Optional[dict[str, int]] = None
+        if prev is not None and _git(self.root, "merge-base", "--is-ancestor", prev["head"], head) is not None:
+            new = _log_times(self.root, f"{prev['head']}..{head}")
+            if new is not None:
+                merged = prev["times"]
+                for rel, ts in new.items():
+                    merged[rel] = max(ts, merged.get(rel, 0))
+        if merged is None:
+            merged = _log_times(self.root, head)
+            if merged is None:
+                return {}
+        tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+        try:
+            cache.parent.mkdir(exist_ok=True)
+            tmp.write_text(json.dumps({"v": _GIT_TIMES_VERSION, "head": head, "times": merged}))
+            os.replace(tmp, cache)
+        except OSError:
+            pass  # 只读工作区: 下次照样现算
+        return merged
     def _age_days(self, f: Path, mtimes: dict[Path, int], now_ts: int) -> int:
         return max(0, (now_ts - mtimes.get(f, now_ts)) // 86400)
     # ---- init ----
@@ -77,7 +160,7 @@ class SpecBase:
     def _inclusion(self, f: Path) -> str:
         """有效 inclusion: frontmatter 显式声明优先; 缺失时按旧 `layer` 字段兼容一轮
         (core→always / 其余→auto), 免旧库未迁移 inclusion 字段就丢了常驻注入。"""
-        meta = _frontmatter(f.read_text())
+        meta = self._doc(f).meta
         inc = str(meta.get("inclusion", "")).strip()
         if inc in INCLUSIONS:
             return inc
@@ -4,7 +4,8 @@
 逐个当参数穿过四十来个调用点。拆文件的目的是让 1000 行的 spec 引擎按职责分开, mixin 做到了。
 
 **依赖契约**: 各 mixin 只依赖 `SpecBase` 提供的 `root` / `layer_dir()` / `_scan_namespaces()`
-/ `_rule_files()` / `_rules()` / `_inclusion()` / `_always_files()` / `_mtimes()` / `_age_days()`。
+/ `_rule_files()` / `_rules()` / `_doc()` / `_inclusion()` / `_always_files()` / `_mtimes()` /
+`_age_days()`; 规则文件一律经 `_doc()` 读 (进程内解析缓存), 不各自 read_text + 解析。
 mixin 之间也互相调 (maintain 调 `_degrade_one`、write 调 `_reindex_all`), 全经 `self` 解析,
 所以只有装配成本类后才完整 —— 单独 import 某个 mixin 去调它的方法不成立。
 """
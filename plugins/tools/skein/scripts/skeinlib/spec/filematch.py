@@ -0,0 +1,248 @@
+"""fileMatch 索引 — PreToolUse 守卫的预编译 glob 表 (`.skein/.cache/filematch-index.json`)。
+
+守卫挂在每一次 Read/Edit/Write 上。以前每次都 `os.walk` 整个 spec 库, 读遍全部 `.md` 并解析
+frontmatter, 再对每条 glob 逐个 `fnmatch` + `PurePath.match`。现在 `reindex` 和 PostToolUse 的
+spec-meta hook 把 fileMatch 页的 (glob 列表, 标题, 正文字节偏移) 连同每条 glob 译好的正则落盘。
+守卫只需读这一个文件, 把全部正则并成一条做一次 `fullmatch`。没命中 (绝大多数读) 就此返回;
+命中才逐页复核, 并按偏移读出正文。
+
+glob 语义与旧实现逐条等价: `fnmatch` (`*` 跨 `/`) 或 `PurePath.match` (从右按段对齐, `*` 不跨段)。
+后者由 `_tail_regex` 译成正则。
+
+**新鲜度**: 重建只重读 stat 变了的文件。mtime 距上次建表不足 `RACY_NS` 的照 racy-clean 判据 (utils/fs.py) 重读。
+命中页的 stat 与登记不符 (手改过还没 reindex) 就当场重建一次。未命中的页若被手改成 fileMatch,
+要等下一次 reindex 或经 Edit/Write 触发的 spec-meta hook 才会进表。这是刻意取舍: 守卫热路径
+不 walk。表缺失、版本或 Python 版本对不上 (正则里有 3.11 的原子组) 也整表重建。
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path, PurePath
+from typing import Any, Optional
+
+from skeinlib.utils.fs import racy
+
+INDEX = "filematch-index.json"
+_VERSION = 2  # 2: offset 改按原始字节量 (CRLF 页在 1 里偏早, 落进 frontmatter)
+_PY = f"{sys.version_info[0]}.{sys.version_info[1]}"  # fnmatch.translate 的产物随版本变, 换解释器就重建
+
+Match = tuple[Path, list[str], str, str]  # (规则文件, globs, 正文, 标题)
+
+
+def parse_frontmatter(text: str) -> dict[str, str]:
+    """守卫口径的 frontmatter: 逐行 `key: value`, 值去掉两端 `[]` (行内数组当逗号串)。"""
+    if not text.startswith("---"):
+        return {}
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}
+    frontmatter: dict[str, str] = {}
+    for line in text[3:end].splitlines():
+        if ":" in line:
+            key, _, value = line.partition(":")
+            frontmatter[key.strip()] = value.strip().strip("[]")
+    return frontmatter
+
+
+def strip_frontmatter(text: str) -> str:
+    if text.startswith("---"):
+        end = text.find("\n---", 3)
+        if end != -1:
+            return text[end + 4:]
+    return text
+
+
+def _component_regex(part: str) -> str:
+    """单段 glob → 正则, 通配不跨 `/` (`PurePath.match` 逐段 fnmatch 的口径)。"""
+    i, n, out = 0, len(part), []
+    while i < n:
+        c = part[i]
+        i += 1
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + (i < n and part[i] == "!")
+            j += j < n and part[j] == "]"
+            while j < n and part[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+                continue
+            stuff = part[i:j].replace("\\", "\\\\")
+            i = j + 1
+            if stuff.startswith("!"):
+                stuff = "^/" + stuff[1:]  # 取反类也不能吃掉段分隔符
+            elif stuff.startswith(("^", "[")):
+                stuff = "\\" + stuff
+            out.append(f"[{stuff}]")
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def _tail_regex(glob: str) -> Optional[str]:
+    """`PurePath(rel).match(glob)` 的正则: 相对 glob 与路径末尾同样多的段逐段对齐。
+    绝对 glob / 空 glob (`.`) 对相对路径恒不命中, 返回 None。"""
+    pat = PurePath(glob)
+    if not pat.parts or pat.anchor:
+        return None
+    return "(?:.*/)?" + "/".join(_component_regex(p) for p in pat.parts)
+
+
+def glob_regex(globs: list[str]) -> str:
+    """一组 glob 的合并正则 (供 `re.fullmatch` 相对路径); 任一 glob 命中即匹配。"""
+    alts: list[str] = []
+    for g in globs:
+        alts.append(fnmatch.translate(g))
+        tail = _tail_regex(g)
+        if tail is not None:
+            try:
+                re.compile(tail)
+            except re.error:
+                continue  # 畸形字符类 (如倒序区间): 只留 fnmatch 那一支, 旧实现在这里同样匹配不上
+            alts.append(tail)
+    return "|".join(f"(?:{a})" for a in alts) or "(?!)"
+
+
+def index_path(spec_root: Path) -> Path:
+    return spec_root.parent / ".cache" / INDEX
+
+
+def _sig(st: os.stat_result) -> list[int]:
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _newlines(s: str) -> str:
+    """同 `read_text` 的通用换行: CRLF / 单独的 CR → LF。"""
+    return s.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _raw_offset(raw: str, chars: int) -> int:
+    """换行归一后的前 chars 个字符在原文里的 UTF-8 字节长度 (CRLF 在归一文本里只占一个字符)。"""
+    i = 0
+    for _ in range(chars):
+        i += 2 if raw.startswith("\r\n", i) else 1
+    return len(raw[:i].encode())
+
+
+def _entry(path: Path, rel: str) -> Optional[dict[str, Any]]:
+    """读一个 .md: 是带 globs 且正文非空的 fileMatch 页 → 表项, 否则 None。
+    解析用换行归一后的文本 (同旧的 `read_text`), offset 则量在原始字节上 —— `_body` 按它切 `read_bytes()`。"""
+    raw = path.read_bytes().decode("utf-8")
+    text = _newlines(raw)
+    metadata = parse_frontmatter(text)
+    if metadata.get("inclusion", "") != "fileMatch":
+        return None
+    globs = [item.strip() for item in metadata.get("globs", "").split(",") if item.strip()]
+    rest = strip_frontmatter(text)
+    if not globs or not rest.strip():
+        return None
+    return {"path": rel, "globs": globs, "title": metadata.get("title", path.name),
+            "offset": _raw_offset(raw, len(text) - len(rest)), "regex": glob_regex(globs)}
+
+
+def load(spec_root: Path) -> Optional[dict[str, Any]]:
+    """读已落盘的表; 缺失/损坏/版本不符 → None。"""
+    try:
+        data = json.loads(index_path(spec_root).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("v") != _VERSION or data.get("py") != _PY:
+        return None
+    return data
+
+
+def _build(spec_root: Path, prev: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """扫整棵 spec 目录下所有 `.md` 建表; prev 里 stat 没变 (且出了 racy 窗口) 的文件不重读。"""
+    old_files: dict[str, list[int]] = prev["files"] if prev else {}
+    old_entries = {e["path"]: e for e in prev["entries"]} if prev else {}
+    built = prev["built_ns"] if prev else 0
+    began = time.time_ns()
+    files: dict[str, list[int]] = {}
+    entries: list[dict[str, Any]] = []
+    try:
+        for root, _, names in os.walk(spec_root):
+            for filename in names:
+                if not filename.endswith(".md"):
+                    continue
+                path = Path(root) / filename
+                rel = path.relative_to(spec_root).as_posix()
+                try:
+                    sig = _sig(path.stat())
+                    if old_files.get(rel) == sig and not racy(sig[0], built):
+                        e = old_entries.get(rel)
+                    else:
+                        e = _entry(path, rel)
+                except (OSError, UnicodeDecodeError):
+                    continue
+                files[rel] = sig
+                if e is not None:
+                    entries.append(e | {"sig": sig})
+    except OSError:
+        files, entries = {}, []
+    return {"v": _VERSION, "py": _PY, "built_ns": began, "files": files, "entries": entries}
+
+
+def rebuild(spec_root: Path, prev: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    """按 stat 增量重建并落盘 (写不进去就只返回内存里的表)。prev 省略时以盘上的旧表为基准。"""
+    data = _build(spec_root, load(spec_root) if prev is None else prev)
+    if not spec_root.is_dir():
+        return data  # 非 SKEIN 项目: 不替它建 .skein/.cache
+    out = index_path(spec_root)
+    tmp = out.with_name(f"{out.name}.{os.getpid()}.tmp")
+    try:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data, ensure_ascii=False))
+        os.replace(tmp, out)
+    except OSError:
+        pass  # 只读工作区: 这一轮照用内存里的表
+    return data
+
+
+def _body(spec_root: Path, e: dict[str, Any]) -> Optional[str]:
+    """按登记的偏移读正文; 文件 stat 与登记不符 / 读不出 → None (该重建了)。"""
+    path = spec_root / str(e["path"])
+    try:
+        if _sig(path.stat()) != e["sig"]:
+            return None
+        return _newlines(path.read_bytes()[int(e["offset"]):].decode()).strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def scan(spec_root: Path) -> list[Match]:
+    """全部 fileMatch 页 (不落盘, 不用旧表): 供需要全量清单的调用方。"""
+    data = _build(spec_root, None)
+    return [(spec_root / e["path"], e["globs"], body, e["title"])
+            for e in data["entries"] if (body := _body(spec_root, e)) is not None]
+
+
+def matches(spec_root: Path, rel: str) -> list[Match]:
+    """相对工作区根的路径 rel 命中的 fileMatch 页 (表序)。表缺失先建; 命中页变过 → 重建一次再答。"""
+    if not spec_root.is_dir():
+        return []
+    data = load(spec_root) or rebuild(spec_root)
+    for attempt in (0, 1):
+        entries = data["entries"]
+        if not entries or not re.fullmatch("|".join(f"(?:{e['regex']})" for e in entries), rel):
+            return []
+        out: list[Match] = []
+        for e in entries:
+            if not re.fullmatch(e["regex"], rel):
+                continue
+            body = _body(spec_root, e)
+            if body is None:
+                break
+            out.append((spec_root / e["path"], e["globs"], body, e["title"]))
+        else:
+            return out
+        if attempt == 0:
+            data = rebuild(spec_root, data)
+    return []
@@ -1,20 +1,69 @@
 """索引重建 + sqlite5 FTS + 召回。
 
 每个 namespace 一份 `index.md` (章节粒度, 一行一条规则, 带 inclusion / anchors 列) + 顶层
-聚合索引 + `backlinks.md` 反链表。FTS 表在 `.recall.db`, **先 DROP 再 CREATE** (幂等迁移,
-不留旧 schema)。
+聚合索引 + `backlinks.md` 反链表。FTS 表在 `.recall.db`, 全量重建时**先 DROP 再 CREATE**
+(幂等迁移, 不留旧 schema)。
+
+## 增量 reindex
+每次 sediment/amend/看板保存都会 reindex, 而一次通常只动一个文件。`.recall.db` 另存一张
+`spec_manifest` (每文件一行: mtime_ns + 内容 sha1 + 类目/章节数/出链), reindex 先 stat 全库,
+mtime 变了才读、sha 也变了才算改动; 然后在**一个事务**里删掉改动/消失文件的 rules 与 spec_meta
+行、插回新行, 只重写受影响 namespace 的 `index.md` / `backlinks.md` (反链表还要算上被改动文件
+新旧出链所指的 namespace)。顶层总索引的条数由 manifest 汇总, 不必读文件。
+库不存在、`PRAGMA user_version` 对不上、表缺失, 或 `reindex --full`, 走全量。mtime 距登记时刻
+不足 `RACY_NS` 的条目照 racy-clean 判据 (utils/fs.py) 重新比 sha。
+
+收尾顺带刷新 PreToolUse 守卫用的 fileMatch 索引 (`spec/filematch.py`) 和 SessionStart / SubagentStart
+注入用的 core 预渲染包 (`InjectMixin._rebuild_core_pack`), 同样按 stat 增量。
 
 `recall` 优先走 FTS5 BM25; 库不存在 / MATCH 语法失败 (查询含双引号) → 降级 grep index.md。
+中文: unicode61 分词把一整串汉字当一个词, 所以 rules 表另有影子列 `cjk` 存切好的双字词,
+查询里的汉字也照样切 (`_fts_query`), 「合并」才查得到写着「合并冲突处理」的规则。
 降级是刻意的: 召回不到规则只是少点上下文, 炸掉却会打断 planning。
+
+`spec.recall: hybrid` (或 `recall --hybrid`) 时 BM25 前 `POOL` 条与章节向量的余弦分融合排序
+(`spec/vectors.py`)。向量随 reindex 按 manifest 的 sha 增量维护; 没装 numpy / 矩阵对不上 → 照走 BM25。
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import re
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, cast
+from typing import TYPE_CHECKING, Any, Optional, cast
+
+from skeinlib.hooks.runner import DBG
+from skeinlib.spec import filematch as _filematch
+from skeinlib.spec import vectors as _vectors
+from skeinlib.spec.model import recall_mode
+from skeinlib.spec.text import _HAN, Doc, _cell, _cjk_grams, _cjk_terms, _dist, _summary
+from skeinlib.utils.fs import racy
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    import numpy as np
+    from numpy.typing import NDArray
+
+_SCHEMA = 3  # .recall.db 的 PRAGMA user_version; 2: rules 加 path 列 (增量删行用), 3: 加 cjk 影子列; 旧库全量重建
+_TABLES = ("rules", "spec_meta", "spec_manifest")
+
 
-from skeinlib.spec.text import _cell, _dist, _frontmatter, _link_target, _summary
+def _fts_query(query: str) -> Optional[str]:
+    """查询 → MATCH 串: 每个 token 双引号包起 + OR; token 里的汉字另按双字词展开 (对上 cjk 影子列)。
+    空查询 / token 含双引号 (会破坏 MATCH 语法) → None。"""
+    tokens = [t for t in re.split(r"\s+", query.strip()) if t]
+    if not tokens or any('"' in t for t in tokens):
+        return None
+    terms = tokens + [g for t in tokens for run in _HAN.findall(t) for g in _cjk_grams(run)]
+    return " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+
+def _sha(doc: Doc) -> str:
+    """manifest 的内容指纹。合法 UTF-8 文件与按原始字节算的 sha1 相同 (旧 manifest 不必重算)。"""
+    return hashlib.sha1(doc.text.encode("utf-8", errors="replace")).hexdigest()
 
 
 class IndexMixin:
@@ -25,8 +74,11 @@ class IndexMixin:
         root: Path
         def layer_dir(self, layer: str) -> Path: ...
         def _scan_namespaces(self) -> list[str]: ...
+        def _rule_files(self, layer: str) -> list[Path]: ...
         def _rules(self, layer: str) -> list[tuple[Path, str, str]]: ...
         def _inclusion(self, f: Path) -> str: ...
+        def _doc(self, f: Path) -> Doc: ...
+        def _rebuild_core_pack(self, full: bool = False) -> dict[str, Any]: ...
 
     # ---- recall (按需粗筛: FTS5 BM25 优先, grep fallback) ----
     def recall(self, a: argparse.Namespace) -> None:
@@ -48,6 +100,13 @@ class IndexMixin:
                 print("recall 无命中")
             return
 
+        if getattr(a, "hybrid", False) or recall_mode(self.root) == "hybrid":
+            hybrid_hits = self._recall_hybrid(query, src)
+            if hybrid_hits is not None:
+                print("recall 命中 (BM25+语义混合, model 读全文再定用否):" if hybrid_hits else "recall 无命中")
+                if hybrid_hits:
+                    print("\n".join(hybrid_hits))
+                return
         fts_hits = self._recall_fts(query, src)
         if fts_hits is not None:
             if fts_hits:
@@ -66,17 +125,16 @@ class IndexMixin:
     def _recall_fts(self, query: str, src: str = "all") -> Optional[list[str]]:
         """FTS5 BM25 召回; 返回命中行 (None=不可用降级 grep, []=无命中)。
 
-        每个 token 双引号包起 + OR: 兼容中文 unicode61 分词弱 (任一词命中即召回)。
+        每个 token 双引号包起 + OR (任一词命中即召回), 汉字再按双字词展开, 见 `_fts_query`。
         含双引号的 token 会破坏 MATCH 语法 → 提前降级 grep (不调 MATCH)。
         src != "all" → 按 namespace 列过滤 (--src rules|product|map)。
         """
         db = self.root / ".recall.db"
         if not db.exists():
             return None
-        tokens = [t for t in re.split(r"\s+", query.strip()) if t]
-        if not tokens or any('"' in t for t in tokens):
+        ftsq = _fts_query(query)
+        if ftsq is None:
             return None
-        ftsq = " OR ".join(f'"{t}"' for t in tokens)
         import sqlite3  # 局部: 仅 recall + reindex 链用, 不拖 session-start/inject-core
         try:
             con = sqlite3.connect(db)
@@ -98,6 +156,57 @@ class IndexMixin:
         # 且 layer compat 列对 manual/fileMatch inclusion 为空串, 会丢标识 (曾致 external namespace 显示 "[]")
         return [f"| [{ns}] {rel} | {cat} | {title} | {kw} | - | {_summary(body)} |"
                 for rel, cat, title, kw, body, ns in rows]
+    def _recall_hybrid(self, query: str, src: str = "all") -> Optional[list[str]]:
+        """BM25 + 章节向量融合召回; 行格式同 `_recall_fts`。None = 不可用 (没 numpy / 没库 / 矩阵
+        对不上), 调用方照走 BM25。矩阵从没建过 (配置刚切到 hybrid, 或只是临时 `--hybrid`) 就现建一次。"""
+        db = self.root / ".recall.db"
+        if not db.exists() or not _vectors.available():
+            DBG.log("hybrid recall 不可用 (无 .recall.db 或未装 numpy), 走 BM25", style="dim")
+            return None
+        import sqlite3
+        con = sqlite3.connect(db)
+        try:
+            m = self._load_vectors(con)
+            if m is None:
+                self._rebuild_vectors()
+                m = self._load_vectors(con)
+                if m is None:
+                    return None
+            keys = con.execute("SELECT namespace, rel FROM rule_vec ORDER BY row").fetchall()
+            bm25: dict[int, float] = {}
+            ftsq = _fts_query(query)
+            if ftsq is not None:
+                row_of = {k: i for i, k in enumerate(keys)}
+                try:
+                    for ns, rel, score in con.execute(
+                            "SELECT namespace, rel, bm25(rules) FROM rules WHERE rules MATCH ? "
+                            "ORDER BY bm25(rules) LIMIT ?", (ftsq, _vectors.POOL)):
+                        if (ns, rel) in row_of:
+                            bm25.setdefault(row_of[(ns, rel)], score)
+                except sqlite3.OperationalError:
+                    pass  # MATCH 语法敏感字符: 只剩语义一路
+            import numpy as np
+            mask = None if src == "all" else np.fromiter((ns == src for ns, _ in keys), dtype=bool, count=len(keys))
+            top = _vectors.fuse(m, query, bm25, mask)
+            if not top:
+                return []
+            info = {r[0]: r[1:] for r in con.execute(
+                f"SELECT row, namespace, rel, category, title, keywords, summary FROM rule_vec "
+                f"WHERE row IN ({','.join('?' * len(top))})", [i for i, _ in top])}
+        except sqlite3.OperationalError as err:
+            DBG.warn(f"hybrid recall 读库失败, 走 BM25: {err}")
+            return None
+        finally:
+            con.close()
+        return ["| [{}] {} | {} | {} | {} | - | {} |".format(*info[i]) for i, _ in top]
+    def _load_vectors(self, con: sqlite3.Connection) -> Optional[NDArray[np.float16]]:
+        """按 rule_vec_meta 的登记内存映射向量矩阵; 表缺失 / 对不上 → None。"""
+        import sqlite3
+        try:
+            sig = con.execute("SELECT rows, mtime_ns, size FROM rule_vec_meta").fetchall()  # 取尽: 不留读锁
+        except sqlite3.OperationalError:
+            return None
+        return _vectors.load(self.root, sig[0] if sig else None)
     def _recall_grep(self, query: str, src: str = "all") -> list[str]:
         """子串 grep index.md (FTS5 不可用时的 fallback); 命中行带 [namespace] 前缀。
         src != "all" → 仅扫指定 namespace, 否则扫全 namespace (含手建的)。"""
@@ -114,10 +223,18 @@ class IndexMixin:
                     hits.append(f"[{ns}] {ln}")
         return hits
     # ---- reindex ----
-    def reindex(self, _: argparse.Namespace) -> None:
-        self._reindex_all()
+    def reindex(self, a: argparse.Namespace) -> None:
+        self._reindex_all(full=bool(getattr(a, "full", False)))
         print(f"已重建索引: {self.root}")
-    def _reindex_all(self) -> dict[str, dict[str, int]]:
+    def _reindex_all(self, full: bool = False) -> dict[str, dict[str, int]]:
+        done = None if full else self._reindex_incremental()
+        counts = self._reindex_full() if done is None else done
+        _filematch.rebuild(self.root, {} if full else None)  # PreToolUse 守卫的 fileMatch 索引, 见 spec/filematch.py
+        self._rebuild_core_pack(full=full)  # SessionStart / SubagentStart 的预渲染包, 见 spec/inject.py
+        if recall_mode(self.root) == "hybrid":
+            self._rebuild_vectors(full)
+        return counts
+    def _reindex_full(self) -> dict[str, dict[str, int]]:
         counts: dict[str, dict[str, int]] = {}
         # 目录扫描 (无常量白名单): 手建 spec/<ns>/<cat>/x.md 后 reindex 就能识别并产 spec/<ns>/index.md
         for ns in self._scan_namespaces():
@@ -125,8 +242,170 @@ class IndexMixin:
         self._reindex_top(counts)
         self._rebuild_fts()
         self._rebuild_spec_meta()
+        self._rebuild_manifest()
         self._rebuild_backlinks_md(self._rebuild_backlinks())
         return counts
+    def _reindex_incremental(self) -> Optional[dict[str, dict[str, int]]]:
+        """只重做变过的文件; 返回各 namespace 类目条数 (同 `_reindex_all`)。None = 该走全量。"""
+        db = self.root / ".recall.db"
+        if not db.exists():
+            return None
+        import sqlite3
+        con = sqlite3.connect(db)
+        try:
+            have = {r[0] for r in con.execute("SELECT name FROM sqlite_master")}
+            if con.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA or not have.issuperset(_TABLES):
+                return None
+            old = {r[0]: r[1:] for r in con.execute(
+                "SELECT path, namespace, mtime_ns, seen_ns, sha, links FROM spec_manifest")}
+            namespaces = self._scan_namespaces()
+            files = {str(f.relative_to(self.root)): (ns, f) for ns in namespaces for f in self._rule_files(ns)}
+            began = time.time_ns()
+            changed: dict[str, tuple[str, Path, Doc, int, str]] = {}
+            touched: list[tuple[int, int, str]] = []  # 内容没变只是 mtime 动了: 只刷 manifest 的两个时间
+            for rel, (ns, f) in files.items():
+                prev = old.get(rel)
+                try:
+                    mtime = f.stat().st_mtime_ns
+                    if prev and prev[0] == ns and prev[1] == mtime and not racy(mtime, prev[2]):
+                        continue
+                    doc = self._doc(f)
+                except OSError as err:
+                    DBG.warn(f"reindex 跳过读不出的 {f}: {err}")
+                    continue
+                sha = _sha(doc)
+                if prev and prev[0] == ns and prev[3] == sha:
+                    touched.append((mtime, began, rel))
+                else:
+                    changed[rel] = (ns, f, doc, mtime, sha)
+            removed = set(old) - set(files)
+            stale = {files[r][0] for r in changed} | {old[r][0] for r in removed}
+            stale |= {ns for ns in namespaces if not (self.layer_dir(ns) / "index.md").exists()}
+            stale &= set(namespaces)
+            gone = sorted(set(changed) | removed)
+            new_links = {rel: self._links(ns, f, doc) for rel, (ns, f, doc, _, _) in changed.items()}
+            with con:
+                con.executemany("UPDATE spec_manifest SET mtime_ns = ?, seen_ns = ? WHERE path = ?", touched)
+                for i in range(0, len(gone), 500):  # 一条 IN 一次扫 FTS 表; 分批免超 SQLite 变量上限
+                    chunk = gone[i:i + 500]
+                    marks = ",".join("?" * len(chunk))
+                    for table in _TABLES:
+                        con.execute(f"DELETE FROM {table} WHERE path IN ({marks})", chunk)
+                for rel, (ns, f, doc, mtime, sha) in changed.items():
+                    con.executemany(
+                        "INSERT INTO rules(rel, category, title, keywords, body, namespace, inclusion, anchors, path, cjk) "
+                        "VALUES (?,?,?,?,?,?,?,?,?,?)", self._fts_rows(ns, f, doc))
+                    con.execute(
+                        "INSERT INTO spec_meta(path, title, namespace, category, keywords, inclusion, mtime) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", self._meta_row(ns, f, doc))
+                    con.execute("INSERT INTO spec_manifest VALUES (?,?,?,?,?,?,?,?)",
+                                (rel, ns, mtime, began, sha, f.parent.name, len(doc.sections),
+                                 json.dumps(new_links[rel], ensure_ascii=False)))
+            counts: dict[str, dict[str, int]] = {ns: {} for ns in namespaces}
+            for ns, cat, n in con.execute(
+                    "SELECT namespace, category, SUM(rules) FROM spec_manifest GROUP BY namespace, category"):
+                if ns in counts and n:
+                    counts[ns][cat] = n
+            backlinks: dict[str, list[str]] = {}
+            for (links,) in con.execute("SELECT links FROM spec_manifest ORDER BY path"):
+                for src, tgt in json.loads(links):
+                    backlinks.setdefault(tgt, []).append(src)
+        finally:
+            con.close()
+        # 反链表: 改动文件新旧出链所指的主题 (任一 namespace 里同名的) 入链变了, 它们的 backlinks.md 也要重写
+        targets = {tgt.partition("#")[0] for rel in gone
+                   for _, tgt in new_links.get(rel, []) + (json.loads(old[rel][4]) if rel in old else [])}
+        linked = {ns for ns, f in files.values() if f.stem in targets}
+        if not (stale or linked) and (self.root / "index.md").exists():
+            DBG.log("增量 reindex: 无变化", style="dim")
+            return counts
+        DBG.log(f"增量 reindex: 改 {len(changed)} / 删 {len(removed)} / 共 {len(files)} 个文件, "
+                f"重写 namespace {sorted(stale)}", style="dim")
+        for ns in sorted(stale):
+            self._reindex_layer(ns)
+        self._reindex_top(counts)
+        self._rebuild_backlinks_md(backlinks, sorted(stale | (linked & set(namespaces))))
+        return counts
+    @staticmethod
+    def _links(ns: str, f: Path, doc: Doc) -> list[tuple[str, str]]:
+        """单文件出链 [(来源规则 id, 归一目标 slug)], 与 `_rebuild_backlinks` 同一口径。"""
+        src = f"{ns}/{f.parent.name}/{f.stem}.md#"
+        return [(src + title, tgt) for (title, _), tgts in zip(doc.sections, doc.targets) for tgt in tgts]
+    def _rebuild_vectors(self, full: bool = False) -> None:
+        """维护 hybrid 召回的章节向量 (spec/vectors.py): 以 spec_manifest 为准, sha 没变的文件的行
+        从旧矩阵照搬, 只给新增/改动的文件重算; 写新矩阵后在一个事务里换行表与登记。full = 全部重算。"""
+        if not _vectors.available():
+            DBG.warn("spec.recall=hybrid 但未装 numpy: 跳过章节向量, recall 照走 BM25")
+            return
+        import sqlite3
+        import numpy as np
+        con = sqlite3.connect(self.root / ".recall.db")
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS rule_vec (row INT PRIMARY KEY, path TEXT, sha TEXT, "
+                        "namespace TEXT, rel TEXT, category TEXT, title TEXT, keywords TEXT, summary TEXT)")
+            con.execute("CREATE TABLE IF NOT EXISTS rule_vec_meta (rows INT, mtime_ns INT, size INT)")
+            files = {p: (ns, sha) for p, ns, sha in con.execute(
+                "SELECT path, namespace, sha FROM spec_manifest ORDER BY path")}
+            old = None if full else self._load_vectors(con)
+            kept: list[tuple[Any, ...]] = []
+            if old is not None:
+                kept = [r for r in con.execute(
+                    "SELECT row, path, sha, namespace, rel, category, title, keywords, summary "
+                    "FROM rule_vec ORDER BY row") if files.get(r[1]) == (r[3], r[2])]
+            have = {r[1] for r in kept}
+            if old is not None and len(kept) == len(old) and have == set(files):
+                DBG.log("章节向量: 无变化", style="dim")
+                return
+            rows: list[tuple[Any, ...]] = [r[1:] for r in kept]
+            texts: list[str] = []
+            for p, (ns, sha) in files.items():
+                if p in have:
+                    continue
+                f = self.root / p
+                try:
+                    doc = self._doc(f)
+                except OSError:
+                    continue  # 不入矩阵: manifest 下次对上了再补
+                for rel, cat, title, kw, body, *_ in self._fts_rows(ns, f, doc):
+                    rows.append((p, sha, ns, rel, cat, title, kw, _summary(body)))
+                    texts.append(f"{title}\n{kw}\n{body}")
+            fresh = _vectors.embed(texts)
+            m = np.concatenate([np.asarray(old[[r[0] for r in kept]]) if old is not None and kept
+                                else np.zeros((0, _vectors.DIM), dtype=np.float16), fresh.astype(np.float16)])
+            del old  # 先放掉旧矩阵的内存映射再换文件
+            sig = _vectors.save(self.root, m)
+            with con:
+                con.execute("DELETE FROM rule_vec")
+                con.executemany("INSERT INTO rule_vec VALUES (?,?,?,?,?,?,?,?,?)",
+                                [(i, *r) for i, r in enumerate(rows)])
+                con.execute("DELETE FROM rule_vec_meta")
+                con.execute("INSERT INTO rule_vec_meta VALUES (?,?,?)", sig)
+            DBG.log(f"章节向量: 重算 {len(texts)} / 共 {len(rows)} 条", style="dim")
+        finally:
+            con.close()
+    def _rebuild_manifest(self) -> None:
+        """全量重建 spec_manifest (增量 reindex 的比对基准), 并把库标成当前 schema。"""
+        import sqlite3
+        con = sqlite3.connect(self.root / ".recall.db")
+        try:
+            con.execute("DROP TABLE IF EXISTS spec_manifest")
+            con.execute("CREATE TABLE spec_manifest (path TEXT PRIMARY KEY, namespace TEXT, mtime_ns INT, "
+                        "seen_ns INT, sha TEXT, category TEXT, rules INT, links TEXT)")
+            began = time.time_ns()
+            for ns in self._scan_namespaces():
+                for f in self._rule_files(ns):
+                    try:
+                        mtime, doc = f.stat().st_mtime_ns, self._doc(f)
+                    except OSError:
+                        continue  # 不入 manifest: 下次增量当新文件重试
+                    con.execute("INSERT INTO spec_manifest VALUES (?,?,?,?,?,?,?,?)",
+                                (str(f.relative_to(self.root)), ns, mtime, began,
+                                 _sha(doc), f.parent.name, len(doc.sections),
+                                 json.dumps(self._links(ns, f, doc), ensure_ascii=False)))
+            con.execute(f"PRAGMA user_version = {_SCHEMA}")
+            con.commit()
+        finally:
+            con.close()
     def _rebuild_backlinks(self) -> dict[str, list[str]]:
         """扫全库章节 body 的 [[slug]] → {目标 slug: [来源规则 id,...]}。A-MEM-lite 反链表。
 
@@ -134,26 +413,31 @@ class IndexMixin:
         (<layer>/<cat>/<topic>.md#<标题>) — 关联落到章节粒度, 检索时可直接跳到那一条。"""
         backlinks: dict[str, list[str]] = {}
         for layer in self._scan_namespaces():
-            for f, title, body in self._rules(layer):
-                src = f"{layer}/{f.parent.name}/{f.stem}.md#{title}"
-                for m in re.finditer(r"\[\[([^\]]+)\]\]", body):
-                    tgt = _link_target(m.group(1))
-                    if tgt:
-                        backlinks.setdefault(tgt, []).append(src)
+            for f in self._rule_files(layer):
+                for src, tgt in self._links(layer, f, self._doc(f)):
+                    backlinks.setdefault(tgt, []).append(src)
         return backlinks
-    def _rebuild_backlinks_md(self, backlinks: dict[str, list[str]]) -> None:
+    def _section_targets(self, layer: str) -> list[tuple[Path, str, list[str]]]:
+        """层内各规则的出链: [(主题文件, 规则标题, 归一目标 slug 列表)], 顺序同 `_rules`。"""
+        out: list[tuple[Path, str, list[str]]] = []
+        for f in self._rule_files(layer):
+            doc = self._doc(f)
+            out.extend((f, title, tgts) for (title, _), tgts in zip(doc.sections, doc.targets))
+        return out
+    def _rebuild_backlinks_md(self, backlinks: dict[str, list[str]],
+                              layers: Optional[list[str]] = None) -> None:
         """每层写 <layer>/backlinks.md: 本层每条规则一章节, 列入链 (谁引用我) + 出链 (我引用谁)。
-        两向都写 — 检索时正查反查同一张表。无章节 = 该规则孤立 (maintain 判据 6 兜底)。"""
-        for layer in self._scan_namespaces():
+        两向都写 — 检索时正查反查同一张表。无章节 = 该规则孤立 (maintain 判据 6 兜底)。
+        layers 省略 = 全部 namespace (增量 reindex 只传受影响的)。"""
+        for layer in self._scan_namespaces() if layers is None else layers:
             lines = [f"# SKEIN {layer} 关联表 (A-MEM-lite 正反链)", "",
                      "章节粒度: 规则 id = `<类目>/<主题>.md#<规则标题>`; "
                      "`←` 入链 (谁引用本条) / `→` 出链 (本条引用谁)。无条目 = 孤立候选。", ""]
-            for f, title, body in self._rules(layer):
+            for f, title, tgts in self._section_targets(layer):
                 rid = f"{f.parent.name}/{f.stem}.md#{title}"
                 ins = sorted(set(backlinks.get(f"{f.stem}#{title}", [])
                                  + backlinks.get(f.stem, [])))
-                outs = sorted({t for m in re.finditer(r"\[\[([^\]]+)\]\]", body)
-                               if (t := _link_target(m.group(1)))})
+                outs = sorted(set(tgts))
                 if not ins and not outs:
                     continue
                 lines.append(f"## {rid}")
@@ -165,10 +449,13 @@ class IndexMixin:
         """重建 FTS5 BM25 索引 (全 namespace, 含 always 页 —— 注入与检索是两件事, 不该耦合;
         recall 命令要能查到全库)。sqlite3 stdlib, 无新依赖。
 
-        表列 = rel/category/title/keywords/body/namespace/inclusion/anchors。曾有个由 inclusion
+        表列 = rel/category/title/keywords/body/namespace/inclusion/anchors/path/cjk。曾有个由 inclusion
         反推的 layer 列, 只写不读 (`_recall_fts` 只 SELECT namespace) — 已删。recall 输出的
         `[namespace]` 前缀供 model 定位 .skein/spec/<namespace>/...。
-        先 DROP 再 CREATE (幂等迁移, 非 CREATE IF NOT EXISTS 免留旧 schema)。"""
+        cjk 是影子列: 标题 + keywords + 正文里的汉字切成双字词 (`_cjk_terms`), 只供 MATCH, 不回显。
+        没用 FTS5 自带的 trigram 分词器: 它查不了不足 3 字的词, 而中文词多是两个字。
+        先 DROP 再 CREATE (幂等迁移, 非 CREATE IF NOT EXISTS 免留旧 schema): 缺 cjk 列的旧库
+        在 `_SCHEMA` 对不上时走全量, 就在这里换成新表。"""
         db = self.root / ".recall.db"
         import sqlite3  # 局部: 仅 reindex/sediment 重建索引链用
         con = sqlite3.connect(db)
@@ -176,20 +463,24 @@ class IndexMixin:
             con.execute("DROP TABLE IF EXISTS rules")
             con.execute(
                 "CREATE VIRTUAL TABLE rules USING fts5("
-                "rel, category, title, keywords, body, namespace, inclusion, anchors)")
+                "rel, category, title, keywords, body, namespace, inclusion, anchors, path UNINDEXED, cjk)")
             for ns in self._scan_namespaces():  # 全 namespace 入索引 (含 always 页)
-                for f, title, body in self._rules(ns):  # 一行 = 一条规则 (章节), 非一个文件
-                    meta = _frontmatter(f.read_text())
-                    inc = self._inclusion(f)
-                    con.execute(
-                        "INSERT INTO rules(rel, category, title, keywords, body, namespace, inclusion, anchors) "
-                        "VALUES (?,?,?,?,?,?,?,?)",
-                        (f"{f.parent.name}/{f.stem}.md#{title}", f.parent.name, title,
-                         str(meta.get("keywords", "")), body, ns, inc,
-                         str(meta.get("anchors", ""))))
+                for f in self._rule_files(ns):  # 一行 = 一条规则 (章节), 非一个文件
+                    con.executemany(
+                        "INSERT INTO rules(rel, category, title, keywords, body, namespace, inclusion, anchors, path, cjk) "
+                        "VALUES (?,?,?,?,?,?,?,?,?,?)", self._fts_rows(ns, f, self._doc(f)))
             con.commit()
         finally:
             con.close()
+    def _fts_rows(self, ns: str, f: Path, doc: Doc) -> list[tuple[str, ...]]:
+        """单文件的 rules 行 (一章节一行); path = 相对库根的文件路径, 增量删行的键; 末列 cjk 影子列。"""
+        meta = doc.meta
+        inc = self._inclusion(f)
+        kw = str(meta.get("keywords", ""))
+        return [(f"{f.parent.name}/{f.stem}.md#{title}", f.parent.name, title,
+                 kw, body, ns, inc, str(meta.get("anchors", "")),
+                 str(f.relative_to(self.root)), _cjk_terms(f"{title}\n{kw}\n{body}"))
+                for title, body in doc.sections]
 
     def _rebuild_spec_meta(self) -> None:
         """重建 spec_meta 表 (文件粒度元数据: path/title/namespace/category/keywords/inclusion/mtime)。
@@ -203,7 +494,6 @@ class IndexMixin:
         """
         db = self.root / ".recall.db"
         import sqlite3
-        import json
         con = sqlite3.connect(db)
         try:
             # DROP + CREATE (幂等迁移)
@@ -229,61 +519,59 @@ class IndexMixin:
                         continue
 
                     try:
-                        txt = p.read_text(encoding="utf-8", errors="replace")
+                        doc = self._doc(p)
                     except Exception:
                         continue
 
-                    rel = str(p.relative_to(self.root))
-                    mtime = p.stat().st_mtime
-
-                    # 解析 frontmatter
-                    fm_title, category, keywords = "", "", []
-                    in_fm = False
-                    lines = txt.split("\n")
-                    fm_end = 0
-                    for li, line in enumerate(lines):
-                        s = line.strip()
-                        if s == "---" and not in_fm:
-                            in_fm = True
-                            continue
-                        if s == "---" and in_fm:
-                            fm_end = li + 1
-                            break
-                        if in_fm:
-                            if s.startswith("title:"):
-                                fm_title = s[6:].strip().strip("\"\'")
-                            elif s.startswith("category:"):
-                                category = s[9:].strip().strip("\"\'")
-                            elif s.startswith("keywords:"):
-                                raw = s[9:].strip()
-                                if raw.startswith("["):
-                                    keywords = [k.strip().strip("\"\'") for k in raw.strip("[]").split(",") if k.strip()]
-
-                    # 解析 H1 标题
-                    h1_title = ""
-                    for line in lines[fm_end:]:
-                        s = line.strip()
-                        if s.startswith("# ") and not s.startswith("## "):
-                            h1_title = s[2:].strip()
-                            break
-
-                    # title 优先级: H1 > frontmatter title > 文件名
-                    title = h1_title or fm_title or p.stem
-
-                    # inclusion = 与 path 相同 (兼容前端字段名)
-                    inclusion = rel
-
-                    # keywords 转 JSON 字符串
-                    keywords_json = json.dumps(keywords, ensure_ascii=False)
-
                     con.execute(
                         "INSERT INTO spec_meta(path, title, namespace, category, keywords, inclusion, mtime) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (rel, title, ns, category, keywords_json, inclusion, mtime))
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", self._meta_row(ns, p, doc))
 
             con.commit()
         finally:
             con.close()
+    def _meta_row(self, ns: str, p: Path, doc: Doc) -> tuple[Any, ...]:
+        """单文件的 spec_meta 行 (全量与增量共用, 两条路产出一致)。"""
+        txt = doc.text
+        rel = str(p.relative_to(self.root))
+        mtime = p.stat().st_mtime
+
+        # 解析 frontmatter
+        fm_title, category, keywords = "", "", []
+        in_fm = False
+        lines = txt.split("\n")
+        fm_end = 0
+        for li, line in enumerate(lines):
+            s = line.strip()
+            if s == "---" and not in_fm:
+                in_fm = True
+                continue
+            if s == "---" and in_fm:
+                fm_end = li + 1
+                break
+            if in_fm:
+                if s.startswith("title:"):
+                    fm_title = s[6:].strip().strip("\"\'")
+                elif s.startswith("category:"):
+                    category = s[9:].strip().strip("\"\'")
+                elif s.startswith("keywords:"):
+                    raw = s[9:].strip()
+                    if raw.startswith("["):
+                        keywords = [k.strip().strip("\"\'") for k in raw.strip("[]").split(",") if k.strip()]
+
+        # 解析 H1 标题
+        h1_title = ""
+        for line in lines[fm_end:]:
+            s = line.strip()
+            if s.startswith("# ") and not s.startswith("## "):
+                h1_title = s[2:].strip()
+                break
+
+        # title 优先级: H1 > frontmatter title > 文件名
+        title = h1_title or fm_title or p.stem
+
+        # inclusion = 与 path 相同 (兼容前端字段名); keywords 转 JSON 字符串
+        return (rel, title, ns, category, json.dumps(keywords, ensure_ascii=False), rel, mtime)
     def _reindex_layer(self, layer: str) -> dict[str, int]:
         """重建 <namespace>/index.md (章节粒度: 一行 = 一条规则), 返回 {category: 规则条数}。
         行加 inclusion (加载策略) 与 anchors (fileMatch 触发路径, 未设留空) 两列。"""
@@ -291,18 +579,19 @@ class IndexMixin:
         d.mkdir(parents=True, exist_ok=True)
         by_cat: dict[str, int] = {}
         rows: list[tuple[str, str, str, str, str, str, str, str]] = []
-        for f, title, body in self._rules(layer):
-            meta = _frontmatter(f.read_text())
+        for f in self._rule_files(layer):
+            doc = self._doc(f)
+            meta, inc = doc.meta, self._inclusion(f)
             cat = f.parent.name  # 类目 = 所在目录 (物理事实), 免与 frontmatter 漂移
-            rel = f"{f.relative_to(d).as_posix()}#{title}"  # 规则 id, 可直接定位到章节
-            by_cat[cat] = by_cat.get(cat, 0) + 1
-            links = ",".join(sorted({t for m in re.finditer(r"\[\[([^\]]+)\]\]", body)
-                                     if (t := _link_target(m.group(1)))}))
-            # .get 容错旧 spec 缺 status (缺字段视为 active, 不报错不迁移)
-            rows.append((cat, rel, _cell(title), _cell(str(meta.get("keywords", ""))),
-                         _cell(self._inclusion(f)), _cell(str(meta.get("anchors", ""))),
-                         _cell(str(meta.get("status", "active"))) + (f" / →{_cell(links)}" if links else ""),
-                         _summary(body)))
+            for (title, body), tgts in zip(doc.sections, doc.targets):
+                rel = f"{f.relative_to(d).as_posix()}#{title}"  # 规则 id, 可直接定位到章节
+                by_cat[cat] = by_cat.get(cat, 0) + 1
+                links = ",".join(sorted(set(tgts)))
+                # .get 容错旧 spec 缺 status (缺字段视为 active, 不报错不迁移)
+                rows.append((cat, rel, _cell(title), _cell(str(meta.get("keywords", ""))),
+                             _cell(inc), _cell(str(meta.get("anchors", ""))),
+                             _cell(str(meta.get("status", "active"))) + (f" / →{_cell(links)}" if links else ""),
+                             _summary(body)))
         rows.sort()
         table = "\n".join(f"| {rel} | {cat} | {title} | {kw} | {inc} | {anc} | {status} | {summ} |"
                           for cat, rel, title, kw, inc, anc, status, summ in rows)
@@ -332,25 +621,23 @@ class IndexMixin:
         """
         # 先尝试 FTS5 BM25
         db = self.root / ".recall.db"
-        if db.exists():
-            tokens = [t for t in re.split(r"\s+", query.strip()) if t]
-            if tokens and not any('"' in t for t in tokens):
-                ftsq = " OR ".join(f'"{t}"' for t in tokens)
-                import sqlite3
+        ftsq = _fts_query(query)
+        if db.exists() and ftsq is not None:
+            import sqlite3
+            try:
+                con = sqlite3.connect(db)
                 try:
-                    con = sqlite3.connect(db)
-                    try:
-                        rows = con.execute(
-                            "SELECT rel, category, title, keywords, body FROM rules "
-                            "WHERE namespace = 'map' AND rules MATCH ? ORDER BY bm25(rules) LIMIT 10",
-                            (ftsq,)).fetchall()
-                    finally:
-                        con.close()
-                    if rows:
-                        return [f"| [{rel}] | {cat} | {title} | {kw} | - | {_summary(body)} |"
-                                for rel, cat, title, kw, body in rows]
-                except sqlite3.OperationalError:
-                    pass  # 降级 grep
+                    rows = con.execute(
+                        "SELECT rel, category, title, keywords, body FROM rules "
+                        "WHERE namespace = 'map' AND rules MATCH ? ORDER BY bm25(rules) LIMIT 10",
+                        (ftsq,)).fetchall()
+                finally:
+                    con.close()
+                if rows:
+                    return [f"| [{rel}] | {cat} | {title} | {kw} | - | {_summary(body)} |"
+                            for rel, cat, title, kw, body in rows]
+            except sqlite3.OperationalError:
+                pass  # 降级 grep
 
         # fallback: grep map/index.md
         return self._recall_grep(query, "map")
@@ -370,11 +657,10 @@ class IndexMixin:
             con = sqlite3.connect(db)
             try:
                 # 查询 map namespace 中所有命中的页的 anchors
-                tokens = [t for t in re.split(r"\s+", query.strip()) if t]
-                if not tokens or any('"' in t for t in tokens):
+                ftsq = _fts_query(query)
+                if ftsq is None:
                     return ""
 
-                ftsq = " OR ".join(f'"{t}"' for t in tokens)
                 rows = con.execute(
                     "SELECT anchors FROM rules WHERE namespace = 'map' AND rules MATCH ?",
                     (ftsq,)).fetchall()
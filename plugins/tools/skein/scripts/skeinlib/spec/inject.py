@@ -3,46 +3,139 @@
 **这是每次会话/每次派 agent 都要付的 token**, 所以两处都过 `budget_guard` 硬预算:
 SessionStart 只注索引 (400 token), SubagentStart 按 agent 类目注全文 (2000 token)。
 超预算不是软警告 —— 直接截断, 免 model 忽视警告后上下文无限膨胀。
+
+**预渲染包** (`.skein/.cache/core-inject.json`): 两个 hook 是独立进程, 进程内的 `_doc` 缓存帮不上。
+以前每次都要读遍全部规则文件判 inclusion, 再读 always 页拼索引和全文; 派 8 个 agent 就付 8 遍。
+现在 `reindex` 把每个文件的 inclusion, 以及 always 页的索引行、正文块 (带类目) 和 token 估算
+落盘。hook 只读这一个文件, 再按 `AGENT_CATEGORIES` 挑块。
+
+**新鲜度**: hook 每次 stat 一遍规则文件 (不读), 与包里登记的 (mtime_ns, size) 比。新增、删掉、
+手改过 (含把 auto 页改成 always), 或 mtime 距建包不足 `RACY_NS` (utils/fs.py) 的, 当场只重读这几个文件并回写包,
+所以注入内容与现读全库逐字一致。
 """
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Optional
 
 from skeinlib.hooks.runner import budget_guard
 from skeinlib.spec.model import (AGENT_CATEGORIES, INJECTION_BUDGETS, STALE_DAYS,
                                  _read_hook_stdin, always_budget_tokens, now)
-from skeinlib.spec.text import _sections, _strip_frontmatter
+from skeinlib.spec.text import Doc
+from skeinlib.utils.token_conversion import estimate_tokens_from_chars
+from skeinlib.utils.fs import racy
+
+CORE_PACK = "core-inject.json"
+_PACK_VERSION = 1
 
 
 class InjectMixin:
-    # 仅供 mypy 用的属性声明: root/_always_files/_mtimes/_age_days 由兄弟类 SpecBase
+    # 仅供 mypy 用的属性声明: root/_always_files/_doc/_inclusion/... 由兄弟类 SpecBase
     # 提供 (组装成 Spec 时混入)。TYPE_CHECKING 块运行时永不执行, 零行为改动, 只消除单看
     # 本 mixin 时的 attr-defined 噪声。
     if TYPE_CHECKING:
         root: Path
+        def _scan_namespaces(self) -> list[str]: ...
+        def _rule_files(self, layer: str) -> list[Path]: ...
+        def _inclusion(self, f: Path) -> str: ...
         def _always_files(self) -> list[Path]: ...
-        def _mtimes(self, use_git: bool = True) -> dict[Path, int]: ...
-        def _age_days(self, f: Path, mtimes: dict[Path, int], now_ts: int) -> int: ...
+        def _doc(self, f: Path) -> Doc: ...
 
-    # ---- core 正文 (供 inject-core / session-start 复用) ----
+    # ---- 预渲染包 (见模块 docstring) ----
+    def _core_pack_path(self) -> Path:
+        return self.root.parent / ".cache" / CORE_PACK
+    def _load_core_pack(self) -> Optional[dict[str, Any]]:
+        try:
+            data = json.loads(self._core_pack_path().read_text())
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) and data.get("v") == _PACK_VERSION else None
+    def _rule_rels(self) -> list[str]:
+        """`_rule_files` 的热路径版: 全 namespace 的规则文件相对路径 (同样排除 index.md/backlinks.md,
+        同样按路径分段排序)。走 os.walk + 字符串, 不为几百个文件各造一遍 Path。"""
+        base = len(str(self.root)) + 1
+        rels = [os.path.join(d, n)[base:].replace(os.sep, "/")
+                for ns in self._scan_namespaces() for d, _, names in os.walk(self.root / ns)
+                for n in names if n.endswith(".md") and n not in ("index.md", "backlinks.md")]
+        return sorted(rels, key=lambda r: r.split("/"))
+    def _build_core_pack(self, prev: Optional[dict[str, Any]]) -> tuple[dict[str, Any], bool]:
+        """stat 全部规则文件建包 → (包, 是否与 prev 有出入)。prev 里 stat 没变 (且出了 racy 窗口)
+        的文件沿用旧 inclusion / 块, 不读。"""
+        old_files: dict[str, list[Any]] = prev["files"] if prev else {}
+        old_blocks = {b["path"]: b for b in prev["always"]} if prev else {}
+        built = prev["built_ns"] if prev else 0
+        began = time.time_ns()
+        files: dict[str, list[Any]] = {}
+        always: list[dict[str, Any]] = []
+        changed = False
+        for rel in self._rule_rels():
+            try:
+                st = os.stat(f"{self.root}/{rel}")
+                sig = [st.st_mtime_ns, st.st_size]
+                hit = old_files.get(rel)
+                if hit is not None and hit[:2] == sig and not racy(sig[0], built) and \
+                        (hit[2] != "always" or rel in old_blocks):
+                    inclusion, block = hit[2], old_blocks.get(rel)
+                else:
+                    changed = True
+                    f = self.root / rel
+                    inclusion, block = self._inclusion(f), None
+                    if inclusion == "always":
+                        doc = self._doc(f)
+                        body = doc.body.strip()
+                        block = {"path": rel, "cat": f.parent.name, "body": body,
+                                 "tokens": estimate_tokens_from_chars(len(body)),
+                                 "index": [f"- [{f.parent.name}/{f.stem}] {t}" for t, _ in doc.sections if t]}
+            except OSError:
+                continue
+            files[rel] = [*sig, inclusion]
+            if block is not None:
+                always.append(block | {"sig": sig})
+        text = "\n\n".join(b["body"] for b in always if b["body"])
+        data = {"v": _PACK_VERSION, "built_ns": began, "files": files, "always": always,
+                "index": "\n".join(line for b in always for line in b["index"]),
+                "text": text, "tokens": estimate_tokens_from_chars(len(text))}
+        return data, changed or files.keys() != old_files.keys()
+    def _save_core_pack(self, data: dict[str, Any]) -> None:
+        """落盘 (临时文件 + `os.replace`); 非 SKEIN 项目 / 只读工作区 → 不写, 这一轮照用内存里的包。"""
+        if not self.root.is_dir():
+            return  # 不替它建 .skein/.cache
+        out = self._core_pack_path()
+        tmp = out.with_name(f"{out.name}.{os.getpid()}.tmp")
+        try:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, ensure_ascii=False))
+            os.replace(tmp, out)
+        except OSError:
+            pass
+    def _rebuild_core_pack(self, full: bool = False) -> dict[str, Any]:
+        """reindex 收尾: 以盘上的旧包为基准按 stat 增量重建 (full → 全读) 并落盘。"""
+        data, _ = self._build_core_pack(None if full else self._load_core_pack())
+        self._save_core_pack(data)
+        return data
+    def _core_pack(self) -> dict[str, Any]:
+        """hook 热路径: 读包, stat 一遍规则文件; 全对得上就直接用, 否则只重读变了的文件并回写。"""
+        data, changed = self._build_core_pack(self._load_core_pack())
+        if changed:
+            self._save_core_pack(data)
+        return data
+    # ---- core 正文 (maintain / Stop hook 的超预算判据用; 现读, 不走包) ----
     def _core_text_raw(self) -> str:
-        parts = [_strip_frontmatter(f.read_text()).strip() for f in self._always_files()]
+        parts = [self._doc(f).body.strip() for f in self._always_files()]
         return "\n\n".join(p for p in parts if p)
     def _core_text(self) -> str:
-        text = self._core_text_raw()
+        pack = self._core_pack()
+        text: str = pack["text"]
         budget = always_budget_tokens()
-        if len(text) > 0:  # 这里比较字符数与 token 预算，需要换算
-            # 估算当前文本的 token 数
-            from skeinlib.utils.token_conversion import estimate_tokens_from_chars
-            estimated_tokens = estimate_tokens_from_chars(len(text))
-            if estimated_tokens > budget:
-                sys.stderr.write(
-                    f"core 规则约 {estimated_tokens} token > 预算 {budget} — "
-                    "常驻注入过重, 考虑降级部分到 recall\n")
+        if pack["tokens"] > budget:
+            sys.stderr.write(
+                f"core 规则约 {pack['tokens']} token > 预算 {budget} — "
+                "常驻注入过重, 考虑降级部分到 recall\n")
         return text
     # ---- inject-core (按需拉全文正文) ----
     def inject_core(self, _: argparse.Namespace) -> None:
@@ -51,46 +144,43 @@ class InjectMixin:
         sys.stdout.write(budget_guard(text, budget, "spec:inject-core"))
     # ---- core 极简索引 (章节粒度, 每条规则 1 行: [类目] 主题 · title) ----
     def _core_index(self) -> str:
-        rules = [(f, t, b) for f in self._always_files() for t, b in _sections(f.read_text())]
-        return "\n".join(f"- [{f.parent.name}/{f.stem}] {title}"
-                         for f, title, _ in rules if title)
+        index: str = self._core_pack()["index"]
+        return index
     # ---- session-start (SessionStart hook: 只注入极简索引, 全文按需 inject-core) ----
     def session_start(self, _: argparse.Namespace) -> None:
-        idx = self._core_index().strip()
+        pack = self._core_pack()
+        idx = str(pack["index"]).strip()
         if not idx:
             return
         ctx = budget_guard(
             "# SKEIN core 规则索引 (仅标题; 需全文跑 `skein-spec inject-core`)\n\n" + idx,
             INJECTION_BUDGETS["session_index"], "spec:session-start")
         # maintain 提示: core 超预算 或 最老规则 > 180 天 → 1 行提醒 (不挤 session_index 预算)
-        core_text = self._core_text_raw()
+        # hook 热路径: 不跑 git log, 包里登记的文件系统 mtime 够判"该体检了"
         now_ts = now()
-        # hook 热路径: 不跑 git log (use_git=False), 文件系统 mtime 够判"该体检了"
-        mt = self._mtimes(use_git=False)
-        oldest = max((self._age_days(f, mt, now_ts) for f in self._always_files()), default=0)
-        from skeinlib.utils.token_conversion import estimate_tokens_from_chars
-        if estimate_tokens_from_chars(len(core_text)) > always_budget_tokens() or oldest > STALE_DAYS:
+        oldest = max((max(0, (now_ts - b["sig"][0] // 1_000_000_000) // 86400) for b in pack["always"]), default=0)
+        if pack["tokens"] > always_budget_tokens() or oldest > STALE_DAYS:
             ctx += f"\n⚠️ core 超 budget / 有 > {STALE_DAYS}天老规则, 跑 `skein-spec maintain` 体检"
         print(json.dumps({"hookSpecificOutput": {
             "hookEventName": "SessionStart", "additionalContext": ctx}}))
     # ---- core 按类目过滤全文 (命中类目注全文, 其余仅进索引) ----
-    def _core_text_by_cat(self, cats: list[str]) -> str:
-        parts = [_strip_frontmatter(f.read_text()).strip()
-                 for f in self._always_files() if f.parent.name in cats]
-        return "\n\n".join(p for p in parts if p)
+    def _core_text_by_cat(self, cats: list[str], pack: Optional[dict[str, Any]] = None) -> str:
+        blocks = (pack or self._core_pack())["always"]
+        return "\n\n".join(b["body"] for b in blocks if b["cat"] in cats and b["body"])
     # ---- subagent-start (SubagentStart hook: 读 stdin.agent_type 决定注入范围) ----
     def subagent_start(self, _: argparse.Namespace) -> None:
         # matcher 已放开到全 subagent — 非 SKEIN 项目 (无 .skein/spec) 静默不注入, 免污染其他插件的 agent
         if not self.root.exists():
             return
-        idx = self._core_index().strip()
+        pack = self._core_pack()
+        idx = str(pack["index"]).strip()
         if not idx:
             return
         head = ("# SKEIN spec 纪律\n- 动手前跑 `skein-spec recall <关键词>`\n- core 规则即硬约束\n- 可复用约定标 `SPEC:` 供 sediment 落盘\n")
         recall_tail = "\n## 需要全文? 跑 `skein-spec recall <关键词>`\n"
         cats = AGENT_CATEGORIES.get(_read_hook_stdin() or "", [])
         if cats:
-            body = self._core_text_by_cat(cats).strip()
+            body = self._core_text_by_cat(cats, pack).strip()
             ctx = head + f"\n## core 规则 (命中类目 {cats})\n\n{body}\n\n## 全量 core 索引\n\n{idx}{recall_tail}"
         else:  # 空映射/非 skein agent/stdin 失败 → 只注摘要+索引 (对齐 budget，原全文注入超预算)
             ctx = head + f"\n## 全量 core 索引\n\n{idx}{recall_tail}"
@@ -13,25 +13,20 @@ import argparse
 from datetime import datetime
 import json
 import re
+import time
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Optional, cast
 
+from skeinlib.hooks.runner import DBG
 from skeinlib.utils.errors import SkeinError
+from skeinlib.spec import symbols as _symbols
 from skeinlib.spec.model import (AUDIT_RETENTION_DAYS, DEFAULT_MAINTAIN_POLICY,
                                  KEYWORDS_DUP_THRESHOLD, MAINTAIN_POLICY, STALE_DAYS,
                                  always_budget_tokens, now)
-from skeinlib.spec.text import (_clean_body, _frontmatter, _link_target, _months, _sections,
-                                _strip_frontmatter)
+from skeinlib.spec.text import Doc, _clean_body, _frontmatter, _link_target, _months, _strip_frontmatter
+from skeinlib.utils.fs import racy
 
-# 复用 map.py 的符号检测正则（k1 骨架现算实现）— 禁重复实现
-# 从 map.py 导入，确保单一真值源
-try:
-    from skeinlib.spec.map import _GO_TOP_RE, _JS_TOP_RE, _PY_TOP_RE
-except ImportError:
-    # ponytail: fallback 防御性复制（如果 map.py 结构变化）
-    _PY_TOP_RE = re.compile(r"^(def|class|async\s+def)\s+(\w+)")
-    _JS_TOP_RE = re.compile(r"^(function|class|export\s+(?:function|class|const|let|var))\s+(\w+)")
-    _GO_TOP_RE = re.compile(r"^(func|type)\s+(\w+)")
+_HEALTH_VERSION = 1          # spec_health 缓存记录的格式版本; 字段变了就加一, 旧记录当未命中
 
 
 class MaintainMixin:
@@ -47,6 +42,7 @@ class MaintainMixin:
         def _mtimes(self, use_git: bool = True) -> dict[Path, int]: ...
         def _age_days(self, f: Path, mtimes: dict[Path, int], now_ts: int) -> int: ...
         def _inclusion(self, f: Path) -> str: ...
+        def _doc(self, f: Path) -> Doc: ...
         def _always_files(self) -> list[Path]: ...
         def _reindex_all(self) -> dict[str, dict[str, int]]: ...
         def _rebuild_backlinks(self) -> dict[str, list[str]]: ...
@@ -56,61 +52,18 @@ class MaintainMixin:
                          inclusion: str = "auto", globs: Optional[str] = None,
                          anchors: Optional[str] = None) -> None: ...
 
-    # 符号检测辅助方法（复用 map.py 的骨架正则，k1 实现）
     def _check_file_symbol(self, file_path: Path, symbol: str) -> bool:
-        """检查文件中是否存在指定符号（按语言选择正则）。
+        """单个文件里有没有这个顶层符号 (与 map 骨架同口径, 见 symbols.py)。
 
-        返回 True 如果符号存在，False 如果不存在。
-        文件不存在或读不出时返回 False。
-        """
+        文件不存在或读不出 → False; 非代码文件 → True (路径存在即通过, 兼容纯路径 anchors)。
+        批量判 anchors 走 `_refresh_anchor_states` + 符号缓存, 不逐个调它。"""
         if not file_path.is_file():
             return False
-
-        try:
-            content = file_path.read_text()
-        except (OSError, UnicodeDecodeError):
+        got = _symbols.extract(str(file_path))
+        if got is None:
             return False
+        return file_path.suffix.lower() not in _symbols.CODE_EXT or symbol in got[1]
 
-        ext = file_path.suffix.lower()
-
-        if ext in {".py", ".pyx", ".pyi"}:
-            return self._check_py_symbol(content, symbol)
-        elif ext in {".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"}:
-            return self._check_js_symbol(content, symbol)
-        elif ext in {".go", ".golang"}:
-            return self._check_go_symbol(content, symbol)
-        else:
-            # 非代码文件：当作路径存在即通过（兼容纯路径 anchors）
-            return True
-
-    def _check_py_symbol(self, content: str, symbol: str) -> bool:
-        """Python 符号检测：def/class/async def。"""
-        for line in content.splitlines():
-            m = _PY_TOP_RE.search(line.strip())
-            if m and m.group(2) == symbol:
-                return True
-        return False
-
-    def _check_js_symbol(self, content: str, symbol: str) -> bool:
-        """JS/TS 符号检测：function/class/export。"""
-        for line in content.splitlines():
-            m = _JS_TOP_RE.search(line.strip())
-            if m:
-                # export const foo = ... → foo
-                # export function bar → bar
-                # class Baz → Baz
-                name = m.group(2).split("(")[0].split("=")[0].strip()
-                if name == symbol and name.isidentifier():
-                    return True
-        return False
-
-    def _check_go_symbol(self, content: str, symbol: str) -> bool:
-        """Go 符号检测：func/type。"""
-        for line in content.splitlines():
-            m = _GO_TOP_RE.search(line.strip())
-            if m and m.group(2) == symbol:
-                return True
-        return False
     # ---- archive (完全重构前可逆清库: 移旧规则到 .archive/<ts>/, reindex 空) ----
     def archive(self, a: argparse.Namespace) -> None:
         namespace_opt = cast(Optional[str], getattr(a, "namespace", None))
@@ -149,41 +102,57 @@ class MaintainMixin:
         print(f"已恢复 {moved} 条 ← {src}")
     # ---- maintain (全量体检, 判据按 namespace 分表 — design.md §4, MAINTAIN_POLICY 单一实现) ----
     def _scan_findings(self, namespaces: list[str]) -> list[dict[str, Any]]:
-        """全量扫描 → 结构化 findings (kind/text + 修复所需上下文); maintain 报告 & --apply 共用。
+        """全量扫描 → 结构化 findings (kind/text + 修复所需上下文); maintain 报告 & --apply 共用。"""
+        return self._health_scan(namespaces)[0]
+    def _health_scan(self, namespaces: list[str],
+                     budget_s: Optional[float] = None) -> tuple[list[dict[str, Any]], int]:
+        """体检引擎; 返回 (findings, 本轮没来得及分析的文件数)。
 
         每 namespace 按 MAINTAIN_POLICY.get(ns, DEFAULT_MAINTAIN_POLICY) 决定哪些判据生效
         (rules/未列名 namespace 走全量默认判据; product/map/external 见分表)。
-        超预算/断链(含 anchors)/fileMatch 缺 globs 三项与 namespace 无关, 全 namespace 统一跑。"""
+        超预算/断链(含 anchors)/fileMatch 缺 globs 三项与 namespace 无关, 全 namespace 统一跑。
+
+        逐文件的事实 (章节/出链/status/anchors 判定...) 经 `_health_records` 缓存, 没变的文件不读。
+        budget_s: 分析耗时上限 (Stop hook 用); 超时没分析到的文件本轮跳过 —— 依赖它们的全局判据
+        (指向它们的断链、孤立) 也跳过, 宁漏报不误报, 下一轮接着分析。"""
         # 合法 wikilink 目标 = 主题 stem (整篇) ∪ stem#规则标题 (单条); 用全库扫描, 不受 --namespace 过滤影响
         all_ns = self._scan_namespaces()
-        all_slugs = {f.stem for ns in all_ns for f in self._rule_files(ns)} | \
-                    {f"{f.stem}#{t}" for ns in all_ns for f, t, _ in self._rules(ns)}
-        backlinks = self._rebuild_backlinks()  # 一次扫, 孤立判据复用
+        listing = {ns: self._rule_files(ns) for ns in all_ns}  # 一轮只 rglob 一次, 下面各判据共用
+        recs, pending = self._health_records(all_ns, budget_s, listing)
+        all_slugs = {f.stem for files in listing.values() for f in files} | \
+                    {f"{f.stem}#{t}" for f, r in recs.items() for t in r["titles"]}
+        unknown = {f.stem for f in pending}  # 未分析文件的章节未知: 指向它们的链接不判断链
+        backlinks: dict[str, list[str]] = {}  # 与 _rebuild_backlinks 同口径, 从缓存事实拼
+        for f, fact in recs.items():
+            for t in fact["targets"]:
+                backlinks.setdefault(t, []).append(f.stem)
         now_ts = now()
         mtimes = self._mtimes()
-        repo_root = self.root.parent.parent  # .skein/spec → 仓库根 (anchors 是仓库相对路径)
         findings: list[dict[str, Any]] = []
 
         # 判据 (全部): 超预算 — always 页总 token, 与 --namespace 过滤无关 (跨 namespace 全局关切), 恒跑
-        core_text = self._core_text_raw()
+        always = sorted([f for f, r in recs.items() if r["inclusion"] == "always"]
+                        + [f for f in pending if self._inclusion(f) == "always"])
+        core_text = "\n\n".join(p for p in (self._doc(f).body.strip() for f in always) if p)
         from skeinlib.utils.token_conversion import estimate_tokens_from_chars
         budget = always_budget_tokens()
         estimated_tokens = estimate_tokens_from_chars(len(core_text))
         if estimated_tokens > budget:
             sized = sorted(
-                ((len(_strip_frontmatter(f.read_text()).strip()), f.parent.name, f.stem)
-                 for f in self._always_files()), reverse=True)
+                ((len(self._doc(f).body.strip()), f.parent.name, f.stem)
+                 for f in always), reverse=True)
             cands = ", ".join(f"{cat}/{stem}({sz})" for sz, cat, stem in sized[:3])
             findings.append({"kind": "overbudget", "size": estimated_tokens,
                              "text": f"[超预算] always 约 {estimated_tokens} token > {budget} token — 考虑降级: {cands}"})
 
         for ns in namespaces:
             policy = MAINTAIN_POLICY.get(ns, DEFAULT_MAINTAIN_POLICY)
-            for f in self._rule_files(ns):
-                txt = f.read_text()
-                meta = _frontmatter(txt)
+            for f in listing.get(ns, []):  # 不在扫描结果里的 namespace 没有目录
+                r = recs.get(f)
+                if r is None:
+                    continue  # 本轮超时未分析
                 rel = f"{ns}/{f.parent.name}/{f.stem}"
-                status = meta.get("status", "active")
+                status = r["status"]
                 age = self._age_days(f, mtimes, now_ts)
 
                 # 判据 rules: stale — 最近修改 (git 提交时间, 无则 fs mtime) 超 STALE_DAYS 且无引用
@@ -193,47 +162,27 @@ class MaintainMixin:
                                      "text": f"[stale] {rel} (最近改动 {_months(age)},{age}天前, status {status})"})
 
                 # 判据 (全部): broken wikilink — body 的 [[slug]] 目标不在库内 (只报告, 需人判断修哪头)
-                body = _strip_frontmatter(txt)
-                for m in re.finditer(r"\[\[([^\]]+)\]\]", body):
-                    slug = m.group(1).strip()
+                for slug in r["links"]:
                     tgt = _link_target(slug)
-                    if tgt and tgt not in all_slugs:
+                    if tgt and tgt not in all_slugs and tgt.partition("#")[0] not in unknown:
                         findings.append({"kind": "broken_link", "rel": rel, "slug": slug,
                                          "text": f"[断链] {rel}: [[{slug}]] ✗ 目标缺失"})
 
                 # 判据 (全部, 断链判据扩到 anchors): 强弱断链区分
                 # 强断链: anchors 路径不存在; 弱断链: 路径存在但 symbol 缺失
                 # 统一先报告, 按 policy.get("anchors") 决定是否可归档
-                anchors_raw = str(meta.get("anchors", "")).strip()
-                if anchors_raw:
-                    for anchor in anchors_raw.split(","):
-                        anchor = anchor.strip()
-                        if not anchor:
-                            continue
-
-                        # 解析 path:symbol 格式
-                        if ":" in anchor:
-                            path_part, symbol = anchor.split(":", 1)
-                            path_part = path_part.strip()
-                            symbol = symbol.strip()
-                        else:
-                            path_part, symbol = anchor.strip(), None
-
-                        # 强断链: 文件不存在
-                        target_file = repo_root / path_part
-                        if not target_file.exists():
-                            findings.append({"kind": "broken_link", "rel": rel,
-                                             "text": f"[断链-强] {rel}: anchors {anchor} 路径不存在"})
-                            if policy.get("anchors") == "archive":
-                                findings.append({"kind": "anchors_broken", "file": f, "rel": rel,
-                                                 "text": f"[anchors失效] {rel} (namespace={ns}) — 判据: 自动归档"})
-                            continue
-
-                        # 弱断链: 文件存在但 symbol 缺失
-                        if symbol and not self._check_file_symbol(target_file, symbol):
-                            findings.append({"kind": "broken_link", "rel": rel,
-                                             "text": f"[断链-弱] {rel}: anchors {anchor} 文件存在但符号 '{symbol}' 缺失"})
-                            # 弱断链只报告，不归档（符号可能被重构但文件仍在）
+                for anchor, state in r["anchor_states"]:
+                    if state == "missing":
+                        findings.append({"kind": "broken_link", "rel": rel,
+                                         "text": f"[断链-强] {rel}: anchors {anchor} 路径不存在"})
+                        if policy.get("anchors") == "archive":
+                            findings.append({"kind": "anchors_broken", "file": f, "rel": rel,
+                                             "text": f"[anchors失效] {rel} (namespace={ns}) — 判据: 自动归档"})
+                    elif state == "weak":
+                        symbol = anchor.split(":", 1)[1].strip()
+                        findings.append({"kind": "broken_link", "rel": rel,
+                                         "text": f"[断链-弱] {rel}: anchors {anchor} 文件存在但符号 '{symbol}' 缺失"})
+                        # 弱断链只报告，不归档（符号可能被重构但文件仍在）
 
                 # 判据 rules/external: 废弃/superseded → archive
                 # product namespace 不套废弃判据 (需求真值不自动归档)
@@ -242,15 +191,14 @@ class MaintainMixin:
                                      "text": f"[废弃] {rel} (status {status}) — 建议 archive"})
 
                 # 判据 (全部): inclusion=fileMatch 缺 globs → 只报告为配置问题
-                if self._inclusion(f) == "fileMatch" and not str(meta.get("globs", "")).strip():
+                if r["inclusion"] == "fileMatch" and not r["globs"]:
                     findings.append({"kind": "config_issue", "rel": rel,
                                      "text": f"[配置问题] {rel}: inclusion=fileMatch 缺 globs"})
 
                 # 判据 rules: 孤立 — 整篇无入度 (stem 及其任一章节都不在 backlinks) + active + 超 STALE_DAYS
-                # product namespace 不套孤立判据 (需求真值无入度要求)
-                if policy.get("orphan") and ns != "product" and status == "active":
-                    linked = f.stem in backlinks or any(f"{f.stem}#{t}" in backlinks
-                                                        for t, _ in _sections(txt))
+                # product namespace 不套孤立判据 (需求真值无入度要求); 有文件未分析时不判 (入链可能在它们里面)
+                if policy.get("orphan") and ns != "product" and status == "active" and not pending:
+                    linked = f.stem in backlinks or any(f"{f.stem}#{t}" in backlinks for t in r["titles"])
                     if not linked and age > STALE_DAYS:
                         findings.append({"kind": "orphan", "file": f, "rel": rel,
                                          "text": f"[孤立] {rel} 无入度+active+超{STALE_DAYS}天 — 候选归档/降级"})
@@ -259,8 +207,8 @@ class MaintainMixin:
             # product namespace 不套 keywords 重复判据 (需求真值不自动归档)
             if policy.get("keywords_dup") and ns != "product":
                 groups: dict[str, list[Path]] = {}
-                for f in self._rule_files(ns):
-                    kw = _frontmatter(f.read_text()).get("keywords", "").strip()
+                for f in listing.get(ns, []):
+                    kw = recs[f]["keywords"] if f in recs else ""
                     if not kw:
                         continue
                     key = ",".join(sorted(k for k in kw.split(",") if k.strip()))
@@ -270,7 +218,150 @@ class MaintainMixin:
                         rels = [f"{ns}/{f.parent.name}/{f.stem}" for f in hits]
                         findings.append({"kind": "keywords_dup", "kw": kw_key, "files": hits,
                                          "text": f'[重复 keywords] "{kw_key}" ×{len(hits)}: {", ".join(rels)}'})
-        return findings
+        return findings, len(pending)
+    def _health_records(self, namespaces: list[str], budget_s: Optional[float] = None,
+                        listing: Optional[dict[str, list[Path]]] = None
+                        ) -> tuple[dict[Path, dict[str, Any]], list[Path]]:
+        """各规则文件的体检事实 → ({文件: 事实}, 超时未分析的文件)。listing: 调用方已列好的
+        {namespace: 规则文件}, 省一轮 rglob。
+
+        缓存在 `.recall.db` 的 spec_health 表 (与 FTS 同库, 同属可删的衍生物): 文件 (mtime_ns, size)
+        没变就直接用, 不读文件; anchors 判定另按各目标文件 mtime 复用, 目标没动就不再打开它找符号,
+        要重判的一批经 `_refresh_anchor_states` 统一查符号缓存。
+        racy (mtime 距登记不足 2s) 的条目照 task/scan.py 的判据重读。"""
+        import sqlite3
+        began = time.time_ns()
+        deadline = None if budget_s is None else time.monotonic() + budget_s
+        repo_root = self.root.parent.parent  # .skein/spec → 仓库根 (anchors 是仓库相对路径)
+        db = self.root / ".recall.db"
+        cached: dict[str, tuple[int, int, int, str]] = {}
+        try:
+            con = sqlite3.connect(db) if self.root.is_dir() else None
+        except sqlite3.Error:
+            con = None
+        try:
+            if con is not None:
+                try:
+                    con.execute("CREATE TABLE IF NOT EXISTS spec_health (path TEXT PRIMARY KEY, "
+                                "mtime_ns INT, size INT, seen_ns INT, record TEXT)")
+                    cached = {r[0]: r[1:] for r in con.execute(
+                        "SELECT path, mtime_ns, size, seen_ns, record FROM spec_health")}
+                except sqlite3.Error as err:
+                    DBG.log(f"体检缓存不可用, 本轮直读: {err}", style="dim")
+                    con.close()
+                    con = None
+            recs: dict[Path, dict[str, Any]] = {}
+            pending: list[Path] = []
+            keyed: dict[str, dict[str, Any]] = {}
+            stats: dict[str, tuple[int, int]] = {}
+            fresh: set[str] = set()  # 本轮重读了规则文件的 key
+            for ns in namespaces:
+                for f in listing[ns] if listing is not None else self._rule_files(ns):
+                    key = str(f.relative_to(self.root))
+                    try:
+                        st = f.stat()
+                    except OSError:
+                        continue
+                    hit = cached.get(key)
+                    rec: Optional[dict[str, Any]] = None
+                    if hit and hit[:2] == (st.st_mtime_ns, st.st_size) and not racy(st.st_mtime_ns, hit[2]):
+                        try:
+                            rec = json.loads(hit[3])
+                        except ValueError:
+                            rec = None
+                    if rec is None or rec.get("v") != _HEALTH_VERSION:
+                        if deadline is not None and time.monotonic() >= deadline:
+                            pending.append(f)
+                            continue
+                        rec = self._health_fact(f)
+                        rec["ns"] = ns
+                        fresh.add(key)
+                    recs[f] = keyed[key] = rec
+                    stats[key] = (st.st_mtime_ns, st.st_size)
+            refreshed = self._refresh_anchor_states(keyed, repo_root, began)
+            dirty = [(key, *stats[key], began, json.dumps(rec, ensure_ascii=False))
+                     for key, rec in keyed.items() if key in fresh or key in refreshed]
+            if con is not None:
+                gone = set(cached) - set(keyed) - {str(f.relative_to(self.root)) for f in pending}
+                try:
+                    with con:
+                        con.executemany("DELETE FROM spec_health WHERE path = ?", [(g,) for g in gone])
+                        con.executemany("INSERT OR REPLACE INTO spec_health VALUES (?,?,?,?,?)", dirty)
+                except sqlite3.Error as err:
+                    DBG.log(f"体检缓存暂不可写: {err}", style="dim")
+        finally:
+            if con is not None:
+                con.close()
+        if pending:
+            DBG.warn(f"spec 体检超出 {budget_s}s 预算: {len(pending)} 个文件留到下一轮")
+        return recs, pending
+    def _health_fact(self, f: Path) -> dict[str, Any]:
+        """读一个规则文件, 抽出体检要用的全部事实 (JSON 可存)。anchors 判定由 `_refresh_anchor_states` 补。"""
+        doc = self._doc(f)
+        meta = doc.meta
+        return {"v": _HEALTH_VERSION,
+                "titles": [t for t, _ in doc.sections],
+                # 断链查整篇 body (含章节前引言), 反链只计章节正文 —— 与 _rebuild_backlinks 同口径
+                "links": list(doc.links),
+                "targets": [t for tgts in doc.targets for t in tgts],
+                "status": meta.get("status", "active"),
+                "inclusion": self._inclusion(f),
+                "globs": bool(str(meta.get("globs", "")).strip()),
+                "keywords": meta.get("keywords", "").strip(),
+                "anchors": list(doc.anchors),
+                "anchor_states": [], "anchor_sigs": []}
+    def _refresh_anchor_states(self, recs: dict[str, dict[str, Any]], repo_root: Path, began: int) -> set[str]:
+        """批量复用/重算各记录的 anchors 判定 (ok/weak/missing); 返回有重算的 key。
+
+        目标文件 mtime 全没动的记录直接沿用旧判定。其余记录的 `path:symbol` 目标去重后一次查
+        `symbols.table` (按 git blob sha / mtime 缓存在 `.skein/.cache/symbols.db`), 再逐条做集合
+        查找 —— 多个规则指向同一文件只读一次, 没变的文件一次都不读。"""
+        stat_of: dict[str, Optional[int]] = {}
+
+        def mtime(rel: str) -> Optional[int]:
+            if rel not in stat_of:
+                try:
+                    stat_of[rel] = (repo_root / rel).stat().st_mtime_ns
+                except OSError:
+                    stat_of[rel] = None
+            return stat_of[rel]
+
+        todo: dict[str, tuple[list[tuple[str, str, str]], list[Optional[int]]]] = {}
+        for key, rec in recs.items():
+            parsed = []
+            for anchor in rec["anchors"]:
+                path_part, _, symbol = anchor.partition(":")
+                parsed.append((anchor, str(Path(path_part.strip())), symbol.strip()))
+            sigs = [mtime(rel) for _, rel, _ in parsed]
+            old = rec.get("anchor_sigs") or []
+            trusted = len(old) == len(sigs) and all(
+                o == n and (n is None or not racy(n, o_seen)) for (o, o_seen), n in zip(old, sigs))
+            if not trusted:
+                todo[key] = (parsed, sigs)
+        wanted = sorted({rel for parsed, sigs in todo.values()
+                         for (_, rel, symbol), sig in zip(parsed, sigs) if symbol and sig is not None})
+        found: dict[str, set[str]] = {}
+        if wanted:
+            table = _symbols.table(repo_root, wanted, _symbols.tracked(repo_root, wanted),
+                                   self.root.parent / ".cache")
+            found = {rel: set(syms) for rel, (_, syms) in table.items()}
+        for key, (parsed, sigs) in todo.items():
+            states: list[list[str]] = []
+            for (anchor, rel, symbol), sig in zip(parsed, sigs):
+                if sig is None:                   # 强断链: 文件不存在
+                    state = "missing"
+                elif not symbol:
+                    state = "ok"
+                elif rel not in found:            # 目录 / 读不出: 谈不上有符号
+                    state = "weak"
+                elif Path(rel).suffix.lower() not in _symbols.CODE_EXT or symbol in found[rel]:
+                    state = "ok"                  # 非代码文件路径存在即通过
+                else:
+                    state = "weak"                # 弱断链: 文件存在但 symbol 缺失
+                states.append([anchor, state])
+            recs[key]["anchor_states"] = states
+            recs[key]["anchor_sigs"] = [[sig, began] for sig in sigs]
+        return set(todo)
     def maintain(self, a: argparse.Namespace) -> None:
         namespace_opt = cast(Optional[str], getattr(a, "namespace", None))
         namespaces = [namespace_opt] if namespace_opt else self._scan_namespaces()
@@ -416,7 +507,7 @@ class MaintainMixin:
             files = self._always_files()
             if not files:
                 break
-            top = max(files, key=lambda f: len(_strip_frontmatter(f.read_text()).strip()))
+            top = max(files, key=lambda f: len(self._doc(f).body.strip()))
             reason = f"always超预算(约{estimated_tokens}token>{budget}token)"
             degraded.append(self._degrade_one(top, reason))
         return degraded
@@ -1,31 +1,21 @@
-"""`skein-spec map --skeleton` — 现算目录树+符号+行数 (不写盘)。
+"""`skein-spec map --skeleton` — 目录树+符号+行数 (不写 spec 库)。
 
-ponytail: 正则非AST, 装饰器/嵌套/多行签名抓不准; 升级路径tree-sitter。
-三语言顶层符号抓取:
-  Python:  ^def |^class |^async def
-  JS/TS:   ^function |^class |^export (function|class|const|let|var)
-  Go:      ^func |^type
+三语言顶层符号的抓取与逐文件缓存在 `spec/symbols.py`: 每个文件只读一次, 结果按 git blob sha
+(改过没暂存的 / 非 git 仓按 mtime+size) 缓存在 `.skein/.cache/symbols.db`, 重复 map 只碰变了的
+文件; 待抽的文件多时走进程池。
 
 非 git 仓降级 rglob + 排除衍生目录 (__pycache__/.mypy_cache/.ruff_cache/node_modules等)。
-纯 stdlib, 现算不落盘。
-
-性能: ponytail 已达1000文件<3s要求 (实测1501文件0.136s)
 
 k2 扩展: 支持 map namespace 语义页，合并骨架与语义，支持 --src code 召回。
 """
 from __future__ import annotations
 
 import argparse
-import re
-import subprocess
 from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
-# ponytail: 正则匹配非AST, 已知ceiling=装饰器/嵌套/多行签名抓不准
-# 升级路径: 引入 tree-sitter 做精确解析
-_PY_TOP_RE = re.compile(r"^(def|class|async\s+def)\s+(\w+)")
-_JS_TOP_RE = re.compile(r"^(function|class|export\s+(?:function|class|const|let|var))\s+(\w+)")
-_GO_TOP_RE = re.compile(r"^(func|type)\s+(\w+)")
+from skeinlib.spec import symbols as _symbols
+from skeinlib.spec.text import Doc
 
 # 衍生目录排除范式 (非 git 仓降级时用)
 _EXCLUDE_DIRS = {
@@ -36,11 +26,12 @@ _EXCLUDE_DIRS = {
 
 
 class MapMixin:
-    """现算目录树+符号+行数 (不写盘)，合并 map namespace 语义页。"""
+    """目录树+符号+行数 (逐文件缓存见 spec/symbols.py)，合并 map namespace 语义页。"""
 
-    # 仅供 mypy 用的属性声明: root 由 SpecBase 提供
+    # 仅供 mypy 用的属性声明: root / _doc 由 SpecBase 提供
     if TYPE_CHECKING:
         root: Path
+        def _doc(self, f: Path) -> Doc: ...
 
     def map(self, a: argparse.Namespace) -> None:
         """map 命令: 合并骨架输出和 map namespace 语义页。
@@ -69,53 +60,29 @@ class MapMixin:
         """计算骨架数据：目录树+符号+行数。"""
         # 1. 取文件清单: 参数注入 > git ls-files > rglob(非git降级)
         repo_root = self.root.parent.parent  # .skein/spec → 仓库根
-        files: list[Path] = []
-
+        shas = _symbols.tracked(repo_root)
         if paths_inject:
             # 清单可参数注入 (逗号分隔)
-            files = [repo_root / p.strip() for p in paths_inject.split(",") if p.strip()]
+            rels = [str(Path(p.strip())) for p in paths_inject.split(",") if p.strip()]
+        elif shas is not None:
+            rels = list(shas)
         else:
-            # git ls-files 取清单 (非 git 降级 rglob+既有排除范式)
-            try:
-                r = subprocess.run(
-                    ["git", "ls-files"],
-                    cwd=repo_root,
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                if r.returncode == 0:
-                    files = [repo_root / p.strip() for p in r.stdout.splitlines() if p.strip()]
-                else:
-                    raise OSError("git ls-files failed")
-            except (OSError, subprocess.TimeoutExpired):
-                # 非 git 仓降级 rglob + 排除衍生目录
-                files = self._rglob_exclude(repo_root)
-
-        if not files:
+            # 非 git 仓降级 rglob + 排除衍生目录
+            rels = [str(f.relative_to(repo_root)) for f in self._rglob_exclude(repo_root)]
+
+        if not rels:
             return {"total_files": 0, "total_lines": 0, "files": []}
 
-        # 2. 现算目录树+符号+行数 (不写盘)
+        # 2. 目录树+符号+行数: 缓存命中的不读文件, 其余读一次抽取后写回
+        found = _symbols.table(repo_root, rels, shas, self.root.parent / ".cache", prune=not paths_inject)
         results: list[dict[str, object]] = []
-        for f in files:
-            if not f.is_file():
-                continue
-
-            # 行数
-            try:
-                lines = f.read_text().count("\n") + 1
-            except (OSError, UnicodeDecodeError):
-                continue  # 跳过二进制/读不出文件
-
-            # 符号抓取 (skeleton 模式仅顶层符号)
-            symbols: list[str] = []
-            symbols = self._extract_top_symbols(f)
-
-            # 目录树 (相对仓库根的路径)
-            rel_path = str(f.relative_to(repo_root))
-
+        for rel in dict.fromkeys(rels):
+            entry = found.get(rel)
+            if entry is None:
+                continue  # 不存在 / 二进制 / 读不出
+            lines, symbols = entry
             results.append({
-                "path": rel_path,
+                "path": rel,
                 "lines": lines,
                 "symbols": symbols,
             })
@@ -154,7 +121,7 @@ class MapMixin:
                     continue
 
                 try:
-                    content = md_file.read_text()
+                    content = self._doc(md_file).text
                     meta = self._parse_frontmatter(content)
                     rel_path = str(md_file.relative_to(map_dir))
 
@@ -254,49 +221,3 @@ class MapMixin:
                 files.append(p)
 
         return files
-
-    def _extract_top_symbols(self, f: Path) -> list[str]:
-        """提取顶层符号 (按语言选择正则)。"""
-        ext = f.suffix.lower()
-        content = f.read_text()
-
-        if ext in {".py", ".pyx", ".pyi"}:
-            return self._extract_py_symbols(content)
-        elif ext in {".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"}:
-            return self._extract_js_symbols(content)
-        elif ext in {".go", ".golang"}:
-            return self._extract_go_symbols(content)
-        else:
-            return []
-
-    def _extract_py_symbols(self, content: str) -> list[str]:
-        """Python 顶层符号: def/class/async def。"""
-        symbols: list[str] = []
-        for line in content.splitlines():
-            m = _PY_TOP_RE.search(line.strip())
-            if m:
-                symbols.append(m.group(2))
-        return symbols
-
-    def _extract_js_symbols(self, content: str) -> list[str]:
-        """JS/TS 顶层符号: function/class/export。"""
-        symbols: list[str] = []
-        for line in content.splitlines():
-            m = _JS_TOP_RE.search(line.strip())
-            if m:
-                # export const foo = ... → foo
-                # export function bar → bar
-                # class Baz → Baz
-                name = m.group(2).split("(")[0].split("=")[0].strip()
-                if name and name.isidentifier():
-                    symbols.append(name)
-        return symbols
-
-    def _extract_go_symbols(self, content: str) -> list[str]:
-        """Go 顶层符号: func/type。"""
-        symbols: list[str] = []
-        for line in content.splitlines():
-            m = _GO_TOP_RE.search(line.strip())
-            if m:
-                symbols.append(m.group(2))
-        return symbols
@@ -85,6 +85,34 @@ def _validate_budget(budget: int) -> None:
     if budget <= 0:
         raise ValueError(f"预算必须为正数: {budget}")
 
+def _raw_spec_config(root: Path) -> dict[str, Any]:
+    """库根 root (.skein/spec) 旁 config.yaml 的原始 `spec:` 块; 缺失/损坏 → {}。"""
+    import yaml as _yaml
+
+    cfg_path = root.parent / "config.yaml"
+    if not cfg_path.exists():
+        return {}
+    try:
+        raw = _yaml.safe_load(cfg_path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    spec = raw.get("spec") if isinstance(raw, dict) else None
+    return spec if isinstance(spec, dict) else {}
+
+def recall_mode(root: Path) -> str:
+    """recall 口径: config.yaml spec.recall — `hybrid` (BM25 + 章节向量, 见 spec/vectors.py) 或缺省 `bm25`。
+    走与 `Workspace.config` 同一份生效配置 (补默认值 + 校验, 非法值整段降级 → bm25);
+    未初始化 / YAML 语法坏 → bm25, 不让 recall 因配置出错。"""
+    import yaml as _yaml
+
+    from skeinlib.core.workspace import load_config
+    from skeinlib.utils.errors import SkeinError
+
+    try:
+        return cast(str, load_config(root.parent)["spec"]["recall"])
+    except (SkeinError, _yaml.YAMLError):
+        return "bm25"
+
 def always_budget_tokens() -> int:
     """会话常驻注入 token 软预算: 读 .skein/config.yaml spec.always_budget (字符),
     用换算系数转为 token。
@@ -92,16 +120,8 @@ def always_budget_tokens() -> int:
 
     读原始 YAML (非 pydantic Config) 以区分「用户显式设了」和「pydantic 补了默认值」。"""
     from skeinlib.utils.token_conversion import estimate_tokens_from_chars
-    import yaml as _yaml
 
-    cfg_path = spec_root().parent / "config.yaml"
-    raw_spec: dict[str, Any] = {}
-    if cfg_path.exists():
-        try:
-            raw = _yaml.safe_load(cfg_path.read_text(encoding="utf-8")) or {}
-            raw_spec = (raw.get("spec") or {}) if isinstance(raw, dict) else {}
-        except Exception:
-            pass
+    raw_spec = _raw_spec_config(spec_root())
 
     # 优先 always_budget (原始 YAML 值, 非 pydantic 补的默认)
     ab = raw_spec.get("always_budget")
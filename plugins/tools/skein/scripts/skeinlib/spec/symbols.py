@@ -0,0 +1,226 @@
+"""仓库符号表 — 逐文件 (行数, 顶层符号) 的抽取与磁盘缓存 (`.skein/.cache/symbols.db`)。
+
+`map --skeleton` 以前每次都把清单里的文件串行读两遍 (数行一遍、抓符号一遍), 什么都不留。
+几万个文件的仓库, 一次要跑很久。现在的做法:
+
+- 每个文件只读一次: 按字节数换行 (`\\r\\n` / `\\r` 与 `read_text` 的通用换行同口径), 只有三种
+  语言的文件才解码后跑正则。
+- 结果按键缓存。git 仓里干净的已跟踪文件用 `git ls-files -s` 的 blob sha 作键, 热路径连 stat
+  都不做。改过没暂存的文件 (`git ls-files -m`) 和非 git 仓的文件用 (mtime_ns, size) 作键。
+  mtime 距现在不足 `RACY_NS` 的照 racy-clean 判据 (utils/fs.py) 只算不存。
+- 待抽的文件够多 (`_POOL_MIN`) 且不止一个 CPU 时交给进程池。起不了子进程 (受限环境) 就退回本进程。
+
+三语言顶层符号的正则 (ponytail: 正则非 AST, 装饰器/嵌套/多行签名抓不准; 升级路径 tree-sitter):
+  Python:  ^def |^class |^async def
+  JS/TS:   ^function |^class |^export (function|class|const|let|var)
+  Go:      ^func |^type
+与旧实现一样先 `strip()` 再匹配, 所以缩进的方法也算在内。
+
+用户有两个: `map --skeleton` 查整份清单; 体检 (`maintain` / Stop hook) 的 anchors 判定把要重判的
+`path:symbol` 目标去重后一次查表, 再做集合查找 (`MaintainMixin._refresh_anchor_states`)。
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import stat
+import subprocess
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from skeinlib.hooks.runner import DBG
+from skeinlib.utils.fs import racy
+
+if TYPE_CHECKING:
+    import sqlite3
+
+CACHE = "symbols.db"
+_SCHEMA = 1  # symbols.db 的 PRAGMA user_version; 抽取口径变了就加一, 旧库整表重建
+_POOL_MIN = 256  # 待抽文件不到这么多就在本进程做: 进程池的启动开销不划算
+_PATHS_PER_CALL = 500  # tracked(paths=...) 每次 git ls-files 带的路径数上限, 免撞命令行长度
+
+_PY_TOP_RE = re.compile(r"^(def|class|async\s+def)\s+(\w+)")
+_JS_TOP_RE = re.compile(r"^(function|class|export\s+(?:function|class|const|let|var))\s+(\w+)")
+_GO_TOP_RE = re.compile(r"^(func|type)\s+(\w+)")
+PY_EXT = frozenset({".py", ".pyx", ".pyi"})
+JS_EXT = frozenset({".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"})
+GO_EXT = frozenset({".go", ".golang"})
+CODE_EXT = PY_EXT | JS_EXT | GO_EXT
+
+Entry = tuple[int, list[str]]  # (行数, 顶层符号)
+
+
+def top_symbols(ext: str, content: str) -> list[str]:
+    """按扩展名选正则抓顶层符号; 非三语言 → []。"""
+    ext = ext.lower()
+    if ext in PY_EXT or ext in GO_EXT:
+        rx = _PY_TOP_RE if ext in PY_EXT else _GO_TOP_RE
+        return [m.group(2) for line in content.splitlines() if (m := rx.search(line.strip()))]
+    if ext in JS_EXT:
+        symbols: list[str] = []
+        for line in content.splitlines():
+            m = _JS_TOP_RE.search(line.strip())
+            if m:
+                # export const foo = ... → foo; export function bar → bar; class Baz → Baz
+                name = m.group(2).split("(")[0].split("=")[0].strip()
+                if name and name.isidentifier():
+                    symbols.append(name)
+        return symbols
+    return []
+
+
+def extract(path: str) -> Optional[Entry]:
+    """读一个文件 (只读一次) → (行数, 顶层符号); 读不出 / 不是 UTF-8 文本 → None。
+    模块级函数: 进程池要能 pickle 它。"""
+    try:
+        data = Path(path).read_bytes()
+        text = data.decode()
+    except (OSError, UnicodeDecodeError):
+        return None
+    lines = data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n") + 1
+    ext = os.path.splitext(path)[1]
+    return lines, top_symbols(ext, text) if ext.lower() in CODE_EXT else []
+
+
+def _extract_many(paths: list[str]) -> list[Optional[Entry]]:
+    workers = min(os.cpu_count() or 1, 8)
+    if len(paths) < _POOL_MIN or workers < 2:
+        return [extract(p) for p in paths]
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(extract, paths, chunksize=max(1, len(paths) // (workers * 4))))
+    except (OSError, BrokenProcessPool) as err:
+        DBG.warn(f"符号抽取进程池起不来, 退回本进程: {err}")
+        return [extract(p) for p in paths]
+
+
+def _git_z(repo_root: Path, *args: str) -> Optional[list[str]]:
+    # -z 紧跟子命令: 参数里可能有 `-- <路径...>`, 放末尾会被当成路径; 路径一律按字面, 不做 glob
+    try:
+        r = subprocess.run(["git", "--literal-pathspecs", args[0], "-z", *args[1:]],
+                           cwd=repo_root, capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if r.returncode != 0:
+        return None
+    return [p for p in r.stdout.decode("utf-8", errors="surrogateescape").split("\0") if p]
+
+
+def _ls_files(repo_root: Path, flag: str, paths: Optional[list[str]]) -> Optional[list[str]]:
+    """`git ls-files <flag>`; 给了 paths 只列这些 (分批, 免命令行超长), 否则全仓。"""
+    if paths is None:
+        return _git_z(repo_root, "ls-files", flag)
+    # 仓外路径 (绝对路径 / ../) 会让整批 ls-files 报错; 它们本就不在跟踪清单里, 直接略过
+    paths = [p for p in paths if not Path(p).is_absolute() and not Path(p).parts[:1] == ("..",)]
+    out: list[str] = []
+    for i in range(0, len(paths), _PATHS_PER_CALL):
+        part = _git_z(repo_root, "ls-files", flag, "--", *paths[i:i + _PATHS_PER_CALL])
+        if part is None:
+            return None
+        out += part
+    return out
+
+
+def tracked(repo_root: Path, paths: Optional[list[str]] = None) -> Optional[dict[str, str]]:
+    """git 已跟踪文件 → blob sha (工作区改过没暂存的值为空串, 得按 stat 判); 非 git 仓 → None。
+
+    paths 给定时只查这些文件 (Stop hook 判 anchors 只关心被指的那几个, 不必每次列全仓)。"""
+    staged = _ls_files(repo_root, "-s", paths)
+    if staged is None:
+        return None
+    out: dict[str, str] = {}
+    for line in staged:
+        meta, _, rel = line.partition("\t")
+        parts = meta.split()
+        if rel and len(parts) == 3:
+            out[rel] = parts[1]
+    for rel in _ls_files(repo_root, "-m", paths) or []:
+        if rel in out:
+            out[rel] = ""
+    return out
+
+
+def _stat_key(path: Path, now_ns: int) -> Optional[tuple[str, bool]]:
+    """(mtime_ns:size 键, 可否入缓存); 不是普通文件 → None。"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return f"m{st.st_mtime_ns}:{st.st_size}", not racy(st.st_mtime_ns, now_ns)
+
+
+def _open(db: Path) -> Optional[sqlite3.Connection]:
+    import sqlite3
+    if not db.parent.parent.is_dir():
+        return None  # 非 SKEIN 项目: 不替它建 .skein/.cache
+    try:
+        db.parent.mkdir(exist_ok=True)
+        con = sqlite3.connect(db)
+        if con.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA:
+            con.execute("DROP TABLE IF EXISTS files")
+            con.execute(f"PRAGMA user_version = {_SCHEMA}")
+        con.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, key TEXT, lines INT, symbols TEXT)")
+        return con
+    except (OSError, sqlite3.Error) as err:
+        DBG.log(f"符号缓存不可用, 本轮现算: {err}", style="dim")
+        return None
+
+
+def table(repo_root: Path, rels: list[str], shas: Optional[dict[str, str]], cache_dir: Path,
+          prune: bool = False) -> dict[str, Entry]:
+    """rels (相对 repo_root) 的 (行数, 顶层符号); 读不出的、不是普通文件的不在结果里。
+
+    shas 是 `tracked()` 的结果 (None = 非 git 仓, 一律按 stat)。缓存命中的不读文件, 其余读一次抽取
+    后写回。prune = rels 是完整清单, 顺手删掉缓存里已不在清单的行。"""
+    import sqlite3
+    now_ns = time.time_ns()
+    keys: dict[str, tuple[str, bool]] = {}
+    for rel in rels:
+        sha = shas.get(rel) if shas is not None else None
+        if sha:
+            keys[rel] = (sha, True)
+        elif (k := _stat_key(repo_root / rel, now_ns)) is not None:
+            keys[rel] = k
+    con = _open(cache_dir / CACHE)
+    cached: dict[str, tuple[str, int, str]] = {}
+    if con is not None:
+        try:
+            cached = {r[0]: r[1:] for r in con.execute("SELECT path, key, lines, symbols FROM files")}
+        except sqlite3.Error:
+            cached = {}
+    out: dict[str, Entry] = {}
+    todo: list[str] = []
+    for rel, (key, _) in keys.items():
+        hit = cached.get(rel)
+        if hit is not None and hit[0] == key:
+            if hit[1] >= 0:
+                out[rel] = (hit[1], json.loads(hit[2]))
+        else:
+            todo.append(rel)
+    fresh = _extract_many([str(repo_root / rel) for rel in todo])
+    rows: list[tuple[str, str, int, str]] = []
+    for rel, got in zip(todo, fresh):
+        if got is not None:
+            out[rel] = got
+        key, cacheable = keys[rel]
+        if cacheable:  # 读不出的也记一行 (lines=-1): 二进制文件不必每次重试解码
+            rows.append((rel, key, got[0] if got else -1, json.dumps(got[1] if got else [])))
+    stale = [(p,) for p in cached if p not in keys] if prune else []
+    if con is not None:
+        try:
+            if rows or stale:
+                with con:
+                    con.executemany("INSERT OR REPLACE INTO files VALUES (?,?,?,?)", rows)
+                    con.executemany("DELETE FROM files WHERE path = ?", stale)
+        except sqlite3.Error as err:
+            DBG.log(f"符号缓存暂不可写: {err}", style="dim")
+        finally:
+            con.close()
+    return out
+
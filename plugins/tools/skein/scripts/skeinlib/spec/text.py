@@ -2,11 +2,15 @@
 
 无 IO 无状态, 只吃字符串返字符串, 所以能直接单测。规则文件的 frontmatter 是自定义极简格式
 (非完整 YAML), 解析器容错优先: 缺字段一律给默认值, 不为一篇写坏的规则炸掉整次注入。
+`_parse_doc` 把一篇规则文件一次解析成 `Doc`, 供 `SpecBase._doc` 进程内缓存 (各 mixin 共用)。
 """
 from __future__ import annotations
 
 import re
-from typing import Optional
+from typing import NamedTuple, Optional
+
+_LINK = re.compile(r"\[\[([^\]]+)\]\]")
+_HAN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")  # CJK 统一表意 (含扩展 A / 兼容区)
 
 def _dist(by_cat: dict[str, int]) -> str:
     """类目分布串 '类目(条数), ...', 空则 '-'。"""
@@ -28,6 +32,12 @@ def _sections(text: str) -> list[tuple[str, str]]:
         t, b = _frontmatter(text).get("title", ""), body.strip()
         return [(t, b)] if (t or b) else []
     return [(parts[i].strip(), parts[i + 1].strip()) for i in range(1, len(parts), 2)]
+def _cjk_grams(run: str) -> list[str]:
+    """一段连续汉字 → 相邻双字词 (单字成段就是它自己)。"""
+    return [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+def _cjk_terms(text: str) -> str:
+    """FTS 影子列的内容: 文本里每段汉字切成双字词, 空格分隔; 非汉字部分不要 (原列已索引)。"""
+    return " ".join(g for run in _HAN.findall(text) for g in _cjk_grams(run))
 def _slug(s: str) -> str:
     """标题 → 文件名 slug: 空白/路径/markdown 敏感字符 → '-'; 中文原样保留。空 → 'misc'。"""
     s = re.sub(r"[\s/\\:*?\"'<>|#\[\]]+", "-", s.strip())
@@ -102,6 +112,23 @@ def _clean_body(body: str) -> str:
     (免与主题文件的 `## 规则标题` 层级冲突把一条规则劈成多条)。"""
     body = re.sub(r"^---\n.*?\n---\n?", "", body.strip(), flags=re.S)
     return re.sub(r"^(#{1,2})\s+", "### ", body, flags=re.M).strip()
+class Doc(NamedTuple):
+    """一篇规则文件解析一次的结果。各字段都是只读用途, 调用方别就地改 (缓存共享同一对象)。"""
+    text: str                      # 原文
+    body: str                      # 去掉 frontmatter 的正文
+    meta: dict[str, str]           # `_frontmatter` 结果
+    sections: list[tuple[str, str]]  # `_sections` 结果
+    links: list[str]               # 整篇 body (含章节前引言) 的 `[[...]]` 原文, 断链判据用
+    targets: list[list[str]]       # 与 sections 对齐: 各章节正文出链的归一 slug (反链/索引口径)
+    anchors: list[str]             # frontmatter anchors 拆成的 `path[:symbol]` 列表
+def _parse_doc(text: str) -> Doc:
+    body = _strip_frontmatter(text)
+    meta = _frontmatter(text)
+    sections = _sections(text)
+    return Doc(text=text, body=body, meta=meta, sections=sections,
+               links=[m.group(1).strip() for m in _LINK.finditer(body)],
+               targets=[[t for m in _LINK.finditer(b) if (t := _link_target(m.group(1)))] for _, b in sections],
+               anchors=[x.strip() for x in str(meta.get("anchors", "")).split(",") if x.strip()])
 def _summary(body: str) -> str:
     s = _strip_frontmatter(body).strip().replace("\n", " ")
     s = re.sub(r"[|]", "/", s)  # 免破坏表格
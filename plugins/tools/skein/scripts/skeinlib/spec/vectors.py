@@ -0,0 +1,123 @@
+"""混合召回的语义侧 — 章节向量矩阵 (`.recall.vec.npy`) + 查询时一次批量点积。
+
+BM25 只认字面: 写成「merge 冲突处理」的规则, 查「合并冲突」就召不回来。中文更糟, unicode61 分词
+把一整串汉字当成一个词。`spec.recall: hybrid` 时, reindex 给每条规则 (章节) 算一个定长向量,
+存成 float16 矩阵放在 `.recall.db` 旁边。recall 把查询向量和整张矩阵 (内存映射) 做一次 mat-vec,
+再把余弦分与 BM25 分各自归一后加权相加 (`fuse`)。
+
+向量器不下模型, 用特征哈希: ASCII 词 + 词内字符三元组 + 汉字单字/双字, 经 crc32 落进 `DIM` 维。
+落点带符号, 抵消碰撞偏差; 再做次线性缩放, 最后 L2 归一。离线、确定、跨进程稳定 (不用 `hash()`,
+它每个进程加盐)。对中文、拼写变体、复合词都比纯 BM25 宽一圈。真要换成小模型, 只动 `embed`。
+
+矩阵的行与 `.recall.db` 的 `rule_vec` 表同序。矩阵的 (行数, mtime_ns, size) 登记在 `rule_vec_meta`,
+对不上 (被删, 或另一进程中途换过) 就不用, recall 退回纯 BM25。增量维护见 `IndexMixin._rebuild_vectors`。
+
+numpy 是可选依赖 (requirements.txt 不列): 缺了 `available()` 为 False, 一切照旧走 BM25。
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from skeinlib.spec.text import _HAN
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+
+VEC = ".recall.vec.npy"
+DIM = 512  # 2 的幂: 落点取 crc32 低位; 2000 条规则 × 512 × float16 ≈ 2MB
+POOL = 50  # BM25 侧取前这么多条参与融合
+WEIGHT = 0.5  # 融合分里 BM25 的权重, 余下归余弦
+MIN_SCORE = 0.075  # 融合分不到这个数的不算命中 (纯语义一路即余弦 < 0.15; 无关查询的余弦多在 0.1 以内)
+
+_WORD = re.compile(r"[0-9a-z_]+")
+
+
+def available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def features(text: str) -> list[int]:
+    """文本 → 哈希特征 (crc32 值; 重复出现即词频)。"""
+    t = text.lower()
+    grams: list[str] = []
+    for w in _WORD.findall(t):
+        grams.append(w)
+        if len(w) > 3:
+            p = f"<{w}>"
+            grams.extend(f"#{p[i:i + 3]}" for i in range(len(p) - 2))  # `#` 前缀: 不与 3 字母的整词撞
+    for run in _HAN.findall(t):
+        grams.extend(run)
+        grams.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return [zlib.crc32(g.encode()) for g in grams]
+
+
+def embed(texts: list[str]) -> NDArray[np.float32]:
+    """一批文本 → (len(texts), DIM) 的 L2 归一 float32 矩阵 (空文本为零行)。"""
+    import numpy as np
+    hashes = [features(t) for t in texts]
+    counts = np.fromiter(map(len, hashes), dtype=np.intp, count=len(texts))
+    h = np.fromiter(itertools.chain.from_iterable(hashes), dtype=np.uint32, count=int(counts.sum()))
+    flat = np.repeat(np.arange(len(texts), dtype=np.intp) * DIM, counts) + (h & (DIM - 1)).astype(np.intp)
+    signs = np.where(h >> 31, 1.0, -1.0)
+    m = np.bincount(flat, weights=signs, minlength=len(texts) * DIM).reshape(len(texts), DIM)
+    m = np.sign(m) * np.log1p(np.abs(m))
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    out: NDArray[np.float32] = (m / np.maximum(norms, 1e-9)).astype(np.float32)
+    return out
+
+
+def save(root: Path, m: NDArray[Any]) -> tuple[int, int, int]:
+    """写矩阵 (float16, 临时文件 + `os.replace`), 返回登记用的 (行数, mtime_ns, size)。"""
+    import numpy as np
+    out = root / VEC
+    tmp = out.with_name(f"{out.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        np.save(fh, np.ascontiguousarray(m, dtype=np.float16))
+    os.replace(tmp, out)
+    st = out.stat()
+    return len(m), st.st_mtime_ns, st.st_size
+
+
+def load(root: Path, sig: Optional[tuple[int, int, int]]) -> Optional[NDArray[np.float16]]:
+    """按登记内存映射矩阵; 缺失 / 与登记不符 / 维数不对 → None。"""
+    import numpy as np
+    out = root / VEC
+    try:
+        st = out.stat()
+        if sig is None or (st.st_mtime_ns, st.st_size) != tuple(sig[1:]):
+            return None
+        m: NDArray[np.float16] = np.load(out, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if m.dtype != np.float16 or m.shape != (sig[0], DIM):
+        return None
+    return m
+
+
+def fuse(m: NDArray[np.float16], query: str, bm25: dict[int, float],
+         mask: Optional[NDArray[np.bool_]], k: int = 10) -> list[tuple[int, float]]:
+    """融合打分, 返回前 k 行 [(行号, 分)] (分降序)。
+
+    余弦 = 整张矩阵乘查询向量 (一次 mat-vec), 负值截到 0。bm25 = {行号: SQLite bm25() 原值}
+    (越负越好), 取反后除以最大值归一到 [0, 1]。mask 为 False 的行 (别的 namespace) 不参与。"""
+    import numpy as np
+    scores = (np.asarray(m, dtype=np.float32) @ embed([query])[0]).clip(min=0.0) * (1 - WEIGHT)
+    if bm25:
+        rows = np.fromiter(bm25, dtype=np.intp, count=len(bm25))
+        raw = (-np.fromiter(bm25.values(), dtype=np.float32, count=len(bm25))).clip(min=0.0)
+        scores[rows] += WEIGHT * raw / max(float(raw.max()), 1e-9)
+    if mask is not None:
+        scores[~mask] = 0.0
+    top = np.argpartition(-scores, k)[:k] if len(scores) > k else np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(int(i), float(scores[i])) for i in top if scores[i] >= MIN_SCORE]
@@ -15,7 +15,7 @@ import re
 from pydantic import BaseModel, Field
 
 from skeinlib.utils.errors import SkeinError
-from skeinlib.spec.text import _frontmatter, _slug, _strip_frontmatter, _sections
+from skeinlib.spec.text import Doc, _frontmatter, _slug, _strip_frontmatter, _sections
 
 
 class AnchorHit(BaseModel):
@@ -45,7 +45,7 @@ class FinishCandidatesResult(BaseModel):
     suggestion: str | None = None
 
 class WriteMixin:
-    # 仅供 mypy 用的属性声明: root/layer_dir/_scan_namespaces/_rules/_rule_files 由兄弟类
+    # 仅供 mypy 用的属性声明: root/layer_dir/_scan_namespaces/_rules/_rule_files/_doc 由兄弟类
     # SpecBase 提供, _reindex_all 由兄弟 mixin IndexMixin 提供 (组装成 Spec 时混入)。
     # TYPE_CHECKING 块运行时永不执行, 零行为改动, 只消除单看本 mixin 时的 attr-defined 噪声。
     if TYPE_CHECKING:
@@ -54,6 +54,7 @@ class WriteMixin:
         def _scan_namespaces(self) -> list[str]: ...
         def _rules(self, layer: str) -> list[tuple[Path, str, str]]: ...
         def _rule_files(self, layer: str) -> list[Path]: ...
+        def _doc(self, f: Path) -> Doc: ...
         def _reindex_all(self) -> dict[str, dict[str, int]]: ...
 
     # ---- namespace/inclusion 取参 (sediment/archive 共用) ----
@@ -414,37 +415,41 @@ class WriteMixin:
         return sorted(keywords)
 
     def _reverse_lookup_anchors(self, changed_files: list[str]) -> list[AnchorHit]:
-        """反查 anchors: 从变更文件查找对应的 product wiki 页。"""
+        """反查 anchors: 从变更文件查找对应的 product wiki 页。
+
+        每个变更文件先展开成它能命中的全部 anchor 路径 (`_anchor_keys`), 之后每条 anchor 只做一次
+        集合查找; `path:symbol` 形式按路径部分匹配 (文件改了, 挂在其中符号上的页也算候选)。"""
         hits: list[AnchorHit] = []
+        keys = [(changed_file, self._anchor_keys(changed_file)) for changed_file in changed_files]
 
         # 扫描 product namespace 的所有规则
         for rule_file, title, body in self._rules("product"):
             try:
-                meta = _frontmatter(rule_file.read_text())
-                anchors_str = str(meta.get("anchors", ""))
-                if not anchors_str:
+                anchors = [a.partition(":")[0].strip().replace("\\", "/") for a in self._doc(rule_file).anchors]
+                if not anchors:
                     continue
-
-                anchors = [a.strip() for a in anchors_str.split(",") if a.strip()]
-
-                # 检查是否有变更文件命中这些 anchors
-                for changed_file in changed_files:
-                    for anchor in anchors:
-                        # 简单的路径匹配: 如果 anchor 是 changed_file 的前缀或包含关系
-                        if self._path_matches_anchor(changed_file, anchor):
-                            rule_id = f"product/{rule_file.parent.name}/{rule_file.stem}.md#{title}"
-                            hits.append(AnchorHit(
-                                file=changed_file,
-                                anchor=anchor,
-                                rule=rule_id,
-                            ))
-                            break  # 一个文件只匹配一次
+                rule_id = f"product/{rule_file.parent.name}/{rule_file.stem}.md#{title}"
+                for changed_file, cands in keys:
+                    anchor = next((a for a in anchors if a in cands), None)
+                    if anchor is not None:  # 一个文件只匹配一次
+                        hits.append(AnchorHit(file=changed_file, anchor=anchor, rule=rule_id))
             except Exception:
                 # 忽略解析错误
                 pass
 
         return hits
 
+    @staticmethod
+    def _anchor_keys(file_path: str) -> set[str]:
+        """文件路径能命中的全部 anchor 写法 — `_path_matches_anchor` 的集合形式: 路径分段的任一
+        连续子段 (含整路径 / 目录前缀 / 文件名后缀), 外加去掉 `.py` 的真后缀。"""
+        file_path = file_path.replace("\\", "/")
+        parts = file_path.split("/")
+        keys = {"/".join(parts[i:j]) for i in range(len(parts)) for j in range(i + 1, len(parts) + 1)}
+        if file_path.endswith(".py"):
+            keys |= {"/".join(parts[i:])[:-3] for i in range(1, len(parts))}
+        return keys
+
     def _path_matches_anchor(self, file_path: str, anchor: str) -> bool:
         """判断文件路径是否匹配 anchor。
 
@@ -479,7 +484,7 @@ class WriteMixin:
 
         for rule_file, title, body in self._rules("product"):
             try:
-                meta = _frontmatter(rule_file.read_text())
+                meta = self._doc(rule_file).meta
                 rule_keywords = str(meta.get("keywords", "")).lower()
                 title_lower = title.lower()
 
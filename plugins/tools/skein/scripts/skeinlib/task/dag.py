@@ -5,7 +5,8 @@ task 级就绪队列。这层不碰文件, 所以能直接单测, 不必起子
 """
 from __future__ import annotations
 
-from typing import Any, Optional
+import statistics
+from typing import Any, Optional, Sequence
 
 from skeinlib.task.model import (PHASE_OF, SubtaskStatus, STATUS_ACTIVE, TaskStatus)
 
@@ -51,25 +52,149 @@ def _task_stage(t: dict[str, Any]) -> str:
     if st == TaskStatus.DONE:
         return "done"
     return PHASE_OF.get(st, "plan")  # 待处理→plan / 调研中→research / 进行中→exec / 检查中→check / 收尾中→finishing
-def _crit_weight(subs: list[dict[str, Any]]) -> dict[str, int]:
-    """纯拓扑深度: 每 subtask 的最长下游链长 (每步计 1, 不依赖 estimate)。
-    权重大 = 越靠关键路径 (阻塞最多下游), 槽位紧张时优先派 → 最小化 makespan (总工期)。"""
+# `_crit_weight` 的形状备忘: 键 = (sid, depends_on) 序列 + 节点工期, 值 = 权重表。一次 claim 里
+# `_global_ready` / `_ready` / `_pending_queue` 对同一 task 各算一遍, 常驻 daemon 里跨命令也复用 ——
+# DAG 不变就只算一次。有界 (先进先出淘汰): 键里带全部边, 不设上限的话长跑进程会攒下每个历史形状。
+_Edges = tuple[tuple[str, tuple[str, ...]], ...]
+_CRIT_MEMO: dict[tuple[_Edges, Optional[tuple[float, ...]]], dict[str, float]] = {}
+_CRIT_MEMO_MAX = 512
+
+# `scheduling.weight` 三档 (config.yaml): 关键路径按什么算长度
+WEIGHT_MODES = ("depth", "estimate", "learned")
+
+
+def _crit_weight(subs: list[dict[str, Any]], cost: Optional[dict[str, float]] = None) -> dict[str, float]:
+    """每 subtask 的最长下游链长 (含自身)。权重大 = 越靠关键路径 (阻塞最多下游), 槽位紧张时
+    优先派 → 最小化 makespan (总工期)。
+
+    `cost` 缺省 = 纯拓扑深度 (每步计 1, 不依赖 estimate); 给了就是按节点工期 (小时) 加权的真实
+    最长路径, 由 `_node_costs` 按 `scheduling.weight` 算出。"""
+    key = tuple((s["sid"], tuple(s.get("depends_on", []))) for s in subs)
+    costs = None if cost is None else tuple(cost.get(sid, 1.0) for sid, _ in key)
+    hit = _CRIT_MEMO.get((key, costs))
+    if hit is None:
+        hit = _crit_depths(key, costs)
+        if len(_CRIT_MEMO) >= _CRIT_MEMO_MAX:
+            del _CRIT_MEMO[next(iter(_CRIT_MEMO))]
+        _CRIT_MEMO[(key, costs)] = hit
+    return dict(hit)  # 调用方拿到的是副本, 备忘里那份不会被改脏
+
+
+def _crit_depths(edges: _Edges, costs: Optional[tuple[float, ...]] = None) -> dict[str, float]:
+    """显式栈后序 DFS, 每条边只走一次: O(V+E)。
+    从前是递归 + 每条边复制一份 `seen` 元组, 深链上平方级, 链长过千还会撞递归上限。"""
     succ: dict[str, list[str]] = {}  # sid -> 直接下游 sid
+    for sid, deps in edges:
+        for d in deps:
+            succ.setdefault(d, []).append(sid)
+    own = {sid: (1.0 if costs is None else costs[i]) for i, (sid, _) in enumerate(edges)}
+    memo: dict[str, float] = {}
+    best: dict[str, float] = {}  # 在栈上的节点 -> 已走完的下游里最长的那条
+    for root, _ in edges:
+        if root in memo:
+            continue
+        best[root] = 0
+        stack = [(root, iter(succ.get(root, ())))]
+        while stack:
+            sid, it = stack[-1]
+            for c in it:
+                if c in memo:
+                    best[sid] = max(best[sid], memo[c])
+                elif c in best:  # ponytail: 环保护 (DAG 校验兜底不该到这), 回边只计对端自身, 断链
+                    best[sid] = max(best[sid], own.get(c, 1.0))
+                else:
+                    best[c] = 0
+                    stack.append((c, iter(succ.get(c, ()))))
+                    break
+            else:
+                stack.pop()
+                memo[sid] = own.get(sid, 1.0) + best.pop(sid)
+                if stack:
+                    parent = stack[-1][0]
+                    best[parent] = max(best[parent], memo[sid])
+    if costs is None:  # 纯深度保持整数, 与改动前的输出 (看板 pendingQueue 的 crit) 逐字一致
+        return {sid: int(memo[sid]) for sid, _ in edges}
+    return {sid: memo[sid] for sid, _ in edges}
+
+
+def _observed_hours(s: dict[str, Any]) -> Optional[float]:
+    """done subtask 的实测工期 (started→finished, 小时); 缺时间戳或非正返回 None。"""
+    st, fin = s.get("started"), s.get("finished")
+    if s.get("status") != SubtaskStatus.DONE or not isinstance(st, (int, float)) \
+            or not isinstance(fin, (int, float)) or fin <= st:
+        return None
+    return (fin - st) / 3600.0
+
+
+Sample = tuple[float, Optional[float], list[str]]  # done subtask 实测: (工期 h, estimate 或 None, skills)
+
+
+def _samples(tasks: list[dict[str, Any]]) -> list[Sample]:
+    """各 task 里 done subtask 的实测样本 (缺时间戳的不计)。"""
+    out: list[Sample] = []
+    for t in tasks:
+        for s in t.get("subtasks") or []:
+            h = _observed_hours(s)
+            if h is None:
+                continue
+            est = s.get("estimate")
+            out.append((h, float(est) if isinstance(est, (int, float)) and est > 0 else None,
+                        list(s.get("skills") or [])))
+    return out
+
+
+def _learned_hours(tasks: list[dict[str, Any]],
+                   archived: Sequence[Sample] = ()) -> dict[str, tuple[float, Optional[float]]]:
+    """按 skill 汇总已完成 subtask 的实测: {skill: (实测工期中位数 h, 实测/estimate 比值中位数)}。
+    空键 "" = 全体 (无 skill 兜底); 该 skill 的样本都没填 estimate 时比值为 None。
+
+    tasks 只有未归档的; 已完成 task 过了 retain_days (默认 7 天) 就搬进 archive, 只看它们样本一周内
+    就没了 —— 归档部分经 archived 传入 (`TaskStore.archived_samples`, 按归档目录签名缓存)。"""
+    hours: dict[str, list[float]] = {"": []}
+    ratios: dict[str, list[float]] = {"": []}
+    for h, est, skills in [*_samples(tasks), *archived]:
+        for k in ["", *skills]:
+            hours.setdefault(k, []).append(h)
+            if est is not None:
+                ratios.setdefault(k, []).append(h / est)
+    return {k: (statistics.median(v), statistics.median(ratios[k]) if ratios.get(k) else None)
+            for k, v in hours.items() if v}
+
+
+def _node_costs(subs: list[dict[str, Any]], mode: str,
+                learned: Optional[dict[str, tuple[float, Optional[float]]]] = None) -> Optional[dict[str, float]]:
+    """`scheduling.weight` → `_crit_weight` 的节点工期 (小时)。depth 返回 None (纯深度)。
+
+    - estimate: 用 subtask 自己的 `estimate`; 没填的取本 DAG 已填者的均值 (都没填 → 1, 退化为深度)
+    - learned: 用同 skill 的实测校准 —— 有 estimate 就乘该 skill 的「实测/预估」比值中位数 (估少了的
+      skill 被拉长), 没 estimate 就直接取该 skill 的实测中位数; 多个 skill 取均值。无可比 skill →
+      自己的 estimate → 全体实测中位数 → 同 estimate 档的兜底。实测来自 `_learned_hours`
+    """
+    if mode not in ("estimate", "learned"):
+        return None
+    est = {s["sid"]: float(v) for s in subs
+           if isinstance(v := s.get("estimate"), (int, float)) and v > 0}
+    fallback = sum(est.values()) / len(est) if est else 1.0
+    out: dict[str, float] = {}
     for s in subs:
-        for d in s.get("depends_on", []):
-            succ.setdefault(d, []).append(s["sid"])
-    memo: dict[str, int] = {}
-
-    def w(sid: str, seen: tuple[str, ...] = ()) -> int:
-        if sid in memo:
-            return memo[sid]
-        if sid in seen:  # ponytail: 环保护 (DAG 校验兜底不该到这), 断链避免无限递归, 不缓存
-            return 1
-        r = 1 + max((w(c, seen + (sid,)) for c in succ.get(sid, [])), default=0)
-        memo[sid] = r
-        return r
-
-    return {s["sid"]: w(s["sid"]) for s in subs}
+        sid = s["sid"]
+        if mode == "learned" and learned:
+            seen = [learned[k] for k in s.get("skills") or [] if k in learned]
+            if sid in est:
+                rs = [r for _, r in seen if r is not None]
+                if rs:
+                    out[sid] = est[sid] * sum(rs) / len(rs)
+                    continue
+            elif seen:
+                out[sid] = sum(h for h, _ in seen) / len(seen)
+                continue
+            elif "" in learned:
+                out[sid] = learned[""][0]
+                continue
+        out[sid] = est.get(sid, fallback)
+    return out
+
+
 def _pending_queue(tasks: list[dict[str, Any]], dep_unfinished: Any) -> list[dict[str, Any]]:
     """待执行 subtask 队列 (全部未完成 task, 同调度序): 每个 pending subtask 一条。
     排序 = task 调度序 (active 态(进行中/调研中/收尾中) > 阻塞前置的 pending, 同级按传入顺序)
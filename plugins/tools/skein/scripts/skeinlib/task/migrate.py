@@ -1,5 +1,6 @@
-"""trellis → skein 的一次性迁移 — 只服务 `skein setup`, 与 task 生命周期无关。
+"""一次性迁移 — 只服务 `skein setup`, 与 task 生命周期无关。
 
+两类: trellis → skein (task 目录/接线), 以及 skein 自身的落盘格式升级 (`migrate_timeline`)。
 单独成文件的理由: 这 150 行跟 create/start/finish 那套完全没关系, 却和它们共享同一个 `self`,
 一直挤在引擎最热的那个文件里。迁完就该删, 放这儿删起来也干净。
 
@@ -8,10 +9,12 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 from pathlib import Path
 from typing import Any
 
+from skeinlib.task import timeline as _timeline
 from skeinlib.task.model import TaskStatus, now
 
 # ---- setup: 初始化 / trellis 迁移 (机械部分; 语义 spec 重组由 skein-setup agent 做) ----
@@ -78,6 +81,39 @@ def migrate_trellis_tasks(trellis: Path, tasks_dir: Path, store: Any) -> list[di
     return out
 
 
+def migrate_timeline(tasks_dir: Path, archive_dir: Path) -> list[str]:
+    # task.json 内嵌的 timeline → 同目录 timeline.jsonl (未归档 + 已归档全扫), 返回迁了的 task id。
+    # 幂等: 迁过的 task.json 不再有 timeline 键。内嵌事件更早, 排在日志已有行之前;
+    # 只删键不碰 updated 等字段 (迁移不是一次状态变更)。没迁的 task 下次 save 也会顺手迁 (TaskStore.save)。
+    dirs = sorted(p for p in tasks_dir.iterdir() if p.name != "archive") if tasks_dir.is_dir() else []
+    if archive_dir.is_dir():
+        dirs += sorted(archive_dir.glob("*/*/*"))
+    out: list[str] = []
+    for d in dirs:
+        tj = d / "task.json"
+        try:
+            t = json.loads(tj.read_text())
+        except (json.JSONDecodeError, OSError):
+            continue  # 缺失/损坏: 留给 store 的读侧去告警
+        if "timeline" not in t:
+            continue
+        events = t.pop("timeline") or []
+        log = d / _timeline.LOG
+        if events and log.exists():
+            # 日志已有行 (迁移中途被杀过): 老事件插到前面, 写临时文件再 rename
+            head = "".join(json.dumps(ev, ensure_ascii=False) + "\n" for ev in events)
+            tmp = log.with_name(f".{log.name}.{os.getpid()}")
+            tmp.write_text(head + log.read_text(encoding="utf-8"), encoding="utf-8")
+            os.replace(tmp, log)
+        else:
+            _timeline.flush(d, events)
+        tmp = tj.with_name(f".{tj.name}.{os.getpid()}")
+        tmp.write_text(json.dumps(t, ensure_ascii=False, indent=2))
+        os.replace(tmp, tj)
+        out.append(d.name)
+    return out
+
+
 def purge_wiring(trellis: Path, root: Path) -> list[str]:
     # 无条件删 trellis 接线 (哪怕兼容模式): .trellis/{scripts,hooks,settings*} + .claude/*trellis*。
     # 保留 .trellis/{spec,task,...} 数据 (兼容其它工具; --full 才整删)。settings.json 内 hook 条目仅标注交 agent 剔。
@@ -0,0 +1,248 @@
+"""per-task 目录扫描引擎 — 同一进程内, 没变过的 task.json / prd.md 只读一遍、只解析一遍。
+
+## 为什么要它
+`TaskStore.sync` 一次要 autoclean / 顶层索引 / 看板三处各扫一遍全部 task, 调用方命令自己
+(claim 的 `active()`、rename 的 `all_tasks()`) 还要再扫; 每一遍都把每个 task.json 读一次、
+prd.md frontmatter 过一次 yaml (纯 Python, 最贵)。几百个 task 时一次 `subtask done` 要数秒。
+
+## 怎么做到只读一遍
+每个 task 目录记一条: (task.json 签名, prd.md 签名) → (task.json 原文, spec dict), 签名 =
+(mtime_ns, size)。再扫时只 stat, 签名没变就复用; 变了才重读。**失效不靠调用方通知** ——
+本进程 save、`save_spec` 直写 prd.md、rename 搬目录、另一个 skein 进程、用户手改, 都是改了
+mtime/size, 这层自己看得见。目录消失的条目顺手丢掉。
+
+## racy 条目不复用
+mtime 粒度是内核时钟 tick (ext4 约 4ms, 部分文件系统 1~2s): 同一 tick 内写两次且 size 不变,
+签名会撞。照 git index 的 racy-clean 判据处理 —— 读盘时 mtime 距当时不足 `RACY_NS` (utils/fs.py) 的条目
+下次照读不复用。刚写过的文件本来就少, 代价只落在它们身上。
+
+## 跨进程: `.skein/.cache/tasks.db`
+每条 `skein` 命令、每个 hook 都是新进程, 只有内存这一层的话每次仍是冷扫。条目因此再落一份
+SQLite (stdlib, 与 spec 的 `.recall.db` 同一选型): 行键 tid, 列为两份签名 + task.json 原文 +
+spec 的 JSON。新进程 stat 对上签名就直接用, 不读 task.json、不碰 yaml。
+- 只落非 racy 条目 —— 与内存层同一判据, 手改文件必然改 mtime/size, 下次 stat 即失效重读。
+- spec 经 JSON 往返不等值 (yaml 解出 date 等) 的条目不落盘, 免缓存命中与未命中给出不同类型。
+- 缓存纯属衍生物: 库坏了 / schema 版本不对 / 被别的进程锁住, 一律当没有, 删掉就是冷启动。
+
+## 为什么缓存 task.json 原文而不是 dict
+调用方会原地改返回的 dict 再 save (rename 改别 task 的 deps), 返回前必须给新对象。json.loads
+一份 34KB 的 task.json ≈ 0.8ms, copy.deepcopy 同一个 dict ≈ 3ms —— 存原文每次 loads 反而最便宜。
+spec dict 小 (四个字段), deepcopy 即可; 省掉的是 yaml。
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, cast
+
+from skeinlib.hooks.runner import DBG
+from skeinlib.task.specfile import parse_spec
+from skeinlib.utils.fs import racy
+
+_SCHEMA = 1  # tasks.db 的 PRAGMA user_version; 列变了就加一, 旧库整表重建
+
+Sig = Optional[tuple[int, int]]
+
+
+def _sig(p: Path) -> Sig:
+    """文件签名 (mtime_ns, size); 不存在 → None。"""
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass
+class _Entry:
+    task_sig: Sig
+    prd_sig: Sig
+    text: str              # task.json 原文
+    spec: dict[str, Any]   # prd.md frontmatter 解析结果
+
+
+class TaskScan:
+    """`tasks_dir/<id>/` 的扫描器。`TaskStore` 持有一个, 所有读侧 (all_tasks / load) 都经它。
+    cache: 跨进程缓存库路径 (`.skein/.cache/tasks.db`); None = 只用内存层。"""
+
+    def __init__(self, tasks_dir: Path, cache: Optional[Path] = None) -> None:
+        self.tasks = tasks_dir
+        self._entries: dict[str, _Entry] = {}
+        self.reads = 0  # 实际读盘的 task 数 (调试/基准用)
+        self._db = cache
+        self._warm = False                    # 缓存库已整表灌进内存
+        self._dirty: dict[str, _Entry] = {}   # 待落库
+        self._dead: set[str] = set()          # 待删行 (目录没了 / 变 racy)
+
+    def get(self, tid: str) -> Optional[dict[str, Any]]:
+        """单个 task: task.json ∪ spec (新对象, 可随意改)。task.json 缺失 → None; 损坏照抛。"""
+        d = self.tasks / tid
+        ts = _sig(d / "task.json")
+        if ts is None:
+            self._forget(tid)
+            self._flush()
+            return None
+        if tid not in self._entries and not self._warm:
+            self._load(tid)
+        try:
+            e = self._fresh(tid, ts, _sig(d / "prd.md"))
+        finally:
+            self._flush()
+        return self._materialize(e)
+
+    def scan(self) -> list[dict[str, Any]]:
+        """全部未归档 task (目录名序, 不排状态)。单个 task.json 损坏 → 告警跳过, 其余照常。"""
+        if not self.tasks.exists():
+            self._entries.clear()
+            return []
+        if not self._warm:
+            self._load(None)
+        out: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for d in sorted(self.tasks.iterdir()):
+            if d.name == "archive":
+                continue
+            ts = _sig(d / "task.json")
+            if ts is None:
+                continue
+            seen.add(d.name)
+            try:
+                e = self._fresh(d.name, ts, _sig(d / "prd.md"))
+            except (json.JSONDecodeError, OSError) as err:
+                # 单个 task.json 损坏 (半写/手改坏) 不该炸整个看板: 跳过并告警, 其余 task 照常渲染
+                DBG.error(f"跳过损坏 {d / 'task.json'}: {err}")
+                continue
+            out.append(self._materialize(e))
+        for gone in set(self._entries) - seen:
+            self._forget(gone)
+        self._flush()
+        return out
+
+    def _fresh(self, tid: str, ts: Sig, ps: Sig) -> _Entry:
+        e = self._entries.get(tid)
+        if e is not None and e.task_sig == ts and e.prd_sig == ps:
+            return e
+        d = self.tasks / tid
+        began = time.time_ns()
+        text = (d / "task.json").read_text()
+        json.loads(text)  # 先验一遍: 损坏的不入缓存, 由调用方决定跳过还是抛
+        prd = d / "prd.md"
+        spec = parse_spec(prd.read_text(encoding="utf-8")) if ps is not None else {}
+        self.reads += 1
+        e = _Entry(ts, ps, text, spec)
+        if not racy(max(ts[0] if ts else 0, ps[0] if ps else 0), began):
+            self._entries[tid] = e
+            self._dirty[tid] = e
+            self._dead.discard(tid)
+        else:
+            self._forget(tid)  # racy: 本次用, 不留
+        return e
+
+    def _forget(self, tid: str) -> None:
+        # 只有曾入缓存的才可能在库里有行 —— 每次读到 racy 文件都去库里删一遍是白写
+        self._dirty.pop(tid, None)
+        if self._entries.pop(tid, None) is not None:
+            self._dead.add(tid)
+
+    @staticmethod
+    def _materialize(e: _Entry) -> dict[str, Any]:
+        t = cast(dict[str, Any], json.loads(e.text))
+        t.update(copy.deepcopy(e.spec))  # spec 注入 (prd.md 真值)
+        return t
+
+    # ---- 跨进程缓存库 (尽力而为: 任何 sqlite 错误 = 本进程不再用它) ----
+    def _connect(self, create: bool) -> Any:
+        import sqlite3  # 局部: 只读单个 task 的 hook 路径不必付这个 import
+        assert self._db is not None
+        if not self._db.exists():
+            if not create or not self._db.parent.parent.is_dir():
+                return None  # 未初始化的工作区不凭空造 .skein/
+            self._db.parent.mkdir(exist_ok=True)
+        con = sqlite3.connect(self._db, timeout=0.5)
+        if con.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA:
+            con.execute("DROP TABLE IF EXISTS task")
+            con.execute("CREATE TABLE task (tid TEXT PRIMARY KEY, task_mtime INT, task_size INT, "
+                        "prd_mtime INT, prd_size INT, text TEXT, spec TEXT)")
+            con.execute(f"PRAGMA user_version = {_SCHEMA}")
+            con.commit()
+        return con
+
+    def _load(self, tid: Optional[str]) -> None:
+        """库 → 内存。tid=None 整表 (scan 用, 之后不再查库), 否则只取一行 (load 用)。"""
+        if self._db is None:
+            self._warm = True
+            return
+        import sqlite3
+        try:
+            con = self._connect(create=False)
+            if con is None:
+                self._warm = True
+                return
+            try:
+                sql = "SELECT tid, task_mtime, task_size, prd_mtime, prd_size, text, spec FROM task"
+                rows = (con.execute(sql).fetchall() if tid is None
+                        else con.execute(sql + " WHERE tid = ?", (tid,)).fetchall())
+            finally:
+                con.close()
+        except sqlite3.Error as err:
+            DBG.log(f"task 缓存库不可用, 本进程改为直读: {err}", style="dim")
+            self._drop_db()
+            return
+        for r in rows:
+            self._entries.setdefault(r[0], _Entry(
+                (r[1], r[2]), (r[3], r[4]) if r[3] is not None else None, r[5], json.loads(r[6])))
+        if tid is None:
+            self._warm = True
+
+    def _flush(self) -> None:
+        if self._db is None or not (self._dirty or self._dead):
+            return
+        import sqlite3
+        rows = []
+        for tid, e in self._dirty.items():
+            try:
+                spec = json.dumps(e.spec, ensure_ascii=False)
+                if json.loads(spec) != e.spec:
+                    continue  # JSON 往返不等值 (date 等): 不落盘, 只留内存层
+            except (TypeError, ValueError):
+                continue
+            ps = e.prd_sig or (None, None)
+            rows.append((tid, *(e.task_sig or (0, 0)), *ps, e.text, spec))
+        try:
+            con = self._connect(create=True)
+            if con is None:
+                self._dirty.clear()
+                self._dead.clear()
+                return
+            try:
+                with con:
+                    con.executemany("DELETE FROM task WHERE tid = ?", [(t,) for t in self._dead])
+                    con.executemany("INSERT OR REPLACE INTO task VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            finally:
+                con.close()
+        except sqlite3.OperationalError as err:
+            # 多半是另一 skein 进程正在写: 待写的留着, 下次 flush 再试
+            DBG.log(f"task 缓存库暂不可写, 稍后重试: {err}", style="dim")
+            return
+        except sqlite3.Error as err:
+            DBG.log(f"task 缓存库损坏, 删除重建: {err}", style="dim")
+            self._drop_db()
+            return
+        self._dirty.clear()
+        self._dead.clear()
+
+    def _drop_db(self) -> None:
+        """库坏了: 删掉 (下个进程冷建一份新的), 本进程不再碰它。"""
+        assert self._db is not None
+        try:
+            self._db.unlink()
+        except OSError:
+            pass
+        self._db = None
+        self._warm = True
+        self._dirty.clear()
+        self._dead.clear()
@@ -0,0 +1,87 @@
+"""task/subtask 落盘结构的 pydantic 模型 — 字段/默认值/说明的单一真值。
+
+从 model.py 拆出: 读写热路径只碰 dict, 不实例化这些模型; 放一起则每条命令 (哪怕 `skein ready`)
+都要先付 pydantic 的导入与建模开销。`skeinlib.task.model` 仍可按原名取用 (模块级 `__getattr__` 按需转发)。
+"""
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from skeinlib.task.model import PRIORITY_DEFAULT, SubtaskStatus, TaskPriority, TaskStatus
+
+
+class Timing(BaseModel):
+	"""通用时间记录 — task/subtask 共用基座。"""
+	created: int | None = Field(default=None, description="创建时间")
+	started: int | None = Field(default=None, description="执行开始时间")
+	finished: int | None = Field(default=None, description="执行结束时间")
+
+
+class Boundary(BaseModel):
+	"""任务边界 — 该做/不该做清单。"""
+	should: list[str] = Field(default_factory=list, description="应该做的")
+	should_not: list[str] = Field(default_factory=list, description="不应该做的")
+
+
+class TaskSpec(BaseModel):
+	"""任务核心四要素 — task/subtask 共用 (描述/边界/验收/工时)。"""
+	desc: str = Field(..., description="任务描述", json_schema_extra={"requirements": ["required"]})
+	boundary: Boundary = Field(..., description="边界", json_schema_extra={"requirements": ["required"]})
+	estimate: float = Field(..., ge=0, description="预计工时", json_schema_extra={"requirements": ["required"]})
+	acceptance: list[str] = Field(..., description="验收项", json_schema_extra={"requirements": ["required"]})
+
+
+class SubtaskData(TaskSpec):
+	"""subtask 落盘结构。"""
+	tid: str = Field(..., description="所属 task id", json_schema_extra={"requirements": ["required"]})
+	sid: str = Field(..., description="subtask 标识", json_schema_extra={"requirements": ["required"]})
+	name: str = Field(..., description="subtask 名称", json_schema_extra={"requirements": ["required"]})
+	status: SubtaskStatus = Field(default=SubtaskStatus.PENDING, description="subtask 状态")
+	depends_on: list[str] = Field(default_factory=list, description="依赖的 subtask sid")
+	timing: Timing = Field(default_factory=Timing, description="时间记录")
+
+
+class WorktreeRef(BaseModel):
+	"""task worktree 记录。"""
+	repo: str = Field(description="git 仓库路径, 根仓为 .")
+	wt: str = Field(description="worktree 相对路径")
+	branch: str = Field(description="worktree 分支")
+	merged: bool = Field(default=False, description="是否已合并回目标仓")
+
+
+class TaskTiming(Timing):
+	"""task 时间记录 — 在通用三时刻上补 task 专属节点。"""
+	confirmed: int | None = Field(default=None, description="确认时间")
+	checked: int | None = Field(default=None, description="检查开始时间")
+	checked_end: int | None = Field(default=None, description="检查结束时间")
+	updated: int | None = Field(default=None, description="更新时间")
+
+
+class TimelineEvent(BaseModel):
+	"""task 生命周期事件 (只追加, 不可改/删)。落盘在 task 目录的 timeline.jsonl, 一行一条; 长 task 会累积上百条。"""
+	kind: Literal["task", "subtask"] = Field(description="事件所属对象类型")
+	status: str = Field(description="task 事件存 TaskStatus 值, subtask 事件存 SubtaskStatus 值")
+	at: int = Field(description="Unix epoch 秒, 与其余落盘时间字段同制")
+	sid: str | None = Field(default=None, description="仅 subtask 事件携带")
+	note: str = Field(default="", description="失败原因 / 回滚说明")
+	rollback: bool = Field(default=False, description="状态序号回退时 True")
+
+
+class TaskData(TaskSpec):
+	"""task.json 结构 — 元信息/执行结构平铺。"""
+	id: str = Field(..., description="task id", json_schema_extra={"requirements": ["required"]})
+	name: str = Field(..., description="task 名称", json_schema_extra={"requirements": ["required"]})
+	status: TaskStatus = Field(default=TaskStatus.PENDING, description="task 状态")
+	priority: TaskPriority = Field(default=PRIORITY_DEFAULT, description="优先级")
+	deps: list[str] = Field(default_factory=list, description="前置 task id")
+	subtasks: list[SubtaskData] = Field(default_factory=list, description="subtask 列表")
+	research_tasks: list[SubtaskData] = Field(default_factory=list, description="research 任务清单")
+	repos: list[str] = Field(default_factory=list, description="涉及仓库")
+	worktree: str | None = Field(default=None, description="task worktree 展示汇总")
+	worktrees: list[WorktreeRef] = Field(default_factory=list, description="worktree 记录")
+	branch: str | None = Field(default=None, description="task 分支")
+	timing: TaskTiming = Field(default_factory=TaskTiming, description="时间记录")
+	timeline: list[TimelineEvent] = Field(default_factory=list,
+	                                      description="生命周期事件日志 (读侧合并视图; 落盘在 timeline.jsonl, task.json 只剩未迁移的老事件)")
@@ -8,8 +8,6 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 from skeinlib.utils.errors import SkeinError
 
 # TaskSpec 四字段 — 注入 task dict 的键, 也是 store.save 需剥离的键
@@ -29,13 +27,19 @@ def load_spec(tasks_dir: Path, tid: str) -> dict[str, Any]:
     prd = tasks_dir / tid / "prd.md"
     if not prd.exists():
         return {}
-    text = prd.read_text(encoding="utf-8")
+    return parse_spec(prd.read_text(encoding="utf-8"))
+
+
+def parse_spec(text: str) -> dict[str, Any]:
+    """prd.md 全文 → frontmatter spec dict (无 frontmatter 返回空 dict)。`TaskScan` 缓存原文时直接复用。"""
     if not text.startswith("---"):
         return {}
     end = text.find("\n---", 3)
     if end < 0:
         return {}
     block = text[4:end] if text[3] == "\n" else text[3:end]
+    import yaml  # 热路径多半命中 TaskScan 缓存, 不解析就不付 yaml 的导入开销
+
     data = yaml.safe_load(block)
     return data if isinstance(data, dict) else {}
 
@@ -49,6 +53,8 @@ def save_spec(tasks_dir: Path, tid: str, spec: dict[str, Any]) -> None:
         end = text.find("\n---", 3)
         if end >= 0:
             body = text[end + 4:]  # 跳过结束 --- 行
+    import yaml
+
     head = yaml.safe_dump({k: spec[k] for k in SPEC_KEYS if k in spec},
                           allow_unicode=True, sort_keys=False, default_flow_style=False)
     prd.write_text(f"---\n{head}---\n{body.lstrip(chr(10))}", encoding="utf-8")
@@ -60,6 +66,8 @@ def scaffold_spec(name: str, desc: str = "", estimate: Any = None) -> str:
                             "acceptance": []}
     if estimate is not None:
         spec["estimate"] = estimate
+    import yaml
+
     head = yaml.safe_dump(spec, allow_unicode=True, sort_keys=False, default_flow_style=False)
     return (f"---\n{head}---\n"
             f"# {name} — 需求\n\n"
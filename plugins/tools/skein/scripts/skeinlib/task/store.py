@@ -13,24 +13,57 @@ task.json 的跳过兜底、派生 .md 的同步刷新 —— 调用方一个都
 `cfg_fn` (读 config.yaml) 与 `wt_shown_fn` (worktree 列是否展示) 由 Skein 传进来。这样
 store 不认识 commands 层, 依赖是单向的。渲染同理: board.py 是纯函数, store 调它, 它不调 store。
 
-## ponytail: 一次 sync 会把每个 task.json 读 5 遍
-`sync` 里 `all_tasks()` 独立调 4 次 + `render_tasks()` 再扫一遍 (实测 15 个 task = 67 次
-read_text / 5ms)。15 个 task 时无所谓, 上到几百再收敛成一次扫描 —— `views.Snapshot` 已是
-现成的「一次扫描多视图」形状, 到时让 sync 也走它。
+## 一次 sync 只扫一遍
+读侧全经 `scan.TaskScan`: 没变过的 task 目录只读、只解析一次 (stat 签名判变, 跨进程经
+`.skein/.cache/tasks.db` 复用, 见其 docstring)。`sync` 自己也只取一次快照, 同一份交给 autoclean / 顶层索引 / 看板 —— 从前这里
+`all_tasks()` 独立调 4 次 + `render_tasks()` 再扫一遍, 15 个 task = 67 次 read_text。
+`views.Snapshot` 的 tasks/all_tasks 两个取数函数也落到同一个扫描器上, 第二遍只剩 stat。
+
+## 增量 sync
+多数 sync 只有一两个 task 的顶层字段变了。`sync` 先以盘上顶层索引为底, 只重读本进程 save 过的
+(`_dirty`) 与 task.json 比索引新的 task, 换掉它们的行再重排, 看板直接由索引行渲染 (索引带 name)。
+task 增删/改名/归档等结构变化退回上面的全量快照 —— 两条路产出逐字节相同。
 """
 from __future__ import annotations
 
 import datetime
 import json
+import os
 import shutil
+import time
 from pathlib import Path
-from typing import Any, Callable, Optional, cast
+from typing import Any, Callable, Optional
 
 from skeinlib.hooks.runner import DBG
 from skeinlib.infra.board import render_board, render_task_board
 from skeinlib.utils.errors import SkeinError
 from skeinlib.task.model import PRIORITY_DEFAULT, PRIORITY_RANK, STATUS_ACTIVE, STATUS_ORDER, TaskStatus, normalize_task_status, now
-from skeinlib.task.specfile import SPEC_KEYS, load_spec
+from skeinlib.task import timeline as _timeline
+from skeinlib.task.dag import Sample, _samples
+from skeinlib.task.scan import TaskScan
+from skeinlib.task.specfile import SPEC_KEYS
+from skeinlib.utils.fs import racy
+
+
+def _board_order(t: dict[str, Any]) -> tuple[int, int, str]:
+    # 状态优先 (进行中>检查中>待处理>已完成), 同状态内按优先级降序 (紧急>高>中>低), 同优先级按 id 序。
+    # all_tasks / 顶层索引 / 看板三处同一排序, 增量换行后重排也用它
+    return (STATUS_ORDER.get(t.get("status", ""), 9),
+            -PRIORITY_RANK.get(t.get("priority", ""), PRIORITY_RANK[PRIORITY_DEFAULT]),
+            t.get("id") or "")
+
+
+def _index_row(t: dict[str, Any]) -> dict[str, Any]:
+    """顶层索引 (`.skein/task.json`) 的一行。带 name 是为了看板能只靠索引渲染 (增量路径不读明细)。"""
+    return {"id": t["id"], "name": t.get("name", t["id"]), "status": t["status"], "deps": t["deps"],
+            "priority": t.get("priority") or PRIORITY_DEFAULT,
+            "worktree": t.get("worktree"),
+            "created": t.get("created"),
+            "confirmed": t.get("confirmed"),
+            "started": t.get("started"),
+            "checked": t.get("checked"),
+            "checked_end": t.get("checked_end"),
+            "finished": t.get("finished")}
 
 
 class TaskStore:
@@ -42,25 +75,37 @@ class TaskStore:
         self.archive_dir = archive_dir
         self._cfg = cfg_fn
         self._wt_shown_fn = wt_shown_fn
+        self._scan = TaskScan(tasks, cache=dir_ / ".cache" / "tasks.db")
+        self._dirty: set[str] = set()  # 本进程 save 过、顶层索引尚未重算的 task id
+        self._arch_memo: Optional[tuple[list[list[Any]], list[Sample]]] = None  # archived_samples 的 (签名, 样本)
 
-    def autoclean(self, days: Optional[int] = None) -> list[str]:
+    def autoclean(self, days: Optional[int] = None,
+                  snapshot: Optional[list[dict[str, Any]]] = None) -> list[str]:
         # 惰性归档: 已完成且超保留期的 task 移入 archive (保留期内留看板)。days 省略用 config retain_days。
         # 负数 = 永不自动清理。0 = finish 即归档 (旧行为)。每次 _sync 触发, 无需守护进程。
+        # snapshot: 调用方 (sync) 已扫好的 all_tasks(), 免再扫一遍。
         d = days if days is not None else self._cfg().get("retain_days", 7)
         if d is None or int(d) < 0:
             return []
-        cutoff = now() - int(d) * 86400
-        snapshot = self.all_tasks()
-        blocked = self._unfinished_related(snapshot)  # 关联链上有未完成 → 整条链不归档
-        archived = []
-        for t in snapshot:
-            if t["id"] in blocked:
-                continue
-            if normalize_task_status(t["status"]) == TaskStatus.DONE and (t.get("finished") or t.get("done_at") or 0) <= cutoff:
-                self.archive_task(t["id"])
-                archived.append(t["id"])
+        if snapshot is None:
+            snapshot = self.all_tasks()
+        archived = self._expired(snapshot, int(d))
+        for tid in archived:
+            self.archive_task(tid)
         return archived
 
+    def _expired(self, tasks: list[dict[str, Any]], days: Optional[int] = None) -> list[str]:
+        """够格归档的 task id: 已完成、超保留期、所在关联链全已完成。只判不搬 (增量索引据此决定走全量)。"""
+        d = days if days is not None else self._cfg().get("retain_days", 7)
+        if d is None or int(d) < 0:
+            return []
+        cutoff = now() - int(d) * 86400
+        blocked = self._unfinished_related(tasks)  # 关联链上有未完成 → 整条链不归档
+        return [t["id"] for t in tasks
+                if t["id"] not in blocked
+                and normalize_task_status(t["status"]) == TaskStatus.DONE
+                and (t.get("finished") or t.get("done_at") or 0) <= cutoff]
+
     @staticmethod
     def _unfinished_related(tasks: list[dict[str, Any]]) -> set[str]:
         # 关联 = deps 双向。任一连通分量内有非已完成 task, 该分量整体禁归档
@@ -92,63 +137,95 @@ class TaskStore:
     def sync(self) -> None:
         # 顶层 task.json 唯一写入口: tasks 是未归档 task 的去规范化状态镜像 (per-task task.json 仍单一真值源),
         # 每次变更重算, 免各处同步。无 task 级 focus — 无未完成前置的 task 皆可并行 (DAG 就绪即跑)。
-        self.autoclean()  # 惰性归档超保留期的完成 task, 再重算索引
-        tasks = [{"id": t["id"], "status": t["status"], "deps": t["deps"],
-                  "priority": t.get("priority") or PRIORITY_DEFAULT,
-                  "worktree": t.get("worktree"),
-                  "created": t.get("created"),
-                  "confirmed": t.get("confirmed"),
-                  "started": t.get("started"),
-                  "checked": t.get("checked"),
-                  "checked_end": t.get("checked_end"),
-                  "finished": t.get("finished")} for t in self.all_tasks()]
+        # 先试增量 (只换变过的行, 见 _patched_rows); 结构变了才走全量:
+        # 一次快照喂三处: autoclean → 索引 → 看板 (归档掉的从快照里剔除, 不再回头扫盘)
+        rows = self._patched_rows()
+        if rows is None:
+            snapshot = self.all_tasks()
+            archived = set(self.autoclean(snapshot=snapshot))  # 惰性归档超保留期的完成 task, 再重算索引
+            rows = [_index_row(t) for t in snapshot if t["id"] not in archived]
         self.write_if_changed(self.dir / "task.json",
-            json.dumps({"tasks": tasks}, ensure_ascii=False, indent=2))
-        self._write_board()  # 变更即刷 task.md (看板 http 实时渲染, 不落盘)
+            json.dumps({"tasks": rows}, ensure_ascii=False, indent=2))
+        # 变更即刷 task.md (看板 http 实时渲染, 不落盘)。行已按看板序排好且与镜像同集合 ——
+        # render_tasks 的「镜像补幽灵骨架」在刚写完镜像后恒为空, 这里直接渲染行, 不再合并一遍
+        self.write_if_changed(self.dir / "task.md", render_board(rows, self._wt_shown_fn()))
+        self._dirty.clear()
+
+    def _patched_rows(self) -> Optional[list[dict[str, Any]]]:
+        """增量索引: 以盘上顶层镜像为底, 只把变过的 task 重读换行。返回 None = 该走全量。
+
+        「变过」= 本进程 save 过的 (`_dirty`) ∪ task.json mtime 不早于镜像的 (别的进程/手改)。
+        走全量的情形: 镜像缺失/损坏/旧格式 (无 name), task 目录集合与镜像行集合不等 (新建/删/
+        rename/归档/损坏), 或有 task 够格被 autoclean 归档 —— 都是结构变化, 不值得另写一套补丁逻辑。
+        """
+        mirror = self.dir / "task.json"
+        try:
+            base_ns = os.stat(mirror).st_mtime_ns
+            base = {r["id"]: r for r in json.loads(mirror.read_text())["tasks"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not self.tasks.is_dir() or any("name" not in r for r in base.values()):
+            return None
+        ids: set[str] = set()
+        stale = set(self._dirty)
+        for d in self.tasks.iterdir():
+            if d.name == "archive":
+                continue
+            try:
+                mtime = os.stat(d / "task.json").st_mtime_ns
+            except OSError:
+                continue
+            ids.add(d.name)
+            if mtime >= base_ns:  # 同 tick 也算: 宁多读一行不漏一行
+                stale.add(d.name)
+        if ids != set(base):
+            return None
+        for tid in stale & ids:
+            try:
+                t = self._scan.get(tid)
+            except (json.JSONDecodeError, OSError):
+                return None  # 手改坏了: 全量路径负责跳过并告警
+            if t is None:
+                return None
+            base[tid] = _index_row(t)
+        rows = sorted(base.values(), key=_board_order)
+        if self._expired(rows):
+            return None
+        DBG.log(f"增量索引: 重算 {len(stale & ids)}/{len(rows)} 行", style="dim")
+        return rows
 
     def load(self, tid: str) -> dict[str, Any]:
-        f = self.tasks / tid / "task.json"
-        if not f.exists():
+        t = self._scan.get(tid)  # TaskSpec 真值在 prd.md frontmatter, 读侧注入 (scan 已合并)
+        if t is None:
             raise SkeinError(f"task 不存在: {tid}")
-        t = cast(dict[str, Any], json.loads(f.read_text()))
-        t.update(load_spec(self.tasks, tid))  # TaskSpec 真值在 prd.md frontmatter, 读侧注入
         return t
 
     def save(self, t: dict[str, Any], sync_index: bool = True) -> None:
         """落盘一个 task; `sync_index=True` 时连带刷顶层索引与汇总看板 (save+sync 原子收口)。
         subtask 级变更不动顶层索引字段 (id/status/deps/...) 时可传 False 免一次全量重算。"""
         t["updated"] = now()
+        # 暂存的 timeline 事件 (含老 task.json 里内嵌的) 追加进 timeline.jsonl, 不随 task.json 重写。
+        # 先落事件再写 task.json: 中途被杀顶多多一条事件, 不会丢一条 (末状态缓存对不上, 下次全量重建)
+        last = _timeline.flush(self.tasks / t["id"], t.pop("timeline", None) or [], t.get(_timeline.LAST))
+        if last is not None:
+            t[_timeline.LAST] = last
         # TaskSpec 四字段不落 task.json (真值在 prd.md), save 时剥离注入键
         stripped = {k: v for k, v in t.items() if k not in SPEC_KEYS}
         # 先算 diff 再写: 内容未变则跳过 (增量, 不全量覆盖 → 免无谓 IO/mtime 抖动)
         self.write_if_changed(self.tasks / t["id"] / "task.json",
                                json.dumps(stripped, ensure_ascii=False, indent=2))
+        self._dirty.add(t["id"])
         self._write_task_board(t)  # task.json 唯一写入口 → 同步渲染子任务看板, 免各调用点漏刷 (task.json 变更即同步 task.md)
         if sync_index:
             self.sync()
 
     def all_tasks(self) -> list[dict[str, Any]]:
-        if not self.tasks.exists():
-            return []
-        out: list[dict[str, Any]] = []
-        for d in sorted(self.tasks.iterdir()):
-            if d.name == "archive":
-                continue
-            f = d / "task.json"
-            if f.exists():
-                try:
-                    t = json.loads(f.read_text())
-                except (json.JSONDecodeError, OSError) as e:
-                    # 单个 task.json 损坏 (半写/手改坏) 不该炸整个看板: 跳过并告警, 其余 task 照常渲染
-                    DBG.error(f"跳过损坏 {f}: {e}")
-                    continue
-                out.append({**t, **load_spec(self.tasks, d.name)})  # spec 注入 (prd.md 真值)
-                DBG.log(f"读 {f}  → id={t.get('id')} status={t.get('status')} "
+        out = self._scan.scan()  # 损坏跳过 + spec 注入都在扫描器里
+        if DBG.enabled:
+            for t in out:
+                DBG.log(f"读 {t.get('id')}  → status={t.get('status')} "
                         f"subtasks={len(t.get('subtasks', []))} deps={t.get('deps') or '-'}", style="dim")
-        # 状态优先排序 (进行中>检查中>待处理>已完成), 同状态内按优先级降序 (紧急>高>中>低), 同优先级按 id 序
-        out.sort(key=lambda t: (STATUS_ORDER.get(t.get("status", ""), 9),
-                                -PRIORITY_RANK.get(t.get("priority", ""), PRIORITY_RANK[PRIORITY_DEFAULT]),
-                                t.get("id") or ""))
+        out.sort(key=_board_order)
         return out
 
     def render_tasks(self) -> list[dict[str, Any]]:
@@ -156,7 +233,7 @@ class TaskStore:
         # per-task 目录是真值源 (有 subtask/desc/name, 明细胜出); 顶层镜像补齐目录被删/迁移丢失、
         # 仅存于索引的 task (只 id/status/deps/worktree), 免看板静默空白。
         # 只服务看板只读渲染; 调度/mutation 仍走严格 _all() (幽灵骨架不可派发/归档)。
-        # ponytail: 顶层索引本就无 name 字段, 看板对幽灵骨架直接用 id 显示 (task 一向以 id 标识, 非降级);
+        # ponytail: 旧版顶层索引无 name 字段, 看板对这类幽灵骨架直接用 id 显示 (task 一向以 id 标识, 非降级);
         #           要恢复 subtask/desc 等完整明细需从有 per-task 目录的分支 checkout。
         DBG.rule("看板数据源合并 (顶层索引 ∪ per-task 明细)")
         tasks = self.all_tasks()
@@ -180,9 +257,7 @@ class TaskStore:
                 DBG.warn(f"  + 镜像补齐幽灵骨架 {r['id']} (per-task 目录缺失, 仅顶层索引可用)")
         else:
             DBG.log(f"顶层镜像 {mirror} 不存在, 仅用 per-task 明细", style="dim")
-        tasks.sort(key=lambda t: (STATUS_ORDER.get(t["status"], 9),
-                                  -PRIORITY_RANK.get(t.get("priority", ""), PRIORITY_RANK[PRIORITY_DEFAULT]),
-                                  t["id"]))
+        tasks.sort(key=_board_order)
         by_status: dict[str, int] = {}
         sub_total = 0
         sub_by_status: dict[str, int] = {}
@@ -209,6 +284,51 @@ class TaskStore:
         hits = list(self.archive_dir.glob(f"*/*/{tid}")) if self.archive_dir.exists() else []
         return hits[0] if hits else None
 
+    def archived_samples(self) -> list[Sample]:
+        """已归档 task 的 done subtask 实测样本 (`scheduling.weight: learned` 用, 见 dag._learned_hours)。
+
+        归档只增不改 (`archive_task` 把目录搬进 `<年>/<月-日>/<id>`), 按 archive 下各级目录的 mtime 签名
+        缓存: 进程内一份, `.skein/.cache/learned.json` 跨进程一份; 签名变了才把归档 task.json 全读一遍。
+        签名里有 racy 的 mtime 不落盘 (判据同 TaskScan)。"""
+        if not self.archive_dir.is_dir():
+            return []
+        sig: list[list[Any]] = []
+        for p in [self.archive_dir, *sorted(self.archive_dir.glob("*")), *sorted(self.archive_dir.glob("*/*")),
+                  *sorted(self.archive_dir.glob("*/*/*"))]:
+            try:
+                sig.append([p.relative_to(self.archive_dir).as_posix(), p.stat().st_mtime_ns])
+            except OSError:
+                continue
+        if self._arch_memo is not None and self._arch_memo[0] == sig:
+            return self._arch_memo[1]
+        cache = self.dir / ".cache" / "learned.json"
+        try:
+            hit = json.loads(cache.read_text(encoding="utf-8"))
+            if hit["sig"] == sig:
+                samples: list[Sample] = [(float(h), est, list(sk)) for h, est, sk in hit["samples"]]
+                self._arch_memo = (sig, samples)
+                return samples
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        tasks: list[dict[str, Any]] = []
+        for f in sorted(self.archive_dir.glob("*/*/*/task.json")):
+            try:
+                tasks.append(json.loads(f.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as err:
+                DBG.warn(f"跳过损坏的归档 {f}: {err}")
+        samples = _samples(tasks)
+        self._arch_memo = (sig, samples)
+        now_ns = time.time_ns()
+        if not any(racy(m, now_ns) for _, m in sig):
+            try:
+                cache.parent.mkdir(exist_ok=True)
+                tmp = cache.with_name(f".{cache.name}.{os.getpid()}")
+                tmp.write_text(json.dumps({"sig": sig, "samples": samples}, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, cache)
+            except OSError:
+                pass
+        return samples
+
     def active(self) -> list[dict[str, Any]]:
         return [t for t in self.all_tasks() if t["status"] in STATUS_ACTIVE]
 
@@ -238,7 +358,10 @@ class TaskStore:
                 return
         except OSError:
             pass
-        path.write_text(content)
+        # 写临时文件再 rename: task 级锁下别的 task 的命令可能正无锁读本文件, 不能让它读到半截
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        tmp.write_text(content)
+        os.replace(tmp, path)
         DBG.log(f"✎ 写入 {path}  ({len(content)} 字符)", style="green")
 
     # ---- 派生 .md 渲染 (纯函数在 board.py, 本层只负责取数与写盘) ----
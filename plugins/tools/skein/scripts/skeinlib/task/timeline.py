@@ -1,15 +1,39 @@
-"""task.json timeline 写入 — 唯一入口, 纯函数, 只追加不改写。
+"""task 生命周期事件日志 — 写入唯一入口, 只追加不改写。
 
-不接入任何调用点 (由后续 subtask 在 6 处 task 迁移 + 3 处 subtask 迁移显式调用)。
-`t` 是 `TaskStore.load` 读出的原始 dict (非 pydantic 模型), 与 store 的落盘层保持同一形状。
+## 落盘: 每 task 一份 `timeline.jsonl`
+事件不再随 task.json 存: 那份是 pretty-print 的整文件, `TaskStore.save` 每次全量重写, 长 task
+累积上百条事件后, 一次 subtask 迁移要为新增的一条重写几十 KB。现在事件一行一条 JSON, 以
+`O_APPEND` 追加到 `task/<id>/timeline.jsonl` —— 一次迁移只写约 100 字节, 已有行从不改动。
+
+## 写侧: append 暂存, save 落盘
+`append` 只把事件暂存进 task dict 的 `timeline` 键 (调用方手里是 `TaskStore.load` 读出的原始
+dict, 与 store 的落盘层同一形状); `TaskStore.save` 把它弹出来交给 `flush`。rollback 判定要看同
+对象的上一条事件, 而那条多半只在日志里, 所以放到 `flush` 里对着日志做。
+
+## 各对象末状态缓存: task dict 的 `timeline_last`
+rollback 只需每个 (kind, sid) 的末状态, 不必每次 flush 把整份日志读一遍解析一遍 (长 task 上
+那是 O(历史))。`flush` 返回 `{"size": 日志字节数, "last": {对象键: 末状态}}`, `TaskStore.save`
+随 task.json 一起存; 下次 flush 时日志大小对得上就直接用, 对不上 (手改/合并/上次追加后没来得
+及写 task.json) 才回落全量读一遍重建。
+
+## 读侧: `merged`
+详情页要完整时间线: task.json 里尚未迁移的老事件 (见 `task/migrate.migrate_timeline`) 在前,
+日志在后。日志末行半截 (进程写到一半被杀) 跳过, 其余照常。
 """
 from __future__ import annotations
 
+import json
+import os
 import time as _time
+from pathlib import Path
 from typing import Any, Literal, Optional
 
+from skeinlib.hooks.runner import DBG
 from skeinlib.task.model import SubtaskStatus, TaskStatus, now
 
+LOG = "timeline.jsonl"
+LAST = "timeline_last"
+
 # 生命周期前进序号 —— 与展示用的 STATUS_ORDER (看板排序权重) 是两套语义, 不可复用:
 # STATUS_ORDER 是"最紧急排最前"的展示权重 (active=0 最高优先级), 不满足 "序号单调递增=前进" 的比较语义。
 _TASK_SEQ: dict[str, int] = {
@@ -31,35 +55,81 @@ _SUBTASK_SEQ: dict[str, int] = {
 
 def append(t: dict[str, Any], kind: Literal["task", "subtask"], status: str, *,
            sid: str | None = None, note: str = "") -> None:
-    """给 task dict 的 timeline 追加一条事件 (原地修改)。
+    """给 task dict 暂存一条事件 (原地修改), 下次 `TaskStore.save` 追加进 timeline.jsonl。
+    rollback 此时还不定 (上一条事件在日志里), 由 `flush` 判。"""
+    t.setdefault("timeline", []).append({
+        "kind": kind,
+        "status": status,
+        "at": now(),
+        "sid": sid,
+        "note": note,
+    })
+
+
+def _key(ev: dict[str, Any]) -> str:
+    # 末状态缓存要随 task.json 落盘, 键得是字符串: task 级一个, subtask 级按 sid 分
+    return f"subtask:{ev.get('sid')}" if ev.get("kind") == "subtask" else str(ev.get("kind"))
+
+
+def flush(task_dir: Path, events: list[dict[str, Any]],
+          cache: Optional[dict[str, Any]] = None) -> Optional[dict[str, Any]]:
+    """暂存事件 → 日志末尾, 一次 `O_APPEND` 写入; 返回更新后的末状态缓存 (无事件时原样返回 `cache`)。
 
     rollback 判定: 找同 kind (subtask 事件再同 sid) 的上一条事件, 新状态序号 <= 旧状态序号即回滚。
-    序号表未知的状态 (理论上不会出现) 视为 0, 不判回滚。
+    序号表未知的状态 (理论上不会出现) 视为 0, 不判回滚。已带 rollback 的事件 (task.json 里迁来的
+    老事件) 原样保留。上一条事件的状态取自 `cache` (见模块说明), 日志大小与它记的不符才全量读。
     """
-    timeline: list[dict[str, Any]] = t.setdefault("timeline", [])
-    seq = _TASK_SEQ if kind == "task" else _SUBTASK_SEQ
+    if not events:
+        return cache
+    log = task_dir / LOG
+    try:
+        size = log.stat().st_size
+    except OSError:
+        size = 0
+    if cache and cache.get("size") == size and isinstance(cache.get("last"), dict):
+        last: dict[str, Any] = dict(cache["last"])
+    else:
+        last = {_key(ev): ev.get("status", "") for ev in read(task_dir)}
+    lines: list[str] = []
+    for ev in events:
+        k = _key(ev)
+        if "rollback" not in ev:
+            seq = _TASK_SEQ if ev.get("kind") == "task" else _SUBTASK_SEQ
+            ev["rollback"] = k in last and seq.get(ev["status"], 0) <= seq.get(last[k], 0)
+        last[k] = ev.get("status", "")
+        lines.append(json.dumps(ev, ensure_ascii=False) + "\n")
+    data = "".join(lines).encode("utf-8")
+    # 缓存的 size 按"写前大小 + 本次字节数"算, 不取写后 fstat: 万一有别的写者插进来, 下次对不上就全量重建
+    size += len(data)
+    fd = os.open(log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+    return {"size": size, "last": last}
 
-    prev = None
-    for ev in reversed(timeline):
-        if ev.get("kind") != kind:
-            continue
-        if kind == "subtask" and ev.get("sid") != sid:
+
+def read(task_dir: Path) -> list[dict[str, Any]]:
+    """timeline.jsonl 全部事件 (写入序)。文件不存在 → 空列表; 坏行 (半截写入) 告警跳过。"""
+    try:
+        text = (task_dir / LOG).read_text(encoding="utf-8")
+    except OSError:
+        return []
+    out: list[dict[str, Any]] = []
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
             continue
-        prev = ev
-        break
+        try:
+            out.append(json.loads(line))
+        except json.JSONDecodeError:
+            DBG.warn(f"跳过损坏的 timeline 行 {task_dir / LOG}:{n}")
+    return out
 
-    rollback = False
-    if prev is not None:
-        rollback = seq.get(status, 0) <= seq.get(prev.get("status", ""), 0)
 
-    timeline.append({
-        "kind": kind,
-        "status": status,
-        "at": now(),
-        "sid": sid,
-        "note": note,
-        "rollback": rollback,
-    })
+def merged(task_dir: Path, data: dict[str, Any]) -> list[dict[str, Any]]:
+    """完整时间线: task.json 里未迁移的老事件 + 日志。老 task 两处都没有 → 空列表。"""
+    return list(data.get("timeline") or []) + read(task_dir)
 
 
 def fmt_ts(ts: Optional[int]) -> str:
@@ -2,6 +2,10 @@
 
 从 boardsource.py BoardSourceMixin._exec_argv 抽出 (ADR 0003 S3/G2):
 属性分析证明此函数零 self 依赖, 是纯函数, 不该挂在 mixin 上。
+
+`exec_call` 是同一份白名单的进程内版 (web/executor.py 用): 写命令 → (dispatch 命令名, namespace
+参数), 参数与 cli/main 里对应 typer 命令传给 `_run` 的一致。两者必须同进同退 —— 子进程模式收的
+body, 进程内模式也收, 反之亦然 (tests/test_serve_executor.py 逐命令对拍)。
 """
 from __future__ import annotations
 
@@ -84,3 +88,52 @@ def exec_argv(body: dict[str, Any]) -> Optional[list[str]]:
     if cmd == "del":
         return base + ["del", g("id")] + force if tid("id") else None
     return None
+
+
+def exec_call(body: dict[str, Any]) -> Optional[tuple[str, dict[str, Any]]]:
+    """看板写命令 → (cmd, kwargs) 或 None(拒绝)。校验与 `exec_argv` 逐条相同; 只读命令不收
+    (看板读面走 Snapshot 视图, 不经命令)。"""
+    cmd = body.get("cmd")
+
+    def s(k: str) -> Optional[str]:
+        v = body.get(k)
+        return v.strip() if isinstance(v, str) and v.strip() else None
+
+    def tid(k: str) -> Optional[str]:
+        v = s(k)
+        return v if v and slug_ok(v) else None
+
+    force = body.get("force") is True
+    if cmd == "create":
+        if not (tid("id") and s("name") and s("desc")):
+            return None
+        return "create", {"id": s("id"), "name": s("name"), "desc": s("desc"), "deps": s("deps"),
+                          "repos": None, "estimate": None, "priority": None, "like": None}
+    if cmd == "subtask-add":
+        if not (tid("id") and s("sid") and s("name") and s("desc") and s("estimate")):
+            return None
+        return "subtask", {"action": "add", "tid": s("id"), "sid": s("sid"), "name": s("name"),
+                           "desc": s("desc"), "estimate": s("estimate"), "deps": s("deps")}
+    if cmd == "clean":
+        days = body.get("days", 0)
+        if isinstance(days, bool) or not isinstance(days, (int, str)):
+            return None
+        try:
+            d = int(days)
+        except ValueError:
+            return None
+        return ("clean", {"days": d}) if d >= 0 else None
+    if not tid("id"):
+        return None
+    if cmd == "confirm":
+        return "confirm", {"id": s("id"), "summary": False, "approved": True, "unattended": False,
+                           "force": force}
+    if cmd == "revert":
+        return "revert", {"id": s("id")}
+    if cmd == "finish":
+        return "finish", {"id": s("id"), "force": force}
+    if cmd == "priority":
+        return ("priority", {"id": s("id"), "set": s("set")}) if s("set") else None
+    if cmd == "del":
+        return "del", {"task_id": s("id"), "subtask_sid": None, "dry_run": False, "force": force}
+    return None
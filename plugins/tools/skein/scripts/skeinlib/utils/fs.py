@@ -7,6 +7,16 @@ import sys
 from typing import Any, Optional, cast
 
 
+# mtime 距参照时刻 (读盘 / 登记 / 建表) 不足此值 → racy: 同一 tick 内写两次且 size 不变, (mtime, size)
+# 签名会撞。照 git index 的 racy-clean 判据, 这种条目不凭 stat 判未变 (取 FAT 的 2s 粒度兜底, 宁多读不读旧)
+RACY_NS = 2_000_000_000
+
+
+def racy(mtime_ns: int, ref_ns: int) -> bool:
+    """mtime 距 ref_ns 不足 `RACY_NS`: 签名不可信, 不复用、不落缓存。"""
+    return mtime_ns >= ref_ns - RACY_NS
+
+
 def git_root(start: str) -> str:
     directory = os.path.abspath(start or ".")
     while True:
@@ -3,6 +3,11 @@
 serve.py: build_app 路由 + server 生命周期
 boardsource.py: BoardSourceMixin 生产 adapter
 views.py: Snapshot + DataSource Protocol + 各视图纯函数
+revs.py: Revisions — watcher 喂的 rev 计数器 (rev 端点 O(1), 不 stat)
+snapcache.py: SnapshotCache — 按 data rev 跨请求共享 Snapshot (single-flight)
+delta.py: DeltaFeed — WS 增量推送 (board+queue 视图的 RFC 6902 patch + seq, 断档 resync)
+executor.py: InProcessExecutor — 看板写端点进程内直调命令 (web.exec=subprocess 退回子进程)
+search.py: SearchIndex — 看板搜索的 FTS5 索引 (task/subtask 内存表随 watcher 增量同步, spec 查 .recall.db)
 
 子模块按需 import (不在 __init__ 里预加载, 避免 web.views 首先被 import 时的循环引用):
   web.views → from skeinlib.web.views import * → 触发本 __init__
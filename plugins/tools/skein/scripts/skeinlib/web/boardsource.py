@@ -20,7 +20,6 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Optional, cast
 
 from skeinlib.hooks.runner import DBG
-from skeinlib.config import Config
 from skeinlib.web.serve import (build_app, ensure_dist_built, install_serve_deps, max_mtime,
                             probe_same_project, serve_deps_present, dist_dir)
 from skeinlib.web.views import Snapshot
@@ -67,7 +66,9 @@ class BoardSourceMixin:
         return (dist_dir() / "index.html").read_text(encoding="utf-8")
     def _spec_rev(self) -> str:
         # spec rev: .skein/spec/ 内 .md 最大 mtime_ns。变 → WS 推 "spec-changed"。
-        # ponytail: rglob ~几十 .md 文件 stat (500ms 周期, 免读内容); 与 _data_rev 独立 (spec 不进 task.json)。
+        # ponytail: rglob ~几十 .md 文件 stat (免读内容); 与 _data_rev 独立 (spec 不进 task.json)。
+        # 以下 *_rev / _task_mtimes 都是 stat 扫描版: serve 跑着 watcher 时 rev 端点读 web/revs.py 的内存计数,
+        # 这些只在 watcher 没挂上 / 起不来时兜底。
         root = self._spec_root()
         if not root.exists():
             return "0"
@@ -241,6 +242,8 @@ class BoardSourceMixin:
             # 手动跑是用户显式意图, 必须告诉他为什么没起来 (否则看着像静默失败)。
             (DBG.log if auto else DBG.warn)(f"无 .skein 工作区 ({f} 不存在) — serve 空跑退出")
             return  # 无 .skein 工作区 — 无 task 项目里空跑 (手动/monitor 皆退, 无盘可服务)
+        from skeinlib.config import Config
+
         cfg = Config(f).cfg.model_dump(by_alias=True)  # 独立 argv 入口, 不走 self.config() (免其未初始化即报错的前置)
         if auto and not cfg["web"]["serve"]:
             DBG.log("config.yaml web.serve=false — monitor 自动起已关闭 (手动 `serve` 仍可强起)")
@@ -294,6 +297,11 @@ class BoardSourceMixin:
     def _task_json_rev(self) -> str:
         # 合并 rev (data + asset): /__skein__/rev 轮询兜底端点用, 任一变即变。
         return f"{self._data_rev()}.{self._asset_rev()}"
+    def _exec_session(self) -> Optional[Any]:
+        # 看板写命令进程内执行用的独立实例 (web/executor.py): 同根, 不与读请求共享 TaskStore 内存层。
+        # 本进程 cwd 已不在该仓库 (新实例落到别处) → None, 写命令退回子进程。
+        sk = type(self)()
+        return sk if sk.root == self.root else None
     def _lock_file(self) -> Path:
         return self.dir / ".board-server.lock"
     def _run_server(self, open_browser: bool = True, quiet: bool = False) -> None:
@@ -0,0 +1,74 @@
+"""看板 WS 增量推送 — 相邻两次视图 (board + queue) 之间的 RFC 6902 JSON Patch, 带序号。
+
+旧协议每批文件事件给每个连接推整张卡片 (task-changed 带全量 card + subtable), 卡片签名没差异时推
+"data", 前端收到就整页重载 —— 几百个 task、开几个 tab, 一次 subtask 流转每个连接重拉几百 KB。
+
+- 文档: `view_doc` → {"board": {...board_data, "cards": {id: card}}, "queue": {...}}。cards 按 id
+  成对象而非数组: RFC 6902 的数组下标随排序漂移, 一张卡换状态 (排序键变) 会把后面整段都算成
+  replace; 按 id 寻址则一次流转只出那张卡的几个字段。其余数组变了就整值 replace (不做 LCS)。
+- 序号: 每条 patch 一个 seq, 单调递增。客户端收到的 seq 不是上一条 +1 (漏收/重连) → 发
+  {"type":"resync"}, 服务端回 {"type":"snapshot", seq, doc} 全量重建基线。
+- 订阅是 opt-in: 只推给发过 resync 的连接; 老客户端照旧收 task-changed / "data"。订阅者在文件变了
+  但视图无差异时也收 "data" 兜底; 卡片之外的 op 由前端合成 view-changed (live.ts `viewsTouched`)。
+- 基线只在有订阅者时维护 (`reset(None)` 丢弃): 没人订阅还每批多算一遍 queue 视图是白干。
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+
+def _esc(key: str) -> str:
+    # JSON Pointer (RFC 6901) 转义: 先 ~ 后 /, 顺序反了 "/" → "~1" 会再被转成 "~01"
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def diff(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """old → new 的 RFC 6902 操作序列 (只用 add/remove/replace)。对象逐键递归, 其余值不等即 replace。"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: list[dict[str, Any]] = [{"op": "remove", "path": f"{path}/{_esc(k)}"} for k in old if k not in new]
+        for k, v in new.items():
+            p = f"{path}/{_esc(k)}"
+            if k in old:
+                ops.extend(diff(old[k], v, p))
+            else:
+                ops.append({"op": "add", "path": p, "value": v})
+        return ops
+    # type 也比: True == 1, 但前端 JSON 里 true 与 1 不是一回事
+    if type(old) is type(new) and old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def view_doc(board_data: dict[str, Any], queue: dict[str, Any]) -> dict[str, Any]:
+    """增量推送的文档: board 视图 (cards 按 id 成对象) + queue 视图。"""
+    board = dict(board_data)
+    board["cards"] = {c["id"]: c for c in board_data.get("cards", [])}
+    return {"board": board, "queue": queue}
+
+
+class DeltaFeed:
+    """上一份已推文档 + 序号。`advance` 出 patch, `snapshot` 出全量 (resync 应答)。"""
+
+    def __init__(self) -> None:
+        self.seq = 0
+        self.doc: Optional[dict[str, Any]] = None
+
+    def reset(self, doc: Optional[dict[str, Any]]) -> None:
+        """换基线, seq 不动 (已收到的序号对新基线仍连续: 订阅者是拿 snapshot 对齐的)。"""
+        self.doc = doc
+
+    def advance(self, doc: dict[str, Any], force: bool = False) -> Optional[list[dict[str, Any]]]:
+        """新文档 → 相对基线的 ops 并前移基线; 无差异返回 None (seq 不动) —— `force` 时仍发空 ops
+        (task 目录有文件事件但卡片没变, 订阅者要靠这一条知道去重拉详情)。无基线 → 只立基线。"""
+        if self.doc is None:
+            self.doc = doc
+            return None
+        ops = diff(self.doc, doc)
+        self.doc = doc
+        if not ops and not force:
+            return None
+        self.seq += 1
+        return ops
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "snapshot", "seq": self.seq, "doc": self.doc}
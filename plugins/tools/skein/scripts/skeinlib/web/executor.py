@@ -0,0 +1,60 @@
+"""看板写端点的进程内执行器 — 直调 cli/main 的 dispatch 表, 不为每次点击起 skein 子进程。
+
+`_run_cli` 每次建卡/拖放/改优先级都 fork 一个新解释器: import typer/pydantic/yaml、跑 bootstrap、
+冷扫 task 目录, 几百毫秒; 命令本身只要几毫秒。这里走同一张 dispatch 表、同一套 `_lock_scope`
+(全局 / task 级 flock), 只是省掉解释器启动和 argv 解析。
+
+- 参数: `exec_call` 白名单, 与子进程路径的 `exec_argv` 同一套校验, 同进同退。
+- 独立 Skein: 不借 serve 的 board 实例 —— board 的 TaskStore/TaskScan 内存层同时被各读请求
+  线程用着, 写命令在它身上改缓存就是跨线程竞态。这里另建一个只给写命令用的实例 (工厂由宿主
+  给, 见 `BoardSourceMixin._exec_session`), 本进程内一把 `threading.Lock` 串行; 跨进程
+  (agent 同时跑 CLI) 照旧靠 flock。TaskScan 按文件签名校验, 别的进程改过盘它会重读。
+- 线程: serve 的写端点是同步 `def`, 由 starlette 放进线程池跑, 不堵事件循环。
+- 结果形状与子进程路径一致 (`{ok, exit, stdout, stderr}`, 前端 CliResult 不动): stdout 即 CLI
+  会打印的那行 JSON, 另附 `result` 原始返回值; SkeinError/ValueError → exit 1 + stderr 原文
+  (同 skein.py `_run_main`), 其余异常 → exit 1 + traceback, 不让命令实现的 bug 打成 500。
+- 工厂给不出同根实例 (serve 进程 cwd 已不在该仓库) → `run` 返回 None, 调用方退回子进程。
+"""
+from __future__ import annotations
+
+import json
+import threading
+import traceback
+from typing import Any, Callable, Optional
+
+from skeinlib.utils.errors import SkeinError
+from skeinlib.utils.exec_policy import exec_call
+
+
+class InProcessExecutor:
+    def __init__(self, factory: Callable[[], Optional[Any]]) -> None:
+        self._factory = factory
+        self._sk: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def run(self, body: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """执行一条看板写命令; 白名单拒绝 → `{"error", ok: False}`, 无可用实例 → None。"""
+        call = exec_call(body)
+        if call is None:
+            return {"error": "参数不合法", "ok": False}
+        from skeinlib.cli.main import command, invoke  # lazy: cli 在 web 之上, 真执行写命令才载入
+
+        cmd, kwargs = call
+        with self._lock:
+            if self._sk is None:
+                self._sk = self._factory()
+                if self._sk is None:
+                    return None
+            try:
+                result = invoke(self._sk, command(cmd, **kwargs))
+            except (SkeinError, ValueError) as e:
+                return {"ok": False, "exit": 1, "stdout": "", "stderr": str(e)}
+            except Exception:
+                return {"ok": False, "exit": 1, "stdout": "", "stderr": traceback.format_exc()}
+        if isinstance(result, dict):
+            out = json.dumps(result, ensure_ascii=False) + "\n"
+        elif result is not None:
+            out = json.dumps({"data": result}, ensure_ascii=False) + "\n"
+        else:
+            out = ""
+        return {"ok": True, "exit": 0, "stdout": out, "stderr": "", "result": result}
@@ -0,0 +1,73 @@
+"""看板 rev 的内存版本号 — `_watch_loop` 的文件事件喂计数器, rev 查询 O(1) 不碰盘。
+
+boardsource 的 `_data_rev` / `_task_mtimes` / `_spec_rev` / `_asset_rev` 每调一次都 stat 全部 task
+文件、rglob spec 与 dist; 前端一直轮询 rev, 看板开一天就遍历 `.skein` 一天。这里按区 (data / spec /
+asset, 各对应一个根目录) 和按 task 各记一个单调计数器, watcher 每批事件 `feed()` 一次, 查询只读内存。
+
+可信范围: 只有 watcher **确认已挂上** (`arm()`, awatch 第一次 yield —— 含超时空批 —— 时底层
+RustNotify 已建好) 且该区根目录在监听列表里, `rev(area)` 才给值, 否则返回 None 由调用方退回 stat
+扫描。`arm()` 把各区都 bump 一次, 兜住挂上之前 (或重挂间隙) 漏掉的事件。被监听目录本身被删 (前端
+重编译 rmtree dist/ 是常态) → inotify 的 watch 随之失效, `feed()` 返回 True 要求调用方重挂。
+rev 串 `<boot>-<n>`: boot 是进程启动时刻, 服务重启后计数从 0 重来也不会撞上重启前的值。
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class Revisions:
+    def __init__(self, tasks_dir: Path, spec_root: Path, dist: Path) -> None:
+        self.roots = {"data": tasks_dir, "spec": spec_root, "asset": dist}
+        self._boot = f"{time.time_ns():x}"
+        self._areas = dict.fromkeys(self.roots, 0)
+        self._task: dict[str, int] = {}  # task id → 该目录下文件事件批次数
+        self._watched: set[Path] = set()
+        self._covered: set[str] = set()
+        self.live = False
+
+    def arm(self, watched: Iterable[Path]) -> None:
+        """watcher 已挂上 `watched` 这些目录: 其下的区转为可信, 各区 bump 一次补间隙。"""
+        self._watched = set(watched)
+        self._covered = {a for a, root in self.roots.items() if root in self._watched}
+        for area in self._areas:
+            self._areas[area] += 1
+        self.live = True
+
+    def feed(self, paths: Iterable[str]) -> bool:
+        """一批变更路径 → bump 涉及的区与 task; 某个被监听目录自身出现在变更里 → True (watch 已失效, 须重挂)。
+
+        task 目录下任何文件都算 (比 `_task_watch_files` 的清单宽: 多推一次无害, 漏推才是 bug);
+        spec 只认 `.md` (`.recall.db` 之类衍生物的写入不算规则变更); dist 下任何文件都算。"""
+        touched: set[str] = set()
+        tids: set[str] = set()
+        rewatch = False
+        for p in paths:
+            path = Path(p)
+            rewatch = rewatch or path in self._watched
+            for area, root in self.roots.items():
+                if not path.is_relative_to(root):
+                    continue
+                if area == "data":
+                    parts = path.relative_to(root).parts
+                    if parts:
+                        tids.add(parts[0])
+                if area != "spec" or path.suffix == ".md":
+                    touched.add(area)
+                break
+        for area in touched:
+            self._areas[area] += 1
+        for tid in tids:
+            self._task[tid] = self._task.get(tid, 0) + 1
+        return rewatch
+
+    def rev(self, area: str) -> Optional[str]:
+        """该区的版本号; watcher 不在或该区根目录没被监听 → None (调用方走 stat 扫描)。"""
+        if not self.live or area not in self._covered:
+            return None
+        return f"{self._boot}-{self._areas[area]}"
+
+    def task_revs(self) -> dict[str, str]:
+        """per-task 版本号 — `_task_mtimes` 的 watcher 版 (定位哪个 task 变了)。"""
+        return {tid: f"{self._boot}-{n}" for tid, n in self._task.items()}
@@ -0,0 +1,194 @@
+"""看板搜索 (`/__skein__/task/search`) — SQLite FTS5 索引, 取代每次按键全量子串扫 + 读遍 spec 文件。
+
+- task / subtask: 进程内 `:memory:` FTS5 表 `board_search`, 一行一个 task 或 subtask (ref/name/body
+  + cjk 影子列, 与 spec/index.py 的 rules 表同一套双字词切法)。按 data rev 同步: rev 没变 (watcher 在、
+  没有文件事件) 连快照都不建; 变了就拿快照逐 task 比文本, 只删掉变了的 task 的行再插回 (rowid 按 task 记)。
+  `_diff_and_push` 每批文件事件后顺手 `sync` —— 只在索引建过之后, 没人搜过不白算。
+- spec: 直接查 `.recall.db` 的 rules 表 (章节粒度, reindex 按 manifest 增量维护), 只读连接。
+  库不在 / 表是旧 schema → 退回逐文件子串扫 (`_spec_scan`)。
+- 查询: 词间 AND; 每个词前缀匹配 (`"词"*`, 边打边搜), 含汉字的词另可由它的双字词全中命中
+  (unicode61 把一整串汉字当一个词, 词中间的字靠 cjk 列)。按 bm25 排序, 名字/标题权重高于正文。
+- 片段: 截命中附近一段, 附 `marks` = [[起, 止), ...] 字符偏移 —— 不往文本里塞 HTML, 前端自己包 <mark>。
+- sqlite 没编 FTS5 (建表失败) / MATCH 出错 → 整体退回 `_view_search` 子串扫 (旧行为)。
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from skeinlib.spec.text import _HAN, _cjk_grams, _cjk_terms
+from skeinlib.web.views import Snapshot, _spec_scan, _view_search
+
+_TASK_LIMIT = 50
+_SPEC_LIMIT = 20
+_SNIP = 120  # 片段字符数
+_LEAD = 30   # 首个命中前留的上文
+
+Row = tuple[str, str, str, str]  # (kind, ref, name, body)
+
+
+def _rows(t: dict[str, Any]) -> tuple[Row, ...]:
+    """一个 task 的索引行: 自身 + 各 subtask (ref = tid/sid)。整组也是增量比对的指纹。"""
+    rows = [("task", t["id"], str(t.get("name") or t["id"]), str(t.get("desc") or ""))]
+    rows += [("subtask", f'{t["id"]}/{s["sid"]}', str(s.get("name") or s["sid"]), str(s.get("desc") or ""))
+             for s in t.get("subtasks", [])]
+    return tuple(rows)
+
+
+def _match(q: str) -> Optional[str]:
+    """查询 → MATCH 串: 词间 AND, 每个词前缀匹配; 含两个以上双字词的另可由双字词全中命中。
+    纯标点的词不参与 (分不出词, 前缀匹配恒不中)。没有可用的词 → None。"""
+    clauses: list[str] = []
+    for tok in q.split():
+        if not re.search(r"\w", tok):
+            continue
+        clause = '"{}"*'.format(tok.replace('"', '""'))
+        grams = [g for run in _HAN.findall(tok) for g in _cjk_grams(run)]
+        if len(grams) > 1:
+            clause = "({} OR ({}))".format(clause, " AND ".join(f'"{g}"' for g in grams))
+        clauses.append(clause)
+    return " AND ".join(clauses) or None
+
+
+def _marks(text: str, q: str) -> list[list[int]]:
+    """text 里查询词 (不分大小写) 的出现区间; 词原样没出现 → 退到它的双字词。重叠的合并。"""
+    spans: list[tuple[int, int]] = []
+    for tok in q.split():
+        terms = [tok] if re.search(re.escape(tok), text, re.I) else \
+            [g for run in _HAN.findall(tok) for g in _cjk_grams(run)]
+        for term in terms:
+            spans += [(m.start(), m.end()) for m in re.finditer(re.escape(term), text, re.I)]
+    merged: list[list[int]] = []
+    for a, b in sorted(spans):
+        if merged and a <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return merged
+
+
+def _snippet(text: str, q: str) -> dict[str, Any]:
+    """命中附近一段 (折成单行) + 段内 marks 偏移; 没命中 (只中了名字) → 开头一段。"""
+    text = " ".join(text.split())
+    marks = _marks(text, q)
+    start = max(0, marks[0][0] - _LEAD) if marks else 0
+    end = start + _SNIP
+    pre = "…" if start else ""
+    snip = pre + text[start:end] + ("…" if end < len(text) else "")
+    shift = len(pre) - start
+    return {"snippet": snip, "marks": [[a + shift, min(b, end) + shift] for a, b in marks if a < end]}
+
+
+class SearchIndex:
+    """task/subtask 的内存 FTS5 表 + spec 走 `.recall.db`。线程安全 (一把锁串行同步与查询)。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._con: Optional[sqlite3.Connection] = None
+        self._broken = False  # 建表失败 (没有 FTS5): 之后一律子串扫, 不每次重试
+        self._rev: Optional[str] = None  # 上次同步时的 data rev; None = 下次查询必同步
+        self._rows: dict[str, tuple[tuple[Row, ...], list[int]]] = {}  # tid → (行, rowid)
+        self._spec_root: Optional[Path] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._con is not None
+
+    def invalidate(self) -> None:
+        """本进程刚写过盘: 下次查询按新快照同步, 不等 watcher 事件把 rev 推上去。"""
+        with self._lock:
+            self._rev = None
+
+    def sync(self, snap: Snapshot, rev: Optional[str]) -> None:
+        """watcher 批次后调用: 索引建过才同步 (只改动过的 task 重写行)。"""
+        with self._lock:
+            if self._con is not None:
+                self._sync(snap, rev)  # 失败已清空, 下次查询全量插回
+
+    def search(self, q: Any, rev: Optional[str], snap_fn: Callable[[], Snapshot]) -> dict[str, Any]:
+        """同 `_view_search` 的返回形状, hit 另带 marks。rev 与上次同步一致 → 不建快照。"""
+        q = (q or "").strip().lower()
+        match = _match(q)
+        if match is None:
+            return {"query": q, "hits": []}
+        with self._lock:
+            if self._con is None and not self._broken:
+                try:
+                    self._con = sqlite3.connect(":memory:", check_same_thread=False)
+                    self._con.execute(
+                        "CREATE VIRTUAL TABLE board_search USING fts5(kind UNINDEXED, ref, name, body, cjk)")
+                except sqlite3.OperationalError:
+                    self._con, self._broken = None, True
+            if self._con is None:
+                return _view_search(snap_fn(), q)
+            if (rev is None or rev != self._rev) and not self._sync(snap_fn(), rev):
+                return _view_search(snap_fn(), q)
+            try:
+                rows = self._con.execute(
+                    "SELECT kind, ref, name, body FROM board_search WHERE board_search MATCH ? "
+                    "ORDER BY bm25(board_search, 0, 2, 4, 1, 1) LIMIT ?", (match, _TASK_LIMIT)).fetchall()
+            except sqlite3.OperationalError:
+                return _view_search(snap_fn(), q)
+            root = self._spec_root
+        hits = [{"kind": kind, "id": ref, "name": name, **_snippet(body or name, q)}
+                for kind, ref, name, body in rows]
+        if root is not None:
+            hits.extend(self._spec_hits(root, q, match))
+        return {"query": q, "hits": hits}
+
+    def _sync(self, snap: Snapshot, rev: Optional[str]) -> bool:
+        assert self._con is not None
+        con = self._con
+        self._spec_root = snap.spec_root
+        try:
+            with con:
+                seen: set[str] = set()
+                for t in snap.tasks:
+                    tid = t["id"]
+                    seen.add(tid)
+                    rows = _rows(t)
+                    old = self._rows.get(tid)
+                    if old is not None and old[0] == rows:
+                        continue
+                    if old is not None:
+                        self._delete(old[1])
+                    ids = [int(con.execute(
+                        "INSERT INTO board_search(kind, ref, name, body, cjk) VALUES (?,?,?,?,?)",
+                        (*r, _cjk_terms(f"{r[2]}\n{r[3]}"))).lastrowid or 0) for r in rows]
+                    self._rows[tid] = (rows, ids)
+                for tid in set(self._rows) - seen:
+                    self._delete(self._rows.pop(tid)[1])
+        except sqlite3.Error:
+            # 事务已回滚, 但 _rows 可能改了一半: 清空, 下次全量插回
+            con.execute("DELETE FROM board_search")
+            self._rows.clear()
+            self._rev = None
+            return False
+        self._rev = rev
+        return True
+
+    def _delete(self, ids: list[int]) -> None:
+        assert self._con is not None
+        self._con.execute(f"DELETE FROM board_search WHERE rowid IN ({','.join('?' * len(ids))})", ids)
+
+    @staticmethod
+    def _spec_hits(root: Path, q: str, match: str) -> list[dict[str, Any]]:
+        db = root / ".recall.db"
+        if not db.exists():
+            return _spec_scan(root, q)
+        try:
+            con = sqlite3.connect(db.as_uri() + "?mode=ro", uri=True)
+            try:
+                rows = con.execute(
+                    "SELECT path, title, body FROM rules WHERE rules MATCH ? "
+                    "ORDER BY bm25(rules, 0, 0, 4, 2, 1, 0, 0, 0, 0, 1) LIMIT ?",
+                    (f"{{title keywords body cjk}} : ({match})", _SPEC_LIMIT)).fetchall()
+            finally:
+                con.close()
+        except sqlite3.Error:  # 旧 schema 缺 cjk 列 / 正在全量重建 (表刚 DROP)
+            return _spec_scan(root, q)
+        return [{"kind": "spec", "id": Path(path).as_posix(), "name": title, **_snippet(body, q)}
+                for path, title, body in rows]
@@ -21,10 +21,13 @@ from typing import Any, AsyncIterator, Callable, Iterable, Optional, cast
 from skeinlib.utils.debug import debug_enabled
 from skeinlib.utils.paths import PLUGIN_ROOT, SPEC_ENTRY
 from skeinlib.utils.exec_policy import SLUG_RE, exec_argv
-import yaml
-from skeinlib.config import Config, ConfigData
-from skeinlib.web.views import (DataSource, _cards_signature, _spec_frontmatter, _view_archive,
-                            _view_board_data, _view_dashboard, _view_queue, _view_search,
+from skeinlib.web.delta import DeltaFeed, view_doc
+from skeinlib.web.executor import InProcessExecutor
+from skeinlib.web.revs import Revisions
+from skeinlib.web.search import SearchIndex
+from skeinlib.web.snapcache import SnapshotCache
+from skeinlib.web.views import (DataSource, Snapshot, _cards_signature, _spec_frontmatter, _view_archive,
+                            _view_board_data, _view_dashboard, _view_queue,
                             _view_task_detail)
 
 
@@ -247,42 +250,68 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
     _g["WebSocket"] = WebSocket
 
     clients: set[Any] = set()  # 活跃热重载 WS 连接
+    deltas: set[Any] = set()   # 其中发过 resync 的: 收 JSON Patch 增量 (delta.py), 不再收 task-changed/data
+    feed = DeltaFeed()
+    # rev 端点的内存计数器, _watch_loop 喂; watcher 没挂上 (revs.live=False) 时端点退回 board 的 stat 扫描
+    revs = Revisions(Path(str(board.tasks)), Path(str(board.dir)) / "spec", dist_dir())
+    # 各视图共用的 Snapshot: 同一 data rev 只扫一次盘 (snapcache.py); 本进程写盘后 invalidate
+    snaps = SnapshotCache(lambda: board._snapshot())
+
+    config_file = Path(str(board.dir)) / "config.yaml"
+    archive_root = getattr(board, "archive_dir", None)
+
+    def _side_rev() -> tuple[Any, ...]:
+        # watcher 不盯、却进了 Snapshot 的: config.yaml (池上限) + 归档目录 (archive/<年>/<月>/<tid>)。
+        # 别的进程 `skein config set` / 归档不推 data rev, 靠这份 stat 签名让缓存失效
+        def mt(p: Path) -> int:
+            try:
+                return p.stat().st_mtime_ns
+            except OSError:
+                return 0
+        paths = [config_file] + ([archive_root, *sorted(archive_root.glob("*/*"))] if archive_root is not None else [])
+        return tuple(mt(p) for p in paths)
+
+    def _snap() -> Snapshot:
+        rev = revs.rev("data")
+        return snaps.get(rev, _side_rev() if rev is not None else ())
+    search = SearchIndex()  # task/subtask FTS, 首次搜索才建; 之后随 watcher 批次增量同步
+    # 写命令进程内执行器: 生产 adapter 才提供 `_exec_session` (DataSource 只列读面), 假 board 恒走子进程
+    session = getattr(board, "_exec_session", None)
+    executor = InProcessExecutor(session) if session is not None else None
 
     async def _watch_loop() -> None:
         # watchfiles (Rust 后端 notify) 事件驱动 — 监听 task 目录 + spec 目录 + 前端源码, 文件变即触发。
         # 数据变 (task.json + 文档) → 两路:
         #   (a) _cards_signature diff 命中 (status/计数/字段) → 逐 task id 推 {type:"task-changed", id, card}
         #       (card 含看板卡片全字段 + subtable, board 页 + detail 页据此增量刷新)。
-        #   (b) 卡片 sig 无差异但 _task_mtimes 变 (design/findings/research 编辑) → 仍推 task-changed,
+        #   (b) 卡片 sig 无差异但该 task 目录有文件事件 (design/findings/research 编辑) → 仍推 task-changed,
         #       card 用当前快照 (让 detail 页 load() 重拉富内容); board 卡片 sig 未变 → spread 合并是 no-op, 安全。
         #   (c) 兜底: 都无差异 (仅 mtime 变内容未变) → 推 {type:"data"} 全订阅软刷。
         # spec 变 (.skein/spec/*.md) → 推 {type:"spec-changed", path:""}; path 暂空 (spec 页全订阅, 不细粒度)。
         # 前端源码变 (assets/nextjs/src/**) → 自动 build → 推 {type:"reload"} 整页刷。
+        # 每批事件先喂 revs (data/spec/asset + per-task 计数), rev 端点与 (b) 的「哪个 task 变了」都读它,
+        # 不再每次 stat 全部 task 文件 / rglob dist。dist/ 也进监听, 只为 asset 计数 (不触发推送);
+        # 被监听的根目录自身被删 (重编译 rmtree dist/) → watch 已死, 按当下存在的目录重挂一次 awatch。
         # ponytail: diff 范围限 status/关键字段 (不深比), O(n) n=task 数, 仅事件触发时跑。
         # 兼容: 保留字符串 "reload"/"data" (T2 live.js dispatch 兜底); 新 JSON 为主, 旧字符串作 fallback。
+        # 增量订阅者 (deltas) 不走 (a)-(c): 收 {type:"patch", seq, ops, touched} —— board+queue 视图相邻两版的
+        # RFC 6902 差量, touched 即 (b) 的 task id; 无差异无文件事件则不推 (不会整页重载)。
         import watchfiles
 
-        watch_dirs: list[Path] = [Path(str(board.tasks))]
         spec_root = Path(str(board.dir)) / "spec"
-        if spec_root.exists():
-            watch_dirs.append(spec_root)
         nextjs_src = PLUGIN_ROOT / "assets" / "nextjs" / "src"
         nextjs_root = PLUGIN_ROOT / "assets" / "nextjs"
         front_watch_enabled = nextjs_src.is_dir()
-        if front_watch_enabled:
-            watch_dirs.append(nextjs_src)
+        candidates = [Path(str(board.tasks)), spec_root, dist_dir()] + ([nextjs_src] if front_watch_enabled else [])
 
         # 前端重编译状态: build 进行中时置 True, 跳过期间的新事件 (防抖)。
         front_building = False
 
         try:
-            last_cards = _cards_signature(_view_board_data(board._snapshot()))
+            last_cards = _cards_signature(_view_board_data(_snap()))
         except Exception:
             last_cards = {}
-        try:
-            last_task_mtimes = board._task_mtimes()
-        except Exception:
-            last_task_mtimes = {}
+        last_task_revs = revs.task_revs()
 
         async def _push_reload() -> None:
             """前端重编译完成 → 推 reload, 浏览器整页刷拉新 dist 产物。"""
@@ -323,24 +352,26 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
                 front_building = False
 
         async def _diff_and_push() -> None:
-            """文件变更后: 算 card sig diff + per-task mtime diff → 推 WS。"""
-            nonlocal last_cards, last_task_mtimes
+            """文件变更后: 算 card sig diff + per-task rev diff → 推 WS。"""
+            nonlocal last_cards, last_task_revs
             msgs: list[str] = []
+            doc: Optional[dict[str, Any]] = None
             try:
-                board_data = _view_board_data(board._snapshot())
+                snap = _snap()
+                board_data = _view_board_data(snap)
                 new_cards = _cards_signature(board_data)
                 card_by_id = {c["id"]: c for c in board_data.get("cards", [])}
+                if deltas:  # 同一个 snap: queue 视图复用已扫的 task 列表
+                    doc = view_doc(board_data, _view_queue(snap))
+                search.sync(snap, revs.rev("data"))  # 只重写文本变了的 task; 索引没建过则不动
             except Exception:
                 new_cards = {}
                 card_by_id = {}
             changed = [tid for tid, sig in new_cards.items() if last_cards.get(tid) != sig]
             removed = [tid for tid in last_cards if tid not in new_cards]
-            try:
-                cur_task_mtimes = board._task_mtimes()
-            except Exception:
-                cur_task_mtimes = {}
-            doc_changed = [tid for tid, mt in cur_task_mtimes.items()
-                           if last_task_mtimes.get(tid) != mt and tid not in changed and tid not in removed]
+            cur_task_revs = revs.task_revs()
+            doc_changed = [tid for tid, rv in cur_task_revs.items()
+                           if last_task_revs.get(tid) != rv and tid not in changed and tid not in removed]
             for tid in changed:
                 msgs.append(json.dumps({"type": "task-changed", "id": tid, "card": card_by_id.get(tid)}))
             for tid in removed:
@@ -351,17 +382,32 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
             if not msgs:
                 msgs.append("data")  # 兜底: 无差异但文件确实变, 全订阅软刷
             last_cards = new_cards
-            last_task_mtimes = cur_task_mtimes
-            if msgs and clients:
+            last_task_revs = cur_task_revs
+            patch: Optional[str] = None
+            if doc is None:
+                if not deltas:
+                    feed.reset(None)  # 无订阅者: 丢基线, 下个 resync 现算快照
+                # 有订阅者但视图算崩: 基线不动, 下一批的 patch 连这批一起补上
+            else:
+                ops = feed.advance(doc, force=bool(doc_changed))
+                if ops is not None:
+                    patch = json.dumps({"type": "patch", "seq": feed.seq, "ops": ops, "touched": doc_changed})
+            if clients:
                 if debug_enabled(None):
                     ts = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                    sys.stderr.write(f"{ts} [ws] push {len(clients)} clients: {msgs[:3]}\n")
+                    sys.stderr.write(f"{ts} [ws] push {len(clients)} clients: {msgs[:3]}"
+                                     f" (delta {len(deltas)}: {len(patch or '')}B)\n")
+                # 订阅者: 有 patch 推 patch; 文件变了但视图无差异 (msgs 只剩 "data" 兜底) 照旧推 "data",
+                # 否则 queue/dashboard/archive 这类只会整页重拉的页面收不到任何信号
+                fallback = msgs if msgs == ["data"] else []
                 for c in list(clients):
-                    for msg in msgs:
+                    out = ([patch] if patch else fallback) if c in deltas else msgs
+                    for msg in out:
                         try:
                             await c.send_text(msg)
                         except Exception:
                             clients.discard(c)
+                            deltas.discard(c)
 
         async def _spec_changed() -> None:
             """spec 文件变更 → 推 spec-changed (无需重建缓存, 由 spec/index.py 维护)。"""
@@ -377,7 +423,7 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
                 except Exception:
                     clients.discard(c)
 
-        async for changes in watchfiles.awatch(*watch_dirs):
+        async def _route(changes: set[tuple[Any, str]]) -> None:
             # changes 是 set[(change_type, path)]; 判定来源目录 → 分别路由
             any_task = any(Path(p).is_relative_to(board.tasks) for _, p in changes)
             any_spec = spec_root.exists() and any(Path(p).is_relative_to(spec_root) for _, p in changes)
@@ -395,6 +441,27 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
             elif any_front and front_building:
                 sys.stderr.write(f"{ts} [watch] frontend src changed but build in progress, skipped\n")
 
+        # yield_on_timeout: 空闲时也定期吐空批 —— 第一次 yield 即证明 watcher 已挂上, revs 才 arm
+        try:
+            rewatch = True
+            while rewatch:
+                rewatch = False
+                revs.live = False
+                watch_dirs = [p for p in candidates if p.is_dir()]
+                if not watch_dirs:
+                    return
+                async for changes in watchfiles.awatch(*watch_dirs, yield_on_timeout=True):
+                    if not revs.live:
+                        revs.arm(watch_dirs)
+                    if not changes:
+                        continue  # 超时空批: 只用来确认 watcher 在
+                    rewatch = revs.feed(p for _, p in changes)
+                    await _route(changes)
+                    if rewatch:
+                        break
+        finally:
+            revs.live = False  # watcher 退出/崩了 → rev 端点退回 stat 扫描
+
     @asynccontextmanager
     async def lifespan(_app: Any) -> AsyncIterator[None]:
         # serve 启动时无需建缓存, 数据已由 spec/index.py 的 _rebuild_spec_meta() 维护
@@ -459,6 +526,13 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
                         return JSONResponse({"error": "bad json", "ok": False}, status_code=400)
         return await call_next(request)
 
+    def _json_rev() -> str:
+        # 同 _task_json_rev 的 data.asset 形状。watcher 在 → 内存计数 O(1); 不在 (未挂上 / 无 watchfiles /
+        # 已退出) → 整个退回 board stat 扫描; 在但某区根目录没被监听 (dist/ 重编译后还没建回来) → 只那区退回。
+        if not revs.live:
+            return board._task_json_rev()
+        return f"{revs.rev('data') or board._data_rev()}.{revs.rev('asset') or board._asset_rev()}"
+
     # ---- 基础设施端点 (GET, 非 业务 API) ----
     @app.get(board._LOCK_ID_PATH, response_class=PlainTextResponse)
     async def _identify() -> str:  # 身份探测: 返回项目标识 (.skein 绝对路径)。probe_same_project 用 urllib GET。
@@ -466,7 +540,7 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
 
     @app.get(board._REV_PATH, response_class=PlainTextResponse)
     async def _rev() -> str:  # 版本探测: WS 不可用时前端轮询兜底。
-        return board._task_json_rev()
+        return _json_rev()
 
     @app.get("/", response_class=HTMLResponse)
     async def _page() -> str:  # 首页: Next.js static export dist/index.html
@@ -482,11 +556,23 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
         clients.add(ws)
         try:
             while True:
-                await ws.receive_text()  # 客户端不发则阻塞; 断开抛异常
+                text = await ws.receive_text()  # 客户端不发则阻塞; 断开抛异常
+                # 唯一的上行消息: {"type":"resync"} —— 订阅增量 / 序号断档后要全量快照 (见 delta.py)
+                try:
+                    req = json.loads(text)
+                except ValueError:
+                    continue
+                if isinstance(req, dict) and req.get("type") == "resync":
+                    if feed.doc is None:
+                        snap = _snap()
+                        feed.reset(view_doc(_view_board_data(snap), _view_queue(snap)))
+                    deltas.add(ws)
+                    await ws.send_text(json.dumps(feed.snapshot()))
         except Exception:
             pass
         finally:
             clients.discard(ws)
+            deltas.discard(ws)
 
     # ---- POST-only 业务端点 (语义化路径 /domain/action; 入参全走 body) ----
     def _body(request: Request) -> dict[str, Any]:
@@ -508,12 +594,25 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
             return {"error": str(e), "ok": False}
         return {"ok": r.returncode == 0, "exit": r.returncode, "stdout": r.stdout, "stderr": r.stderr}
 
+    def _exec(body: dict[str, Any], argv: list[str]) -> dict[str, Any]:
+        # 写命令出口: web.exec=inprocess (默认) 且 adapter 给得出执行实例 → 进程内; 否则 skein 子进程。
+        # 每次现读配置 (config() 按文件签名缓存), 改 web.exec 不用重启 serve。
+        try:
+            if executor is not None and (board.config().get("web") or {}).get("exec", "inprocess") == "inprocess":
+                result = executor.run(body)
+                if result is not None:
+                    return result
+            return _run_cli(argv)
+        finally:
+            snaps.invalidate()  # 写完前端立刻重拉, 不能等 watcher 事件推 rev
+            search.invalidate()
+
     def _cli_from_cmd(cmd: str, body: dict[str, Any]) -> Any:
         body["cmd"] = cmd
         argv = exec_argv(body)
         if argv is None:
             return JSONResponse({"error": "参数不合法", "ok": False}, status_code=400)
-        return _run_cli(argv)
+        return _exec(body, argv)
 
     # ── 系统 ──
     @app.post("/__skein__/system/id")
@@ -522,7 +621,7 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
 
     @app.post("/__skein__/system/rev")
     async def _system_rev() -> JSONResponse:
-        return JSONResponse({"rev": board._task_json_rev()})
+        return JSONResponse({"rev": _json_rev()})
 
     @app.post("/__skein__/system/config-get")
     async def _config_get() -> JSONResponse:
@@ -533,6 +632,8 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
         body = _body(request)
         # hooks 禁远程写 (值是 shell 命令 = RCE), 保留盘上原值; 其余键以盘上值为底、body 覆盖 —
         # 部分字段 POST 不许把未提及字段抹回默认值
+        from skeinlib.config import Config, ConfigData  # pydantic 只在真写配置时才 import
+
         config = Config(board.dir / "config.yaml")
         disk = config.cfg.model_dump(by_alias=True)
         merged = {**disk, **{k: v for k, v in body.items() if k != "hooks"}}
@@ -542,31 +643,32 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
             # 校验失败直接 400, 不落盘 — 默认值兜底会把整份用户配置静默抹掉
             return JSONResponse({"error": "config 校验失败", "ok": False}, status_code=400)
         config._write()
+        snaps.invalidate()  # Snapshot 带着池上限 (pools), config.yaml 又不在 watcher 的 data 区
         return JSONResponse({"ok": True, "config": config.cfg.model_dump(by_alias=True)})
 
     # ── Task ──
     @app.post("/__skein__/task/list")
     async def _task_list() -> JSONResponse:
-        return JSONResponse(_view_board_data(board._snapshot()))
+        return JSONResponse(_view_board_data(_snap()))
 
     @app.post("/__skein__/task/dashboard")
     async def _task_dashboard() -> JSONResponse:
-        return JSONResponse(_view_dashboard(board._snapshot()))
+        return JSONResponse(_view_dashboard(_snap()))
 
     @app.post("/__skein__/task/queue")
     async def _task_queue() -> JSONResponse:
-        return JSONResponse(_view_queue(board._snapshot()))
+        return JSONResponse(_view_queue(_snap()))
 
     @app.post("/__skein__/task/get")
     async def _task_get(request: Request) -> Any:
         body = _body(request)
-        d = _view_task_detail(board._snapshot(), body.get("id", ""))
+        d = _view_task_detail(_snap(), body.get("id", ""))
         return JSONResponse(d) if d else JSONResponse({"error": "task 不存在"}, status_code=404)
 
     @app.post("/__skein__/task/search")
     async def _task_search(request: Request) -> JSONResponse:
         body = _body(request)
-        return JSONResponse(_view_search(board._snapshot(), body.get("q", "")))
+        return JSONResponse(search.search(body.get("q", ""), revs.rev("data"), _snap))
 
     @app.post("/__skein__/task/create")
     def _task_create(request: Request) -> Any:
@@ -590,7 +692,7 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
         argv = [sys.executable, str(SPEC_ENTRY.parent.parent / "skein.py"), "finish", tid]
         if body.get("force") is True:
             argv.append("--force")
-        result = _run_cli(argv)
+        result = _exec({"cmd": "finish", "id": tid, "force": body.get("force") is True}, argv)
         result["id"] = tid
         return result
 
@@ -716,7 +818,7 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
     # ── 归档 ──
     @app.post("/__skein__/archive/list")
     async def _archive_list() -> JSONResponse:
-        return JSONResponse(_view_archive(board._snapshot()))
+        return JSONResponse(_view_archive(_snap()))
 
     @app.post("/__skein__/archive/delete")
     async def _archive_delete(request: Request) -> JSONResponse:
@@ -724,12 +826,13 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
         tid = body.get("id")
         if not isinstance(tid, str) or SLUG_RE.fullmatch(tid) is None:
             return JSONResponse({"error": "id 必填且禁路径分隔符"}, status_code=400)
-        snap = board._snapshot()
+        snap = _snap()
         src = snap.archived_path(tid)
         if src is None or not src.exists():
             return JSONResponse({"error": f"归档任务不存在: {tid}"}, status_code=404)
         # DataSource (views.py) 只列读面; trash 是 Workspace 的写协议, 走注入对象的实现
         dst = cast(Any, board).trash(src, tid)
+        snaps.invalidate()
         return JSONResponse({"ok": True, "moved": str(dst)})
 
     # ── 回收站 ──
@@ -772,12 +875,14 @@ def build_app(board: "DataSource", proj_id: str, quiet: bool,
                 return JSONResponse({"error": f"垃圾桶中不存在: {tid}"}, status_code=404)
             for m in matches:
                 shutil.rmtree(m)
+            snaps.invalidate()
             return JSONResponse({"ok": True, "purged": [m.name for m in matches]})
         count = 0
         for d in trash_dir.iterdir():
             if d.is_dir():
                 shutil.rmtree(d)
                 count += 1
+        snaps.invalidate()
         return JSONResponse({"ok": True, "purged_count": count})
 
     # static export: 每路由有 index.html, mount dist/ 为根 + html=true。
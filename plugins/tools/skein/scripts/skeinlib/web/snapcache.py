@@ -0,0 +1,50 @@
+"""跨请求共享的 `Snapshot` — 按数据 rev 记一份, 同 rev 的请求复用同一个 (已扫好的) Snapshot。
+
+`Snapshot` 的惰性缓存只活一个请求: 看板页一次加载要打 board / dashboard / queue / counts 好几个
+端点, 每个各建一个 Snapshot 各扫一遍 `.skein/task`。这里按 rev 共享: rev 不变就把同一个 (已扫好的)
+Snapshot 交给所有视图, `_diff_and_push` 算推送时建的那份, 紧随其后被推送触发的前端重拉直接命中。
+
+- rev: 只认 watcher 喂的内存计数 (`Revisions.rev("data")`)。watcher 不在 → None → 不缓存, 每请求
+  现建 (同旧行为) —— stat 版 `_data_rev` 本身就要 stat 全部 task 文件, 省不下什么。
+- side: watcher 不盯、却进了 Snapshot 的东西 (config.yaml 的池上限、归档目录) 由调用方给一个 stat
+  签名并入 key —— 别的进程 `skein config set` / 动归档不推 data rev, 也不会拿到旧快照。
+- 本进程的写 (看板写端点、config-set、归档删除、回收站) 不等 watcher 事件: 调用方 `invalidate()` 换代,
+  写完立刻重拉的请求不会拿到写之前的快照。key = (rev, side, 代)。
+- 不做 single-flight: 调用方全是 event loop 上的 async 端点, 同一时刻只有一个 get 在跑, 等待别人建
+  只会卡住 loop。建的时候抛了就不记, 下一个 get 重建。`invalidate` 可能来自线程池里的同步写端点:
+  它只换代, get 的 key 带着建之前读到的代, 旧代建出的快照不会被之后的 get 命中。
+- 视图对 Snapshot 只读 (`_view_*` 全是纯函数), 共享才成立; 给视图加写 Snapshot 的逻辑前先看这里。
+"""
+from __future__ import annotations
+
+from typing import Callable, Hashable, Optional
+
+from skeinlib.web.views import Snapshot
+
+
+class SnapshotCache:
+    def __init__(self, build: Callable[[], Snapshot]) -> None:
+        self._build = build
+        self._gen = 0
+        self._key: Optional[Hashable] = None
+        self._snap: Optional[Snapshot] = None
+        self.builds = 0  # 实建次数 (测试/调试观测用)
+
+    def invalidate(self) -> None:
+        """本进程刚写过盘: 之后的 get 一律重建, 不等 watcher 事件把 rev 推上去。"""
+        self._gen += 1
+        self._key = self._snap = None
+
+    def get(self, rev: Optional[str], side: Hashable = ()) -> Snapshot:
+        if rev is None:
+            self.builds += 1
+            return self._build()
+        key = (rev, side, self._gen)
+        if self._key == key and self._snap is not None:
+            return self._snap
+        snap = self._build()
+        self.builds += 1
+        snap.tasks  # 先扫好再共享: 之后各视图拿到的都是现成的
+        snap.all_tasks
+        self._key, self._snap = key, snap
+        return snap
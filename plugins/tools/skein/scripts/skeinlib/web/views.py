@@ -13,6 +13,7 @@ from typing import Any, Callable, Optional, Protocol, cast
 
 from skeinlib.task.dag import _pending_queue, _sub_pct, _task_pct, _task_stage
 from skeinlib.task.model import (PRIORITY_DEFAULT, SubtaskStatus, STATUS_ACTIVE, STATUS_INFLIGHT, STATUS_ORDER, TaskStatus, now)
+from skeinlib.task import timeline as _timeline
 from skeinlib.task.timeline import fmt_ts as _fmt_ts
 from skeinlib.task.specfile import load_spec
 
@@ -20,7 +21,9 @@ class Snapshot:
     """一次目录扫描的 task/subtask 内存快照 — board 视图的统一输入。
     惰性: tasks(渲染源)/all_tasks(严格真值) 首次访问才扫盘并缓存; design/task.json 按需读 (task_path)。
     → task_detail 只碰路径不触发全量扫描 (旧行为), 其余视图访问 .tasks 时才实扫。
-    dep_unfinished 由缓存态 O(1) 判定 (取代逐 dep 读盘)。构造经 Skein._snapshot(), 每请求一次。"""
+    dep_unfinished 由缓存态 O(1) 判定 (取代逐 dep 读盘)。构造经 Skein._snapshot(); serve 里按 data rev
+    跨请求共享 (snapcache.py), 所以视图对它只读。
+    两个取数函数背后是同一个 `TaskScan`: 先访问的那个读盘, 后一个只剩 stat。"""
 
     def __init__(self, *, proj: str, wt_shown: bool,
                  tasks_fn: Callable[[], list[dict[str, Any]]],
@@ -265,7 +268,7 @@ def _view_task_detail(snap: Snapshot, tid: str) -> Optional[dict[str, Any]]:
     return {"task": {**data, **load_spec(tdir.parent, data.get("id") or tid)},
             "docs": docs, "research": research, "archived": archived,
             "subtasks": data.get("subtasks", []),
-            "timeline": data.get("timeline", []),  # 原样带出, 不聚合; 老 task 缺字段回落空列表
+            "timeline": _timeline.merged(tdir, data),  # 内嵌老事件 + timeline.jsonl, 不聚合; 都没有回落空列表
             "maxActive": snap.pool_work,  # 前端 ETA 折算并行墙钟用
             "progress": _task_pct(data),
             "stage": _task_stage(data), "depTasks": dep_tasks, "dependents": dependents}
@@ -437,7 +440,8 @@ def _view_queue(snap: Snapshot) -> dict[str, Any]:
             "readyTasks": ready_tasks, "readySubtasks": ready_subs,
             "activeTasks": active_tasks, "runningSubs": running_subs}
 def _view_search(snap: Snapshot, q: Any) -> dict[str, Any]:
-    # 跨 task/subtask/spec 关键词 (子串, 不分词): 命中即返回一条 {kind,id,name,snippet}
+    # 跨 task/subtask/spec 关键词 (子串, 不分词): 命中即返回一条 {kind,id,name,snippet}。
+    # 端点走 web/search.py 的 FTS 索引; 这里是它的降级路径 (sqlite 没有 FTS5 / MATCH 出错)
     q = (q or "").strip().lower()
     if not q:
         return {"query": q, "hits": []}
@@ -450,7 +454,11 @@ def _view_search(snap: Snapshot, q: Any) -> dict[str, Any]:
             if q in " ".join(str(x or "") for x in (s["sid"], s.get("name", ""), s.get("desc", ""))).lower():
                 hits.append({"kind": "subtask", "id": f'{t["id"]}/{s["sid"]}',
                              "name": s.get("name", s["sid"]), "snippet": s.get("desc", "")})
-    root = snap.spec_root
+    hits.extend(_spec_scan(snap.spec_root, q))
+    return {"query": q, "hits": hits}
+def _spec_scan(root: Path, q: str) -> list[dict[str, Any]]:
+    # spec 逐文件子串扫 (q 已小写); web/search.py 查不了 .recall.db 时也退到这里
+    hits: list[dict[str, Any]] = []
     if root.exists():
         for f in sorted(root.rglob("*.md")):
             if f.name == "index.md":
@@ -458,7 +466,7 @@ def _view_search(snap: Snapshot, q: Any) -> dict[str, Any]:
             if q in f.read_text(encoding="utf-8", errors="replace").lower():
                 rel = f.relative_to(root).as_posix()
                 hits.append({"kind": "spec", "id": rel, "name": rel, "snippet": ""})
-    return {"query": q, "hits": hits}
+    return hits
 class DataSource(Protocol):
     """serve 层 (build_app) 消费的只读数据面 seam — Skein 结构性满足 (无需继承)。
     真实 Skein + 测试假源 = 两个 adapter, 令路由脱 uvicorn 经 TestClient 单测。
@@ -475,7 +483,6 @@ class DataSource(Protocol):
     _LIVE_PATH: str
     def _asset_rev(self) -> str: ...
     def _data_rev(self) -> str: ...
-    def _task_mtimes(self) -> dict[str, str]: ...
     def _task_json_rev(self) -> str: ...
     def _snapshot(self) -> "Snapshot": ...
     def _webapp_html(self) -> str: ...
@@ -12,6 +12,7 @@ import os
 import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
 from typing import Callable, Optional
 
@@ -107,6 +108,21 @@ def make_spec_ws(d: Path) -> Path:
     return d
 
 
+def write_rule(ws: Path, ns: str, cat: str, topic: str, body: str, fm: str = "") -> Path:
+    """`.skein/spec/<ns>/<cat>/<topic>.md`: frontmatter 原文 fm (逐行带换行) + 正文。"""
+    f = ws / ".skein" / "spec" / ns / cat / f"{topic}.md"
+    f.parent.mkdir(parents=True, exist_ok=True)
+    f.write_text(f"---\n{fm}---\n\n{body}\n")
+    return f
+
+
+def age_files(*files: Path) -> None:
+    """mtime 拨回 10s: 出 racy 窗口 (utils/fs.py), stat 签名缓存才会复用 —— 刚写的文件照规矩每次重读。"""
+    t = time.time_ns() - 10_000_000_000
+    for f in files:
+        os.utime(f, ns=(t, t))
+
+
 # ── pytest adapter (同一实现, 换成注入形态) ───────────────────────────────────
 import pytest  # noqa: E402  (放在实现之后, 让上半段 import 时不必有 pytest)
 
@@ -131,6 +147,32 @@ def hooks_cli() -> HooksCli:
     return run_hooks
 
 
+@pytest.fixture
+def spec_rule() -> Callable[..., Path]:
+    return write_rule
+
+
+@pytest.fixture
+def aged() -> Callable[..., None]:
+    return age_files
+
+
+# ── 墙钟基准: 默认跳过 ────────────────────────────────────────────────────────
+# 「缓存路径耗时至多为对照的 N 成」这类比例断言在负载高的 CI 上时绿时红; 缓存是否生效由各文件
+# 的命中/未命中计数用例守着, 基准只供手动比对: `SKEIN_BENCHMARK=1 pytest` 或 `pytest -m benchmark`。
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "benchmark: 墙钟比例基准, 默认跳过 (SKEIN_BENCHMARK=1 或 -m benchmark 开)")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if os.environ.get("SKEIN_BENCHMARK") == "1" or "benchmark" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="墙钟基准默认不跑 (SKEIN_BENCHMARK=1 开)")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 # ── 工作区模板 (session 级建一次, 各测试 copytree) ────────────────────────────
 # 造一个工作区要 6 个子进程 (5 git + 1 init) ≈ 208ms; 全套 ~180 个测试用它, 光 fixture 就
 # 37 秒。改成建一次模板再逐个复制: copytree 一个 31 文件的小仓 ≈ 3ms。
@@ -1,8 +1,8 @@
 """config 命令测试 — skein.py config [set <key> <value> | reset]。
 
 经 conftest 的 skein_cli/ws fixture 跑真实 skein.py CLI 子进程 (tmp_path 隔离)。
-CONFIG_DEFAULTS 10 叶 (pools.work/pools.gate/auto_commit/retain_days/worktree.enabled/worktree.root/
-web.serve/web.board_open/spec.core_budget/spec.always_budget)。
+CONFIG_DEFAULTS 14 叶 (pools.work/pools.gate/auto_commit/retain_days/worktree.enabled/worktree.root/
+web.serve/web.board_open/web.exec/spec.core_budget/spec.always_budget/spec.recall/confirm.unattended/scheduling.weight)。
 报错用例传 check=False 断 returncode + stderr 文案。
 
 全部命令缺省输出结构化 JSON；`--show` 改为人读面板:
@@ -60,9 +60,9 @@ def _readback(skein_cli: SkeinCli, ws: Path, path: str) -> str | None:
 
 # ---------- 1. 展示全部 ----------
 def test_show_all(skein_cli: SkeinCli, ws: Path) -> None:
-    """缺省 JSON 可展平为 11 个非 hooks 叶，含关键默认值。"""
+    """缺省 JSON 可展平为 14 个非 hooks 叶，含关键默认值。"""
     data = _flat(skein_cli, ws)
-    assert len(data) == 11, f"应 11 叶, 得 {len(data)}: {data}"
+    assert len(data) == 14, f"应 14 叶, 得 {len(data)}: {data}"
     assert data.get("confirm.unattended") is False, f"缺 confirm.unattended 默认 False: {data}"
     assert data.get("pools.work") == 2, f"缺 pools.work=2: {data}"
     assert data.get("worktree.enabled") is False, f"缺 worktree.enabled=False: {data}"
@@ -192,9 +192,10 @@ def test_flat_config_missing_keys_backfilled(skein_cli: SkeinCli, ws: Path) -> N
         "auto_commit": False, "retain_days": 7,
         "pools": {"work": 2, "gate": 3},
         "worktree": {"enabled": False, "root": ".worktrees"},
-        "web": {"serve": True, "board_open": True},
-        "spec": {"core_budget": 400, "always_budget": 517},
+        "web": {"serve": True, "board_open": True, "exec": "inprocess"},
+        "spec": {"core_budget": 400, "always_budget": 517, "recall": "bm25"},
         "confirm": {"unattended": False},
+        "scheduling": {"weight": "depth"},
         "hooks": {s: {"before": [], "after": []} for s in _STAGES} | {"agent": {}},
     }, f"缺键回填不符: {data}"
     text = cfg.read_text()
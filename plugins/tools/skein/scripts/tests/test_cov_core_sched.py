@@ -558,6 +558,43 @@ def test_claim_check_reports_finishing_error_when_gate_full(
     assert {e["action"] for e in out["errors"]} == {"finishing"}
 
 
+def test_claim_check_admits_to_check_only_within_gate(
+        ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """进检查也占 gate 槽: 两个 task 同时完工、gate=1 → 只收一个进检查中, 另一个留进行中;
+    收进去的那个随后能进收尾 (不再两个都卡在检查中互相占满)。"""
+    _cfg_sub(ws, "gate: 3", "gate: 1")
+    sk = _skein(ws, monkeypatch)
+    _active_task(sk, ws, "feat-x")
+    _sub_act(sk, "done", "feat-x", "sub-a")
+    _active_task(sk, ws, "feat-y", "sub-y")
+    _sub_act(sk, "done", "feat-y", "sub-y")
+    first = sk.scheduler.claim(_ns(phase="check", dry_run=False, task=None))
+    assert len(first["checked"]) == 1
+    assert [e["action"] for e in first["errors"]] == ["check"]
+    second = sk.scheduler.claim(_ns(phase="check", dry_run=False, task=None))
+    assert second["finishing"] == first["checked"] and second["checked"] == []
+    left = next(tid for tid in ("feat-x", "feat-y") if tid not in first["checked"])
+    assert _load(ws, left)["status"] == TaskStatus.ACTIVE
+
+
+def test_claim_check_counts_finishing_tasks_against_gate(
+        ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """收尾中的 task 同占 gate: 槽被它占满时不收新的进检查中; 它 finish 释放槽后下一次 claim 收进来。"""
+    _cfg_sub(ws, "gate: 3", "gate: 1")
+    sk = _skein(ws, monkeypatch)
+    _active_task(sk, ws, "feat-x")
+    _sub_act(sk, "done", "feat-x", "sub-a")
+    sk.lifecycle.check(_ns(id="feat-x"))
+    sk.lifecycle.finishing(_ns(id="feat-x"))
+    _active_task(sk, ws, "feat-y", "sub-y")
+    _sub_act(sk, "done", "feat-y", "sub-y")
+    out = sk.scheduler.claim(_ns(phase="check", dry_run=False, task=None))
+    assert out["checked"] == [] and [e["tid"] for e in out["errors"]] == ["feat-y"]
+    assert _load(ws, "feat-y")["status"] == TaskStatus.ACTIVE
+    sk.lifecycle.finish(_ns(id="feat-x"))
+    assert sk.scheduler.claim(_ns(phase="check", dry_run=False, task=None))["checked"] == ["feat-y"]
+
+
 def test_check_candidates_skips_task_without_subtask(ws: Path,
                                                      monkeypatch: pytest.MonkeyPatch) -> None:
     """普通 task 没有 subtask 时不进 check 候选 (空 task 不算全 done)。"""
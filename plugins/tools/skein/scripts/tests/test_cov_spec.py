@@ -131,6 +131,23 @@ def test_always_budget_core_budget_fallback(
     assert spec_model.always_budget_tokens() == 580
 
 
+@pytest.mark.parametrize("text, want", [
+    ("spec:\n  recall: hybrid\n", "hybrid"),
+    ("spec:\n  core_budget: 400\n", "bm25"),       # 缺省由 SpecConfig 补
+    ("spec:\n  recall: vector\n", "bm25"),         # 非法值校验不过, 降级默认
+    ("spec: [unclosed\n", "bm25"),
+])
+def test_recall_mode_reads_effective_config(mem_ws: Path, text: str, want: str) -> None:
+    """recall_mode 与 `skein config` 同口径: 补默认值 + 校验, 坏配置回落 bm25。"""
+    (mem_ws / ".skein" / "config.yaml").write_text(text)
+    assert spec_model.recall_mode(mem_ws / ".skein" / "spec") == want
+    assert (mem_ws / ".skein" / "config.yaml").read_text() == text, "只读, 不回写补的默认值"
+
+
+def test_recall_mode_uninitialized_is_bm25(tmp_path: Path) -> None:
+    assert spec_model.recall_mode(tmp_path / ".skein" / "spec") == "bm25"
+
+
 # ══════════════════════ inject.py ══════════════════════
 
 def _always_rule(ws: Path, cat: str, topic: str, title: str, body: str) -> Path:
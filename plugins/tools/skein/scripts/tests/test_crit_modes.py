@@ -0,0 +1,213 @@
+"""关键路径三档 (`scheduling.weight`: depth / estimate / learned) — 节点工期换算 + makespan 对比。
+
+覆盖: estimate 加权的最长路径逐值正确 / 缺 estimate 回落均值 / learned 按 skill 实测校准、
+无样本回落 estimate / learned 连已归档 task 的实测一起学、归档样本按目录签名缓存 /
+调度器按配置切档 (未知值回落 depth) / 合成 DAG 上的 makespan 对比 ——
+工期悬殊时 estimate 档明显短于 depth 档; 预估按 skill 系统性失真时 learned 档再短一截。
+
+makespan 模拟是 list scheduling: N 个 worker, 每当有 worker 空出来, 从就绪 subtask 里按权重
+降序取一个 (同分按登记序), 与 `Scheduler._ready` 的派发顺序一致; 实际工期由用例给定。
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import random
+import statistics
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files
+from skeinlib.core.scheduling import Scheduler  # noqa: E402
+from skeinlib.task.dag import Sample, _crit_weight, _learned_hours, _node_costs  # noqa: E402
+from skeinlib.task.store import TaskStore  # noqa: E402
+from skeinlib.task.model import SubtaskStatus  # noqa: E402
+
+_SKILLS = ["py", "ts", "sql", "docs"]
+
+
+def _synthetic(rng: random.Random, n: int) -> list[dict[str, Any]]:
+    """分层随机 DAG: 工期长尾 (多数 0.5h, 少数 4~8h), 让「步数多」与「耗时长」的链分道扬镳。"""
+    subs: list[dict[str, Any]] = []
+    for i in range(n):
+        deps = rng.sample([f"s{j}" for j in range(i)], k=min(i, rng.randint(0, 2)))
+        est = rng.choice([0.5, 0.5, 0.5, 1.0]) if rng.random() < 0.8 else rng.uniform(4, 8)
+        subs.append({"sid": f"s{i}", "depends_on": deps, "estimate": round(est, 2),
+                     "skills": [rng.choice(_SKILLS)], "status": SubtaskStatus.PENDING})
+    return subs
+
+
+def _makespan(subs: list[dict[str, Any]], workers: int, weight: dict[str, float],
+              dur: Optional[dict[str, float]] = None) -> float:
+    """list scheduling 模拟: 返回全部完成的时刻 (小时)。"""
+    dur = dur or {s["sid"]: float(s["estimate"]) for s in subs}
+    order = {s["sid"]: i for i, s in enumerate(subs)}
+    left = {s["sid"]: set(s.get("depends_on", [])) for s in subs}
+    succ: dict[str, list[str]] = {}
+    for s in subs:
+        for d in s.get("depends_on", []):
+            succ.setdefault(d, []).append(s["sid"])
+    ready = [(-weight[sid], order[sid], sid) for sid, deps in left.items() if not deps]
+    heapq.heapify(ready)
+    running: list[tuple[float, str]] = []
+    clock = 0.0
+    while ready or running:
+        while ready and len(running) < workers:
+            _, _, sid = heapq.heappop(ready)
+            heapq.heappush(running, (clock + dur[sid], sid))
+        clock, sid = heapq.heappop(running)
+        for c in succ.get(sid, []):
+            left[c].discard(sid)
+            if not left[c]:
+                heapq.heappush(ready, (-weight[c], order[c], c))
+    return clock
+
+
+def test_estimate_weight_is_true_longest_path() -> None:
+    subs = [{"sid": "a", "estimate": 1}, {"sid": "b", "estimate": 5, "depends_on": ["a"]},
+            {"sid": "c", "estimate": 0.5, "depends_on": ["a"]}, {"sid": "d", "estimate": 2, "depends_on": ["c"]}]
+    w = _crit_weight(subs, _node_costs(subs, "estimate"))
+    assert w == {"a": 6.0, "b": 5.0, "c": 2.5, "d": 2.0}
+    assert _crit_weight(subs) == {"a": 3, "b": 1, "c": 2, "d": 1}  # depth 档: c→d 链步数更多
+
+
+def test_missing_estimate_falls_back_to_mean() -> None:
+    subs: list[dict[str, Any]] = [{"sid": "a", "estimate": 2}, {"sid": "b", "estimate": 4}, {"sid": "c"}]
+    assert _node_costs(subs, "estimate") == {"a": 2.0, "b": 4.0, "c": 3.0}
+    assert _node_costs([{"sid": "x"}], "estimate") == {"x": 1.0}
+    assert _node_costs(subs, "depth") is None
+
+
+def test_learned_calibrates_estimates_by_skill() -> None:
+    h = 3600
+    hist = [{"subtasks": [
+        {"sid": "h1", "status": SubtaskStatus.DONE, "skills": ["sql"], "estimate": 1, "started": 0, "finished": 3 * h},
+        {"sid": "h2", "status": SubtaskStatus.DONE, "skills": ["sql"], "estimate": 1, "started": 0, "finished": 5 * h},
+        {"sid": "h3", "status": SubtaskStatus.DONE, "skills": ["py"], "started": 0, "finished": h // 2},
+        {"sid": "h4", "status": SubtaskStatus.FAILED, "skills": ["py"], "started": 0, "finished": 99 * h},
+        {"sid": "h5", "status": SubtaskStatus.DONE, "skills": ["py"], "started": 10},  # 缺 finished 不计
+    ]}]
+    learned = _learned_hours(hist)
+    assert learned == {"": (3.0, 4.0), "sql": (4.0, 4.0), "py": (0.5, None)}
+    subs: list[dict[str, Any]] = [
+        {"sid": "a", "skills": ["sql"], "estimate": 2}, {"sid": "b", "skills": ["go"], "estimate": 2},
+        {"sid": "c", "skills": ["go"]}, {"sid": "d", "skills": ["sql", "py"]},
+        {"sid": "e", "skills": ["py"], "estimate": 1}]
+    # a: estimate × sql 比值; b: 无可比 skill → 自己的 estimate; c: 连 estimate 都没有 → 全体中位数;
+    # d: 无 estimate → 两个 skill 实测中位数取均值; e: py 样本没有 estimate 可比 → 自己的 estimate
+    assert _node_costs(subs, "learned", learned) == {"a": 8.0, "b": 2.0, "c": 3.0, "d": 2.25, "e": 1.0}
+    assert _node_costs(subs, "learned", {}) == _node_costs(subs, "estimate")  # 无历史 = estimate 档
+
+
+class _Store:
+    def __init__(self, tasks: list[dict[str, Any]], archived: list[Sample]) -> None:
+        self.tasks = tasks
+        self.archived = archived
+
+    def active(self) -> list[dict[str, Any]]:
+        return self.tasks
+
+    def all_tasks(self) -> list[dict[str, Any]]:
+        return self.tasks
+
+    def archived_samples(self) -> list[Sample]:
+        return self.archived
+
+
+class _WS:
+    def __init__(self, tasks: list[dict[str, Any]], weight: str, archived: Optional[list[Sample]] = None) -> None:
+        self.store = _Store(tasks, archived or [])
+        self.weight = weight
+
+    def config(self) -> dict[str, Any]:
+        return {"pools": {"work": 1}, "scheduling": {"weight": self.weight}}
+
+    def _dep_unfinished(self, d: str) -> bool:
+        return False
+
+
+def _first_pick(weight: str, archived: Optional[list[Sample]] = None) -> str:
+    # 两条独立链: long 一步 6h; short 三步各 0.5h (步数多但更快)。只有 1 个槽。
+    subs = [{"sid": "long", "estimate": 6, "status": SubtaskStatus.PENDING, "created": 0, "skills": ["py"]},
+            {"sid": "s1", "estimate": 0.5, "status": SubtaskStatus.PENDING, "created": 0, "skills": ["sql"]},
+            {"sid": "s2", "estimate": 0.5, "status": SubtaskStatus.PENDING, "created": 0, "skills": ["sql"],
+             "depends_on": ["s1"]},
+            {"sid": "s3", "estimate": 0.5, "status": SubtaskStatus.PENDING, "created": 0, "skills": ["sql"],
+             "depends_on": ["s2"]}]
+    sched = Scheduler.__new__(Scheduler)
+    sched.ws = _WS([{"id": "t", "subtasks": subs}], weight, archived)  # type: ignore[assignment]
+    (_, s), = sched._global_ready()
+    assert [x["sid"] for x in sched._ready({"id": "t", "subtasks": subs})] == [s["sid"]]
+    return str(s["sid"])
+
+
+def test_scheduler_follows_config_mode() -> None:
+    assert _first_pick("depth") == "s1"
+    assert _first_pick("estimate") == "long"
+    assert _first_pick("bogus") == "s1"  # 未知档 (手改坏的 yaml) 回落 depth, 不让取活崩掉
+
+
+def test_scheduler_learned_uses_archived_samples() -> None:
+    # 活 task 里已没有实测 (done 的都过了 retain_days 进了归档): 只有归档样本说 sql 实际是预估的 10 倍
+    assert _first_pick("learned") == "long", "无样本 = estimate 档"
+    assert _first_pick("learned", [(5.0, 0.5, ["sql"])]) == "s1", "sql 链校准成 3×5h, 比 long 的 6h 长"
+
+
+def _archive(arch: Path, day: str, tid: str, hours: int) -> None:
+    d = arch / "2026" / day / tid
+    d.mkdir(parents=True)
+    (d / "task.json").write_text(json.dumps({"id": tid, "subtasks": [
+        {"sid": "a", "status": SubtaskStatus.DONE, "skills": ["sql"], "estimate": 1,
+         "started": 0, "finished": hours * 3600}]}))
+    age_files(arch, *arch.glob("*"), *arch.glob("*/*"), *arch.glob("*/*/*"))
+
+
+def test_archived_samples_cached_by_archive_signature(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    dot = tmp_path / ".skein"
+    arch = dot / "task" / "archive"
+
+    def store() -> TaskStore:  # 每次新建 = 模拟新进程, 只剩 .cache/learned.json 可复用
+        return TaskStore(dot, dot / "task", arch, lambda: {}, lambda: False)
+    _archive(arch, "01-02", "t1", 3)
+    assert store().archived_samples() == [(3.0, 1.0, ["sql"])]
+    assert (dot / ".cache" / "learned.json").exists()
+
+    reads: list[str] = []
+    orig = Path.read_text
+
+    def spy(self: Path, *a: Any, **kw: Any) -> str:
+        reads.append(self.name)
+        return orig(self, *a, **kw)
+    monkeypatch.setattr(Path, "read_text", spy)
+    assert store().archived_samples() == [(3.0, 1.0, ["sql"])]
+    assert "task.json" not in reads, "归档目录签名没变: 不读归档 task.json"
+
+    _archive(arch, "01-03", "t2", 5)
+    assert sorted(h for h, _, _ in store().archived_samples()) == [3.0, 5.0], "新归档进来签名变 → 重扫"
+    assert _learned_hours([], store().archived_samples())["sql"] == (4.0, 4.0)
+
+
+def test_makespan_benchmark_across_modes() -> None:
+    """合成 DAG 基准: 同一批 DAG 分别按三档权重派发, 比平均 makespan。
+
+    真实工期 = estimate × skill 偏差 (sql 系统性低估 3 倍, docs 高估一倍), 历史样本带同样偏差 ——
+    estimate 档按失真的预估排, learned 档按实测校准后排, 应当更短。"""
+    rng = random.Random(2024)
+    bias = {"py": 1.0, "ts": 1.0, "sql": 3.0, "docs": 0.5}
+    spans: dict[str, list[float]] = {"depth": [], "estimate": [], "learned": []}
+    for _ in range(150):
+        subs = _synthetic(rng, rng.randint(15, 40))
+        real = {s["sid"]: s["estimate"] * bias[s["skills"][0]] for s in subs}
+        hist = [{"subtasks": [{"sid": f"h{k}", "status": SubtaskStatus.DONE, "skills": [k],
+                               "estimate": 2, "started": 0, "finished": int(2 * 3600 * b)}
+                              for k, b in bias.items()]}]
+        learned = _learned_hours(hist)
+        for mode in spans:
+            w = _crit_weight(subs, _node_costs(subs, mode, learned))
+            spans[mode].append(_makespan(subs, 3, w, real))
+    mean = {m: statistics.mean(v) for m, v in spans.items()}
+    assert mean["estimate"] < mean["depth"] * 0.97, mean
+    assert mean["learned"] < mean["estimate"], mean
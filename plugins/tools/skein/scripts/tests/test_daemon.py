@@ -0,0 +1,142 @@
+"""`skein daemon` + `bin/skein` 转发 — 有 daemon 走 socket, 没有/不该转发时就地执行, 结果一致。
+
+覆盖: 转发后 served 计数涨、输出与退出码/stderr 原样回传 / 无 daemon 回落 / 插件根不符回落 /
+钩子里 (SKEIN_IN_HOOK) 不转发 / `--stop` 收掉 socket / 没收到开跑标记就断开 → 回落就地跑,
+收到标记后断开或回复截断 → 报错退非零、绝不重跑 (命令可能已改过盘)。
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import SCRIPTS, SKEIN  # noqa: E402
+from skeinlib.cli.daemon import ACCEPTED, SOCK_NAME, Daemon, _alive  # noqa: E402
+
+BIN = SCRIPTS.parent / "bin" / "skein"
+
+
+def _bin(cwd: Path, *args: str, **env: str) -> subprocess.CompletedProcess[str]:
+    e = {k: v for k, v in os.environ.items() if k not in ("SKEIN_NO_DAEMON", "SKEIN_IN_HOOK")}
+    return subprocess.run([sys.executable, str(BIN), *args], cwd=cwd, capture_output=True,
+                          text=True, env={**e, **env})
+
+
+def _served(ws: Path) -> int:
+    st = _alive(ws / ".skein" / SOCK_NAME)
+    assert st is not None
+    return int(st["served"])
+
+
+@pytest.fixture
+def daemon(ws: Path) -> Iterator[Path]:
+    p = subprocess.Popen([sys.executable, str(SKEIN), "daemon", "--idle", "60"], cwd=ws,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    sock = ws / ".skein" / SOCK_NAME
+    deadline = time.monotonic() + 15
+    while _alive(sock) is None:
+        assert p.poll() is None and time.monotonic() < deadline, "daemon 未就绪"
+        time.sleep(0.05)
+    yield ws
+    p.terminate()
+    p.wait(10)
+
+
+def test_forwarded_commands_run_in_daemon(daemon: Path) -> None:
+    r = _bin(daemon, "create", "dm-demo", "--name", "常驻", "--desc", "d")
+    assert r.returncode == 0, r.stderr
+    r = _bin(daemon, "list")
+    assert r.returncode == 0 and "dm-demo" in r.stdout
+    assert _served(daemon) == 2
+    # 子目录里也能找到上层的 socket; 落盘结果与就地执行看到的一致
+    sub = daemon / "sub"
+    sub.mkdir()
+    assert "dm-demo" in _bin(sub, "list").stdout
+    assert "dm-demo" in _bin(daemon, "list", SKEIN_NO_DAEMON="1").stdout
+    assert _served(daemon) == 3
+
+
+def test_error_exit_code_and_stderr_propagate(daemon: Path) -> None:
+    r = _bin(daemon, "show", "no-such-task")
+    assert r.returncode != 0 and r.stderr.strip()
+    assert _served(daemon) == 1
+
+
+def test_hook_nested_call_is_not_forwarded(daemon: Path) -> None:
+    assert _bin(daemon, "list", SKEIN_IN_HOOK="1").returncode == 0
+    assert _served(daemon) == 0
+
+
+def test_no_daemon_falls_back_in_process(ws: Path) -> None:
+    (ws / ".skein" / SOCK_NAME).write_text("")  # 死 socket (普通文件): connect 失败 → 就地
+    r = _bin(ws, "create", "fb-demo", "--name", "回落", "--desc", "d")
+    assert r.returncode == 0, r.stderr
+    assert (ws / ".skein" / "task" / "fb-demo" / "task.json").exists()
+
+
+def test_plugin_mismatch_asks_for_fallback(tmp_path: Path) -> None:
+    d = Daemon(tmp_path / SOCK_NAME)
+    assert d.handle({"argv": ["list"], "cwd": str(tmp_path), "plugin": "/elsewhere"}) == {"fallback": True}
+    assert d.served == 0
+
+
+def _fake_daemon(ws: Path, reply: bytes) -> threading.Thread:
+    """只接一条请求、回 reply 后断开的假 daemon —— 模拟 daemon 在各阶段崩掉。"""
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(str(ws / ".skein" / SOCK_NAME))
+    srv.listen(1)
+
+    def run() -> None:
+        conn, _ = srv.accept()
+        with conn:
+            b"".join(iter(lambda: conn.recv(65536), b""))
+            conn.sendall(reply)
+        srv.close()
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return t
+
+
+def test_disconnect_before_accept_falls_back(ws: Path) -> None:
+    t = _fake_daemon(ws, b"")
+    r = _bin(ws, "create", "fb-early", "--name", "回落", "--desc", "d")
+    t.join(5)
+    assert r.returncode == 0, r.stderr
+    assert (ws / ".skein" / "task" / "fb-early" / "task.json").exists(), "没开跑就断开 → 就地执行"
+
+
+@pytest.mark.parametrize("reply", [ACCEPTED, ACCEPTED + b'{"out": "ok\\n", "er'])
+def test_disconnect_after_accept_does_not_rerun(ws: Path, reply: bytes) -> None:
+    t = _fake_daemon(ws, reply)
+    r = _bin(ws, "create", "fb-late", "--name", "不重跑", "--desc", "d")
+    t.join(5)
+    assert r.returncode != 0 and "daemon" in r.stderr and "Traceback" not in r.stderr, r.stderr
+    assert not (ws / ".skein" / "task" / "fb-late").exists(), "已开跑的命令不能再就地跑一遍"
+
+
+def test_client_gone_before_accept_skips_run(tmp_path: Path) -> None:
+    from skeinlib.utils.paths import PLUGIN_ROOT
+    d = Daemon(tmp_path / SOCK_NAME)
+    req = {"argv": ["list"], "cwd": str(tmp_path), "plugin": str(PLUGIN_ROOT)}
+    assert d.handle(req, lambda: False) == {"fallback": True}
+    assert d.served == 0 and Path.cwd() != tmp_path
+
+
+def test_stop_removes_socket(daemon: Path) -> None:
+    r = subprocess.run([sys.executable, str(SKEIN), "daemon", "--stop"], cwd=daemon,
+                       capture_output=True, text=True)
+    assert json.loads(r.stdout)["stopped"] is True
+    deadline = time.monotonic() + 10
+    while (daemon / ".skein" / SOCK_NAME).exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert _bin(daemon, "list").returncode == 0  # 无 daemon 后照常就地执行
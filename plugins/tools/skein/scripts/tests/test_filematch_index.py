@@ -0,0 +1,175 @@
+"""PreToolUse fileMatch 预编译索引 (`spec/filematch.py`)。
+
+覆盖: 合并正则与逐条 `fnmatch` / `PurePath.match` 判定逐例等价 / 建表后守卫不再 walk、未命中不读任何
+spec 页 / 命中页手改后当场重建 / CRLF 页的正文偏移按原始字节算 / spec-meta hook 与 reindex 刷新索引且
+只重读变了的页 / 非 SKEIN 项目不建 `.skein` / 500 页的库命中时只读命中的那一页。
+"""
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import time
+from pathlib import Path, PurePath
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.hooks import post_tool_use as pou  # noqa: E402
+from skeinlib.hooks import pre_tool_use as ptu  # noqa: E402
+from skeinlib.spec import filematch as fm  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+GLOBS = ["*.py", "src/*.py", "src/**/*.ts", "*/test_*.py", "a?c/*", "[!.]*.md", "[a-c]*/x.py",
+         "docs/", "./src/*.py", "/abs/*.py", ".", "lib/[]]x", "x[", "*", "**", "src/*/deep/*.go"]
+PATHS = ["a.py", "src/a.py", "src/x/a.py", "src/x/y/b.ts", "pkg/test_a.py", "pkg/sub/test_a.py",
+         "abc/q", "abc/q/r", "README.md", ".hidden.md", "b/x.py", "z/b/x.py", "docs", "lib/]x",
+         "x[", "src/a/deep/m.go", "src/a/b/deep/m.go", "deep/m.go", "src/a.pyc"]
+
+
+def _page(spec: Path, rel: str, globs: str, body: str = "正文", inclusion: str = "fileMatch") -> Path:
+    ns, cat, name = rel.removesuffix(".md").split("/")
+    return write_rule(spec.parents[1], ns, cat, name, body, f"title: {name}\ninclusion: {inclusion}\nglobs: {globs}\n")
+
+
+def _reference(rel: str, glob: str) -> bool:
+    try:
+        tail = PurePath(rel).match(glob)
+    except ValueError:  # 空 pattern: 旧实现在这里抛, 整次注入被 cmd_guard 吞掉
+        tail = False
+    return fnmatch.fnmatch(rel, glob) or tail
+
+
+@pytest.mark.parametrize("glob", GLOBS)
+def test_combined_regex_matches_fnmatch_or_purepath(glob: str) -> None:
+    rx = fm.glob_regex([glob])
+    for rel in PATHS:
+        assert (re.fullmatch(rx, rel) is not None) == _reference(rel, glob), (glob, rel)
+
+
+def test_guard_uses_index_without_walking(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    spec = tmp_path / ".skein" / "spec"
+    _page(spec, "rules/py/style.md", "*.py", "用类型注解")
+    _page(spec, "rules/ts/style.md", "src/**/*.ts", "用 strict")
+    _page(spec, "rules/misc/plain.md", "*.py", inclusion="auto")
+    assert "用类型注解" in ptu.filematch_context(str(tmp_path / "a.py"), str(tmp_path))  # 首次: 建表
+    assert fm.index_path(spec).exists()
+
+    def no_walk(*_: Any, **__: Any) -> Any:
+        raise AssertionError("守卫热路径不该 walk")
+    monkeypatch.setattr(os, "walk", no_walk)
+    reads: list[Path] = []
+    orig = Path.read_bytes
+
+    def counting(self: Path) -> bytes:
+        reads.append(self)
+        return orig(self)
+    monkeypatch.setattr(Path, "read_bytes", counting)
+    assert ptu.filematch_context(str(tmp_path / "README.md"), str(tmp_path)) == ""
+    assert reads == []
+    ctx = ptu.filematch_context(str(tmp_path / "src" / "a" / "b.ts"), str(tmp_path))
+    assert "用 strict" in ctx and "用类型注解" not in ctx
+    assert reads == [spec / "rules/ts/style.md"]
+
+
+def test_hand_edited_hit_is_rebuilt(tmp_path: Path) -> None:
+    spec = tmp_path / ".skein" / "spec"
+    f = _page(spec, "rules/py/style.md", "*.py", "旧正文")
+    fm.rebuild(spec)
+    f.write_text(f.read_text().replace("旧正文", "新的正文更长一些").replace("title: style", "title: 风格"))
+    ctx = ptu.filematch_context(str(tmp_path / "a.py"), str(tmp_path))
+    assert "新的正文更长一些" in ctx and "### 风格" in ctx
+
+
+def test_crlf_page_body_offset(tmp_path: Path) -> None:
+    spec = tmp_path / ".skein" / "spec"
+    f = spec / "rules/py/crlf.md"
+    f.parent.mkdir(parents=True)
+    f.write_bytes("---\r\ntitle: T\r\ninclusion: fileMatch\r\nglobs: *.py\r\n---\r\nBODY 第一行\r\n第二行\r\n".encode())
+    fm.rebuild(spec)
+    ctx = ptu.filematch_context(str(tmp_path / "a.py"), str(tmp_path))
+    assert "### T\nBODY 第一行\n第二行" in ctx and "---" not in ctx
+    assert [body for _, _, body, _ in fm.scan(spec)] == ["BODY 第一行\n第二行"], "同 read_text 的换行归一"
+
+
+def test_spec_meta_hook_and_reindex_refresh_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    spec = tmp_path / ".skein" / "spec"
+    old = [_page(spec, f"rules/c/p{i}.md", "*.txt", inclusion="auto") for i in range(5)]
+    age_files(*old)
+    fm.rebuild(spec)
+    time.sleep(0.01)
+    new = _page(spec, "rules/c/go.md", "*.go", "Go 规则")
+    parsed: list[str] = []
+    orig = fm._entry
+
+    def spy(path: Path, rel: str) -> Any:
+        parsed.append(rel)
+        return orig(path, rel)
+    monkeypatch.setattr(fm, "_entry", spy)
+    pou.cmd_spec_meta({"tool_input": {"file_path": str(new)}})
+    assert parsed == ["rules/c/go.md"]
+    assert [e["path"] for e in fm.load(spec)["entries"]] == ["rules/c/go.md"]  # type: ignore[index]
+
+    new.unlink()
+    monkeypatch.chdir(tmp_path)
+    Spec()._reindex_all()
+    assert fm.load(spec)["entries"] == []  # type: ignore[index]
+
+
+def test_no_index_outside_skein_projects(tmp_path: Path) -> None:
+    assert ptu.filematch_context(str(tmp_path / "a.py"), str(tmp_path)) == ""
+    assert not (tmp_path / ".skein").exists()
+
+
+def _big_library(spec: Path) -> None:
+    """500 页, 其中 50 页 fileMatch, 每页 globs 各不相同。"""
+    for i in range(500):
+        inc = "fileMatch" if i % 10 == 0 else "auto"
+        _page(spec, f"rules/c{i % 20}/p{i}.md", f"mod{i}/*.py, **/gen{i}_*.ts", "正文 " * 200, inclusion=inc)
+    fm.rebuild(spec)
+
+
+def test_large_library_guard_reads_only_hits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    spec = tmp_path / ".skein" / "spec"
+    _big_library(spec)
+    parsed: list[str] = []
+    monkeypatch.setattr(fm, "_entry", lambda path, rel: parsed.append(rel))
+    monkeypatch.setattr(os, "walk", lambda *_, **__: (_ for _ in ()).throw(AssertionError("不该 walk")))
+    reads: list[str] = []
+    orig = Path.read_bytes
+
+    def spy(self: Path) -> bytes:
+        reads.append(self.name)
+        return orig(self)
+    monkeypatch.setattr(Path, "read_bytes", spy)
+    for _ in range(3):
+        assert ptu.filematch_context(str(tmp_path / "app" / "main.py"), str(tmp_path)) == ""
+    assert "### p40\n正文" in ptu.filematch_context(str(tmp_path / "x" / "gen40_a.ts"), str(tmp_path))
+    assert reads == ["p40.md"] and parsed == [], "未命中零读; 命中只读那一页的正文, 不重解析"
+
+
+GUARD_SHARE = 0.2  # 有索引时守卫单次判定至多耗旧现扫的这个比例
+
+
+@pytest.mark.benchmark
+def test_guard_latency_benchmark(tmp_path: Path) -> None:
+    """基准: 500 页 (50 页 fileMatch) 的库。旧路径每次 walk + 全读全解析 + 逐条 glob, 约 20ms;
+    索引路径读一份 JSON + 编译并跑一次合并正则, 约 1.5ms。比例留足余量。"""
+    spec = tmp_path / ".skein" / "spec"
+    _big_library(spec)
+    target = str(tmp_path / "app" / "main.py")
+
+    def per_call(fn: Any) -> float:
+        t0 = time.perf_counter()
+        for _ in range(20):
+            fn()
+        return (time.perf_counter() - t0) / 20
+
+    def legacy() -> list[Any]:
+        return [s for s in ptu.find_filematch_specs(str(spec))
+                if ptu.file_matches_globs(target, s[1], str(tmp_path))]
+    old = per_call(legacy)
+    new = per_call(lambda: ptu.filematch_context(target, str(tmp_path)))
+    assert new < old * GUARD_SHARE, (new, old)
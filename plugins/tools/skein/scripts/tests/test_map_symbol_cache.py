@@ -0,0 +1,159 @@
+"""map 骨架的逐文件符号缓存 (`spec/symbols.py`, `.skein/.cache/symbols.db`)。
+
+覆盖: 结果与逐文件 `read_text` + 正则现算一致 (含 CRLF / 二进制) 且冷轮每文件只读一次、热轮不读 /
+改过没暂存的、新提交的文件才重读, 删掉的出缓存 / 非 git 仓按 mtime+size / 进程池与本进程结果一致 /
+千文件的仓热轮零读、改一个只重读一个。
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files
+from skeinlib.spec import symbols as _symbols  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+
+def _commit(ws: Path) -> None:
+    subprocess.run(["git", "add", "-A"], cwd=ws, check=True, capture_output=True)
+    subprocess.run(["git", "commit", "-qm", "x", "--allow-empty"], cwd=ws, check=True, capture_output=True)
+
+
+def _reads(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    seen: list[str] = []
+    orig = Path.read_bytes
+
+    def spy(self: Path) -> bytes:
+        seen.append(self.name)
+        return orig(self)
+    monkeypatch.setattr(Path, "read_bytes", spy)
+    return seen
+
+
+def _skeleton() -> dict[str, Any]:
+    return {f["path"]: (f["lines"], f["symbols"]) for f in Spec()._compute_skeleton("")["files"]}  # type: ignore[attr-defined]
+
+
+def _sources(ws: Path) -> None:
+    (ws / "a.py").write_text("import os\n\ndef alpha():\n    pass\n\nclass Beta:\n    def gamma(self):\n        pass\n")
+    (ws / "b.ts").write_text("export const foo = 1\nexport function bar() {}\nclass Baz {}\n")
+    (ws / "c.go").write_bytes(b"package c\r\n\r\nfunc Run() {}\r\ntype T struct{}\r\n")
+    (ws / "notes.md").write_text("# t\n\nbody\n")
+    (ws / "blob.bin").write_bytes(b"\xff\xfe\x00\x01")
+
+
+def test_matches_per_file_read_and_reads_once(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    _commit(mem_ws)
+    reads = _reads(monkeypatch)
+    cold = _skeleton()
+    assert cold["a.py"] == (9, ["alpha", "Beta", "gamma"])
+    assert cold["b.ts"] == (4, ["foo", "bar", "Baz"])
+    assert cold["c.go"] == (5, ["Run", "T"])
+    assert cold["notes.md"] == (4, []) and "blob.bin" not in cold
+    for rel, (lines, _) in cold.items():
+        assert lines == (mem_ws / rel).read_text().count("\n") + 1, rel
+    names = [r for r in reads if r in ("a.py", "b.ts", "c.go", "notes.md", "blob.bin")]
+    assert sorted(names) == ["a.py", "b.ts", "blob.bin", "c.go", "notes.md"]
+    reads.clear()
+    assert _skeleton() == cold and reads == []
+
+
+def test_only_changed_files_are_reread(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    _commit(mem_ws)
+    _skeleton()
+    reads = _reads(monkeypatch)
+
+    (mem_ws / "a.py").write_text("def delta():\n    pass\n")  # 改了没暂存: 按 stat 判
+    age_files(mem_ws / "a.py")
+    (mem_ws / "d.py").write_text("def epsilon():\n    pass\n")
+    (mem_ws / "notes.md").unlink()
+    subprocess.run(["git", "add", "d.py", "notes.md"], cwd=mem_ws, check=True, capture_output=True)
+    warm = _skeleton()
+    assert sorted(reads) == ["a.py", "d.py"]
+    assert warm["a.py"] == (3, ["delta"]) and warm["d.py"] == (3, ["epsilon"]) and "notes.md" not in warm
+    reads.clear()
+    assert _skeleton() == warm and reads == []
+
+    import sqlite3
+    con = sqlite3.connect(mem_ws / ".skein" / ".cache" / _symbols.CACHE)
+    try:
+        assert "notes.md" not in {r[0] for r in con.execute("SELECT path FROM files")}
+    finally:
+        con.close()
+
+
+def test_non_git_tree_keys_by_stat(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / ".skein" / "spec").mkdir(parents=True)
+    (tmp_path / "src").mkdir()
+    f = tmp_path / "src" / "m.py"
+    f.write_text("def one():\n    pass\n")
+    age_files(f)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(_symbols, "tracked", lambda _root, _paths=None: None)
+    assert _skeleton() == {"src/m.py": (3, ["one"])}
+    reads = _reads(monkeypatch)
+    assert _skeleton() == {"src/m.py": (3, ["one"])} and reads == []
+    f.write_text("def one():\n    pass\n\ndef two():\n    pass\n")
+    assert _skeleton() == {"src/m.py": (6, ["one", "two"])} and reads == ["m.py"]
+
+
+def test_process_pool_agrees_with_inline(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    paths = [str(mem_ws / n) for n in ("a.py", "b.ts", "c.go", "notes.md", "blob.bin")]
+    inline = [_symbols.extract(p) for p in paths]
+    monkeypatch.setattr(_symbols, "_POOL_MIN", 1)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    assert _symbols._extract_many(paths) == inline
+
+
+def _big_repo(ws: Path, n: int) -> None:
+    for i in range(n):
+        d = ws / "src" / f"p{i % 30}"
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"m{i}.py").write_text("".join(f"def f{i}_{j}():\n    return {j}\n\n" for j in range(30)))
+    _commit(ws)
+
+
+def test_large_repo_warm_run_reads_nothing(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _big_repo(mem_ws, 1000)
+    monkeypatch.setattr(_symbols, "_POOL_MIN", 10 ** 9)  # 冷轮也在本进程抽, 读盘才数得到
+    reads = _reads(monkeypatch)
+    cold = _skeleton()
+    assert len([r for r in reads if r.endswith(".py")]) == 1000
+    reads.clear()
+    assert _skeleton() == cold and reads == []
+    f = mem_ws / "src" / "p7" / "m7.py"
+    f.write_text("def only():\n    pass\n")
+    _commit(mem_ws)
+    assert _skeleton()["src/p7/m7.py"] == (3, ["only"])
+    assert [r for r in reads if r.endswith(".py")] == ["m7.py"]
+
+
+WARM_SHARE = 0.4  # 热轮骨架至多耗冷轮的这个比例
+
+
+@pytest.mark.benchmark
+def test_skeleton_cache_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 3000 个已提交的源文件。冷轮逐个读 + 抓符号; 热轮只剩 git ls-files 与读一次缓存表。"""
+    monkeypatch.chdir(mem_ws)
+    _big_repo(mem_ws, 3000)
+    t0 = time.perf_counter()
+    cold = _skeleton()
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    warm = _skeleton()
+    t_warm = time.perf_counter() - t0
+    assert warm == cold and len(cold) >= 3000
+    assert t_warm < t_cold * WARM_SHARE, (t_warm, t_cold)
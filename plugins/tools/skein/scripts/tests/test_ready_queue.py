@@ -0,0 +1,126 @@
+"""就绪队列索引 — `_crit_weight` 线性化 + 形状备忘, `_global_ready` 堆选 top-k。
+
+覆盖: 随机 DAG 上与递归参考实现逐值一致 / 5000 深链不撞递归上限 / 备忘副本不被改脏 /
+环保护终止 / 堆选与全量排序逐位同序 (含优先级、FAILED、research 混排)。
+"""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from skeinlib.core.scheduling import Scheduler, _score  # noqa: E402
+from skeinlib.task import dag  # noqa: E402
+from skeinlib.task.dag import _crit_weight  # noqa: E402
+from skeinlib.task.model import PRIORITY_DEFAULT, PRIORITY_RANK, SubtaskStatus  # noqa: E402
+
+
+def _ref_crit(subs: list[dict[str, Any]]) -> dict[str, int]:
+    """改动前的递归实现 (只在无环图上对拍)。"""
+    succ: dict[str, list[str]] = {}
+    for s in subs:
+        for d in s.get("depends_on", []):
+            succ.setdefault(d, []).append(s["sid"])
+    memo: dict[str, int] = {}
+
+    def w(sid: str) -> int:
+        if sid not in memo:
+            memo[sid] = 1 + max((w(c) for c in succ.get(sid, [])), default=0)
+        return memo[sid]
+
+    return {s["sid"]: w(s["sid"]) for s in subs}
+
+
+def _random_dag(rng: random.Random, n: int) -> list[dict[str, Any]]:
+    subs: list[dict[str, Any]] = []
+    for i in range(n):
+        deps = rng.sample([f"s{j}" for j in range(i)], k=min(i, rng.randint(0, 3)))
+        subs.append({"sid": f"s{i}", "depends_on": deps})
+    rng.shuffle(subs)  # 登记序与拓扑序无关
+    return subs
+
+
+def test_crit_matches_recursive_reference() -> None:
+    rng = random.Random(7)
+    for _ in range(200):
+        subs = _random_dag(rng, rng.randint(1, 40))
+        assert _crit_weight(subs) == _ref_crit(subs)
+
+
+def test_deep_chain_is_not_recursive() -> None:
+    n = 5000  # 递归实现在这里直接 RecursionError
+    chain: list[dict[str, Any]] = [{"sid": f"s{i}", "depends_on": [f"s{i - 1}"] if i else []} for i in range(n)]
+    w = _crit_weight(chain)
+    assert w["s0"] == n and w[f"s{n - 1}"] == 1
+
+
+def test_memo_returns_copies() -> None:
+    subs: list[dict[str, Any]] = [{"sid": "a"}, {"sid": "b", "depends_on": ["a"]}]
+    first = _crit_weight(subs)
+    first["a"] = 99
+    assert _crit_weight(subs) == {"a": 2, "b": 1}
+    assert len(dag._CRIT_MEMO) <= dag._CRIT_MEMO_MAX
+
+
+def test_cycle_guard_terminates() -> None:
+    w = _crit_weight([{"sid": "x", "depends_on": ["y"]}, {"sid": "y", "depends_on": ["x"]}])
+    assert set(w) == {"x", "y"} and all(v >= 1 for v in w.values())
+
+
+class _Store:
+    def __init__(self, tasks: list[dict[str, Any]]) -> None:
+        self.tasks = tasks
+
+    def active(self) -> list[dict[str, Any]]:
+        return self.tasks
+
+
+class _WS:
+    def __init__(self, tasks: list[dict[str, Any]], work: int) -> None:
+        self.store = _Store(tasks)
+        self.work = work
+
+    def config(self) -> dict[str, Any]:
+        return {"pools": {"work": self.work}}
+
+    def _dep_unfinished(self, d: str) -> bool:
+        return False
+
+
+def _ref_global_ready(tasks: list[dict[str, Any]], slots: int) -> list[tuple[str, str]]:
+    """改动前 `_global_ready` 的全量排序 (同一 now() 下)。"""
+    cand = []
+    for ti, t in enumerate(tasks):
+        subs, rsubs = t.get("subtasks", []), t.get("research_tasks", [])
+        done = {s["sid"] for s in subs + rsubs if s["status"] == SubtaskStatus.DONE}
+        crit = _ref_crit(subs + rsubs)
+        prio = PRIORITY_RANK.get(t.get("priority") or PRIORITY_DEFAULT, PRIORITY_RANK[PRIORITY_DEFAULT])
+        for i, s in enumerate(subs + rsubs):
+            if s["status"] in (SubtaskStatus.PENDING, SubtaskStatus.FAILED) \
+                    and all(d in done for d in s.get("depends_on", [])):
+                is_r = any(r["sid"] == s["sid"] for r in rsubs)
+                cand.append((t["id"], s, ti, i, _score(s, crit[s["sid"]], is_r), prio))
+    cand.sort(key=lambda x: (-x[5], -x[4], 0 if x[1]["status"] == SubtaskStatus.PENDING else 1, x[2], x[3]))
+    return [(c[0], c[1]["sid"]) for c in cand[:slots]]
+
+
+def test_heap_selection_matches_full_sort() -> None:
+    rng = random.Random(11)
+    statuses = [SubtaskStatus.PENDING] * 4 + [SubtaskStatus.DONE, SubtaskStatus.FAILED, SubtaskStatus.RUNNING]
+    for _ in range(60):
+        tasks: list[dict[str, Any]] = []
+        for k in range(rng.randint(1, 5)):
+            subs = _random_dag(rng, rng.randint(1, 25))
+            for s in subs:
+                s["status"] = rng.choice(statuses)
+                s["created"] = 1_700_000_000 + rng.randint(0, 3) * 1800  # 刻意造同分
+            rsubs: list[dict[str, Any]] = [{"sid": f"r{j}", "status": SubtaskStatus.PENDING, "created": 1_700_000_000}
+                     for j in range(rng.randint(0, 2))]
+            tasks.append({"id": f"t{k}", "priority": rng.choice(list(PRIORITY_RANK)),
+                          "subtasks": subs, "research_tasks": rsubs})
+        running = sum(1 for t in tasks for s in t["subtasks"] if s["status"] == SubtaskStatus.RUNNING)
+        work = running + rng.randint(1, 12)
+        sched = Scheduler.__new__(Scheduler)
+        sched.ws = _WS(tasks, work)  # type: ignore[assignment]
+        got = [(t["id"], s["sid"]) for t, s in sched._global_ready()]
+        assert got == _ref_global_ready(tasks, work - running)
@@ -0,0 +1,171 @@
+"""看板 WS 增量推送 (`web/delta.py` diff/DeltaFeed + `_live` resync + `_diff_and_push` 出 patch)。
+
+覆盖: diff 应用回去等于新文档 (含 JSON Pointer 转义); 卡片按 id 寻址, 排序变不出整段 replace;
+DeltaFeed 的基线/空差量/force/seq; 端点: resync 拿快照, 文件事件后订阅者只收带 seq 的 patch、
+老客户端照旧收 task-changed, 断档再 resync 拿到对齐当前 seq 的快照; 无差异的文件事件订阅者也收 "data"。
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import queue
+import sys
+import types
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import pytest
+
+import conftest  # noqa: F401
+from skeinlib.task.model import TaskStatus
+from skeinlib.web import serve
+from skeinlib.web.delta import DeltaFeed, diff, view_doc
+
+
+def _apply(doc: Any, ops: list[dict[str, Any]]) -> Any:
+    # RFC 6902 的 add/remove/replace 子集 (与前端 live.ts applyPatch 同语义)
+    for o in ops:
+        if o["path"] == "":
+            doc = o["value"]
+            continue
+        keys = [k.replace("~1", "/").replace("~0", "~") for k in o["path"][1:].split("/")]
+        node = doc
+        for k in keys[:-1]:
+            node = node[k]
+        if o["op"] == "remove":
+            del node[keys[-1]]
+        else:
+            node[keys[-1]] = o["value"]
+    return doc
+
+
+@pytest.mark.parametrize("old,new", [
+    ({"a": 1, "b": {"c": [1, 2]}}, {"a": 1, "b": {"c": [1, 3]}, "d": None}),
+    ({"x/y": 1, "m~n": {"k": True}}, {"x/y": 2, "m~n": {"k": 1}}),
+    ({"a": {"b": 1}}, {"a": [1]}),
+    ([1], {"a": 1}),
+    ({}, {}),
+])
+def test_diff_roundtrips(old: Any, new: Any) -> None:
+    ops = diff(old, new)
+    assert _apply(copy.deepcopy(old), ops) == new
+    assert json.loads(json.dumps(ops)) == ops
+
+
+def test_diff_keeps_type_distinct() -> None:
+    assert diff({"a": 1}, {"a": True}) == [{"op": "replace", "path": "/a", "value": True}]
+
+
+def test_card_reorder_yields_only_card_fields() -> None:
+    cards = [{"id": f"t{i}", "status": "pending", "name": f"n{i}"} for i in range(50)]
+    old = view_doc({"cards": cards}, {})
+    moved = [dict(cards[-1], status="active")] + cards[:-1]  # 状态变 → 排到最前
+    ops = diff(old, view_doc({"cards": moved}, {}))
+    assert ops == [{"op": "replace", "path": "/board/cards/t49/status", "value": "active"}]
+
+
+def test_feed_baseline_noop_and_force() -> None:
+    f = DeltaFeed()
+    assert f.advance({"a": 1}) is None and f.seq == 0, "无基线只立基线"
+    assert f.advance({"a": 1}) is None and f.seq == 0, "无差异不占 seq"
+    assert f.advance({"a": 2}) == [{"op": "replace", "path": "/a", "value": 2}] and f.seq == 1
+    assert f.advance({"a": 2}, force=True) == [] and f.seq == 2
+    f.reset(None)
+    assert f.snapshot() == {"type": "snapshot", "seq": 2, "doc": None}
+
+
+# ---- 端点: 假 watchfiles 驱动 _watch_loop, 可变 task 列表的假 board ---------------
+
+class _FakeWatch:
+    def __init__(self) -> None:
+        self.q: queue.Queue[set[tuple[int, str]]] = queue.Queue()
+
+    async def awatch(self, *paths: Any, **kw: Any) -> AsyncIterator[set[tuple[int, str]]]:
+        while True:
+            try:
+                batch = self.q.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+                continue
+            yield batch
+
+
+class _FakeBoard:
+    _LOCK_ID_PATH = "/__skein__/id"
+    _REV_PATH = "/__skein__/rev"
+    _LIVE_PATH = "/__skein__/live"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.dir = root / ".skein"
+        self.tasks = self.dir / "task"
+        self.spec_root = self.dir / "spec"
+        self.archive_dir = self.dir / "archive"
+        for p in (self.tasks, self.spec_root):
+            p.mkdir(parents=True, exist_ok=True)
+        self.data = [{"id": f"t{i}", "name": f"n{i}", "status": TaskStatus.PENDING, "created": 1000}
+                     for i in range(3)]
+
+    def _snapshot(self) -> Any:
+        from skeinlib.web.views import Snapshot
+        rows = copy.deepcopy(self.data)
+        return Snapshot(proj="FAKE", wt_shown=False, tasks_fn=lambda: rows, all_tasks_fn=lambda: rows,
+                        tasks_dir=self.tasks, archive_dir=self.archive_dir, spec_root=self.spec_root)
+
+    def _task_json_rev(self) -> str:
+        return "stat.stat"
+
+    def _data_rev(self) -> str:
+        return "stat"
+
+    def _asset_rev(self) -> str:
+        return "stat"
+
+
+def test_subscribers_get_seq_patches_legacy_keep_task_changed(
+        tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr("skeinlib.web.serve.dist_dir", lambda: tmp_path / "dist")
+    monkeypatch.setattr("skeinlib.web.serve.PLUGIN_ROOT", tmp_path / "plugin")
+    fake = _FakeWatch()
+    monkeypatch.setitem(sys.modules, "watchfiles", types.SimpleNamespace(awatch=fake.awatch))
+    board = _FakeBoard(tmp_path / "repo")
+    app = serve.build_app(board, "PROJ-ID", quiet=True, on_ready=None)  # type: ignore[arg-type]
+
+    live = "ws://127.0.0.1/__skein__/live"  # WS 的 Host 取自 url 本身, 不跟 base_url
+    with TestClient(app, base_url="http://127.0.0.1") as c, \
+            c.websocket_connect(live) as sub, c.websocket_connect(live) as old:
+        sub.send_text(json.dumps({"type": "resync"}))
+        snap = sub.receive_json()
+        assert snap["type"] == "snapshot" and snap["seq"] == 0
+        assert set(snap["doc"]["board"]["cards"]) == {"t0", "t1", "t2"}
+        assert "queueTasks" in snap["doc"]["queue"]
+        doc = snap["doc"]
+
+        board.data[1]["name"] = "renamed"
+        fake.q.put({(2, str(board.tasks / "t1" / "task.json"))})
+        patch = sub.receive_json()
+        assert patch["type"] == "patch" and patch["seq"] == 1 and patch["touched"] == []
+        assert {"op": "replace", "path": "/board/cards/t1/name", "value": "renamed"} in patch["ops"]
+        assert all(not o["path"].startswith("/board/cards/") or o["path"].startswith("/board/cards/t1/")
+                   for o in patch["ops"]), "只出变了的那张卡"
+        doc = _apply(doc, patch["ops"])
+        legacy = json.loads(old.receive_text())
+        assert legacy["type"] == "task-changed" and legacy["id"] == "t1"
+
+        # 卡片没变、task 目录有文档编辑 → 空 ops + touched, seq 照样前进
+        fake.q.put({(2, str(board.tasks / "t2" / "design.md"))})
+        patch = sub.receive_json()
+        assert patch["seq"] == 2 and patch["touched"] == ["t2"]
+        doc = _apply(doc, patch["ops"])
+
+        # 断档: 客户端再发 resync → 快照对齐当前 seq, 内容等于逐条应用的结果
+        sub.send_text(json.dumps({"type": "resync"}))
+        again = sub.receive_json()
+        assert again["type"] == "snapshot" and again["seq"] == 2
+        assert again["doc"] == doc
+
+        # 文件变了但卡片/视图都没差 (task 目录自身的事件): 订阅者照旧收 "data" 兜底
+        fake.q.put({(2, str(board.tasks))})
+        assert sub.receive_text() == "data"
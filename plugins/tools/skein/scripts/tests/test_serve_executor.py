@@ -0,0 +1,109 @@
+"""看板写端点的进程内执行 (`web/executor.py` InProcessExecutor + `exec_call` 白名单)。
+
+覆盖: exec_call 与 exec_argv 同进同退; 真工作区上写端点不起子进程、结果形状同 CliResult
+(stdout 即 CLI 那行 JSON); 领域错误 → ok=False + stderr 原文; web.exec=subprocess 切回子进程;
+进程内实例与 board 各自独立, board 的读面照样看得到写入。
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401
+from conftest import run_skein
+from skeinlib.core.commands import Skein
+from skeinlib.utils.exec_policy import exec_argv, exec_call
+from skeinlib.web import serve
+
+_BODIES: list[dict[str, Any]] = [
+    {"cmd": "create", "id": "t1", "name": "n", "desc": "d"},
+    {"cmd": "create", "id": "t1", "name": "n", "desc": "d", "deps": "t0"},
+    {"cmd": "create", "id": "../x", "name": "n", "desc": "d"},
+    {"cmd": "create", "id": "t1", "name": " ", "desc": "d"},
+    {"cmd": "subtask-add", "id": "t1", "sid": "s1", "name": "n", "desc": "d", "estimate": "5m"},
+    {"cmd": "subtask-add", "id": "t1", "sid": "s1", "name": "n", "desc": "d"},
+    {"cmd": "clean"}, {"cmd": "clean", "days": "3"}, {"cmd": "clean", "days": -1},
+    {"cmd": "clean", "days": True}, {"cmd": "clean", "days": "x"},
+    {"cmd": "confirm", "id": "t1", "force": True}, {"cmd": "confirm"},
+    {"cmd": "revert", "id": "t1"}, {"cmd": "revert", "id": ".."},
+    {"cmd": "finish", "id": "t1"}, {"cmd": "priority", "id": "t1", "set": "high"},
+    {"cmd": "priority", "id": "t1"}, {"cmd": "del", "id": "t1", "force": True},
+    {"cmd": "nope", "id": "t1"},
+]
+
+
+@pytest.mark.parametrize("body", _BODIES)
+def test_exec_call_accepts_exactly_what_exec_argv_accepts(body: dict[str, Any]) -> None:
+    assert (exec_call(body) is None) == (exec_argv(body) is None)
+
+
+def test_exec_call_fills_typer_fields() -> None:
+    call = exec_call({"cmd": "del", "id": "t1"})
+    assert call == ("del", {"task_id": "t1", "subtask_sid": None, "dry_run": False, "force": False})
+
+
+# ---- 端点: 真工作区 + 真 Skein board ------------------------------------------
+
+def _client(ws: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[Any, Skein, list[Any]]:
+    from fastapi.testclient import TestClient
+    monkeypatch.chdir(ws)
+    monkeypatch.setattr("skeinlib.web.serve.dist_dir", lambda: ws / "dist")
+    spawned: list[Any] = []
+    real_run = subprocess.run
+
+    def fake_run(argv: Any, **kw: Any) -> Any:
+        # serve.subprocess 就是全局 subprocess 模块: git 等照常放行, 只拦 skein 子进程
+        if argv[0] != sys.executable:
+            return real_run(argv, **kw)
+        spawned.append(argv)
+        raise OSError("spawn blocked")
+    monkeypatch.setattr("skeinlib.web.serve.subprocess.run", fake_run)
+    board = Skein()
+    app = serve.build_app(board, "PROJ-ID", quiet=True, on_ready=None)
+    return TestClient(app, base_url="http://127.0.0.1"), board, spawned
+
+
+def test_write_endpoints_run_in_process(ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    c, board, spawned = _client(ws, monkeypatch)
+    r = c.post("/__skein__/task/create", json={"id": "order-api", "name": "任务一", "desc": "d"}).json()
+    assert r["ok"] is True and r["exit"] == 0 and r["stderr"] == "", r
+    assert json.loads(r["stdout"]) == r["result"]
+    assert (ws / ".skein" / "task" / "order-api" / "task.json").is_file()
+
+    r = c.post("/__skein__/subtask/add",
+               json={"id": "order-api", "sid": "s1", "name": "n", "desc": "d", "estimate": "5m"}).json()
+    assert r["ok"] is True, r
+    assert c.post("/__skein__/task/priority", json={"id": "order-api", "set": "high"}).json()["ok"] is True
+    assert spawned == [], "默认 web.exec=inprocess, 写端点不该起子进程"
+
+
+def test_domain_error_is_relayed_not_raised(ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    c, _, spawned = _client(ws, monkeypatch)
+    assert c.post("/__skein__/task/create", json={"id": "order-api", "name": "n", "desc": "d"}).json()["ok"]
+    r = c.post("/__skein__/task/create", json={"id": "order-api", "name": "n", "desc": "d"}).json()
+    assert r["ok"] is False and r["exit"] == 1 and r["stderr"]
+    r = c.post("/__skein__/task/finish", json={"id": "no-such-task"}).json()
+    assert r["ok"] is False and r["id"] == "no-such-task" and r["stderr"]
+    assert spawned == []
+
+
+def test_board_reads_see_in_process_writes(ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # 写走执行器自己的 Skein 实例, 读走 board 的: 两者不共享内存层, board 靠文件签名看到新 task
+    c, board, _ = _client(ws, monkeypatch)
+    assert [t["id"] for t in board.store.all_tasks()] == []
+    assert c.post("/__skein__/task/create", json={"id": "order-api", "name": "n", "desc": "d"}).json()["ok"]
+    assert c.post("/__skein__/task/get", json={"id": "order-api"}).status_code == 200
+    assert [t["id"] for t in board.store.all_tasks()] == ["order-api"]
+
+
+def test_subprocess_mode_switch(ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    run_skein(ws, "config", "set", "web.exec", "subprocess")
+    c, _, spawned = _client(ws, monkeypatch)
+    r = c.post("/__skein__/task/create", json={"id": "order-api", "name": "n", "desc": "d"}).json()
+    assert r == {"error": "spawn blocked", "ok": False}
+    assert spawned and spawned[0][-4:] == ["--name", "n", "--desc", "d"]
@@ -0,0 +1,155 @@
+"""serve 的 rev 计数器 (`web/revs.py` Revisions + `_watch_loop` 喂数)。
+
+覆盖: arm 前 / 未监听区不给值 / 各区按路径 bump (spec 只认 .md) / per-task 计数 / 被监听目录自身
+出事件要求重挂; 端点层: watcher 未挂上时走 board stat 扫描, 挂上后 rev 端点不再调 board 的
+*_rev, 文件事件推动 rev 变, dist/ 被删后重挂 awatch。watchfiles 用假模块驱动, 不碰真文件监听。
+"""
+from __future__ import annotations
+
+import asyncio
+import queue
+import shutil
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+import pytest
+
+import conftest  # noqa: F401
+from skeinlib.web import serve
+from skeinlib.web.revs import Revisions
+
+
+def _revs(tmp_path: Path) -> tuple[Revisions, Path, Path, Path]:
+    tasks, spec, dist = tmp_path / "task", tmp_path / "spec", tmp_path / "dist"
+    return Revisions(tasks, spec, dist), tasks, spec, dist
+
+
+def test_untrusted_until_armed_and_only_for_watched_roots(tmp_path: Path) -> None:
+    r, tasks, spec, dist = _revs(tmp_path)
+    assert r.rev("data") is None and not r.live
+    r.arm([tasks, spec])
+    assert r.rev("data") is not None and r.rev("spec") is not None
+    assert r.rev("asset") is None, "dist 没被监听, 不能冒充可信"
+
+
+def test_feed_bumps_areas_and_tasks(tmp_path: Path) -> None:
+    r, tasks, spec, dist = _revs(tmp_path)
+    r.arm([tasks, spec, dist])
+    before = {a: r.rev(a) for a in ("data", "spec", "asset")}
+    assert r.feed([str(tasks / "t1" / "design.md"), str(tasks / "t1" / "task.json")]) is False
+    assert r.rev("data") != before["data"]
+    assert r.rev("spec") == before["spec"] and r.rev("asset") == before["asset"]
+    assert list(r.task_revs()) == ["t1"]
+    t1 = r.task_revs()["t1"]
+
+    r.feed([str(spec / ".recall.db")])
+    assert r.rev("spec") == before["spec"], "衍生 db 写入不算规则变更"
+    r.feed([str(spec / "rules" / "git" / "a.md"), str(dist / "_next" / "x.js")])
+    assert r.rev("spec") != before["spec"] and r.rev("asset") != before["asset"]
+    assert r.task_revs()["t1"] == t1
+
+
+def test_watched_root_event_requests_rewatch(tmp_path: Path) -> None:
+    r, tasks, spec, dist = _revs(tmp_path)
+    r.arm([tasks, dist])
+    assert r.feed([str(dist / "index.html")]) is False
+    assert r.feed([str(dist / "a"), str(dist)]) is True
+
+
+# ---- 端点: 假 watchfiles 驱动 _watch_loop ------------------------------------
+
+class _FakeWatch:
+    """awatch 替身: 测试线程往 q 里塞批次, 事件循环线程逐批 yield。"""
+
+    def __init__(self) -> None:
+        self.q: queue.Queue[set[tuple[int, str]]] = queue.Queue()
+        self.calls: list[tuple[Any, ...]] = []
+
+    async def awatch(self, *paths: Any, **kw: Any) -> AsyncIterator[set[tuple[int, str]]]:
+        self.calls.append(paths)
+        while True:
+            try:
+                batch = self.q.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+                continue
+            yield batch
+
+
+class _FakeBoard:
+    _LOCK_ID_PATH = "/__skein__/id"
+    _REV_PATH = "/__skein__/rev"
+    _LIVE_PATH = "/__skein__/live"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.dir = root / ".skein"
+        self.tasks = self.dir / "task"
+        self.spec_root = self.dir / "spec"
+        self.archive_dir = self.dir / "archive"
+        for p in (self.tasks, self.spec_root):
+            p.mkdir(parents=True, exist_ok=True)
+        self.stat_calls = 0
+
+    def _snapshot(self) -> Any:
+        from skeinlib.web.views import Snapshot
+        return Snapshot(proj="FAKE", wt_shown=False, tasks_fn=lambda: [], all_tasks_fn=lambda: [],
+                        tasks_dir=self.tasks, archive_dir=self.archive_dir, spec_root=self.spec_root)
+
+    def _task_json_rev(self) -> str:
+        self.stat_calls += 1
+        return "stat.stat"
+
+    def _data_rev(self) -> str:
+        self.stat_calls += 1
+        return "stat"
+
+    def _asset_rev(self) -> str:
+        self.stat_calls += 1
+        return "stat"
+
+
+def _until(cond: Callable[[], bool], timeout: float = 5.0) -> None:
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "等待超时"
+        time.sleep(0.01)
+
+
+def test_rev_endpoint_served_from_watcher(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+    dist = tmp_path / "dist"
+    monkeypatch.setattr("skeinlib.web.serve.dist_dir", lambda: dist)
+    monkeypatch.setattr("skeinlib.web.serve.PLUGIN_ROOT", tmp_path / "plugin")  # 无前端源码 → 不监听
+    fake = _FakeWatch()
+    monkeypatch.setitem(sys.modules, "watchfiles", types.SimpleNamespace(awatch=fake.awatch))
+    board = _FakeBoard(tmp_path / "repo")
+    app = serve.build_app(board, "PROJ-ID", quiet=True, on_ready=None)  # type: ignore[arg-type]
+
+    with TestClient(app, base_url="http://127.0.0.1") as c:
+        assert c.get("/__skein__/rev").text == "stat.stat", "watcher 未挂上 → stat 扫描兜底"
+        _until(lambda: len(fake.calls) == 1)
+        assert set(fake.calls[0]) == {board.tasks, board.spec_root, dist}
+
+        fake.q.put(set())  # 超时空批 = watcher 已挂上
+        _until(lambda: c.get("/__skein__/rev").text != "stat.stat")
+        board.stat_calls = 0
+        r1 = c.get("/__skein__/rev").text
+        assert c.post("/__skein__/system/rev").json()["rev"] == r1
+        assert board.stat_calls == 0, "挂上后 rev 端点不该再走 stat 扫描"
+
+        fake.q.put({(2, str(board.tasks / "t1" / "prd.md"))})
+        _until(lambda: c.get("/__skein__/rev").text != r1)
+        r2 = c.get("/__skein__/rev").text
+        assert r2.split(".")[1] == r1.split(".")[1], "task 事件不动 asset 半边"
+
+        # dist/ 被 rmtree (前端重编译) → watch 已死: 重挂, 此时 dist 不在 → asset 半边退回 stat
+        shutil.rmtree(dist)
+        fake.q.put({(3, str(dist))})
+        _until(lambda: len(fake.calls) == 2)
+        fake.q.put(set())
+        _until(lambda: (rv := c.get("/__skein__/rev").text) != "stat.stat" and rv.endswith(".stat"))
+        assert set(fake.calls[1]) == {board.tasks, board.spec_root}
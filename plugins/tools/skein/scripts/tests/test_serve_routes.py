@@ -179,7 +179,7 @@ def test_config_panel_shaped_payload_persists() -> None:
                 assert saved["auto_commit"] is False
                 assert saved["retain_days"] == -1
                 assert saved["worktree"] == {"enabled": False, "root": "custom-wt"}
-                assert saved["web"] == {"serve": False, "board_open": False}
+                assert saved["web"] == {"serve": False, "board_open": False, "exec": "inprocess"}
                 assert saved["spec"]["always_budget"] == 2000
                 assert saved["spec"]["core_budget"] == 400  # 未编辑字段没被 CONFIG_DEFAULTS 兜底覆盖
 
@@ -0,0 +1,233 @@
+"""看板搜索索引 (`web/search.py` SearchIndex + `/__skein__/task/search`)。
+
+覆盖: 前缀匹配 / 词间 AND / 汉字词中间的字; bm25 名字优先; 片段截取与 marks 偏移; rev 不变不建快照、
+变了只重写改动的 task、删掉消失的; spec 走 `.recall.db` rules 表 (章节 + 高亮), 库不在退回逐文件扫;
+端点: watcher 批次后索引已同步, 搜索不再建快照。
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import queue
+import sqlite3
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+import pytest
+
+import conftest  # noqa: F401
+from skeinlib.spec.text import _cjk_terms
+from skeinlib.web import serve
+from skeinlib.web.search import SearchIndex, _match, _snippet
+from skeinlib.web.views import Snapshot
+
+
+def _task(tid: str, name: str, desc: str = "", subs: tuple[tuple[str, str, str], ...] = ()) -> dict[str, Any]:
+    return {"id": tid, "name": name, "desc": desc, "status": "pending",
+            "subtasks": [{"sid": s, "name": n, "desc": d} for s, n, d in subs]}
+
+
+class _Source:
+    def __init__(self, spec_root: Path, tasks: list[dict[str, Any]]) -> None:
+        self.spec_root = spec_root
+        self.tasks = tasks
+        self.builds = 0
+
+    def __call__(self) -> Snapshot:
+        self.builds += 1
+        rows = copy.deepcopy(self.tasks)
+        return Snapshot(proj="P", wt_shown=False, tasks_fn=lambda: rows, all_tasks_fn=lambda: rows,
+                        tasks_dir=self.spec_root, archive_dir=self.spec_root, spec_root=self.spec_root)
+
+
+def _ids(res: dict[str, Any]) -> list[str]:
+    return [h["id"] for h in res["hits"]]
+
+
+@pytest.fixture
+def src(tmp_path: Path) -> _Source:
+    return _Source(tmp_path / "spec", [
+        _task("order-api", "订单接口", "处理合并冲突时保留下单顺序",
+              (("s1", "Schema migration", "add orders table"),)),
+        _task("billing-export", "Billing export", "导出对账单, 引用 order 编号"),
+    ])
+
+
+def test_prefix_and_and_semantics(src: _Source) -> None:
+    idx = SearchIndex()
+    assert _ids(idx.search("migr", None, src)) == ["order-api/s1"], "前缀 + subtask 独立成行"
+    assert _ids(idx.search("ord", None, src))[-1] == "billing-export", "id/名字命中排在正文命中前"
+    assert set(_ids(idx.search("ord", None, src))) == {"order-api", "order-api/s1", "billing-export"}
+    assert _ids(idx.search("billing ord", None, src)) == ["billing-export"], "词间 AND"
+    assert _ids(idx.search("并冲", None, src)) == ["order-api"], "汉字串中间的词靠双字词影子列"
+    assert _ids(idx.search("冲突时保留", None, src)) == ["order-api"]
+    assert idx.search("  ", None, src)["hits"] == [] and idx.search("--", None, src)["hits"] == []
+    assert _ids(idx.search('"ord', None, src)), "双引号转义, 不炸 MATCH"
+
+
+def test_match_query_shape() -> None:
+    assert _match("ab Cd") == '"ab"* AND "Cd"*'
+    assert _match("合并冲") == '("合并冲"* OR ("合并" AND "并冲"))'
+    assert _match("- ,") is None
+
+
+def test_snippet_window_and_marks() -> None:
+    text = "x" * 200 + " merge Conflict here " + "y" * 200
+    s = _snippet(text, "conflict")
+    assert s["snippet"].startswith("…") and s["snippet"].endswith("…")
+    (a, b), = s["marks"]
+    assert s["snippet"][a:b] == "Conflict"
+    s = _snippet("处理\n合并冲突", "并冲")
+    assert s["snippet"] == "处理 合并冲突" and [s["snippet"][a:b] for a, b in s["marks"]] == ["并冲"]
+    assert _snippet("abc", "zzz") == {"snippet": "abc", "marks": []}
+
+
+def test_rev_gates_rebuild_and_sync_is_incremental(src: _Source) -> None:
+    idx = SearchIndex()
+    idx.search("order", "b-1", src)
+    assert src.builds == 1
+    idx.search("billing", "b-1", src)
+    assert src.builds == 1, "rev 没变不建快照"
+    rowids = dict(idx._rows)
+
+    src.tasks[1]["desc"] = "换成 reconcile 报表"
+    del src.tasks[0]["subtasks"][0]
+    src.tasks.append(_task("new-task", "Reconcile job"))
+    assert set(_ids(idx.search("reconcile", "b-2", src))) == {"billing-export", "new-task"}
+    assert idx._rows["billing-export"][1] != rowids["billing-export"][1]
+    assert "order-api/s1" not in _ids(idx.search("migr", "b-2", src)), "删掉的 subtask 不再命中"
+
+    src.tasks = [t for t in src.tasks if t["id"] != "new-task"]
+    idx.sync(src(), "b-3")
+    assert "new-task" not in idx._rows and _ids(idx.search("reconcile", "b-3", src)) == ["billing-export"]
+    idx.invalidate()
+    n = src.builds
+    idx.search("reconcile", "b-3", src)
+    assert src.builds == n + 1, "invalidate 后同 rev 也重同步"
+
+
+def test_sync_before_first_search_is_noop(src: _Source) -> None:
+    idx = SearchIndex()
+    idx.sync(src(), "b-1")
+    assert not idx.ready and idx._rows == {}
+
+
+def _recall_db(root: Path) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(root / ".recall.db")
+    con.execute("CREATE VIRTUAL TABLE rules USING fts5("
+                "rel, category, title, keywords, body, namespace, inclusion, anchors, path UNINDEXED, cjk)")
+    rows = [("git/merge.md#冲突处理", "git", "冲突处理", "rebase", "合并冲突时先看对方改动", "core", "", "",
+             "core/git/merge.md"),
+            ("web/api.md#Ordering", "web", "Ordering", "", "keep order stable", "core", "", "", "core/web/api.md")]
+    con.executemany("INSERT INTO rules VALUES (?,?,?,?,?,?,?,?,?,?)",
+                    [(*r, _cjk_terms(f"{r[2]}\n{r[3]}\n{r[4]}")) for r in rows])
+    con.commit()
+    con.close()
+
+
+def test_spec_sections_from_recall_db(src: _Source) -> None:
+    _recall_db(src.spec_root)
+    idx = SearchIndex()
+    spec = [h for h in idx.search("并冲", None, src)["hits"] if h["kind"] == "spec"]
+    assert [(h["id"], h["name"]) for h in spec] == [("core/git/merge.md", "冲突处理")]
+    a, b = spec[0]["marks"][0]
+    assert spec[0]["snippet"][a:b] == "并冲"
+    spec = [h for h in idx.search("rebas", None, src)["hits"] if h["kind"] == "spec"]
+    assert [h["id"] for h in spec] == ["core/git/merge.md"], "keywords 列也前缀匹配"
+    assert not [h for h in idx.search("core", None, src)["hits"] if h["kind"] == "spec"], \
+        "namespace/path 列不参与"
+
+
+def test_spec_falls_back_to_file_scan_without_db(src: _Source) -> None:
+    (src.spec_root / "rules").mkdir(parents=True)
+    (src.spec_root / "rules" / "naming.md").write_text("# 命名规范\n", encoding="utf-8")
+    hits = SearchIndex().search("命名", None, src)["hits"]
+    assert [h["id"] for h in hits if h["kind"] == "spec"] == ["rules/naming.md"]
+
+
+# ---- 端点: 假 watchfiles 让 revs 挂上 -----------------------------------------
+
+class _FakeWatch:
+    def __init__(self) -> None:
+        self.q: queue.Queue[set[tuple[int, str]]] = queue.Queue()
+
+    async def awatch(self, *paths: Any, **kw: Any) -> AsyncIterator[set[tuple[int, str]]]:
+        while True:
+            try:
+                batch = self.q.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+                continue
+            yield batch
+
+
+class _FakeBoard:
+    _LOCK_ID_PATH = "/__skein__/id"
+    _REV_PATH = "/__skein__/rev"
+    _LIVE_PATH = "/__skein__/live"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.dir = root / ".skein"
+        self.tasks = self.dir / "task"
+        self.spec_root = self.dir / "spec"
+        self.archive_dir = self.dir / "archive"
+        for p in (self.tasks, self.spec_root):
+            p.mkdir(parents=True, exist_ok=True)
+        self.data = [_task("order-api", "Order API", "ship it")]
+        self.snapshots = 0
+
+    def _snapshot(self) -> Snapshot:
+        self.snapshots += 1
+        rows = copy.deepcopy(self.data)
+        return Snapshot(proj="FAKE", wt_shown=False, tasks_fn=lambda: rows, all_tasks_fn=lambda: rows,
+                        tasks_dir=self.tasks, archive_dir=self.archive_dir, spec_root=self.spec_root)
+
+    def _task_json_rev(self) -> str:
+        return "stat.stat"
+
+    def _data_rev(self) -> str:
+        return "stat"
+
+    def _asset_rev(self) -> str:
+        return "stat"
+
+
+def _wait(cond: Callable[[], bool], what: str) -> None:
+    deadline = time.monotonic() + 5
+    while not cond():
+        assert time.monotonic() < deadline, f"等待{what}超时"
+        time.sleep(0.01)
+
+
+def test_endpoint_synced_by_watcher(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr("skeinlib.web.serve.dist_dir", lambda: tmp_path / "dist")
+    monkeypatch.setattr("skeinlib.web.serve.PLUGIN_ROOT", tmp_path / "plugin")
+    fake = _FakeWatch()
+    monkeypatch.setitem(sys.modules, "watchfiles", types.SimpleNamespace(awatch=fake.awatch))
+    board = _FakeBoard(tmp_path / "repo")
+    app = serve.build_app(board, "PROJ-ID", quiet=True, on_ready=None)  # type: ignore[arg-type]
+
+    def search(q: str) -> list[str]:
+        r = c.post("/__skein__/task/search", json={"q": q})
+        assert r.status_code == 200
+        return [h["id"] for h in r.json()["hits"]]
+
+    with TestClient(app, base_url="http://127.0.0.1") as c:
+        fake.q.put(set())  # 超时空批 = watcher 已挂上, data rev 可信
+        _wait(lambda: c.get("/__skein__/rev").text != "stat.stat", " watcher 挂上")
+        assert search("ord") == ["order-api"]
+        n = board.snapshots
+        assert search("ship") == ["order-api"] and board.snapshots == n, "rev 不变: 查询不建快照"
+
+        board.data.append(_task("refund-flow", "Refund flow"))
+        fake.q.put({(2, str(board.tasks / "refund-flow" / "task.json"))})
+        _wait(lambda: board.snapshots > n, "文件事件")
+        n = board.snapshots
+        assert search("refu") == ["refund-flow"]
+        assert board.snapshots == n, "推送时已同步过, 查询直接命中"
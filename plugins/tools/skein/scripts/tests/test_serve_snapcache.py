@@ -0,0 +1,196 @@
+"""跨请求共享 Snapshot (`web/snapcache.py` SnapshotCache + serve 的 `_snap()`)。
+
+覆盖: 无可信 rev 不缓存; 同 rev 复用、换 rev / side 签名 / invalidate 重建; 建的时候抛了不记;
+端点: watcher 挂上后一次页面加载的几个视图端点只扫一次, 文件事件推动 rev 后重建; 别的进程改
+config.yaml、回收站清空不推 rev 也重建。
+"""
+from __future__ import annotations
+
+import asyncio
+import queue
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+import pytest
+
+import conftest  # noqa: F401
+from skeinlib.web import serve
+from skeinlib.web.snapcache import SnapshotCache
+from skeinlib.web.views import Snapshot
+
+
+def _factory(tmp_path: Path, delay: float = 0.0) -> tuple[Callable[[], Snapshot], list[int]]:
+    scans: list[int] = []
+
+    def tasks() -> list[dict[str, Any]]:
+        scans.append(1)
+        time.sleep(delay)
+        return []
+
+    def build() -> Snapshot:
+        return Snapshot(proj="P", wt_shown=False, tasks_fn=tasks, all_tasks_fn=lambda: [],
+                        tasks_dir=tmp_path, archive_dir=tmp_path / "archive", spec_root=tmp_path)
+    return build, scans
+
+
+def test_untrusted_rev_is_not_cached(tmp_path: Path) -> None:
+    build, _ = _factory(tmp_path)
+    c = SnapshotCache(build)
+    assert c.get(None) is not c.get(None)
+    assert c.builds == 2
+
+
+def test_same_rev_reused_until_rev_changes_or_invalidated(tmp_path: Path) -> None:
+    build, scans = _factory(tmp_path)
+    c = SnapshotCache(build)
+    s1 = c.get("b-1")
+    assert c.get("b-1") is s1 and len(scans) == 1, "共享前已扫好, 视图再访问不重扫"
+    s1.tasks
+    assert len(scans) == 1
+    s2 = c.get("b-2")
+    assert s2 is not s1 and c.get("b-2") is s2
+    c.invalidate()
+    assert c.get("b-2") is not s2
+    assert c.builds == 3
+
+
+def test_side_signature_joins_key(tmp_path: Path) -> None:
+    build, _ = _factory(tmp_path)
+    c = SnapshotCache(build)
+    s1 = c.get("b-1", (1, 2))
+    assert c.get("b-1", (1, 2)) is s1
+    assert c.get("b-1", (1, 3)) is not s1, "config / 归档的 stat 变了, 同 rev 也重建"
+
+
+def test_failed_build_is_not_cached(tmp_path: Path) -> None:
+    build, _ = _factory(tmp_path)
+    calls: list[int] = []
+
+    def flaky() -> Snapshot:
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("scan failed")
+        return build()
+    c = SnapshotCache(flaky)
+    with pytest.raises(OSError):
+        c.get("b-1")
+    s = c.get("b-1")
+    assert c.get("b-1") is s and len(calls) == 2
+
+
+# ---- 端点: 假 watchfiles 让 revs 挂上 -----------------------------------------
+
+class _FakeWatch:
+    def __init__(self) -> None:
+        self.q: queue.Queue[set[tuple[int, str]]] = queue.Queue()
+
+    async def awatch(self, *paths: Any, **kw: Any) -> AsyncIterator[set[tuple[int, str]]]:
+        while True:
+            try:
+                batch = self.q.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+                continue
+            yield batch
+
+
+class _FakeBoard:
+    _LOCK_ID_PATH = "/__skein__/id"
+    _REV_PATH = "/__skein__/rev"
+    _LIVE_PATH = "/__skein__/live"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.dir = root / ".skein"
+        self.tasks = self.dir / "task"
+        self.spec_root = self.dir / "spec"
+        self.archive_dir = self.dir / "archive"
+        for p in (self.tasks, self.spec_root):
+            p.mkdir(parents=True, exist_ok=True)
+        self.snapshots = 0
+
+    def _snapshot(self) -> Snapshot:
+        self.snapshots += 1
+        return Snapshot(proj="FAKE", wt_shown=False, tasks_fn=lambda: [], all_tasks_fn=lambda: [],
+                        tasks_dir=self.tasks, archive_dir=self.archive_dir, spec_root=self.spec_root)
+
+    def _task_json_rev(self) -> str:
+        return "stat.stat"
+
+    def _data_rev(self) -> str:
+        return "stat"
+
+    def _asset_rev(self) -> str:
+        return "stat"
+
+
+def test_page_load_views_share_one_snapshot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr("skeinlib.web.serve.dist_dir", lambda: tmp_path / "dist")
+    monkeypatch.setattr("skeinlib.web.serve.PLUGIN_ROOT", tmp_path / "plugin")
+    fake = _FakeWatch()
+    monkeypatch.setitem(sys.modules, "watchfiles", types.SimpleNamespace(awatch=fake.awatch))
+    board = _FakeBoard(tmp_path / "repo")
+    app = serve.build_app(board, "PROJ-ID", quiet=True, on_ready=None)  # type: ignore[arg-type]
+    views = ("/__skein__/task/list", "/__skein__/task/dashboard", "/__skein__/task/queue",
+             "/__skein__/archive/list")
+
+    with TestClient(app, base_url="http://127.0.0.1") as c:
+        fake.q.put(set())  # 超时空批 = watcher 已挂上, data rev 可信
+        deadline = time.monotonic() + 5
+        while c.get("/__skein__/rev").text == "stat.stat":
+            assert time.monotonic() < deadline, "等待 watcher 挂上超时"
+            time.sleep(0.01)
+        before = board.snapshots
+        for path in views:
+            assert c.post(path).status_code == 200
+        assert board.snapshots == before + 1, "同一 rev 下各视图共用一份"
+
+        fake.q.put({(2, str(board.tasks / "t1" / "task.json"))})
+        deadline = time.monotonic() + 5
+        while board.snapshots == before + 1:  # _diff_and_push 按新 rev 建
+            assert time.monotonic() < deadline, "等待文件事件超时"
+            time.sleep(0.01)
+        n = board.snapshots
+        for path in views:
+            c.post(path)
+        assert board.snapshots == n, "推送算过的那份被随后的重拉直接命中"
+
+
+def test_config_and_trash_changes_rebuild(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr("skeinlib.web.serve.dist_dir", lambda: tmp_path / "dist")
+    monkeypatch.setattr("skeinlib.web.serve.PLUGIN_ROOT", tmp_path / "plugin")
+    fake = _FakeWatch()
+    monkeypatch.setitem(sys.modules, "watchfiles", types.SimpleNamespace(awatch=fake.awatch))
+    board = _FakeBoard(tmp_path / "repo")
+    app = serve.build_app(board, "PROJ-ID", quiet=True, on_ready=None)  # type: ignore[arg-type]
+
+    with TestClient(app, base_url="http://127.0.0.1") as c:
+        fake.q.put(set())
+        deadline = time.monotonic() + 5
+        while c.get("/__skein__/rev").text == "stat.stat":
+            assert time.monotonic() < deadline, "等待 watcher 挂上超时"
+            time.sleep(0.01)
+        c.post("/__skein__/task/list")
+        n = board.snapshots
+        c.post("/__skein__/task/list")
+        assert board.snapshots == n
+
+        (board.dir / "config.yaml").write_text("pools:\n  work: 4\n")  # 别的进程 `skein config set`
+        c.post("/__skein__/task/list")
+        assert board.snapshots == n + 1, "config.yaml 不在 watcher 的 data 区, 靠 stat 签名失效"
+
+        month = board.archive_dir / "2026" / "10"
+        month.mkdir(parents=True)
+        (month / "old-task").mkdir()
+        c.post("/__skein__/archive/list")
+        assert board.snapshots == n + 2, "归档目录变了 (别的进程归档) 也重建"
+
+        (board.dir / "trash" / "gone-task").mkdir(parents=True)
+        assert c.post("/__skein__/trash/purge", json={}).json()["purged_count"] == 1
+        c.post("/__skein__/task/list")
+        assert board.snapshots == n + 3, "清回收站后重建"
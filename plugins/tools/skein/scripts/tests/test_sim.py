@@ -0,0 +1,105 @@
+"""`skein sim` 离线模拟 — 合成 DAG 过真实 claim/迁移/finish, 报 makespan 与池占用。
+
+覆盖: 单链场景 makespan 与手算逐值一致 / 各组合下的物理下界 (占用率 ≤ 1, makespan ≥ 总工时÷槽数) /
+同 seed 可复现 / gate 池卡收尾 / 失败重试跑完 / 虚拟时钟用完即还 / 各形状 DAG 无环且依赖只指向前面 /
+CLI 网格扫描与参数报错。另有一条墙钟基准 (默认跳过): 中等规模场景的 claim 耗时分位有上限。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import run_skein  # noqa: E402
+from skeinlib.cli import sim as _sim  # noqa: E402
+from skeinlib.task import model as _model  # noqa: E402
+
+
+def _args(**kw: Any) -> argparse.Namespace:
+    base: dict[str, Any] = {"tasks": 3, "subtasks": "3-6", "shape": "random", "work": "2", "gate": "3",
+                            "weight": "depth", "seed": 0, "sigma": 0.3, "fail_rate": 0.0, "finish": 0.5,
+                            "task_deps": 0.0}
+    return argparse.Namespace(**(base | kw))
+
+
+def test_chain_makespan_matches_hand_count() -> None:
+    out = _sim.sim(_args(tasks=1, subtasks="5", shape="chain", work="3", finish=1.0, seed=4))
+    spec = _sim.synthetic_tasks(4, 1, (5, 5), "chain", 0.0)[0]
+    real = sum(_sim._attempt(4, spec["id"], s["sid"], 1, s["estimate"], 0.3, 0.0)[0] for s in spec["subtasks"])
+    run = out["runs"][0]
+    assert run["makespan_h"] == pytest.approx(real + 1.0, abs=1e-3)  # 串行: 工期之和 + 收尾
+    assert run["wait_h"]["max"] == pytest.approx(0.0, abs=1e-3)  # 槽富余, 就绪即认领
+    assert run["attempts"] == 5 and run["unfinished"] == []
+
+
+def test_grid_respects_physical_bounds_and_is_reproducible() -> None:
+    a = _args(tasks=4, subtasks="4-8", shape="layered", work="1,2,4", gate="1,2", task_deps=0.4)
+    out = _sim.sim(a)
+    assert [(r["work"], r["gate"]) for r in out["runs"]] == [(w, g) for w in (1, 2, 4) for g in (1, 2)]
+    for r in out["runs"]:
+        assert r["unfinished"] == [] and r["attempts"] == out["scenario"]["subtasks"]
+        assert 0 < r["work_util"] <= 1.0 + 1e-6 and 0 < r["gate_util"] <= 1.0 + 1e-6
+        assert r["claim_ms"]["count"] > 0
+        assert r["wait_h"]["p50"] <= r["wait_h"]["p90"] <= r["wait_h"]["p99"] <= r["wait_h"]["max"]
+    one = next(r for r in out["runs"] if r["work"] == 1)
+    assert one["work_util"] > 0.9  # 单槽几乎一直有活
+    strip = [{k: v for k, v in r.items() if k != "claim_ms"} for r in out["runs"]]
+    assert strip == [{k: v for k, v in r.items() if k != "claim_ms"} for r in _sim.sim(a)["runs"]]
+
+
+def test_gate_pool_serializes_finishing() -> None:
+    a = _args(tasks=4, subtasks="1", work="4", gate="1,4", finish=5.0, seed=2)
+    narrow, wide = _sim.sim(a)["runs"]
+    assert narrow["gate_rejects"] > 0 and wide["gate_rejects"] == 0
+    assert narrow["unfinished"] == []  # 曾经: 多个 task 同时进检查中, 互相占满 gate 永远收不了尾
+    assert narrow["makespan_h"] >= wide["makespan_h"] + 5.0  # 至少多排一轮收尾
+
+
+def test_failures_are_retried_to_completion() -> None:
+    run = _sim.sim(_args(tasks=3, fail_rate=0.4, seed=9))["runs"][0]
+    assert run["unfinished"] == []
+    assert run["failed"] > 0 and run["attempts"] > run["failed"]
+
+
+def test_virtual_clock_is_restored() -> None:
+    _sim.sim(_args(tasks=1, subtasks="2"))
+    assert getattr(_model, "time") is time and abs(_model.now() - time.time()) < 5
+
+
+@pytest.mark.parametrize("shape", _sim.SHAPES)
+def test_shapes_are_dags_over_earlier_subtasks(shape: str) -> None:
+    rng = random.Random(3)
+    for n in (1, 2, 7, 20):
+        subs = _sim.synthetic_subtasks(rng, n, shape)
+        seen: set[str] = set()
+        for s in subs:
+            assert set(s["depends_on"]) <= seen and s["estimate"] > 0
+            seen.add(s["sid"])
+
+
+def test_cli_grid_and_errors(ws: Path) -> None:
+    out = json.loads(run_skein(ws, "sim", "--tasks", "2", "--work", "1,2", "--weight", "depth,estimate").stdout)
+    assert [(r["work"], r["weight"]) for r in out["runs"]] == [(1, "depth"), (1, "estimate"),
+                                                                (2, "depth"), (2, "estimate")]
+    for bad in (["--shape", "ring"], ["--work", "0"], ["--weight", "fastest"], ["--subtasks", "5-2"]):
+        p = run_skein(ws, "sim", *bad, check=False)
+        assert p.returncode != 0 and bad[0] in p.stderr, (bad, p.stderr)
+    assert not list((ws / ".skein" / "task").glob("sim-*"))  # 只在临时工作区里跑, 不碰当前工作区
+
+
+CLAIM_P50_BUDGET_MS = 60.0
+
+
+@pytest.mark.benchmark
+def test_claim_latency_benchmark() -> None:
+    """基准: 12 task × 8~12 subtask (~120 个) 的场景, 单次 claim 中位耗时 (含落盘) 有上限。
+    本机约 13ms; 预算留足余量, 只拦「claim 又变成每次整表重扫/重解析」这类回退。"""
+    run = _sim.sim(_args(tasks=12, subtasks="8-12", work="4", seed=1))["runs"][0]
+    assert run["unfinished"] == []
+    assert run["claim_ms"]["p50"] < CLAIM_P50_BUDGET_MS, run["claim_ms"]
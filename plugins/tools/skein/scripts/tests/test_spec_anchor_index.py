@@ -0,0 +1,192 @@
+"""anchors 的批量判定 (`MaintainMixin._refresh_anchor_states` + `spec/symbols.py` 符号缓存) 与
+finish-candidates 的 anchors 反查 (`WriteMixin._anchor_keys`)。
+
+覆盖: 多条规则指向同一文件只读一次, ok/weak/missing 与逐个 `_check_file_symbol` 同口径 / 规则文件
+改了、目标没动 → 目标走符号缓存不重读 / Stop hook 同走批量 / 反查集合与 `_path_matches_anchor`
+逐条判定一致, `path:symbol` 按路径部分命中 / 600 条 anchors 指向 20 个文件只抽 20 次符号 /
+Stop hook 的 git ls-files 只列被指的文件, 不扫全仓。
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.hooks import stop as _stop  # noqa: E402
+from skeinlib.spec import symbols as _symbols  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+
+def _rule(ws: Path, ns: str, cat: str, topic: str, anchors: str, body: str = "## r\n\nx") -> Path:
+    return write_rule(ws, ns, cat, topic, body, f"status: active\nanchors: {anchors}\n")
+
+
+def _extracts(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    seen: list[str] = []
+    orig = _symbols.extract
+
+    def spy(path: str) -> Any:
+        seen.append(Path(path).name)
+        return orig(path)
+    monkeypatch.setattr(_symbols, "extract", spy)
+    return seen
+
+
+def _states(s: Spec) -> dict[str, str]:
+    recs, _ = s._health_records(["map"])
+    return {a: st for r in recs.values() for a, st in r["anchor_states"]}
+
+
+def _sources(ws: Path) -> None:
+    (ws / "src").mkdir(exist_ok=True)
+    (ws / "src" / "lib.py").write_text("def alpha():\n    pass\n\nclass Beta:\n    pass\n")
+    (ws / "src" / "ui.ts").write_text("export const view = 1\n")
+    (ws / "README.md").write_text("# hi\n")
+    (ws / "bad.py").write_bytes(b"\x80\x80")
+
+
+def test_shared_targets_read_once_same_verdicts(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    _rule(mem_ws, "map", "code", "a", "src/lib.py:alpha, src/lib.py:Beta, src/ui.ts:view")
+    _rule(mem_ws, "map", "code", "b", "src/lib.py:gone, ./src/lib.py:alpha, src/ui.ts:nope, README.md:any")
+    _rule(mem_ws, "map", "code", "c", "src, src:alpha, bad.py:x, missing.py:y, missing.py")
+    seen = _extracts(monkeypatch)
+    states = _states(Spec())
+    assert sorted(seen) == ["README.md", "bad.py", "lib.py", "ui.ts"]
+    s = Spec()
+    for anchor, state in states.items():
+        path, _, symbol = anchor.partition(":")
+        target = mem_ws / path.strip()
+        want = "missing" if not target.exists() else \
+            "ok" if not symbol or s._check_file_symbol(target, symbol.strip()) else "weak"
+        assert state == want, anchor
+    assert states["src/lib.py:gone"] == "weak" and states["missing.py"] == "missing"
+    assert states["src:alpha"] == "weak" and states["README.md:any"] == "ok"
+
+
+def test_edited_rule_reuses_symbol_cache(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    subprocess.run(["git", "add", "src"], cwd=mem_ws, check=True, capture_output=True)
+    f = _rule(mem_ws, "map", "code", "a", "src/lib.py:alpha")
+    Spec()._health_records(["map"])
+    seen = _extracts(monkeypatch)
+    f.write_text(f.read_text().replace("src/lib.py:alpha", "src/lib.py:Beta, src/lib.py:zeta"))
+    assert _states(Spec()) == {"src/lib.py:Beta": "ok", "src/lib.py:zeta": "weak"}
+    assert seen == [], "目标 blob 没变, 不该重读"
+
+    (mem_ws / "src" / "lib.py").write_text("def zeta():\n    pass\n")
+    age_files(mem_ws / "src" / "lib.py")
+    assert _states(Spec()) == {"src/lib.py:Beta": "weak", "src/lib.py:zeta": "ok"}
+    assert seen == ["lib.py"]
+
+
+def test_stop_hook_uses_batch(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    for i in range(5):
+        _rule(mem_ws, "map", "code", f"t{i}", f"src/lib.py:alpha, src/lib.py:miss{i}")
+    seen = _extracts(monkeypatch)
+    _stop.cmd_stop_check({})
+    assert seen == ["lib.py"]
+    data = json.loads((mem_ws / ".skein" / "spec" / ".pending-fix").read_text())
+    assert sum("[断链-弱]" in p["detail"] for p in data["problems"]) == 5
+
+
+def test_stop_hook_lists_only_anchored_files(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _sources(mem_ws)
+    (mem_ws / "other.py").write_text("def x():\n    pass\n")
+    subprocess.run(["git", "add", "src", "other.py"], cwd=mem_ws, check=True, capture_output=True)
+    _rule(mem_ws, "map", "code", "a", "src/lib.py:alpha, src/ui.ts:view, /abs/x.py:y")
+    calls: list[Any] = []
+    orig = subprocess.run
+
+    def spy(cmd: Any, *a: Any, **kw: Any) -> Any:
+        calls.append(cmd)
+        return orig(cmd, *a, **kw)
+    monkeypatch.setattr(subprocess, "run", spy)
+    _stop.cmd_stop_check({})
+    ls = [c for c in calls if isinstance(c, list) and "ls-files" in c]
+    assert ls and all(c[c.index("--") + 1:] == ["src/lib.py", "src/ui.ts"] for c in ls), ls
+
+    (mem_ws / "src" / "lib.py").write_text("def alpha():\n    return 1\n")
+    got = _symbols.tracked(mem_ws, ["src/lib.py", "src/ui.ts", "missing.py", "/abs/x.py", "../y.py"])
+    full = _symbols.tracked(mem_ws)
+    assert full is not None and got == {k: full[k] for k in ("src/lib.py", "src/ui.ts")}
+    assert got["src/lib.py"] == "" and got["src/ui.ts"], "改过没暂存的按 stat, 其余给 blob sha"
+
+
+def test_reverse_lookup_set_matches_pairwise(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    files = ["src/a.py", "a.py", "/abs/x.py", "src/pkg/mod.py", "web/ui/view.ts", "docs/readme.md"]
+    anchors = ["src", "src/a", "a", "a.py", "src/a.py", "/abs/x.py", "abs/x", "pkg", "pkg/mod", "mod",
+               "ui/view.ts", "web/ui", "view", "readme.md", "readme", "src/pkg/mod", "pkg/mod.py", "x", "a/b"]
+    s = Spec()
+    for f in files:
+        keys = s._anchor_keys(f)
+        assert {a for a in anchors if a in keys} == {a for a in anchors if s._path_matches_anchor(f, a)}, f
+
+    _rule(mem_ws, "product", "auth", "login", "src/auth.py:login, web", "## 登录\n\nx\n\n## 登出\n\ny")
+    _rule(mem_ws, "product", "misc", "other", "lib/other.py")
+    hits = s._reverse_lookup_anchors(["src/auth.py", "web/app.ts", "tools/x.py"])
+    assert [(h.file, h.anchor, h.rule) for h in hits] == [
+        ("src/auth.py", "src/auth.py", "product/auth/login.md#登录"),
+        ("web/app.ts", "web", "product/auth/login.md#登录"),
+        ("src/auth.py", "src/auth.py", "product/auth/login.md#登出"),
+        ("web/app.ts", "web", "product/auth/login.md#登出"),
+    ]
+
+
+def _big_map(ws: Path) -> list[tuple[str, str]]:
+    """20 个 1000 函数的源文件, 300 条规则各挂 2 个 anchors (共 600 条, 同一文件被 30 条指)。"""
+    (ws / "src").mkdir()
+    for m in range(20):
+        (ws / "src" / f"m{m}.py").write_text("".join(f"def f{m}_{j}():\n    return {j}\n" for j in range(1000)))
+    for i in range(300):
+        _rule(ws, "map", f"c{i % 5}", f"t{i}", f"src/m{i % 20}.py:f{i % 20}_{i}, src/m{(i + 1) % 20}.py:nope")
+    return [(f"src/m{i % 20}.py", f"f{i % 20}_{i}") for i in range(300)]
+
+
+def test_large_map_extracts_each_target_once(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    ok = _big_map(mem_ws)
+    age_files(*(mem_ws / "src").iterdir())  # 出 racy 窗口, 符号才落缓存
+    seen = _extracts(monkeypatch)
+    states = _states(Spec())
+    assert sorted(seen) == sorted(f"m{m}.py" for m in range(20)), "600 条 anchors 只抽 20 次"
+    assert {a for a, st in states.items() if st == "ok"} == {f"{p}:{sym}" for p, sym in ok}
+    assert {a for a, st in states.items() if st == "weak"} == {f"src/m{m}.py:nope" for m in range(20)}
+    seen.clear()
+    _states(Spec())
+    assert seen == [], "目标没动: 符号缓存全命中"
+
+
+ANCHOR_SHARE = 0.3  # 批量判定至多耗逐条 `_check_file_symbol` 的这个比例
+
+
+@pytest.mark.benchmark
+def test_batched_anchors_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 同 `_big_map`。逐条判定 = 600 次读文件跑正则; 批量 = 20 次。"""
+    monkeypatch.chdir(mem_ws)
+    _big_map(mem_ws)
+    s = Spec()
+    recs, _ = s._health_records(["map"])
+    pairs = [a.split(":") for r in recs.values() for a in r["anchors"]]
+    t0 = time.perf_counter()
+    naive = [s._check_file_symbol(mem_ws / p, sym) for p, sym in pairs]
+    t_naive = time.perf_counter() - t0
+    fresh = {str(i): {"anchors": r["anchors"]} for i, r in enumerate(recs.values())}
+    (mem_ws / ".skein" / ".cache" / _symbols.CACHE).unlink()  # 冷符号缓存: 与逐条判定同起跑线
+    t0 = time.perf_counter()
+    s._refresh_anchor_states(fresh, mem_ws, time.time_ns())
+    t_batch = time.perf_counter() - t0
+    assert [st == "ok" for r in fresh.values() for _, st in r["anchor_states"]] == naive
+    assert t_batch < t_naive * ANCHOR_SHARE, (t_batch, t_naive)
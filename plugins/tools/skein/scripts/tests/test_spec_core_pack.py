@@ -0,0 +1,162 @@
+"""SessionStart / SubagentStart 的 core 预渲染包 (`InjectMixin._core_pack`, `.skein/.cache/core-inject.json`)。
+
+覆盖: 包里的索引 / 全文 / 按类目切块与现读全库逐字一致 (含旧 `layer: core` 兼容、多 namespace) /
+reindex 之后 hook 不再读规则文件 / 手改 (新增、auto 改 always、删除) 只重读变了的文件并回写包 /
+400 个文件的库派 8 个 agent (各当新进程) 零解析。
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.spec import core as _core  # noqa: E402
+from skeinlib.spec import inject as _inject  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+from skeinlib.spec.text import Doc, _parse_doc  # noqa: E402
+from skeinlib.utils.token_conversion import estimate_tokens_from_chars  # noqa: E402
+
+
+def _library(ws: Path) -> list[Path]:
+    return [
+        write_rule(ws, "rules", "script", "run", "## 跑脚本\n\n用 uv run。\n\n## 日志\n\n用 DBG。", "inclusion: always\n"),
+        write_rule(ws, "rules", "git", "commit", "## 提交\n\n一需求一提交。", "inclusion: always\n"),
+        write_rule(ws, "rules", "git", "legacy", "## 旧规则\n\n老库没迁移 inclusion。", "layer: core\n"),
+        write_rule(ws, "rules", "arch", "misc", "## 随手\n\n不常驻。", "inclusion: auto\n"),
+        write_rule(ws, "product", "script", "wiki", "引言无标题\n\n## 产品\n\n需求真值。", "inclusion: always\n"),
+    ]
+
+
+def _direct(s: Spec, cats: list[str]) -> tuple[str, str, str]:
+    """旧实现: 现读全库 (索引, 全文, 按类目全文)。"""
+    files = s._always_files()
+    idx = "\n".join(f"- [{f.parent.name}/{f.stem}] {t}" for f in files for t, _ in s._doc(f).sections if t)
+    by_cat = "\n\n".join(p for p in (s._doc(f).body.strip() for f in files if f.parent.name in cats) if p)
+    return idx, s._core_text_raw(), by_cat
+
+
+def _parses(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    seen: list[str] = []
+
+    def spy(text: str) -> Doc:
+        seen.append(text)
+        return _parse_doc(text)
+    monkeypatch.setattr(_core, "_parse_doc", spy)
+    return seen
+
+
+def _subagent(s: Spec, monkeypatch: pytest.MonkeyPatch, agent: str) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps({"agent_type": agent})))
+    s.subagent_start(argparse.Namespace())
+
+
+def test_pack_matches_direct_read(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _library(mem_ws)
+    s = Spec()
+    s._reindex_all()
+    pack = s._core_pack()
+    idx, text, by_cat = _direct(s, ["script", "git"])
+    assert s._core_index() == idx and pack["text"] == text and s._core_text() == text
+    assert s._core_text_by_cat(["script", "git"]) == by_cat
+    assert "[git/legacy] 旧规则" in idx and "随手" not in idx
+    assert [b["cat"] for b in pack["always"]] == ["script", "git", "git", "script"]
+    assert pack["tokens"] == estimate_tokens_from_chars(len(text))
+
+
+def test_hooks_read_only_the_pack(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                  capsys: pytest.CaptureFixture[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    age_files(*_library(mem_ws))
+    Spec()._reindex_all()
+    assert (mem_ws / ".skein" / ".cache" / _inject.CORE_PACK).exists()
+    _core._DOCS.clear()  # hook 是新进程
+    parses = _parses(monkeypatch)
+    s = Spec()
+    s.session_start(argparse.Namespace())
+    _subagent(s, monkeypatch, "skein-executor")
+    out = capsys.readouterr().out.splitlines()
+    assert parses == []
+    session = json.loads(out[0])["hookSpecificOutput"]["additionalContext"]
+    sub = json.loads(out[1])["hookSpecificOutput"]["additionalContext"]
+    assert "- [script/run] 跑脚本" in session and "- [git/legacy] 旧规则" in session
+    assert "用 uv run。" in sub and "需求真值。" in sub and "一需求一提交。" in sub
+
+
+def test_hand_edits_reread_only_changed_files(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    files = _library(mem_ws)
+    age_files(*files)
+    Spec()._reindex_all()
+    _core._DOCS.clear()
+    parses = _parses(monkeypatch)
+
+    misc = files[3]
+    misc.write_text(misc.read_text().replace("inclusion: auto", "inclusion: always"))
+    new = write_rule(mem_ws, "rules", "ops", "deploy", "## 发布\n\n先灰度。", "inclusion: always\n")
+    files[1].unlink()
+    age_files(misc, new)
+    s = Spec()
+    idx = s._core_index()
+    assert len(parses) == 2
+    assert "[arch/misc] 随手" in idx and "[ops/deploy] 发布" in idx and "提交" not in idx
+    _core._DOCS.clear()
+    assert _direct(Spec(), [])[0] == idx
+    parses.clear()
+    assert Spec()._core_index() == idx and parses == [], "回写过的包不该再重读"
+
+
+def _big_library(ws: Path) -> list[Path]:
+    """400 个规则文件, 其中 40 个 always。"""
+    files = [write_rule(ws, "rules", ["script", "git", "arch", "db"][i % 4], f"t{i}",
+                        "".join(f"## 规则{i}-{j}\n\n{'正文内容 ' * 40}\n\n" for j in range(5)),
+                        f"inclusion: {'always' if i % 10 == 0 else 'auto'}\nkeywords: [k{i}]\n")
+             for i in range(400)]
+    age_files(*files)
+    return files
+
+
+def test_subagent_fanout_parses_nothing(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                        capsys: pytest.CaptureFixture[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    _big_library(mem_ws)
+    Spec()._reindex_all()
+    parses = _parses(monkeypatch)
+    s = Spec()
+    for _ in range(8):
+        _core._DOCS.clear()  # 每个 agent 都是新进程
+        _subagent(s, monkeypatch, "skein-executor")
+    assert parses == [], "400 个文件全凭 stat 命中包"
+    assert capsys.readouterr().out.count('"hookEventName": "SubagentStart"') == 8
+
+
+PACK_SHARE = 0.3  # 用预渲染包的 8 次注入至多耗现读全库的这个比例
+
+
+@pytest.mark.benchmark
+def test_subagent_fanout_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                   capsys: pytest.CaptureFixture[str]) -> None:
+    """基准: 同 `_big_library`, 派 8 个 agent。每次注入都当新进程算 (清空 `_doc`
+    缓存): 现读要判 400 个文件的 inclusion 再读 always 页; 用包只读一个 JSON + stat 400 个文件。"""
+    monkeypatch.chdir(mem_ws)
+    _big_library(mem_ws)
+    Spec()._reindex_all()
+    s = Spec()
+    t0 = time.perf_counter()
+    for _ in range(8):
+        _core._DOCS.clear()
+        _direct(s, ["script", "git"])
+    t_direct = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(8):
+        _core._DOCS.clear()
+        _subagent(s, monkeypatch, "skein-executor")
+    t_pack = time.perf_counter() - t0
+    capsys.readouterr()
+    assert t_pack < t_direct * PACK_SHARE, (t_pack, t_direct)
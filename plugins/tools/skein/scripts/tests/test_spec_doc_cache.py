@@ -0,0 +1,114 @@
+"""规则文件解析缓存 (`SpecBase._doc`) — 一次 reindex + 体检 + 注入里每个文件只解析一次。
+
+覆盖: 全链路每文件一次 `_parse_doc` / 改动 (stat 变) 即重解析 / racy 窗口内的文件每次重读 /
+删掉的文件不留缓存 / 500 个文件的库反复全量 reindex + 体检仍是每文件一次解析。
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.spec import core as _core  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+from skeinlib.spec.text import _parse_doc  # noqa: E402
+from skeinlib.utils import fs  # noqa: E402
+
+
+def _library(ws: Path, n: int, sections: int = 2) -> list[Path]:
+    files = [write_rule(ws, "rules", f"c{i % 10}", f"t{i}",
+                        "".join(f"## 规则{j}\n\n正文 {'lorem ' * 40}[[t{(i + 1) % n}#规则0]]\n\n"
+                                for j in range(sections)),
+                        f"inclusion: {'always' if i % 50 == 0 else 'auto'}\nstatus: active\n"
+                        f"keywords: [k{i}, x]\nanchors: a{i}.py\n")
+             for i in range(n)]
+    age_files(*files)
+    return files
+
+
+@pytest.fixture
+def parses(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """空缓存起步, 记录每次实际解析的原文。"""
+    monkeypatch.setattr(_core, "_DOCS", {})
+    seen: list[str] = []
+
+    def spy(text: str) -> Any:
+        seen.append(text)
+        return _parse_doc(text)
+    monkeypatch.setattr(_core, "_parse_doc", spy)
+    return seen
+
+
+def test_each_file_parsed_once_across_mixins(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                             parses: list[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    files = _library(mem_ws, 20)
+    s = Spec()
+    s._reindex_all(full=True)
+    s._scan_findings(["rules"])
+    s._core_text_raw()
+    s._core_index()
+    Spec()._always_files()
+    assert len(parses) == len(files)
+
+
+def test_changed_and_racy_files_are_reparsed(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                             parses: list[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    a, b = _library(mem_ws, 2)
+    s = Spec()
+    assert s._doc(a).meta["status"] == "active"
+    a.write_text(a.read_text().replace("status: active", "status: deprecated"))
+    age_files(a)
+    assert s._doc(a).meta["status"] == "deprecated" and len(parses) == 2
+    s._doc(a)
+    assert len(parses) == 2
+
+    b.write_text(b.read_text().replace("k1", "k9"))  # 刚写: 在 racy 窗口内
+    assert s._doc(b).meta["keywords"] == "k9, x"
+    s._doc(b)
+    assert len(parses) == 4, "racy 窗口内的文件不凭 stat 复用"
+    b.unlink()
+    with pytest.raises(OSError):
+        s._doc(b)
+    assert b not in _core._DOCS
+
+
+def test_large_library_repeat_runs_parse_once(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                              parses: list[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    files = _library(mem_ws, 500, sections=4)
+    for _ in range(2):
+        Spec()._reindex_all(full=True)
+        Spec()._scan_findings(["rules"])
+    assert len(parses) == len(files), "第二轮全部命中进程内缓存"
+
+
+DOC_CACHE_SHARE = 0.7  # 有缓存时全量 reindex + 体检至多耗无缓存时的这个比例
+
+
+@pytest.mark.benchmark
+def test_doc_cache_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 500 个主题文件 × 4 章节 = 2000 条规则。无缓存 (把 racy 窗口拉到无穷, 每次取都重读)
+    约 0.4s, 有缓存约 0.17s; 比例留余量, 只拦「又各读各的」这类回退。"""
+    monkeypatch.chdir(mem_ws)
+    _library(mem_ws, 500, sections=4)
+
+    def run() -> float:
+        t0 = time.perf_counter()
+        Spec()._reindex_all(full=True)
+        Spec()._scan_findings(["rules"])
+        return time.perf_counter() - t0
+
+    monkeypatch.setattr(_core, "_DOCS", {})
+    monkeypatch.setattr(fs, "RACY_NS", 10 ** 30)
+    run()  # 体检缓存 (spec_health) 两边都先灌好, 只比解析缓存
+    uncached = run()
+    monkeypatch.setattr(fs, "RACY_NS", 2_000_000_000)
+    run()
+    cached = run()
+    assert cached < uncached * DOC_CACHE_SHARE, (cached, uncached)
@@ -0,0 +1,85 @@
+"""rules 表的中文分词 (cjk 影子列 + `_fts_query` 双字词展开)。
+
+覆盖: 整串汉字里的词经 FTS 命中 (以前 MATCH 对不上整串, 报无命中), 不落 grep / 中英混写 token /
+增量 reindex 同样写影子列 / 缺 cjk 列的旧库 (schema 2) 在下次 reindex 全量迁移。
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.spec import index as _index  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+from skeinlib.spec.text import _cjk_terms  # noqa: E402
+
+
+def _rule(ws: Path, cat: str, topic: str, body: str) -> Path:
+    return write_rule(ws, "rules", cat, topic, body, f"keywords: [{cat}]\n")
+
+
+def _no_grep(monkeypatch: pytest.MonkeyPatch) -> None:
+    def boom(*_: Any, **__: Any) -> Any:
+        raise AssertionError("中文查询不该再降级 grep")
+    monkeypatch.setattr(Spec, "_recall_grep", boom)
+
+
+def test_cjk_terms_and_query_expansion() -> None:
+    assert _cjk_terms("用 git合并冲突, 再改。") == "用 合并 并冲 冲突 再改"
+    assert _index._fts_query("合并冲突 git") == '"合并冲突" OR "git" OR "合并" OR "并冲" OR "冲突"'
+    assert _index._fts_query('say "hi"') is None
+
+
+def test_chinese_words_hit_the_index(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                     capsys: pytest.CaptureFixture[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    _rule(mem_ws, "git", "merge", "## 合并冲突处理\n\n遇到冲突先变基到主干, 再逐个解决。")
+    _rule(mem_ws, "py", "log", "## 日志规范\n\n统一用 DBG 打日志。")
+    s = Spec()
+    s._reindex_all()
+    _no_grep(monkeypatch)
+    hits = s._recall_fts("冲突")
+    assert hits is not None and [h.split(" | ")[0] for h in hits] == ["| [rules] git/merge.md#合并冲突处理"]
+    assert "git/merge.md" in (s._recall_fts("git变基") or [""])[0]
+    s.recall(argparse.Namespace(query="怎么打日志", src="all"))
+    out = capsys.readouterr().out
+    assert "FTS5 BM25" in out and "py/log.md#日志规范" in out
+
+
+def test_incremental_reindex_writes_shadow_column(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    f = _rule(mem_ws, "git", "merge", "## 合并\n\n先拉取。")
+    age_files(f)
+    s = Spec()
+    s._reindex_all()
+    f.write_text(f.read_text().replace("先拉取", "先拉取再推送"))
+    assert s._reindex_incremental() is not None
+    hits = s._recall_fts("推送")
+    assert hits is not None and len(hits) == 1
+
+
+def test_old_schema_without_shadow_column_migrates(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _rule(mem_ws, "git", "merge", "## 合并冲突处理\n\n先变基。")
+    s = Spec()
+    s._reindex_all()
+    con = sqlite3.connect(s.root / ".recall.db")
+    con.execute("DROP TABLE rules")
+    con.execute("CREATE VIRTUAL TABLE rules USING fts5("
+                "rel, category, title, keywords, body, namespace, inclusion, anchors, path UNINDEXED)")
+    con.execute("PRAGMA user_version = 2")
+    con.commit()
+    con.close()
+    s._reindex_all()
+    con = sqlite3.connect(s.root / ".recall.db")
+    try:
+        cols = [r[1] for r in con.execute("PRAGMA table_info(rules)")]
+        assert cols[-1] == "cjk" and con.execute("PRAGMA user_version").fetchone()[0] == _index._SCHEMA
+    finally:
+        con.close()
+    assert s._recall_fts("冲突")
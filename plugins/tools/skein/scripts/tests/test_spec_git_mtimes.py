@@ -0,0 +1,161 @@
+"""spec 规则的 git 提交时间缓存 (`SpecBase._git_times`, `.skein/.cache/spec-mtimes.json`)。
+
+覆盖: 结果与全量 `git log --name-only` 逐字一致 / HEAD 没动不跑 git log / 往前提交只 log 新增那段 /
+历史改写 (reset) 全量重跑 / 非 git 仓退回文件系统 mtime 且不建缓存 / 2000 个提交的 spec 历史
+(fast-import 造) 热轮不跑 git log、再提交一次只 log 新增那一段。
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from skeinlib.spec import core as _core  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+
+_RUN = subprocess.run  # 对照用的 git 调用不进 spy
+
+
+def _git(ws: Path, *args: str, env: dict[str, str] | None = None) -> str:
+    r = _RUN(["git", *args], cwd=ws, check=True, capture_output=True, text=True,
+                       env={**os.environ, **(env or {})})
+    return r.stdout
+
+
+def _commit(ws: Path, rel: str, text: str, ts: int) -> None:
+    f = ws / ".skein" / "spec" / rel
+    f.parent.mkdir(parents=True, exist_ok=True)
+    f.write_text(text)
+    _git(ws, "add", "-f", str(f))
+    date = f"{ts} +0000"
+    _git(ws, "commit", "-qm", rel, env={"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date})
+
+
+def _full(ws: Path) -> dict[Path, int]:
+    """旧实现: 每次全量 log。"""
+    out: dict[Path, int] = {}
+    ts = 0
+    for ln in _git(ws / ".skein" / "spec", "log", "--format=@%ct", "--name-only", "--", ".").splitlines():
+        if ln.startswith("@"):
+            ts = int(ln[1:])
+        elif ln.strip():
+            out.setdefault(ws / ln.strip(), ts)
+    return out
+
+
+def _logs(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def spy(args: Any, *a: Any, **kw: Any) -> Any:
+        if list(args[:2]) == ["git", "log"]:
+            calls.append(list(args))
+        return _RUN(args, *a, **kw)
+    monkeypatch.setattr(subprocess, "run", spy)
+    return calls
+
+
+def _git_part(s: Spec, ws: Path) -> dict[Path, int]:
+    return {f: t for f, t in s._mtimes().items() if f in _full(ws)}
+
+
+def test_cached_by_head_and_extended_incrementally(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _commit(mem_ws, "rules/git/a.md", "a1", 1_700_000_000)
+    _commit(mem_ws, "rules/git/b.md", "b1", 1_700_000_100)
+    _commit(mem_ws, "rules/git/a.md", "a2", 1_700_000_200)
+    s = Spec()
+    logs = _logs(monkeypatch)
+    assert _git_part(s, mem_ws) == _full(mem_ws)
+    assert len(logs) == 1 and "--" in logs[0]
+    logs.clear()
+    assert _git_part(Spec(), mem_ws) == _full(mem_ws) and logs == [], "HEAD 没动不该再跑 git log"
+
+    head = _git(mem_ws, "rev-parse", "HEAD").strip()
+    _commit(mem_ws, "rules/py/c.md", "c1", 1_700_000_300)
+    _commit(mem_ws, "rules/git/b.md", "b2", 1_700_000_400)
+    got = _git_part(Spec(), mem_ws)
+    assert got == _full(mem_ws)
+    assert got[mem_ws / ".skein/spec/rules/git/b.md"] == 1_700_000_400
+    assert got[mem_ws / ".skein/spec/rules/git/a.md"] == 1_700_000_200
+    assert len(logs) == 1 and logs[0][logs[0].index("--") - 1].startswith(f"{head}..")
+
+
+def test_rewritten_history_recomputes(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _commit(mem_ws, "rules/git/a.md", "a1", 1_700_000_000)
+    base = _git(mem_ws, "rev-parse", "HEAD").strip()
+    _commit(mem_ws, "rules/git/a.md", "a2", 1_700_000_500)
+    assert Spec()._mtimes()[mem_ws / ".skein/spec/rules/git/a.md"] == 1_700_000_500
+    _git(mem_ws, "reset", "-q", "--hard", base)
+    _commit(mem_ws, "rules/git/b.md", "b1", 1_700_000_300)  # 新 HEAD 不以旧 HEAD 为祖先
+    logs = _logs(monkeypatch)
+    got = _git_part(Spec(), mem_ws)
+    assert got == _full(mem_ws) and got[mem_ws / ".skein/spec/rules/git/a.md"] == 1_700_000_000
+    assert len(logs) == 1 and not any(".." in a for a in logs[0])
+
+
+def test_non_git_tree_uses_fs_mtime(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    f = tmp_path / ".skein" / "spec" / "rules" / "git" / "a.md"
+    f.parent.mkdir(parents=True)
+    f.write_text("x")
+    os.utime(f, (1_600_000_000, 1_600_000_000))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    assert Spec()._mtimes() == {f: 1_600_000_000}
+    assert not (tmp_path / ".skein" / ".cache" / _core.GIT_TIMES).exists()
+
+
+def _fast_import(ws: Path, commits: int, files: int) -> None:
+    """fast-import 一口气造 commits 个提交, 轮流改 spec 下 files 个文件。"""
+    lines: list[str] = []
+    for i in range(commits):
+        body = f"rev {i}\n".encode()
+        lines.append(f"commit refs/heads/bench\nmark :{i + 1}\n"
+                     f"committer b <b@x> {1_600_000_000 + i * 60} +0000\ndata 1\nx\n")
+        if i:
+            lines.append(f"from :{i}\n")
+        lines.append(f"M 644 inline .skein/spec/rules/c{i % 20}/t{i % files}.md\ndata {len(body)}\n{body.decode()}\n")
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=ws, input="".join(lines).encode(), check=True)
+    _git(ws, "checkout", "-qf", "bench")
+
+
+def test_large_history_warm_runs_no_log(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    _fast_import(mem_ws, 2000, 400)
+    want = _full(mem_ws)
+    logs = _logs(monkeypatch)
+    assert {mem_ws / k: t for k, t in Spec()._git_times().items()} == want and len(want) == 400
+    assert len(logs) == 1
+    logs.clear()
+    Spec()._git_times()
+    assert logs == [], "HEAD 没动: 只 rev-parse + 读 JSON"
+    head = _git(mem_ws, "rev-parse", "HEAD").strip()
+    _commit(mem_ws, "rules/c0/t0.md", "new", 1_700_000_000)
+    assert Spec()._git_times()[".skein/spec/rules/c0/t0.md"] == 1_700_000_000
+    assert len(logs) == 1 and logs[0][logs[0].index("--") - 1].startswith(f"{head}..")
+
+
+WARM_SHARE = 0.3  # HEAD 没动时的 _mtimes 至多耗全量 log 的这个比例
+
+
+@pytest.mark.benchmark
+def test_git_times_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 2000 个提交、400 个规则文件的 spec 历史。全量 log 要吐两千段; 热轮只剩一次 rev-parse
+    + 读 JSON。"""
+    import time
+    monkeypatch.chdir(mem_ws)
+    _fast_import(mem_ws, 2000, 400)
+    s = Spec()
+    t0 = time.perf_counter()
+    want = _full(mem_ws)
+    t_full = time.perf_counter() - t0
+    assert _git_part(s, mem_ws) == want and len(want) == 400
+    t0 = time.perf_counter()
+    s._git_times()
+    t_warm = time.perf_counter() - t0
+    assert t_warm < t_full * WARM_SHARE, (t_warm, t_full)
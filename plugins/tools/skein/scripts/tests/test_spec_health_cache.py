@@ -0,0 +1,155 @@
+"""spec 体检缓存 (`_health_scan` / spec_health 表) 与 Stop hook 的时间预算。
+
+覆盖: 冷热两轮 findings 一致且热轮不读规则文件 / 改一个文件只重读它 / anchors 目标没动不再找符号、
+目标一改判定跟着变 / 预算耗尽交部分结果 (未分析文件的断链/孤立不误报), 下一轮补齐 /
+Stop hook 部分结果不抹旧标记、写 unscanned / 300 个带 anchors 的文件热轮零读零找符号。
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.hooks import stop as _stop  # noqa: E402
+from skeinlib.spec import symbols as _symbols  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+
+def _counting(monkeypatch: pytest.MonkeyPatch, name: str) -> list[Any]:
+    calls: list[Any] = []
+    orig = getattr(Spec, name)
+
+    def spy(self: Spec, *a: Any) -> Any:
+        calls.append(a[0])
+        return orig(self, *a)
+    monkeypatch.setattr(Spec, name, spy)
+    return calls
+
+
+def _texts(findings: list[dict[str, Any]]) -> list[str]:
+    return [f["text"] for f in findings]
+
+
+def test_warm_scan_reuses_facts(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    a = write_rule(mem_ws, "rules", "git", "merge", "## 合并\n\n见 [[gone]]", "status: active\nkeywords: [git]\n")
+    b = write_rule(mem_ws, "rules", "git", "rebase", "## 变基\n\n见 [[merge#合并]]", "status: deprecated\n")
+    age_files(a, b)
+    s = Spec()
+    reads = _counting(monkeypatch, "_health_fact")
+    cold = s._scan_findings(["rules"])
+    assert sorted(reads) == [a, b]
+    assert any("[[gone]]" in t for t in _texts(cold)) and any("[废弃]" in t for t in _texts(cold))
+    reads.clear()
+    assert _texts(Spec()._scan_findings(["rules"])) == _texts(cold) and reads == []
+
+    b.write_text(b.read_text().replace("deprecated", "active"))
+    age_files(b)
+    warm = Spec()._scan_findings(["rules"])
+    assert reads == [b] and not any("[废弃]" in t for t in _texts(warm))
+
+
+def test_anchor_targets_rechecked_only_when_changed(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    src = mem_ws / "lib.py"
+    src.write_text("def real():\n    pass\n")
+    f = write_rule(mem_ws, "map", "code", "lib", "## lib\n\nx", "status: active\nanchors: lib.py:wanted\n")
+    age_files(src, f)
+    checks: list[str] = []
+    orig = _symbols.extract
+
+    def spy(path: str) -> Any:
+        checks.append(path)
+        return orig(path)
+    monkeypatch.setattr(_symbols, "extract", spy)
+    assert any("[断链-弱]" in t for t in _texts(Spec()._scan_findings(["map"])))
+    assert checks == [str(src)]
+    checks.clear()
+    Spec()._scan_findings(["map"])
+    assert checks == [], "目标没动不该再打开它找符号"
+
+    src.write_text("def wanted():\n    pass\n")
+    age_files(src)
+    assert not any("断链" in t for t in _texts(Spec()._scan_findings(["map"])))
+    src.unlink()
+    assert any("[断链-强]" in t for t in _texts(Spec()._scan_findings(["map"])))
+
+
+def test_budget_returns_partial_without_false_positives(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    a = write_rule(mem_ws, "rules", "git", "a", "## A\n\n见 [[b#B]]", "status: active\n")
+    b = write_rule(mem_ws, "rules", "git", "b", "## B\n\nx", "status: deprecated\n")
+    age_files(a, b)
+    found, pending = Spec()._health_scan(["rules"], budget_s=0.0)
+    assert pending == 2 and found == []
+    full, pending = Spec()._health_scan(["rules"])
+    assert pending == 0 and _texts(full) == ["[废弃] rules/git/b (status deprecated) — 建议 archive"]
+
+
+def test_stop_hook_partial_keeps_marker(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    f = write_rule(mem_ws, "rules", "git", "old", "## 旧\n\nx", "status: deprecated\n")
+    age_files(f)
+    marker = mem_ws / ".skein" / "spec" / ".pending-fix"
+    marker.write_text("{}")
+    monkeypatch.setattr(_stop, "_SCAN_BUDGET_S", 0.0)
+    assert _stop.cmd_stop_check({}) == 0
+    assert marker.read_text() == "{}", "只扫了一部分且暂无问题: 旧标记不该被删"
+    monkeypatch.setattr(_stop, "_SCAN_BUDGET_S", 30.0)
+    _stop.cmd_stop_check({})
+    data = json.loads(marker.read_text())
+    assert [p["type"] for p in data["problems"]] == ["deprecated"] and "unscanned" not in data
+
+
+def _big_library(mem_ws: Path) -> list[Path]:
+    """300 个主题文件, 各挂一个 anchor 指向同一个源文件, 章节间互链。"""
+    (mem_ws / "mod.py").write_text("".join(f"def f{i}():\n    pass\n" for i in range(300)))
+    files = [write_rule(mem_ws, "rules", f"c{i % 5}", f"t{i}",
+                        "".join(f"## 规则{j}\n\n正文 [[t{(i + 1) % 300}#规则0]]\n\n" for j in range(4)),
+                        f"status: active\nkeywords: [k{i}]\nanchors: mod.py:f{i}\n")
+             for i in range(300)]
+    age_files(mem_ws / "mod.py", *files)
+    return files
+
+
+def test_warm_scan_at_scale_reads_nothing(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    files = _big_library(mem_ws)
+    reads = _counting(monkeypatch, "_health_fact")
+    checks: list[str] = []
+    orig = _symbols.extract
+
+    def spy(path: str) -> Any:
+        checks.append(path)
+        return orig(path)
+    monkeypatch.setattr(_symbols, "extract", spy)
+    cold = Spec()._scan_findings(["rules"])
+    assert len(reads) == len(files) and checks == [str(mem_ws / "mod.py")], "300 条 anchors 同一目标只找一次符号"
+    reads.clear()
+    checks.clear()
+    assert _texts(Spec()._scan_findings(["rules"])) == _texts(cold)
+    assert (reads, checks) == ([], []), "热轮: 全部命中 spec_health, 不读规则文件也不打开 anchors 目标"
+
+
+WARM_SHARE = 0.5  # 热轮体检至多耗冷轮的这个比例
+
+
+@pytest.mark.benchmark
+def test_warm_scan_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 300 个主题文件 (带 anchors), 冷轮全读全判, 热轮只剩 stat 与全局判据。"""
+    monkeypatch.chdir(mem_ws)
+    _big_library(mem_ws)
+    s = Spec()
+    t0 = time.perf_counter()
+    cold = s._scan_findings(["rules"])
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    warm = Spec()._scan_findings(["rules"])
+    t_warm = time.perf_counter() - t0
+    assert _texts(warm) == _texts(cold)
+    assert t_warm < t_cold * WARM_SHARE, (t_warm, t_cold)
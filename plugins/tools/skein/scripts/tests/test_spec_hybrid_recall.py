@@ -0,0 +1,189 @@
+"""hybrid recall (`spec/vectors.py` + `IndexMixin._recall_hybrid` / `_rebuild_vectors`)。
+
+覆盖: BM25 召不回的词形变体经语义一路召回 / `--src` 过滤 / 无关查询无命中 / reindex 只给改动
+文件重算向量、删掉的文件出矩阵 / 没 numpy 或矩阵对不上时回落 BM25 或现建 / 2000 条规则的库改一个
+文件只重算它的几条、查询只嵌入查询本身。
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import conftest  # noqa: F401,E402  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule  # noqa: E402
+from skeinlib.spec import vectors as _vectors  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+
+def _rule(ws: Path, ns: str, cat: str, topic: str, body: str, keywords: str = "") -> Path:
+    return write_rule(ws, ns, cat, topic, body, f"keywords: [{keywords}]\n")
+
+
+def _hybrid(ws: Path) -> None:
+    cfg = ws / ".skein" / "config.yaml"
+    cfg.write_text((cfg.read_text() if cfg.exists() else "") + "\nspec:\n  recall: hybrid\n")
+
+
+def _library(ws: Path) -> list[Path]:
+    return [
+        _rule(ws, "rules", "git", "merge", "## 合并冲突处理\n\n遇到 merge 冲突先 rebase 到主干, 再逐个解决冲突文件。", "git"),
+        _rule(ws, "rules", "py", "style", "## 类型注解\n\n公开函数都写类型注解, 用 mypy strict 检查。\n\n"
+                                          "## 日志\n\n用 DBG 打日志, 不要 print。", "python"),
+        _rule(ws, "product", "board", "log", "## 看板日志面板\n\n看板展示每个 task 的日志与时间线。", "board"),
+    ]
+
+
+def _embedded(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    texts: list[str] = []
+    orig = _vectors.embed
+
+    def spy(batch: list[str]) -> Any:
+        texts.extend(batch)
+        return orig(batch)
+    monkeypatch.setattr(_vectors, "embed", spy)
+    return texts
+
+
+def test_hybrid_recalls_what_bm25_misses(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                          capsys: pytest.CaptureFixture[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    _library(mem_ws)
+    _hybrid(mem_ws)
+    s = Spec()
+    s._reindex_all()
+    assert (s.root / _vectors.VEC).exists()
+    assert s._recall_fts("rebased merges") == []  # unicode61 不做词形还原
+    hits = s._recall_hybrid("rebased merges")
+    assert hits is not None and hits[0].startswith("| [rules] git/merge.md#合并冲突处理 | git |")
+    assert "先 rebase 到主干" in hits[0]
+    cjk = s._recall_hybrid("解决合并时的冲突")
+    assert cjk is not None and "git/merge.md#合并冲突处理" in cjk[0]
+
+    logs = s._recall_hybrid("怎么写日志", "product")
+    assert logs is not None and [h.split(" | ")[0] for h in logs] == ["| [product] board/log.md#看板日志面板"]
+    assert s._recall_hybrid("数据库迁移") == []
+
+    s.recall(argparse.Namespace(query="函数签名要加类型吗", src="all"))
+    out = capsys.readouterr().out
+    assert "BM25+语义混合" in out and "py/style.md#类型注解" in out
+
+
+def test_reindex_reembeds_only_changed_files(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    merge, style, board = _library(mem_ws)
+    _hybrid(mem_ws)
+    age_files(merge, style, board)
+    s = Spec()
+    s._reindex_all()
+    texts = _embedded(monkeypatch)
+    s._reindex_all()
+    assert texts == [], "无改动的 reindex 不该重算向量"
+
+    style.write_text(style.read_text().replace("不要 print", "不要用 print 调试"))
+    board.unlink()
+    s._reindex_all()
+    assert [t.split("\n")[0] for t in texts] == ["类型注解", "日志"]
+    hits = s._recall_hybrid("print 调试")
+    assert hits is not None and "py/style.md#日志" in hits[0]
+    assert not any("board/log.md" in h for h in s._recall_hybrid("看板日志") or [])
+
+    texts.clear()
+    s._reindex_all(full=True)
+    assert len(texts) == 3
+
+
+def test_falls_back_without_numpy_or_matrix(mem_ws: Path, monkeypatch: pytest.MonkeyPatch,
+                                           capsys: pytest.CaptureFixture[str]) -> None:
+    monkeypatch.chdir(mem_ws)
+    _library(mem_ws)
+    s = Spec()
+    s._reindex_all()  # 配置仍是 bm25: 不建矩阵
+    assert not (s.root / _vectors.VEC).exists()
+    s.recall(argparse.Namespace(query="merge", src="all", hybrid=True))  # 临时 --hybrid: 现建
+    assert "BM25+语义混合" in capsys.readouterr().out
+    assert (s.root / _vectors.VEC).exists()
+
+    (s.root / _vectors.VEC).write_bytes(b"garbage")  # 与登记对不上: 不信, 重建
+    assert s._recall_hybrid("merge") is not None
+
+    monkeypatch.setattr(_vectors, "available", lambda: False)
+    assert s._recall_hybrid("merge") is None
+    s.recall(argparse.Namespace(query="merge", src="all", hybrid=True))
+    assert "FTS5 BM25" in capsys.readouterr().out
+    _hybrid(mem_ws)
+    s._reindex_all(full=True)  # 配置 hybrid 但没 numpy: reindex 照常完成
+
+
+def _big_library(ws: Path) -> list[Path]:
+    files = [_rule(ws, "rules", f"c{i % 10}", f"t{i}",
+                   "".join(f"## 规则{i}-{j}\n\n第 {j} 条: 模块 m{i} 的约定, 调用前先校验参数, "
+                           f"失败抛 SkeinError 并写审计日志。{'detail ' * 20}\n\n" for j in range(4)), f"k{i}, x")
+             for i in range(500)]
+    age_files(*files)
+    return files
+
+
+def test_large_library_embeds_only_changes(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(mem_ws)
+    files = _big_library(mem_ws)
+    _hybrid(mem_ws)
+    s = Spec()
+    s._reindex_all()
+    texts = _embedded(monkeypatch)
+    files[7].write_text(files[7].read_text() + "\n补一句。\n")
+    s._reindex_all()
+    assert [t.split("\n")[0] for t in texts] == [f"规则7-{j}" for j in range(4)], "其余 1996 行照搬旧矩阵"
+    texts.clear()
+    assert s._recall_hybrid("参数校验失败怎么处理")
+    assert texts == ["参数校验失败怎么处理"], "查询只嵌入查询本身, 不现算库"
+
+
+INCR_SHARE = 0.3  # 改一个文件后的向量维护至多耗整库重算的这个比例
+QUERY_SHARE = 0.2  # 单次 hybrid 查询至多耗整库现算向量的这个比例
+
+
+@pytest.mark.benchmark
+def test_incremental_vectors_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 500 个主题文件 × 4 章节 = 2000 条规则。整库重算约 0.3s, 改一个文件只重算它的 4 条,
+    其余行从旧矩阵照搬, 约 10ms。"""
+    monkeypatch.chdir(mem_ws)
+    files = _big_library(mem_ws)
+    _hybrid(mem_ws)
+    s = Spec()
+    s._reindex_all()
+    t0 = time.perf_counter()
+    s._rebuild_vectors(full=True)
+    full = time.perf_counter() - t0
+    files[7].write_text(files[7].read_text() + "\n补一句。\n")
+    s._reindex_incremental()
+    t0 = time.perf_counter()
+    s._rebuild_vectors()
+    incr = time.perf_counter() - t0
+    assert incr < full * INCR_SHARE, (incr, full)
+
+
+@pytest.mark.benchmark
+def test_hybrid_query_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 同一个 2000 条规则的库。查询 = BM25 前 50 + 一次内存映射 mat-vec, 约 5ms; 对照是
+    没有向量索引时每次现算全库向量。"""
+    monkeypatch.chdir(mem_ws)
+    _big_library(mem_ws)
+    _hybrid(mem_ws)
+    s = Spec()
+    s._reindex_all()
+    texts = [f"{title}\n{body}" for _, title, body in s._rules("rules")]
+    t0 = time.perf_counter()
+    _vectors.embed(texts)
+    naive = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(10):
+        hits = s._recall_hybrid("参数校验失败怎么处理")
+    per_query = (time.perf_counter() - t0) / 10
+    assert hits
+    assert per_query < naive * QUERY_SHARE, (per_query, naive)
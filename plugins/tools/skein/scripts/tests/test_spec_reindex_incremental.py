@@ -0,0 +1,188 @@
+"""增量 reindex (`.recall.db` 的 spec_manifest) — 只重做变过的文件。
+
+覆盖: 改/删/增文件后的增量结果与 `--full` 全量逐字节一致 (index.md / backlinks.md / 总索引 /
+rules 与 spec_meta 表) / 只重写受影响 namespace 的派生文件 (含被改动文件出链指向的 namespace) /
+无变化不写盘 / 同 mtime 的 racy 改动照样识别 / 旧 schema 或表缺失回落全量 / 大库改一行只判一个文件、
+只重建一个 namespace。
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import age_files, write_rule
+from skeinlib.spec import index as _index  # noqa: E402
+from skeinlib.spec.facade import Spec  # noqa: E402
+
+_NS = ("rules", "product", "map")
+
+
+def _spec(ws: Path, monkeypatch: pytest.MonkeyPatch) -> Spec:
+    monkeypatch.chdir(ws)  # Spec.__init__ 走 spec_root() 读 cwd
+    return Spec()
+
+
+def _topic(root: Path, ns: str, cat: str, topic: str, sections: list[tuple[str, str]]) -> Path:
+    body = "\n".join(f"## {t}\n\n{b}\n" for t, b in sections)
+    return write_rule(root.parents[1], ns, cat, topic, f"# {topic}\n\n{body}",
+                      f"title: {topic}\ncategory: {cat}\nkeywords: [{topic}, k]\nstatus: active\ninclusion: auto\n")
+
+
+def _library(root: Path, topics: int, sections: int = 2) -> list[Path]:
+    """多 namespace 小库: 每个主题 `sections` 条规则, 每条链到下一个主题 (跨 namespace 反链)。"""
+    out = []
+    for i in range(topics):
+        ns, nxt = _NS[i % 3], f"t{(i + 1) % topics}"
+        out.append(_topic(root, ns, f"c{i % 4}", f"t{i}",
+                          [(f"规则{j}", f"正文 {i}-{j} 参见 [[{nxt}#规则0]]") for j in range(sections)]))
+    return out
+
+
+def _derived(root: Path) -> dict[str, str]:
+    return {str(p.relative_to(root)): p.read_text() for p in sorted(root.rglob("*.md"))
+            if p.name in ("index.md", "backlinks.md")}
+
+
+def _tables(root: Path) -> dict[str, Any]:
+    con = sqlite3.connect(root / ".recall.db")
+    try:
+        return {"rules": sorted(con.execute("SELECT * FROM rules").fetchall()),
+                "spec_meta": sorted(con.execute("SELECT * FROM spec_meta").fetchall())}
+    finally:
+        con.close()
+
+
+def _backdate(root: Path) -> dict[str, int]:
+    """派生文件 mtime 拨回一个固定值, 之后没被重写的保持这个值。"""
+    out = {}
+    for rel in _derived(root):
+        os.utime(root / rel, ns=(1_000_000_000, 1_000_000_000))
+        out[rel] = 1_000_000_000
+    return out
+
+
+def _rewritten(root: Path, before: dict[str, int]) -> set[str]:
+    return {rel for rel, ns in before.items() if (root / rel).stat().st_mtime_ns != ns}
+
+
+def test_incremental_matches_full_rebuild(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    m = _spec(mem_ws, monkeypatch)
+    files = _library(m.root, 12)
+    m._reindex_all()
+    # 改标题 + 换出链 / 删一个 / 新增一个 (新 namespace)
+    _topic(m.root, "rules", "c0", "t0", [("改名规则", "现在链到 [[t5]]")])
+    files[4].unlink()
+    _topic(m.root, "extra", "x", "fresh", [("新规则", "链回 [[t0#改名规则]]")])
+    m._reindex_all()
+    inc = (_derived(m.root), _tables(m.root))
+    m._reindex_all(full=True)
+    assert inc == (_derived(m.root), _tables(m.root))
+
+
+def test_only_affected_namespaces_are_rewritten(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    m = _spec(mem_ws, monkeypatch)
+    files = _library(m.root, 9)
+    m._reindex_all()
+
+    before = _backdate(m.root)
+    m._reindex_all()
+    assert _rewritten(m.root, before) == set(), "无变化不该写任何派生文件"
+
+    # t3 (rules) 只改正文, 出链仍指 t4 (product): rules 的索引/反链 + product 的反链 + 总索引
+    text = files[3].read_text()
+    files[3].write_text(text.replace("正文 3-0", "正文 3-0 改一行"))
+    before = _backdate(m.root)
+    m._reindex_all()
+    assert _rewritten(m.root, before) == {"index.md", "rules/index.md", "rules/backlinks.md",
+                                          "product/backlinks.md"}
+
+
+def test_racy_same_mtime_edit_is_detected(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    m = _spec(mem_ws, monkeypatch)
+    f = _topic(m.root, "rules", "git", "merge", [("合并", "aaaa")])
+    m._reindex_all()
+    st = f.stat()
+    f.write_text(f.read_text().replace("aaaa", "zzzz"))  # 同 size
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns))    # 同 mtime: 只有 sha 看得出
+    m._reindex_all()
+    assert [r[4] for r in _tables(m.root)["rules"] if r[2] == "合并"] == ["zzzz"]
+
+
+def test_schema_drift_falls_back_to_full(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    m = _spec(mem_ws, monkeypatch)
+    _library(m.root, 3)
+    m._reindex_all()
+    con = sqlite3.connect(m.root / ".recall.db")
+    con.execute("DROP TABLE rules")
+    con.commit()
+    con.close()
+    m._reindex_all()
+    assert len(_tables(m.root)["rules"]) == 6
+    con = sqlite3.connect(m.root / ".recall.db")
+    con.execute("PRAGMA user_version = 1")  # 旧版库 (rules 无 path 列)
+    con.commit()
+    con.close()
+    m.reindex(argparse.Namespace())
+    con = sqlite3.connect(m.root / ".recall.db")
+    assert con.execute("PRAGMA user_version").fetchone()[0] == 3
+    con.close()
+
+
+def test_one_line_edit_rereads_one_file(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    m = _spec(mem_ws, monkeypatch)
+    files = _library(m.root, 300, sections=3)
+    age_files(*files)
+    m._reindex_all()
+    shas: list[str] = []
+    rows: list[str] = []
+    layers: list[str] = []
+    sha, fts_rows, layer = _index._sha, Spec._fts_rows, Spec._reindex_layer
+
+    def sha_spy(doc: Any) -> Any:
+        shas.append("")
+        return sha(doc)
+
+    def rows_spy(self: Spec, ns: str, f: Path, doc: Any) -> Any:
+        rows.append(f.stem)
+        return fts_rows(self, ns, f, doc)
+
+    def layer_spy(self: Spec, ns: str) -> Any:
+        layers.append(ns)
+        return layer(self, ns)
+    monkeypatch.setattr(_index, "_sha", sha_spy)
+    monkeypatch.setattr(Spec, "_fts_rows", rows_spy)
+    monkeypatch.setattr(Spec, "_reindex_layer", layer_spy)
+
+    m._reindex_all()
+    assert (shas, rows, layers) == ([], [], []), "无变化: 全部凭 stat 命中 manifest"
+    files[7].write_text(files[7].read_text().replace("正文 7-2", "正文 7-2 改"))
+    m._reindex_all()
+    assert (len(shas), rows, layers) == (1, ["t7"], ["product"]), "改一行: 只判这一个文件、只重建它的 namespace"
+
+
+INCREMENTAL_SHARE = 0.6  # 改一行的增量 reindex 至多耗全量的这个比例
+
+
+@pytest.mark.benchmark
+def test_incremental_reindex_benchmark(mem_ws: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """基准: 400 主题 × 5 章节 = 2000 条规则, 改一行后增量 vs 全量。
+    本机全量约 0.33s、增量约 0.12s (余下的是重写受影响 namespace 的 index.md);
+    预算只拦「增量又退化成全量重扫重写」。"""
+    m = _spec(mem_ws, monkeypatch)
+    files = _library(m.root, 400, sections=5)
+    m._reindex_all()
+    files[7].write_text(files[7].read_text().replace("正文 7-2", "正文 7-2 改"))
+    t0 = time.perf_counter()
+    m._reindex_all()
+    inc = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    m._reindex_all(full=True)
+    full = time.perf_counter() - t0
+    assert inc < full * INCREMENTAL_SHARE, (inc, full)
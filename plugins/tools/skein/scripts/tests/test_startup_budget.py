@@ -0,0 +1,81 @@
+"""启动预算 — `skein ready` 冷启动不许再把 pydantic/yaml/配置模型拖进来, import 总耗时有上限。
+
+每条 agent 调用都是新进程, 导入开销叠在每一次上。两道闸:
+1. 模块集合 (确定性): ready/status/list 不加载 pydantic / yaml / skeinlib.config / task.schema ——
+   配置经 `.cache/config.json` 复用, prd.md frontmatter 经 tasks.db 复用。
+2. 耗时 (兜底, `benchmark`, 缺省不跑): `-X importtime` 顶层 cumulative 之和 < `BUDGET_MS`。改前约
+   360ms, 改后约 110ms (含解释器自身 site 约 35ms); 挂钟数在负载高的 CI 上会抖, 回退由第 1 道拦。
+
+子进程开字节码缓存 (指到 tmp): 生产环境有 __pycache__, 量无缓存的编译时间没有意义。
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import SKEIN  # noqa: E402
+from skeinlib.cli.profile import parse_importtime, summarize  # noqa: E402
+
+BUDGET_MS = 200.0
+
+
+@pytest.fixture
+def env(tmp_path: Path) -> dict[str, str]:
+    e = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    return {**e, "PYTHONPYCACHEPREFIX": str(tmp_path / "pyc"), "SKEIN_NO_DAEMON": "1"}
+
+
+def _importtime(ws: Path, env: dict[str, str], *args: str) -> list[tuple[str, int, int, int]]:
+    p = subprocess.run([sys.executable, "-X", "importtime", str(SKEIN), *args], cwd=ws,
+                       capture_output=True, text=True, env=env)
+    assert p.returncode == 0, p.stderr[-2000:]
+    return parse_importtime(p.stderr)
+
+
+def _warm(ws: Path, env: dict[str, str]) -> None:
+    old = time.time() - 3600
+    os.utime(ws / ".skein" / "config.yaml", (old, old))  # 刚写的配置按 racy 规则不进缓存
+    # status 读生效配置 (池容量), 顺手把 .cache/config.json 写好
+    subprocess.run([sys.executable, str(SKEIN), "status"], cwd=ws, capture_output=True, env=env, check=True)
+
+
+@pytest.mark.parametrize("cmd", ["ready", "status", "list"])
+def test_read_commands_do_not_import_lazy_deps(ws: Path, env: dict[str, str], cmd: str) -> None:
+    _warm(ws, env)
+    mods = {name for name, *_ in _importtime(ws, env, cmd)}
+    assert not {m for m in mods if m.split(".")[0] in ("pydantic", "yaml")}
+    assert "skeinlib.config" not in mods and "skeinlib.task.schema" not in mods
+
+
+@pytest.mark.benchmark
+def test_ready_import_time_within_budget(ws: Path, env: dict[str, str]) -> None:
+    _warm(ws, env)
+    best = min(summarize(_importtime(ws, env, "ready"))["import_ms"] for _ in range(3))
+    assert best < BUDGET_MS, f"skein ready 冷启动 import {best}ms 超预算 {BUDGET_MS}ms — 跑 `skein --profile-startup ready` 看是谁"
+
+
+def test_config_edit_invalidates_cache(ws: Path, env: dict[str, str]) -> None:
+    _warm(ws, env)
+    assert (ws / ".skein" / ".cache" / "config.json").exists()
+    cfg = ws / ".skein" / "config.yaml"
+    cfg.write_text(cfg.read_text().replace("work: 2", "work: 5"))
+    out = subprocess.run([sys.executable, str(SKEIN), "status"], cwd=ws, capture_output=True,
+                         text=True, env=env)
+    assert json.loads(out.stdout)["pool"]["work"]["capacity"] == 5, out.stderr
+
+
+def test_profile_startup_reports_breakdown(ws: Path, env: dict[str, str]) -> None:
+    p = subprocess.run([sys.executable, str(SKEIN), "--profile-startup", "ready"], cwd=ws,
+                       capture_output=True, text=True, env=env)
+    assert p.returncode == 0, p.stderr
+    out = json.loads(p.stdout)
+    assert out["argv"] == ["ready"] and out["exit"] == 0
+    assert out["import_ms"] > 0 and "skeinlib" in out["packages"]
+    assert any(r["module"] == "skeinlib.cli.main" for r in out["top"])
@@ -15,7 +15,7 @@ from __future__ import annotations
 import json
 import subprocess
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, cast
 
 from skeinlib.task.model import TaskStatus
 
@@ -38,6 +38,11 @@ def _mk(skein_cli: SkeinCli, ws: Path, tid: str = "feat-x", *,
     return tid
 
 
+def _last_event(ws: Path, tid: str) -> dict[str, Any]:
+    lines = (ws / ".skein" / "task" / tid / "timeline.jsonl").read_text().splitlines()
+    return cast(dict[str, Any], json.loads(lines[-1]))
+
+
 def _fill_prd(ws: Path, tid: str) -> None:
     """写齐 prd.md frontmatter (TaskSpec 四要素) + design 接缝, 过 confirm 的 planning 硬门。"""
     (ws / ".skein" / "task" / tid / "prd.md").write_text("---\ndesc: 解决 X 问题\nboundary:\n  should:\n  - 范围内a\n  should_not: []\nestimate: 1\nacceptance:\n  - 用例通过\n---\n", encoding="utf-8")
@@ -181,8 +186,7 @@ def test_confirm_force_skips_planning_and_research_gates(skein_cli: SkeinCli, ws
     r = skein_cli(ws, "confirm", pending, "--approved", "--force")
     assert r.returncode == 0, r.stderr
     assert _status_of(skein_cli, ws, pending) == TaskStatus.ACTIVE
-    task = json.loads((ws / ".skein" / "task" / pending / "task.json").read_text())
-    assert task["timeline"][-1]["note"] == "--force: 看板强制操作, 跳过前置门"
+    assert _last_event(ws, pending)["note"] == "--force: 看板强制操作, 跳过前置门"
 
     research = "feat-force-research"
     skein_cli(ws, "create", research, "--name", research, "--desc", "d")
@@ -246,7 +250,7 @@ def test_finish_force_skips_state_gate_but_completes(skein_cli: SkeinCli, ws: Pa
     task = json.loads((ws / ".skein" / "task" / tid / "task.json").read_text())
     assert task["finished"]
     assert task["checked_end"]
-    assert task["timeline"][-1]["note"] == "--force: 看板强制操作, 跳过前置门"
+    assert _last_event(ws, tid)["note"] == "--force: 看板强制操作, 跳过前置门"
 
 
 def test_finish_active_rejected(skein_cli: SkeinCli, ws: Path) -> None:
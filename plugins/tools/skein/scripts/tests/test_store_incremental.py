@@ -0,0 +1,147 @@
+"""`TaskStore.sync` 增量索引 — 只换变过的行, 结构变了退回全量, 两条路产出逐字节相同。
+
+覆盖: 单 task 改状态不走全量快照 / 别的进程手改也被发现 / 与全量逐字节对拍 (改状态、改优先级、
+改 deps) / 新建 task、旧格式索引、够格归档 → 全量 / 损坏 task.json → 全量跳过。
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from skeinlib.task.store import TaskStore  # noqa: E402
+
+_OLD = time.time() - 3600
+
+
+def _mk(store: TaskStore, tid: str, status: str = "pending", deps: list[str] | None = None,
+        **extra: Any) -> None:
+    d = store.tasks / tid
+    d.mkdir(parents=True)
+    (d / "task.json").write_text(json.dumps(
+        {"id": tid, "name": f"名-{tid}", "status": status, "deps": deps or [], "subtasks": [], **extra}))
+    os.utime(d / "task.json", (_OLD, _OLD))
+
+
+def _store(root: Path, retain: int = 7) -> TaskStore:
+    sk = root / ".skein"
+    tasks = sk / "task"
+    tasks.mkdir(parents=True, exist_ok=True)
+    cfg = {"retain_days": retain, "pools": {"work": 2, "gate": 3}}
+    return TaskStore(sk, tasks, tasks / "archive", lambda: cfg, lambda: True)
+
+
+def _outputs(store: TaskStore) -> tuple[str, str]:
+    return (store.dir / "task.json").read_text(), (store.dir / "task.md").read_text()
+
+
+def _full(store: TaskStore) -> tuple[str, str]:
+    """同一棵树走全量路径的产出 (删掉索引 = 无底可补)。"""
+    ref = _store(store.dir.parent)
+    (store.dir / "task.json").unlink()
+    ref.sync()
+    return _outputs(ref)
+
+
+@pytest.fixture
+def no_full_scan(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """计 all_tasks 调用次数 —— 增量路径一次都不该调。"""
+    calls: list[int] = []
+    orig = TaskStore.all_tasks
+
+    def counting(self: TaskStore) -> list[dict[str, Any]]:
+        calls.append(1)
+        return orig(self)
+
+    monkeypatch.setattr(TaskStore, "all_tasks", counting)
+    return calls
+
+
+def _seed(root: Path, n: int = 30) -> TaskStore:
+    store = _store(root)
+    for i in range(n):
+        _mk(store, f"t{i:02d}", deps=[f"t{i - 1:02d}"] if i % 3 else [])
+    store.sync()
+    return store
+
+
+def test_single_save_patches_without_full_scan(tmp_path: Path, no_full_scan: list[int]) -> None:
+    store = _seed(tmp_path)
+    no_full_scan.clear()
+    t = store.load("t07")
+    t["status"] = "active"
+    store.save(t)
+    assert no_full_scan == []
+    rows = json.loads((store.dir / "task.json").read_text())["tasks"]
+    assert rows[0]["id"] == "t07" and rows[0]["status"] == "active"  # 进行中排最前
+    assert "| t07 | 名-t07 | active |" in (store.dir / "task.md").read_text()
+
+
+def test_hand_edit_from_other_process_is_picked_up(tmp_path: Path, no_full_scan: list[int]) -> None:
+    store = _seed(tmp_path)
+    f = store.tasks / "t03" / "task.json"
+    f.write_text(f.read_text().replace('"pending"', '"check"'))  # mtime=now, 晚于索引
+    no_full_scan.clear()
+    _store(tmp_path).sync()  # 新进程: _dirty 为空, 靠 mtime 发现
+    assert no_full_scan == []
+    assert {r["id"]: r["status"] for r in json.loads((store.dir / "task.json").read_text())["tasks"]}["t03"] == "check"
+
+
+@pytest.mark.parametrize("edit", [
+    {"status": "done", "finished": 2_000_000_000},
+    {"priority": "urgent"},
+    {"deps": ["t00", "t01"]},
+    {"name": "改名不改 id", "worktree": ".worktrees/skein-t05"},
+])
+def test_incremental_output_matches_full_render(tmp_path: Path, edit: dict[str, Any]) -> None:
+    store = _seed(tmp_path)
+    t = store.load("t05")
+    t.update(edit)
+    store.save(t)
+    assert _outputs(store) == _full(store)
+
+
+def test_new_task_falls_back_to_full(tmp_path: Path, no_full_scan: list[int]) -> None:
+    store = _seed(tmp_path, 5)
+    _mk(store, "zz")
+    no_full_scan.clear()
+    store.sync()
+    assert no_full_scan == [1]
+    assert "zz" in {r["id"] for r in json.loads((store.dir / "task.json").read_text())["tasks"]}
+
+
+def test_legacy_index_without_name_falls_back_and_upgrades(tmp_path: Path, no_full_scan: list[int]) -> None:
+    store = _seed(tmp_path, 3)
+    idx = store.dir / "task.json"
+    data = json.loads(idx.read_text())
+    for r in data["tasks"]:
+        r.pop("name")
+    idx.write_text(json.dumps(data))
+    no_full_scan.clear()
+    store.sync()
+    assert no_full_scan == [1]
+    assert all("name" in r for r in json.loads(idx.read_text())["tasks"])
+
+
+def test_expired_task_falls_back_and_archives(tmp_path: Path) -> None:
+    store = _store(tmp_path, retain=0)
+    _mk(store, "a")
+    _mk(store, "b")
+    store.sync()
+    t = store.load("a")
+    t.update(status="done", finished=int(_OLD))
+    store.save(t)
+    assert store.archived_path("a") is not None
+    assert [r["id"] for r in json.loads((store.dir / "task.json").read_text())["tasks"]] == ["b"]
+
+
+def test_corrupt_task_json_falls_back_and_is_skipped(tmp_path: Path) -> None:
+    store = _seed(tmp_path, 3)
+    (store.tasks / "t01" / "task.json").write_text("{half")
+    store.sync()
+    assert [r["id"] for r in json.loads((store.dir / "task.json").read_text())["tasks"]] == ["t00", "t02"]
@@ -0,0 +1,90 @@
+"""task 级锁 — 单 task 的 subtask 迁移拿 `task/<id>/.lock`, 不再排在全局锁后面。
+
+覆盖: N 个并发 `subtask done` 打同一 task 不丢更新 (压力) / 持有 A 的 task 锁不挡 B /
+全局排他锁照样挡住 task 级命令 (rename/归档这类全局命令与 subtask 迁移互斥)。
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from conftest import SKEIN, SkeinCli
+from skeinlib.core.workspace import _workspace_lock  # noqa: E402
+from skeinlib.task.model import SubtaskStatus  # noqa: E402
+
+N = 8
+
+
+def _task(ws: Path, tid: str) -> dict[str, Any]:
+    return cast(dict[str, Any], json.loads((ws / ".skein" / "task" / tid / "task.json").read_text()))
+
+
+def _running(skein_cli: SkeinCli, ws: Path, tid: str, n: int) -> None:
+    """建 task 并直接落 n 个运行中的 subtask (免逐条 add/confirm/start 的几十个子进程)。"""
+    skein_cli(ws, "create", tid, "--name", tid, "--desc", "d")
+    f = ws / ".skein" / "task" / tid / "task.json"
+    t = json.loads(f.read_text())
+    t["subtasks"] = [{"tid": tid, "sid": f"s{i}", "name": f"s{i}", "desc": "d", "estimate": 1,
+                      "depends_on": [], "acceptance": ["a"], "acceptance_done": [],
+                      "status": SubtaskStatus.RUNNING, "created": 0, "started": 0, "finished": None}
+                     for i in range(n)]
+    f.write_text(json.dumps(t, ensure_ascii=False))
+
+
+def _spawn(ws: Path, *args: str) -> subprocess.Popen[str]:
+    return subprocess.Popen([sys.executable, str(SKEIN), *args], cwd=ws,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def _finish(p: subprocess.Popen[str]) -> None:
+    out, err = p.communicate(timeout=60)
+    assert p.returncode == 0, err or out
+
+
+@pytest.fixture(autouse=True)
+def _not_in_hook(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("SKEIN_IN_HOOK", raising=False)  # 嵌套钩子态下锁是 no-op, 本文件要真锁
+
+
+def test_concurrent_subtask_done_loses_no_update(skein_cli: SkeinCli, ws: Path) -> None:
+    # 压力: N 个进程同时 read-modify-write 同一 task.json, 任何一个被覆盖都会留下「运行中」
+    _running(skein_cli, ws, "hot", N)
+    procs = [_spawn(ws, "subtask", "done", "hot", f"s{i}") for i in range(N)]
+    for p in procs:
+        _finish(p)
+    t = _task(ws, "hot")
+    assert {s["sid"]: s["status"] for s in t["subtasks"]} == {f"s{i}": SubtaskStatus.DONE for i in range(N)}
+    log = (ws / ".skein" / "task" / "hot" / "timeline.jsonl").read_text().splitlines()
+    done_events = [e for e in map(json.loads, log) if e.get("kind") == "subtask"]
+    assert sorted(e["sid"] for e in done_events) == sorted(f"s{i}" for i in range(N))
+    assert not list((ws / ".skein" / "task" / "hot").glob(".task.json.*")), "临时文件残留"
+
+
+def test_task_lock_does_not_block_other_task(skein_cli: SkeinCli, ws: Path) -> None:
+    _running(skein_cli, ws, "a", 1)
+    _running(skein_cli, ws, "b", 1)
+    with _workspace_lock(ws / ".skein" / "task" / "a" / ".lock"):
+        held = _spawn(ws, "subtask", "done", "a", "s0")
+        _finish(_spawn(ws, "subtask", "done", "b", "s0"))  # 不同 task: 直接过
+        assert _task(ws, "b")["subtasks"][0]["status"] == SubtaskStatus.DONE
+        assert held.poll() is None, "同 task 的迁移应等锁"
+    _finish(held)
+    assert _task(ws, "a")["subtasks"][0]["status"] == SubtaskStatus.DONE
+
+
+def test_global_exclusive_lock_still_blocks_task_commands(skein_cli: SkeinCli, ws: Path) -> None:
+    _running(skein_cli, ws, "a", 1)
+    with _workspace_lock(ws / ".skein" / ".lock"):
+        p = _spawn(ws, "subtask", "done", "a", "s0")
+        time.sleep(1.5)
+        assert p.poll() is None, "全局排他锁持有期间 task 级命令不该进临界区"
+        assert _task(ws, "a")["subtasks"][0]["status"] == SubtaskStatus.RUNNING
+    _finish(p)
+    assert _task(ws, "a")["subtasks"][0]["status"] == SubtaskStatus.DONE
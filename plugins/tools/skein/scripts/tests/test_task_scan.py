@@ -0,0 +1,212 @@
+"""`task/scan.py` 扫描引擎 — 一次 sync 每个 task 只读一遍, 没变的下次只 stat。
+
+覆盖: read_text 次数随 task 数线性 (基准) / 第二次 sync 零重读 / 手改失效 / racy 不复用 /
+损坏跳过 / 返回值改了不污染缓存; 跨进程缓存库: 新进程零读盘 / 别处手改失效 / 删行 / 库坏回落 /
+JSON 往返不等值不落库 / 未初始化不造目录。
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from skeinlib.task.scan import TaskScan  # noqa: E402
+from skeinlib.task.store import TaskStore  # noqa: E402
+
+_OLD = time.time() - 3600  # 远离 racy 窗口的 mtime
+
+
+def _mk(tasks_dir: Path, tid: str, status: str = "pending", deps: list[str] | None = None) -> None:
+    d = tasks_dir / tid
+    d.mkdir(parents=True)
+    (d / "task.json").write_text(json.dumps(
+        {"id": tid, "name": tid, "status": status, "deps": deps or [], "subtasks": []}))
+    (d / "prd.md").write_text(f"---\ndesc: {tid} desc\nestimate: 1\n---\n# {tid}\n", encoding="utf-8")
+    for f in d.iterdir():
+        os.utime(f, (_OLD, _OLD))
+
+
+def _store(root: Path) -> TaskStore:
+    sk = root / ".skein"
+    tasks = sk / "task"
+    tasks.mkdir(parents=True, exist_ok=True)
+    cfg = {"retain_days": 7, "pools": {"work": 2, "gate": 3}}
+    return TaskStore(sk, tasks, tasks / "archive", lambda: cfg, lambda: False)
+
+
+@pytest.fixture
+def reads(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[Path]]:
+    """记录每次 Path.read_text 的路径。"""
+    log: list[Path] = []
+    orig = Path.read_text
+
+    def counting(self: Path, *a: Any, **kw: Any) -> str:
+        log.append(self)
+        return orig(self, *a, **kw)
+
+    monkeypatch.setattr(Path, "read_text", counting)
+    yield log
+
+
+def _sync_reads(root: Path, n: int, log: list[Path]) -> int:
+    store = _store(root)
+    for i in range(n):
+        _mk(store.tasks, f"t{i:03d}")
+    log.clear()
+    store.sync()
+    return len(log)
+
+
+def test_sync_reads_grow_linearly_with_task_count(tmp_path: Path, reads: list[Path]) -> None:
+    # 基准: 每个 task 恰好 task.json + prd.md 各一次, 其余是索引/看板的常数次 (与 task 数无关)。
+    # 改造前同样 15 个 task 是 67 次 (每个 task 读 5 遍)。
+    counts = {n: _sync_reads(tmp_path / f"n{n}", n, reads) for n in (10, 40, 160)}
+    assert counts[40] - counts[10] == 2 * 30
+    assert counts[160] - counts[40] == 2 * 120
+    assert counts[10] - 2 * 10 <= 4  # 常数项: 顶层镜像/看板的比对读
+
+
+def test_second_sync_rereads_nothing_unchanged(tmp_path: Path, reads: list[Path]) -> None:
+    store = _store(tmp_path)
+    for i in range(20):
+        _mk(store.tasks, f"t{i:02d}")
+    store.sync()
+    reads.clear()
+    store.sync()
+    assert not [p for p in reads if p.name in ("task.json", "prd.md") and p.parent.parent == store.tasks]
+
+
+def test_hand_edit_invalidates(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    _mk(store.tasks, "a")
+    assert store.load("a")["desc"] == "a desc"
+    prd = store.tasks / "a" / "prd.md"
+    prd.write_text("---\ndesc: edited by hand\nestimate: 1\n---\n", encoding="utf-8")
+    os.utime(prd, (_OLD + 5, _OLD + 5))  # mtime 仍很旧, 但签名变了
+    assert store.load("a")["desc"] == "edited by hand"
+    assert [t["desc"] for t in store.all_tasks()] == ["edited by hand"]
+
+
+def test_racy_entry_not_reused(tmp_path: Path) -> None:
+    # 刚写的文件 (mtime 在 racy 窗口内) 不入缓存: 同 tick 同 size 的第二次写也读得到
+    tasks = tmp_path / "task"
+    (tasks / "a").mkdir(parents=True)
+    f = tasks / "a" / "task.json"
+    f.write_text(json.dumps({"id": "a", "status": "pending"}))
+    scan = TaskScan(tasks)
+    assert scan.scan()[0]["status"] == "pending"
+    st = os.stat(f)
+    f.write_text(json.dumps({"id": "a", "status": "running"}))  # 同 size
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns))            # 同 mtime: 签名完全撞上
+    assert scan.scan()[0]["status"] == "running"
+
+
+def test_corrupt_skipped_and_vanished_dropped(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    _mk(store.tasks, "good")
+    _mk(store.tasks, "bad")
+    (store.tasks / "bad" / "task.json").write_text("{half")
+    assert [t["id"] for t in store.all_tasks()] == ["good"]
+    store.archive_task("good")
+    assert store.all_tasks() == []
+
+
+def test_returned_dicts_are_private_copies(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    _mk(store.tasks, "a")
+    t = store.all_tasks()[0]
+    t["deps"].append("x")
+    t["boundary"] = {"should": ["mutated"]}
+    again = store.all_tasks()[0]
+    assert again["deps"] == [] and "boundary" not in again
+
+
+# ---- 跨进程缓存库 .skein/.cache/tasks.db ----
+
+def _fresh_scan(root: Path) -> TaskScan:
+    """模拟一个新进程: 内存层为空, 只剩缓存库。"""
+    return TaskScan(root / ".skein" / "task", cache=root / ".skein" / ".cache" / "tasks.db")
+
+
+def _get(scan: TaskScan, tid: str) -> dict[str, Any]:
+    t = scan.get(tid)
+    assert t is not None
+    return t
+
+
+def test_new_process_served_from_cache_without_reading(tmp_path: Path, reads: list[Path]) -> None:
+    store = _store(tmp_path)
+    for i in range(5):
+        _mk(store.tasks, f"t{i}")
+    first = store.all_tasks()
+    assert (tmp_path / ".skein" / ".cache" / "tasks.db").exists()
+    scan = _fresh_scan(tmp_path)
+    reads.clear()
+    again = scan.scan()
+    assert scan.reads == 0 and reads == []
+    assert again == sorted(first, key=lambda t: t["id"])
+    assert _get(scan, "t3")["desc"] == "t3 desc"
+
+
+def test_cache_invalidated_by_hand_edit_in_other_process(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    _mk(store.tasks, "a")
+    _mk(store.tasks, "b")
+    store.all_tasks()
+    f = store.tasks / "a" / "task.json"
+    f.write_text(json.dumps({"id": "a", "name": "a", "status": "active", "deps": [], "subtasks": []}))
+    os.utime(f, (_OLD + 9, _OLD + 9))
+    scan = _fresh_scan(tmp_path)
+    assert {t["id"]: t["status"] for t in scan.scan()} == {"a": "active", "b": "pending"}
+    assert scan.reads == 1  # 只重读改过的那个
+    # 单条 get 路径 (load) 同理
+    assert _get(_fresh_scan(tmp_path), "a")["status"] == "active"
+
+
+def test_removed_task_dropped_from_cache(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    _mk(store.tasks, "a")
+    _mk(store.tasks, "b")
+    store.all_tasks()
+    store.archive_task("a")
+    assert [t["id"] for t in store.all_tasks()] == ["b"]
+    import sqlite3
+    con = sqlite3.connect(tmp_path / ".skein" / ".cache" / "tasks.db")
+    assert [r[0] for r in con.execute("SELECT tid FROM task")] == ["b"]
+    con.close()
+
+
+def test_corrupt_cache_db_falls_back_and_rebuilds(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    _mk(store.tasks, "a")
+    db = tmp_path / ".skein" / ".cache"
+    db.mkdir(parents=True)
+    (db / "tasks.db").write_bytes(b"not a sqlite file at all" * 100)
+    assert [t["id"] for t in store.all_tasks()] == ["a"]
+    assert [t["id"] for t in _fresh_scan(tmp_path).scan()] == ["a"]
+
+
+def test_spec_not_json_roundtrippable_kept_out_of_cache(tmp_path: Path) -> None:
+    # yaml 解出 date: 落盘会变成 str, 命中与未命中类型不一 → 不落库, 新进程照读
+    store = _store(tmp_path)
+    _mk(store.tasks, "a")
+    prd = store.tasks / "a" / "prd.md"
+    prd.write_text("---\ndesc: x\ndue: 2026-01-02\n---\n", encoding="utf-8")
+    os.utime(prd, (_OLD, _OLD))
+    import datetime
+    assert store.load("a")["due"] == datetime.date(2026, 1, 2)
+    scan = _fresh_scan(tmp_path)
+    assert _get(scan, "a")["due"] == datetime.date(2026, 1, 2)
+    assert scan.reads == 1
+
+
+def test_uninitialized_workspace_gets_no_cache_dir(tmp_path: Path) -> None:
+    tasks = tmp_path / "nowhere" / "task"
+    scan = TaskScan(tasks, cache=tmp_path / "nowhere" / ".cache" / "tasks.db")
+    assert scan.scan() == [] and scan.get("x") is None
+    assert not (tmp_path / "nowhere").exists()
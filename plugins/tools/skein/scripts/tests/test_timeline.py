@@ -1,10 +1,13 @@
-"""task.json timeline 行为测试 — 走 `skein_cli` 跑真命令, 读回 task.json 断言。
+"""timeline 行为测试 — 走 `skein_cli` 跑真命令, 读回落盘的 timeline.jsonl 断言。
 
 覆盖 (对应 wire-task/wire-sub 落地后的时间线):
-1. 追加语义: 每次生命周期动作只 append 一条, 已有条目原样不变(不改写/不删)。
+1. 追加语义: 每次生命周期动作只 append 一条, 已有行逐字节不变(不改写/不删); task.json 不再带事件。
 2. rollback 判定: task 级 (research→plan 回退) / subtask 级 (fail 后重 start 视为回滚)。
 3. 多轮 check: `check` 已在检查中态时幂等, 不重复 append。
-4. 老数据容错: task.json 缺 "timeline" 字段(模拟迁移前老数据)时不崩, 后续动作能正常补上。
+4. 老数据容错: 没有 timeline.jsonl (模拟迁移前老数据)时不崩, 后续动作能正常补上。
+5. 老格式自愈: task.json 内嵌 timeline 的 task, 下一次落盘把老事件搬进日志 (排在新事件前)。
+6. 写放大: 一次 subtask 迁移只给日志追加一行, 不随事件数重写 task.json。
+7. 末状态缓存: task.json 的 `timeline_last` 与日志大小对得上就不读日志; 对不上回落全量读。
 
 🛑 禁 import skeinlib 内部函数(timeline.append / 状态枚举等) —— 只经 `skein_cli` 子进程操作,
 断言只认 CLI 落盘的字面字符串, 黑盒验证真实行为(而非白盒验证实现细节)。
@@ -36,8 +39,12 @@ def _task(ws: Path, tid: str) -> dict[str, Any]:
 def _write_task(ws: Path, tid: str, t: dict[str, Any]) -> None:
     (ws / ".skein" / "task" / tid / "task.json").write_text(json.dumps(t))
 
-def _timeline(t: dict[str, Any]) -> list[dict[str, Any]]:
-    return cast(list[dict[str, Any]], t.get("timeline", []))
+def _log(ws: Path, tid: str) -> Path:
+    return ws / ".skein" / "task" / tid / "timeline.jsonl"
+
+def _timeline(ws: Path, tid: str) -> list[dict[str, Any]]:
+    f = _log(ws, tid)
+    return [cast(dict[str, Any], json.loads(x)) for x in f.read_text().splitlines()] if f.exists() else []
 
 def _ready_task(ws: Path, skein_cli: SkeinCli, tid: str = "feat-tl") -> str:
     """结构上够格 confirm 的 task (复用 test_confirm_gate 的配方)。"""
@@ -52,24 +59,23 @@ def _ready_task(ws: Path, skein_cli: SkeinCli, tid: str = "feat-tl") -> str:
 # ---------- 1. 追加语义: 只增不改 ----------
 def test_timeline_append_only_grows(skein_cli: SkeinCli, ws: Path) -> None:
     tid = _ready_task(ws, skein_cli)
-    t = _task(ws, tid)
-    tl = _timeline(t)
+    tl = _timeline(ws, tid)
     assert len(tl) == 1, f"create 应写入唯一一条 task 事件: {tl}"
     assert tl[0]["kind"] == "task" and tl[0]["status"] == "pending" and tl[0]["rollback"] is False
-    snapshot0 = dict(tl[0])
+    assert "timeline" not in _task(ws, tid), "事件只进 timeline.jsonl, 不随 task.json 重写"
+    raw0 = _log(ws, tid).read_bytes()
 
     skein_cli(ws, "confirm", tid, "--approved")
-    t2 = _task(ws, tid)
-    tl2 = _timeline(t2)
+    tl2 = _timeline(ws, tid)
     assert len(tl2) == 2, f"confirm 应新追加一条, 而非改写: {tl2}"
-    assert tl2[0] == snapshot0, "已有条目不该被后续动作改写"
+    assert _log(ws, tid).read_bytes().startswith(raw0), "已有行不该被后续动作改写"
     assert tl2[1]["status"] == "active" and tl2[1]["rollback"] is False
+    raw2 = _log(ws, tid).read_bytes()
 
     skein_cli(ws, "check", tid)
-    t3 = _task(ws, tid)
-    tl3 = _timeline(t3)
+    tl3 = _timeline(ws, tid)
     assert len(tl3) == 3, f"check 应再追加一条: {tl3}"
-    assert tl3[:2] == tl2, "前两条不该因新动作被改动"
+    assert _log(ws, tid).read_bytes().startswith(raw2), "前两行不该因新动作被改动"
     assert tl3[2]["status"] == "check" and tl3[2]["rollback"] is False
 
 # ---------- 2. rollback: task 级 (research → plan 回退) ----------
@@ -81,8 +87,7 @@ def test_timeline_rollback_task_level(skein_cli: SkeinCli, ws: Path) -> None:
     skein_cli(ws, "research", tid)
     skein_cli(ws, "research", "done", tid, "r1")  # plan 门槛: research subtask 须全 done
     skein_cli(ws, "plan", tid)  # 调研中→待处理, 序号倒退 (research=1 → pending=0)
-    t = _task(ws, tid)
-    task_events = [e for e in _timeline(t) if e["kind"] == "task"]
+    task_events = [e for e in _timeline(ws, tid) if e["kind"] == "task"]
     assert [(e["status"], e["rollback"]) for e in task_events] == [
         ("pending", False), ("research", False), ("pending", True),
     ], task_events
@@ -98,8 +103,7 @@ def test_timeline_rollback_subtask_level(skein_cli: SkeinCli, ws: Path) -> None:
     skein_cli(ws, "subtask", "start", tid, "s1")  # 失败后重 start = 回滚重跑
     skein_cli(ws, "subtask", "done", tid, "s1")
 
-    t = _task(ws, tid)
-    sub_events = [e for e in _timeline(t) if e["kind"] == "subtask" and e["sid"] == "s1"]
+    sub_events = [e for e in _timeline(ws, tid) if e["kind"] == "subtask" and e["sid"] == "s1"]
     assert [(e["status"], e["rollback"]) for e in sub_events] == [
         ("running", False),
         ("failed", False),
@@ -115,46 +119,103 @@ def test_timeline_multi_round_check_is_idempotent(skein_cli: SkeinCli, ws: Path)
     d1 = json.loads(r1.stdout)
     assert d1.get("status") == "check" and not d1.get("idempotent")
 
-    t_after_first = _task(ws, tid)
-    check_events_1 = [e for e in _timeline(t_after_first) if e.get("status") == "check"]
+    tl_after_first = _timeline(ws, tid)
+    check_events_1 = [e for e in tl_after_first if e.get("status") == "check"]
     assert len(check_events_1) == 1
 
     r2 = skein_cli(ws, "check", tid)  # 再跑一次 (多轮 checker 自跑场景)
     d2 = json.loads(r2.stdout)
     assert d2.get("idempotent") is True, f"重复 check 应幂等: {d2}"
 
-    t_after_second = _task(ws, tid)
-    check_events_2 = [e for e in _timeline(t_after_second) if e.get("status") == "check"]
+    tl_after_second = _timeline(ws, tid)
+    check_events_2 = [e for e in tl_after_second if e.get("status") == "check"]
     assert len(check_events_2) == 1, f"幂等调用不该再追加一条: {check_events_2}"
-    assert _timeline(t_after_second) == _timeline(t_after_first), "幂等调用不该改动 timeline"
+    assert tl_after_second == tl_after_first, "幂等调用不该改动 timeline"
 
-# ---------- 5. 老数据容错: task.json 缺 "timeline" 字段不崩 ----------
+# ---------- 5. 老数据容错: 没有 timeline.jsonl 不崩 ----------
 def test_timeline_legacy_data_missing_field_tolerated(skein_cli: SkeinCli, ws: Path) -> None:
     # 先推到「进行中」再抹 timeline —— start 要求 task 可调度, 与本用例要验的老数据自愈无关
     tid = _ready_task(ws, skein_cli, "feat-legacy")
     skein_cli(ws, "confirm", tid, "--approved")
-    t = _task(ws, tid)
-    assert "timeline" in t
-    del t["timeline"]  # 模拟 timeline 功能上线前的老 task.json
-    _write_task(ws, tid, t)
+    assert _log(ws, tid).exists()
+    _log(ws, tid).unlink()  # 模拟 timeline 功能上线前的老 task
 
-    # 只读路径: status --json 不因缺字段崩, 原样回落空列表 (views.py 注释所述)
+    # 只读路径: status --json 不因缺日志崩, 原样回落空列表 (views.py 注释所述)
     r_status = skein_cli(ws, "status", tid)
     assert r_status.returncode == 0, f"老数据读 status 不该崩: {r_status.stderr}"
     status_data = json.loads(r_status.stdout)
     assert status_data.get("timeline", []) == [], f"缺字段应回落空列表: {status_data.get('timeline')}"
 
-    # 写路径: 后续动作 (subtask add + start) 触发 timeline.append, 应自愈补回字段而非崩
+    # 写路径: 后续动作 (subtask add + start) 触发 timeline.append, 应自愈新建日志而非崩
     r_add = skein_cli(ws, "subtask", "add", tid, "s2", "--name", "子二", "--desc", "d", "--estimate", "1")
     assert r_add.returncode == 0, f"老数据下新增 subtask 不该崩: {r_add.stderr}"
     r_start = skein_cli(ws, "subtask", "start", tid, "s2")
     assert r_start.returncode == 0, f"老数据下 start 不该崩: {r_start.stderr}"
 
-    t2 = _task(ws, tid)
-    tl2 = _timeline(t2)
+    tl2 = _timeline(ws, tid)
     assert len(tl2) == 1, f"老数据自愈后应正常追加新事件: {tl2}"
     assert tl2[0]["kind"] == "subtask" and tl2[0]["status"] == "running" and tl2[0]["sid"] == "s2"
 
+# ---------- 6. 老格式: task.json 内嵌 timeline, 下次落盘搬进日志 ----------
+def test_timeline_inline_legacy_moves_to_log_on_save(skein_cli: SkeinCli, ws: Path) -> None:
+    tid = _ready_task(ws, skein_cli, "feat-inline")
+    skein_cli(ws, "confirm", tid, "--approved")
+    t = _task(ws, tid)
+    t["timeline"] = _timeline(ws, tid)  # 模拟旧版: 事件内嵌在 task.json, 没有日志
+    _log(ws, tid).unlink()
+    _write_task(ws, tid, t)
+
+    skein_cli(ws, "subtask", "start", tid, "s1")
+    skein_cli(ws, "subtask", "fail", tid, "s1", "--note", "boom")
+    assert "timeline" not in _task(ws, tid), "落盘后 task.json 不该再内嵌事件"
+    tl = _timeline(ws, tid)
+    assert [(e["kind"], e["status"]) for e in tl] == [
+        ("task", "pending"), ("task", "active"), ("subtask", "running"), ("subtask", "failed")], tl
+    assert tl[3]["note"] == "boom"
+
+# ---------- 7. 写放大: 一次迁移追加一行, 不重写事件 ----------
+def test_timeline_transition_appends_one_small_line(skein_cli: SkeinCli, ws: Path) -> None:
+    tid = _ready_task(ws, skein_cli, "feat-bytes")
+    skein_cli(ws, "confirm", tid, "--approved")
+    for _ in range(5):  # 攒一段历史: 老方案下每条都随 task.json 重写
+        skein_cli(ws, "subtask", "start", tid, "s1")
+        skein_cli(ws, "subtask", "fail", tid, "s1", "--note", "retry")
+    before = _log(ws, tid).stat().st_size
+    skein_cli(ws, "subtask", "start", tid, "s1")
+    grown = _log(ws, tid).stat().st_size - before
+    assert 0 < grown < 200, f"一次迁移应只追加百来字节: {grown}"
+    assert len(_timeline(ws, tid)) == 13
+    assert "timeline" not in _task(ws, tid), "历史事件不该留在 task.json"
+
+# ---------- 8. 末状态缓存: 大小对得上信缓存, 对不上全量重建 ----------
+def test_timeline_last_cache_skips_log_read(skein_cli: SkeinCli, ws: Path) -> None:
+    tid = _ready_task(ws, skein_cli, "feat-cache")
+    skein_cli(ws, "confirm", tid, "--approved")
+    t = _task(ws, tid)
+    assert t["timeline_last"] == {"size": _log(ws, tid).stat().st_size, "last": {"task": "active"}}
+
+    # 只改缓存不动日志: 大小仍对得上 → 判定只看缓存 (日志里没有 s1 事件, 读日志则不会判回滚)
+    t["timeline_last"]["last"]["subtask:s1"] = "failed"
+    _write_task(ws, tid, t)
+    skein_cli(ws, "subtask", "start", tid, "s1")
+    assert _timeline(ws, tid)[-1]["rollback"] is True, "缓存有效时不该再读日志"
+    assert _task(ws, tid)["timeline_last"]["size"] == _log(ws, tid).stat().st_size
+
+
+def test_timeline_last_cache_stale_rebuilds_from_log(skein_cli: SkeinCli, ws: Path) -> None:
+    tid = _ready_task(ws, skein_cli, "feat-stale")
+    skein_cli(ws, "confirm", tid, "--approved")
+    skein_cli(ws, "subtask", "start", tid, "s1")
+    skein_cli(ws, "subtask", "fail", tid, "s1")
+    # 日志被外部改写 (如合并/手工清理去掉了 s1 的事件), task.json 的缓存没跟上 → 大小对不上
+    kept = [e for e in _timeline(ws, tid) if e["kind"] == "task"]
+    _log(ws, tid).write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in kept))
+    skein_cli(ws, "subtask", "start", tid, "s1")
+    tl = _timeline(ws, tid)
+    assert (tl[-1]["status"], tl[-1]["rollback"]) == ("running", False), "应按日志重建, 不信过期缓存"
+    assert _task(ws, tid)["timeline_last"] == {
+        "size": _log(ws, tid).stat().st_size, "last": {"task": "active", "subtask:s1": "running"}}
+
 if __name__ == "__main__":
     import tempfile
 
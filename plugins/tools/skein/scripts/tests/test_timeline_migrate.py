@@ -0,0 +1,69 @@
+"""timeline.jsonl 的读侧合并与一次性迁移 (`migrate.migrate_timeline`)。
+
+覆盖: 内嵌老事件搬进日志且排在已有行前 / 归档 task 一并迁 / 幂等 / task.json 其余字段 (updated)
+不动 / 半截末行跳过 / 详情页视图合并内嵌 + 日志。黑盒的追加/rollback 语义见 test_timeline.py。
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import conftest  # noqa: F401  模块体把 scripts/ 塞进 sys.path
+from skeinlib.task import timeline as _timeline  # noqa: E402
+from skeinlib.task.migrate import migrate_timeline  # noqa: E402
+
+
+def _ev(status: str, at: int, **kw: Any) -> dict[str, Any]:
+    return {"kind": "task", "status": status, "at": at, "sid": None, "note": "", "rollback": False, **kw}
+
+
+def _task_dir(root: Path, tid: str, timeline: list[dict[str, Any]] | None) -> Path:
+    d = root / tid
+    d.mkdir(parents=True)
+    t: dict[str, Any] = {"id": tid, "name": tid, "status": "active", "updated": 123}
+    if timeline is not None:
+        t["timeline"] = timeline
+    (d / "task.json").write_text(json.dumps(t))
+    return d
+
+
+def test_migrate_moves_inline_events_and_is_idempotent(tmp_path: Path) -> None:
+    tasks, archive = tmp_path / "task", tmp_path / "task" / "archive"
+    a = _task_dir(tasks, "a", [_ev("pending", 1), _ev("active", 2)])
+    b = _task_dir(tasks, "b", [_ev("pending", 1)])
+    (b / _timeline.LOG).write_text(json.dumps(_ev("active", 5)) + "\n")  # 中途被杀过: 日志已有新行
+    _task_dir(tasks, "c", None)  # 已是新格式
+    old = _task_dir(archive / "2025" / "01-02", "old", [_ev("done", 9)])
+
+    assert migrate_timeline(tasks, archive) == ["a", "b", "old"]
+    assert [e["status"] for e in _timeline.read(a)] == ["pending", "active"]
+    assert [e["at"] for e in _timeline.read(b)] == [1, 5]  # 内嵌的更早, 排前面
+    assert [e["status"] for e in _timeline.read(old)] == ["done"]
+    for d in (a, b, old):
+        t = json.loads((d / "task.json").read_text())
+        assert "timeline" not in t and t["updated"] == 123  # 迁移不是状态变更
+    assert migrate_timeline(tasks, archive) == []
+    assert len(_timeline.read(a)) == 2
+
+
+def test_flush_keeps_migrated_rollback_and_judges_new_against_log(tmp_path: Path) -> None:
+    d = tmp_path / "t"
+    d.mkdir()
+    _timeline.flush(d, [_ev("research", 1, rollback=True)])  # 迁来的老事件: rollback 原样
+    t: dict[str, Any] = {}
+    _timeline.append(t, "task", "pending")
+    _timeline.append(t, "subtask", "running", sid="s1")
+    _timeline.flush(d, t["timeline"])
+    assert [(e["status"], e["rollback"]) for e in _timeline.read(d)] == [
+        ("research", True), ("pending", True), ("running", False)]
+
+
+def test_read_skips_torn_line_and_merged_view_joins_both(tmp_path: Path) -> None:
+    d = tmp_path / "t"
+    d.mkdir()
+    (d / _timeline.LOG).write_text(json.dumps(_ev("active", 2)) + "\n" + '{"kind": "ta')
+    assert [e["status"] for e in _timeline.read(d)] == ["active"]
+    data = {"timeline": [_ev("pending", 1)]}
+    assert [e["at"] for e in _timeline.merged(d, data)] == [1, 2]
+    assert _timeline.merged(tmp_path / "missing", {}) == []